@@ -0,0 +1,108 @@
+"""
+로그 ID 저장 형식별 INSERT 처리량 / 테이블·인덱스 크기 벤치마크
+
+email_logs와 같은 형태(PK id, (created_at, id)/(status, created_at, id) 보조 인덱스)의 임시 테이블에
+같은 행 수를 INSERT하고, 1초당 INSERT 행 수와 데이터/인덱스 크기를 비교한다.
+- CHAR(36) + UUIDv4 : 기존 방식
+- CHAR(36) + UUIDv7 : 시간순 ID만 적용 (LOG_ID_STORAGE=char)
+- BINARY(16) + UUIDv7 : LOG_ID_STORAGE=binary
+
+InnoDB clustered index의 페이지 분할 차이는 MySQL에서 실행해야 드러난다
+(SQLite는 rowid 테이블이라 PK는 별도 인덱스로만 비교됨).
+
+실행: cd backend && python benchmarks/bench_log_ids.py [행 수] [DB URL]
+      DB URL을 생략하면 임시 SQLite 파일 사용, MySQL 예: mysql+pymysql://user:pw@host/db
+"""
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import Column, DateTime, Index, MetaData, String, Table, Text, create_engine, insert, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_ids import LogId, uuid7
+
+BATCH_SIZE = 500
+
+VARIANTS = [
+    ("CHAR(36) + UUIDv4", "char_v4", False, lambda: str(uuid.uuid4())),
+    ("CHAR(36) + UUIDv7", "char_v7", False, lambda: str(uuid7())),
+    ("BINARY(16) + UUIDv7", "binary_v7", True, lambda: str(uuid7())),
+]
+
+
+def build_table(metadata: MetaData, name: str, binary: bool) -> Table:
+    table_name = f"bench_log_ids_{name}"
+    return Table(
+        table_name, metadata,
+        Column("id", LogId(binary=binary), primary_key=True),
+        Column("status", String(50), nullable=False),
+        Column("body", Text, nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Index(f"idx_{table_name}_created_at_id", "created_at", "id"),
+        Index(f"idx_{table_name}_status_created_at", "status", "created_at", "id"),
+    )
+
+
+def insert_rows(engine, table: Table, new_id, rows: int) -> float:
+    """BATCH_SIZE건씩 multi-row INSERT, 1초당 행 수"""
+    base = datetime.utcnow()
+    body = "x" * 200
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        for start in range(0, rows, BATCH_SIZE):
+            conn.execute(insert(table), [
+                {"id": new_id(), "status": "success", "body": body, "created_at": base + timedelta(milliseconds=i)}
+                for i in range(start, min(start + BATCH_SIZE, rows))
+            ])
+    return rows / (time.perf_counter() - started)
+
+
+def table_sizes(engine, table: Table):
+    """(데이터 바이트, 인덱스 바이트)"""
+    with engine.connect() as conn:
+        if engine.dialect.name == "mysql":
+            conn.execute(text(f"ANALYZE TABLE {table.name}"))
+            data, index = conn.execute(text(
+                "SELECT data_length, index_length FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = :name"
+            ), {"name": table.name}).one()
+            return int(data), int(index)
+        sizes = dict(conn.execute(text("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")).all())
+    data = sizes.pop(table.name, 0)
+    index = sum(size for name, size in sizes.items() if table.name in name)
+    return data, index
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    url = sys.argv[2] if len(sys.argv) > 2 else None
+    workdir = tempfile.TemporaryDirectory() if url is None else None
+
+    print(f"행 수: {rows}")
+    print(f"{'형식':<22}{'rows/s':>12}{'data KB':>12}{'index KB':>12}")
+    for label, name, binary, new_id in VARIANTS:
+        # SQLite는 형식마다 별도 파일 (dbstat 크기에 다른 테이블이 섞이지 않도록)
+        engine = create_engine(url or f"sqlite:///{workdir.name}/{name}.db")
+        metadata = MetaData()
+        table = build_table(metadata, name, binary)
+        metadata.drop_all(engine)
+        metadata.create_all(engine)
+        try:
+            throughput = insert_rows(engine, table, new_id, rows)
+            data, index = table_sizes(engine, table)
+        finally:
+            metadata.drop_all(engine)
+            engine.dispose()
+        print(f"{label:<22}{throughput:>12.0f}{data / 1024:>12.0f}{index / 1024:>12.0f}")
+
+    if workdir is not None:
+        workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
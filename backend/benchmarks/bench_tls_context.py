@@ -0,0 +1,51 @@
+"""
+SSLContext 생성 비용 마이크로벤치마크
+
+메시지마다 certifi CA 번들을 파싱하던 기존 방식과 캐시된 컨텍스트를 재사용하는 방식의
+1회당 CPU 시간을 비교한다.
+
+실행: cd backend && python benchmarks/bench_tls_context.py [반복 횟수]
+"""
+import os
+import ssl
+import sys
+import time
+
+import certifi
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from email_service import get_tls_context, _certifi_bundle
+
+
+def build_per_send():
+    """기존 방식: 발송마다 certifi.where() + create_default_context"""
+    return ssl.create_default_context(cafile=certifi.where())
+
+
+def build_cached():
+    """캐시 방식: 최초 1회 생성 후 재사용"""
+    return get_tls_context(True, _certifi_bundle())
+
+
+def measure(func, iterations: int) -> float:
+    """1회당 평균 CPU 시간 (ms)"""
+    started = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - started) / iterations * 1000
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    before = measure(build_per_send, iterations)
+    after = measure(build_cached, iterations)
+    print(f"반복 횟수: {iterations}")
+    print(f"발송마다 생성 : {before:.4f} ms/send")
+    print(f"캐시 재사용   : {after:.4f} ms/send")
+    if after > 0:
+        print(f"개선 배율     : {before / after:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
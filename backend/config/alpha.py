@@ -96,6 +96,131 @@ class AlphaConfig:
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")  # 프로덕션은 INFO
     
+    # SMTP 커넥션 풀 (목적지별 인증된 세션 재사용)
+    SMTP_POOL_ENABLED: bool = os.getenv("SMTP_POOL_ENABLED", "true").lower() in ("true", "1", "yes")
+    SMTP_POOL_MAX_SIZE: int = int(os.getenv("SMTP_POOL_MAX_SIZE", "5"))
+    SMTP_POOL_IDLE_TIMEOUT: float = float(os.getenv("SMTP_POOL_IDLE_TIMEOUT", "30"))
+
+    # 이메일 비동기 발송 큐 (활성화 시 발송 API는 202 반환 후 워커가 발송)
+    EMAIL_QUEUE_ENABLED: bool = os.getenv("EMAIL_QUEUE_ENABLED", "false").lower() in ("true", "1", "yes")
+    EMAIL_QUEUE_WORKERS: int = int(os.getenv("EMAIL_QUEUE_WORKERS", "4"))
+    EMAIL_QUEUE_MAX_SIZE: int = int(os.getenv("EMAIL_QUEUE_MAX_SIZE", "1000"))
+    EMAIL_QUEUE_DRAIN_TIMEOUT: float = float(os.getenv("EMAIL_QUEUE_DRAIN_TIMEOUT", "30"))
+
+    # 대량(batch) 이메일 발송
+    EMAIL_BATCH_MAX_RECIPIENTS: int = int(os.getenv("EMAIL_BATCH_MAX_RECIPIENTS", "50000"))
+    EMAIL_BATCH_SESSIONS: int = int(os.getenv("EMAIL_BATCH_SESSIONS", "4"))
+    EMAIL_BATCH_FLUSH_SIZE: int = int(os.getenv("EMAIL_BATCH_FLUSH_SIZE", "500"))
+
+    # 예약 발송 (send_at): DB 증분 로드 주기/구간, 만기 작업 방출 속도(초당), 최대 예약 기간
+    # 켜려면 JOB_PAYLOAD_KEY를 task definition/Secrets Manager로 함께 주입 (예약 발송/재시도는 끄면 사용 불가)
+    SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "false").lower() in ("true", "1", "yes")
+    SCHEDULER_POLL_INTERVAL: float = float(os.getenv("SCHEDULER_POLL_INTERVAL", "5"))
+    SCHEDULER_LOOKAHEAD: float = float(os.getenv("SCHEDULER_LOOKAHEAD", "300"))
+    SCHEDULER_RELEASE_RATE: float = float(os.getenv("SCHEDULER_RELEASE_RATE", "50"))
+    SCHEDULER_MAX_DAYS: int = int(os.getenv("SCHEDULER_MAX_DAYS", "30"))
+    # 직접 발송 중 인스턴스가 중단되어 pending으로 남은 예약 작업을 다시 발송하기까지의 시간(초)
+    SCHEDULER_CLAIM_TIMEOUT: float = float(os.getenv("SCHEDULER_CLAIM_TIMEOUT", "600"))
+    # 예약 이메일 발송 정보(SMTP 인증 정보/첨부파일) 암호화 키 (Fernet.generate_key()로 생성)
+    # 예약 발송/outbox를 켜면 필수 (모든 ECS task가 같은 키를 사용해야 하며, 없으면 서버가 시작되지 않음)
+    JOB_PAYLOAD_KEY: str = os.getenv("JOB_PAYLOAD_KEY", "")
+
+    # 발송 작업 outbox (로그와 같은 트랜잭션으로 작업 저장, 모든 인스턴스가 lease를 잡고 나눠 처리)
+    # 켜면 발송 API가 202(status=queued)를 반환하므로 클라이언트가 처리할 수 있을 때 켤 것
+    OUTBOX_ENABLED: bool = os.getenv("OUTBOX_ENABLED", "false").lower() in ("true", "1", "yes")
+    OUTBOX_CONCURRENCY: int = int(os.getenv("OUTBOX_CONCURRENCY", "8"))
+    OUTBOX_POLL_INTERVAL: float = float(os.getenv("OUTBOX_POLL_INTERVAL", "1"))
+    OUTBOX_LEASE_SECONDS: float = float(os.getenv("OUTBOX_LEASE_SECONDS", "120"))
+    OUTBOX_MAX_CLAIMS: int = int(os.getenv("OUTBOX_MAX_CLAIMS", "5"))
+
+    # 발송 로그 write-behind (로그 변경을 모아 batch로 기록, 동기 발송은 로그 INSERT를 기다리지 않음)
+    # 켜면 응답의 log_id가 flush 전까지 DB에 없으므로 (다른 task 조회 불가, task 비정상 종료 시 유실) 이를 감수할 수 있을 때 켤 것
+    LOG_WRITER_ENABLED: bool = os.getenv("LOG_WRITER_ENABLED", "false").lower() in ("true", "1", "yes")
+    LOG_WRITER_BATCH_SIZE: int = int(os.getenv("LOG_WRITER_BATCH_SIZE", "200"))
+    LOG_WRITER_FLUSH_INTERVAL: float = float(os.getenv("LOG_WRITER_FLUSH_INTERVAL", "0.2"))
+    LOG_WRITER_MAX_PENDING: int = int(os.getenv("LOG_WRITER_MAX_PENDING", "10000"))
+    LOG_WRITER_PUT_TIMEOUT: float = float(os.getenv("LOG_WRITER_PUT_TIMEOUT", "2"))
+
+    # 발송 로그 보관 기간 (만료된 로그/월 파티션을 압축 NDJSON으로 아카이브 후 삭제, 0이면 삭제하지 않음)
+    # ECS task 로컬 디스크는 task 종료 시 사라지므로 LOG_ARCHIVE_S3_BUCKET을 설정한 뒤 켤 것
+    LOG_RETENTION_ENABLED: bool = os.getenv("LOG_RETENTION_ENABLED", "false").lower() in ("true", "1", "yes")
+    LOG_RETENTION_EMAIL_DAYS: int = int(os.getenv("LOG_RETENTION_EMAIL_DAYS", "180"))
+    LOG_RETENTION_PUSH_DAYS: int = int(os.getenv("LOG_RETENTION_PUSH_DAYS", "90"))
+    LOG_RETENTION_INTERVAL: float = float(os.getenv("LOG_RETENTION_INTERVAL", "3600"))
+    LOG_RETENTION_BATCH_SIZE: int = int(os.getenv("LOG_RETENTION_BATCH_SIZE", "1000"))
+    LOG_PARTITION_PREMAKE_MONTHS: int = int(os.getenv("LOG_PARTITION_PREMAKE_MONTHS", "2"))
+    LOG_ARCHIVE_ENABLED: bool = os.getenv("LOG_ARCHIVE_ENABLED", "true").lower() in ("true", "1", "yes")
+    LOG_ARCHIVE_DIR: str = os.getenv("LOG_ARCHIVE_DIR", "./log-archive")
+    LOG_ARCHIVE_S3_BUCKET: str = os.getenv("LOG_ARCHIVE_S3_BUCKET", "")
+    LOG_ARCHIVE_S3_PREFIX: str = os.getenv("LOG_ARCHIVE_S3_PREFIX", "ig-notification/")
+
+    # 로그 ID 저장 형식: char는 CHAR(36) 문자열, binary는 BINARY(16) (database/init_db.sql 마이그레이션 후 변경)
+    LOG_ID_STORAGE: str = os.getenv("LOG_ID_STORAGE", "char")
+
+    # 발송 재시도 (일시적 오류만 지수 백오프+jitter로 재시도, 목적지별 재시도 예산)
+    RETRY_ENABLED: bool = os.getenv("RETRY_ENABLED", "true").lower() in ("true", "1", "yes")
+    RETRY_MAX_ATTEMPTS: int = int(os.getenv("RETRY_MAX_ATTEMPTS", "4"))
+    RETRY_BASE_DELAY: float = float(os.getenv("RETRY_BASE_DELAY", "2"))
+    RETRY_MAX_DELAY: float = float(os.getenv("RETRY_MAX_DELAY", "300"))
+    RETRY_BUDGET_RATIO: float = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))
+    RETRY_BUDGET_MIN: int = int(os.getenv("RETRY_BUDGET_MIN", "10"))
+    RETRY_BUDGET_WINDOW: float = float(os.getenv("RETRY_BUDGET_WINDOW", "60"))
+
+    # 목적지별 발송 속도 제한(초당 발송 수/burst, 421/451·QUOTA_EXCEEDED 시 감소) + circuit breaker
+    OUTBOUND_LIMIT_ENABLED: bool = os.getenv("OUTBOUND_LIMIT_ENABLED", "true").lower() in ("true", "1", "yes")
+    SMTP_RATE_PER_HOST: float = float(os.getenv("SMTP_RATE_PER_HOST", "20"))
+    SMTP_BURST_PER_HOST: float = float(os.getenv("SMTP_BURST_PER_HOST", "40"))
+    FCM_RATE_PER_PROJECT: float = float(os.getenv("FCM_RATE_PER_PROJECT", "1000"))
+    FCM_BURST_PER_PROJECT: float = float(os.getenv("FCM_BURST_PER_PROJECT", "2000"))
+    OUTBOUND_MIN_RATE_RATIO: float = float(os.getenv("OUTBOUND_MIN_RATE_RATIO", "0.1"))
+    OUTBOUND_MAX_WAIT: float = float(os.getenv("OUTBOUND_MAX_WAIT", "5"))
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_TIMEOUT: float = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+
+    # 발송 API Idempotency-Key (같은 키 재요청 시 재발송 없이 최초 응답 반환)
+    IDEMPOTENCY_TTL_HOURS: int = int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+    IDEMPOTENCY_CACHE_SIZE: int = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+    IDEMPOTENCY_WAIT_TIMEOUT: float = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "30"))
+    # 처리 중 키 lease: 처리하던 인스턴스가 죽으면 이 시간 후 재시도가 키를 인수 (대기 시간 + 발송 시간보다 길게)
+    IDEMPOTENCY_LEASE_SECONDS: float = float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "120"))
+
+    # 발송 API rate limit (sliding window, 저장소: memory | database(ECS task 간 공유))
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("true", "1", "yes")
+    RATE_LIMIT_STORAGE: str = os.getenv("RATE_LIMIT_STORAGE", "database")
+    # 클라이언트 앞단 프록시 수 (ALB 뒤: 1, X-Forwarded-For에서 오른쪽부터 이 수만큼 건너뛴 주소를 클라이언트 IP로 사용)
+    RATE_LIMIT_TRUSTED_PROXIES: int = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "1"))
+    # API 키별 한도: "API 키 sha256 앞 16자리=600/minute,..."
+    RATE_LIMIT_API_KEY_LIMITS: str = os.getenv("RATE_LIMIT_API_KEY_LIMITS", "")
+
+    # FCM 푸시 발송 스레드 풀 (이벤트 루프 밖에서 send_each 실행)
+    PUSH_EXECUTOR_WORKERS: int = int(os.getenv("PUSH_EXECUTOR_WORKERS", "16"))
+    PUSH_PROJECT_CONCURRENCY: int = int(os.getenv("PUSH_PROJECT_CONCURRENCY", "4"))
+
+    # Firebase 앱(서비스 계정) 캐시: TTL 만료 전 백그라운드 갱신, LRU/idle 정리, Secret 없음은 negative 캐시
+    FIREBASE_APP_CACHE_TTL: float = float(os.getenv("FIREBASE_APP_CACHE_TTL", "3600"))
+    FIREBASE_APP_CACHE_MAX_SIZE: int = int(os.getenv("FIREBASE_APP_CACHE_MAX_SIZE", "100"))
+    FIREBASE_APP_IDLE_TIMEOUT: float = float(os.getenv("FIREBASE_APP_IDLE_TIMEOUT", "86400"))
+    FIREBASE_APP_NEGATIVE_TTL: float = float(os.getenv("FIREBASE_APP_NEGATIVE_TTL", "60"))
+    # 서버 시작 시 미리 초기화할 Firebase 프로젝트 ID (쉼표 구분)
+    FIREBASE_PREWARM_PROJECTS: str = os.getenv("FIREBASE_PREWARM_PROJECTS", "")
+
+    # FCM dead 토큰 레지스트리 (UNREGISTERED 등 영구 실패 토큰은 발송 전 제외)
+    PUSH_TOKEN_PREFILTER_ENABLED: bool = os.getenv("PUSH_TOKEN_PREFILTER_ENABLED", "true").lower() in ("true", "1", "yes")
+    PUSH_TOKEN_REGISTRY_REFRESH_INTERVAL: float = float(os.getenv("PUSH_TOKEN_REGISTRY_REFRESH_INTERVAL", "300"))
+
+    # 대량 푸시 fan-out (500개 단위 chunk 동시 발송)
+    PUSH_FANOUT_MAX_TOKENS: int = int(os.getenv("PUSH_FANOUT_MAX_TOKENS", "1000000"))
+    PUSH_FANOUT_MAX_FILE_MB: int = int(os.getenv("PUSH_FANOUT_MAX_FILE_MB", "200"))
+
+    # DB 커넥션 풀 (queue: 크기 제한 QueuePool, null: 요청마다 연결 생성/해제)
+    DB_POOL_MODE: str = os.getenv("DB_POOL_MODE", "queue")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("true", "1", "yes")
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+    DB_POOL_IDLE_TIMEOUT: float = float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))
+
     # Environment name
     ENV_NAME: str = "alpha"
 
@@ -1,30 +1,134 @@
-from sqlalchemy import create_engine, Column, String, Integer, BigInteger, DateTime, Text, CHAR
+from sqlalchemy import create_engine, make_url, Column, Index, String, Integer, BigInteger, DateTime, Text, CHAR, LargeBinary
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy.dialects.mysql import JSON
-from sqlalchemy.pool import NullPool
+from sqlalchemy.dialects.mysql import JSON, LONGBLOB
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+import threading
+import time
 import uuid
 from datetime import datetime
+from typing import Any, AsyncIterator, Dict
+from log_ids import LogId, new_log_id
 from settings import settings
 
-# NullPool: 연결을 pool에 유지하지 않고 요청마다 생성/즉시 반환
-# MySQL max_connections 제한이 있는 공유 DB 환경에서 idle connection 점유 방지
+
+class PoolMetrics:
+    """커넥션 풀 checkout 대기 시간 / 사용량 지표"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.last_checkin_at = time.monotonic()
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def record_checkin(self):
+        self.last_checkin_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "avg_wait_ms": round(self.total_wait_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+class _MeteredPoolMixin:
+    """checkout 시 풀에서 커넥션을 얻기까지 걸린 시간을 기록"""
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.metrics.record_wait(time.perf_counter() - started)
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self.metrics.record_checkin()
+
+
+class MeteredQueuePool(_MeteredPoolMixin, QueuePool):
+    metrics = PoolMetrics()
+
+
+class MeteredAsyncQueuePool(_MeteredPoolMixin, AsyncAdaptedQueuePool):
+    metrics = PoolMetrics()
+
+
+# 동기 드라이버 → 비동기 드라이버 매핑 (FastAPI 라우트용 AsyncSession)
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def _to_async_url(database_url: str) -> URL:
+    url = make_url(database_url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+def _build_engine_kwargs(database_url, pool_class) -> Dict[str, Any]:
+    """
+    DB 커넥션 풀 설정.
+    기본은 크기가 제한된 QueuePool이며, DB_POOL_MODE=null이면 기존처럼 NullPool 사용
+    (MySQL max_connections 제한이 빡빡한 공유 DB에서 idle connection 점유 방지용)
+    """
+    url = make_url(database_url)
+    kwargs: Dict[str, Any] = {}
+    if url.get_backend_name() == "mysql" and url.get_driver_name() == "pymysql":
+        kwargs["connect_args"] = {
+            "read_timeout": 30,
+            "write_timeout": 30,
+        }
+
+    if settings.db_pool_mode.lower() == "null":
+        kwargs["poolclass"] = NullPool
+    elif url.get_backend_name() == "sqlite" and pool_class is MeteredAsyncQueuePool:
+        # aiosqlite 커넥션은 생성된 이벤트 루프에 묶이므로 로컬/테스트용 SQLite는 풀링하지 않음
+        kwargs["poolclass"] = NullPool
+    elif url.database != ":memory:":
+        kwargs.update(
+            poolclass=pool_class,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=settings.db_pool_pre_ping,
+            pool_timeout=settings.db_pool_timeout,
+        )
+    return kwargs
+
+
 engine = create_engine(
     settings.database_url,
-    poolclass=NullPool,
-    connect_args={
-        "read_timeout": 30,
-        "write_timeout": 30,
-    }
+    **_build_engine_kwargs(settings.database_url, MeteredQueuePool)
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# 비동기 엔진: 라우트에서 DB I/O 동안 이벤트 루프를 막지 않도록 AsyncSession 사용
+async_engine = create_async_engine(
+    _to_async_url(settings.database_url),
+    **_build_engine_kwargs(_to_async_url(settings.database_url), MeteredAsyncQueuePool)
+)
+# commit 후에도 속성을 다시 로드하지 않도록 expire_on_commit=False (async에서는 lazy load 불가)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
 Base = declarative_base()
 
 
 class EmailLog(Base):
     __tablename__ = "email_logs"
     
-    # MySQL: UUID를 CHAR(36)로 저장 (UUID 타입 대신)
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    # 시간순 UUIDv7, LOG_ID_STORAGE에 따라 CHAR(36) 또는 BINARY(16)로 저장 (log_ids.LogId)
+    id = Column(LogId(), primary_key=True, default=new_log_id)
     sender_email = Column(String(255), nullable=False)
     # MySQL: JSON 타입 사용 (MySQL 5.7.8+)
     recipient_emails = Column(JSON, nullable=False)  # List of strings
@@ -35,30 +139,223 @@ class EmailLog(Base):
     smtp_host = Column(String(255), nullable=False)
     smtp_port = Column(Integer, nullable=False)
     use_ssl = Column(String(10), default="true")
-    status = Column(String(50), default="pending")  # pending, success, failed
+    status = Column(String(50), default="pending")  # scheduled, pending, queued, sending, retrying, success, failed
     error_message = Column(Text, nullable=True)
     attachment_count = Column(Integer, default=0)
     total_attachment_size = Column(BigInteger, default=0)  # bytes
     created_at = Column(DateTime, default=datetime.utcnow)
     sent_at = Column(DateTime, nullable=True)
+    batch_id = Column(LogId(), nullable=True)  # /api/v1/email/batch 로 생성된 로그의 배치 ID
+    send_at = Column(DateTime, nullable=True)  # 예약 발송 시각 (UTC, 재시도 대기 중이면 다음 시도 시각)
+    attempts = Column(JSON, nullable=True)  # 발송 시도 이력 (재시도 엔진)
+
+    __table_args__ = (
+        # 커서 페이지네이션 (created_at DESC, id DESC)
+        Index("idx_email_logs_created_at_id", "created_at", "id"),
+        # 검색 필터: (필터 컬럼, created_at, id) → 등호 조건 + 기간/커서 범위 스캔을 인덱스만으로 처리
+        Index("idx_email_logs_status_created_at", "status", "created_at", "id"),
+        Index("idx_email_logs_sender_created_at", "sender_email", "created_at", "id"),
+        Index("idx_email_logs_smtp_host_created_at", "smtp_host", "created_at", "id"),
+        Index("idx_email_logs_batch_id_created_at", "batch_id", "created_at", "id"),
+        # 예약 발송 스케줄러의 증분 로드 (status='scheduled' AND send_at 범위)
+        Index("idx_email_logs_status_send_at", "status", "send_at"),
+    )
 
 
 class PushLog(Base):
     __tablename__ = "push_logs"
 
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(LogId(), primary_key=True, default=new_log_id)
     firebase_project_id = Column(String(255), nullable=False)
     title = Column(String(500), nullable=False)
     body = Column(Text, nullable=False)
     data = Column(JSON, nullable=True)
-    device_tokens = Column(JSON, nullable=False)  # List[str]
+    # 토큰 목록/토큰별 결과는 push_deliveries에 저장하고 로그에는 집계만 남김
+    token_count = Column(Integer, default=0)
     success_count = Column(Integer, default=0)
     failure_count = Column(Integer, default=0)
-    failed_tokens = Column(JSON, nullable=True)
-    status = Column(String(50), default="pending")  # pending, success, failed, partial
+    status = Column(String(50), default="pending")  # scheduled, pending, queued, sending, retrying, success, failed, partial
     error_message = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     sent_at = Column(DateTime, nullable=True)
+    # fan-out 발송의 chunk 로그: 부모 로그 ID와 chunk 순번 (일반 발송은 NULL)
+    parent_log_id = Column(LogId(), nullable=True)
+    chunk_index = Column(Integer, nullable=True)
+    send_at = Column(DateTime, nullable=True)  # 예약 발송 시각 (UTC, 재시도 대기 중이면 다음 시도 시각)
+    attempts = Column(JSON, nullable=True)  # 발송 시도 이력 (재시도 엔진)
+
+    __table_args__ = (
+        Index("idx_push_logs_created_at_id", "created_at", "id"),
+        Index("idx_push_logs_status_created_at", "status", "created_at", "id"),
+        Index("idx_push_logs_project_created_at", "firebase_project_id", "created_at", "id"),
+        # "프로젝트 X의 최근 1시간 실패 건" 같은 운영 조회용
+        Index("idx_push_logs_project_status_created_at", "firebase_project_id", "status", "created_at", "id"),
+        Index("idx_push_logs_parent_created_at", "parent_log_id", "created_at", "id"),
+        Index("idx_push_logs_status_send_at", "status", "send_at"),
+    )
+
+
+class PushDelivery(Base):
+    """푸시 로그의 토큰별 발송 결과 (로그 1건당 토큰 수만큼, 같은 로그 안에서 토큰은 중복되지 않음)"""
+    __tablename__ = "push_deliveries"
+
+    push_log_id = Column(LogId(), primary_key=True)
+    token_hash = Column(CHAR(64), primary_key=True)  # sha256(token) hex
+    seq = Column(Integer, nullable=False, default=0)  # 요청의 토큰 순서 (상세 조회 페이지네이션)
+    token = Column(Text, nullable=False)
+    status = Column(String(16), nullable=False, default="pending")  # pending, retrying, success, failed
+    message_id = Column(String(255), nullable=True)  # FCM message id (성공)
+    error_code = Column(String(64), nullable=True)  # FCM 에러 코드 (실패/재시도 대기)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # 로그 상세의 토큰별 결과 페이지네이션 (상태 필터 포함)
+        Index("idx_push_deliveries_log_seq", "push_log_id", "seq"),
+        Index("idx_push_deliveries_log_status_seq", "push_log_id", "status", "seq"),
+        # "토큰 X가 받은 발송" 조회 (최신순)
+        Index("idx_push_deliveries_token_created_at", "token_hash", "created_at", "push_log_id"),
+    )
+
+
+class PushTokenHealth(Base):
+    """FCM이 영구 실패(UNREGISTERED 등)로 응답한 토큰 (프로젝트 + 토큰 해시 단위)"""
+    __tablename__ = "push_token_health"
+
+    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    firebase_project_id = Column(String(255), nullable=False)
+    token_hash = Column(CHAR(64), nullable=False)  # sha256(token) hex
+    token = Column(Text, nullable=False)
+    error_code = Column(String(64), nullable=False)  # UNREGISTERED, SENDER_ID_MISMATCH, INVALID_ARGUMENT
+    failure_count = Column(Integer, default=1)
+    created_at = Column(DateTime, default=datetime.utcnow)  # 최초 실패 시각
+    last_failed_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("uq_push_token_health_project_hash", "firebase_project_id", "token_hash", unique=True),
+        # 프로젝트별 dead 토큰 조회/export (커서 페이지네이션)
+        Index("idx_push_token_health_project_created_at", "firebase_project_id", "created_at", "id"),
+        # 다른 인스턴스가 기록한 토큰을 증분 로드
+        Index("idx_push_token_health_last_failed_at", "last_failed_at"),
+    )
+
+
+class JobPayload(Base):
+    """
+    예약 발송 시 로그 테이블에 없는 발송 정보 (SMTP 인증 정보, 첨부파일 등).
+    payload는 Fernet으로 암호화한 JSON이며 발송 후 삭제한다.
+    """
+    __tablename__ = "job_payloads"
+
+    log_id = Column(LogId(), primary_key=True)
+    kind = Column(String(16), nullable=False)  # email, push (재시도할 토큰)
+    payload = Column(LargeBinary().with_variant(LONGBLOB(), "mysql"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class OutboxJob(Base):
+    """
+    발송 작업 outbox (로그와 같은 트랜잭션으로 INSERT, 모든 인스턴스의 워커가 lease를 잡고 처리한 뒤 삭제).
+    leased_until이 지난 작업은 처리하던 인스턴스가 중단된 것으로 보고 다른 워커가 다시 가져간다.
+    """
+    __tablename__ = "outbox_jobs"
+
+    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = Column(String(16), nullable=False)  # email, push
+    log_id = Column(LogId(), nullable=False)
+    payload = Column(LargeBinary().with_variant(LONGBLOB(), "mysql"), nullable=True)  # Fernet 암호화 JSON
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    lease_token = Column(CHAR(36), nullable=True)
+    leased_until = Column(DateTime, nullable=True)
+    claim_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_outbox_jobs_available_at", "available_at"),
+        Index("idx_outbox_jobs_lease_token", "lease_token"),
+    )
+
+
+class IdempotencyKey(Base):
+    """Idempotency-Key 헤더로 들어온 발송 요청과 최초 응답 (재시도 시 재발송 없이 응답 재사용)"""
+    __tablename__ = "idempotency_keys"
+
+    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    scope = Column(String(32), nullable=False)  # email_send, push_send
+    idempotency_key = Column(String(255), nullable=False)
+    request_hash = Column(CHAR(64), nullable=False)  # sha256(요청 파라미터), 같은 키로 다른 요청 방지
+    status = Column(String(16), nullable=False, default="in_progress")  # in_progress, completed
+    log_id = Column(LogId(), nullable=True)
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("uq_idempotency_keys_scope_key", "scope", "idempotency_key", unique=True),
+        Index("idx_idempotency_keys_expires_at", "expires_at"),
+    )
+
+
+
+class RateLimitCounter(Base):
+    """발송 API rate limit 카운터 (모든 인스턴스가 공유, window별 1행)"""
+    __tablename__ = "rate_limit_counters"
+
+    limit_key = Column(String(255), primary_key=True)  # {엔드포인트}:ip:{주소} 또는 {엔드포인트}:key:{API 키 해시}
+    window_start = Column(BigInteger, primary_key=True, autoincrement=False)  # epoch초 // window
+    hits = Column(Integer, nullable=False, default=0)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("idx_rate_limit_counters_expires_at", "expires_at"),
+    )
+
+def _pool_stats(pool, metrics: PoolMetrics) -> Dict[str, Any]:
+    if not isinstance(pool, QueuePool):
+        return {"mode": type(pool).__name__}
+    return {
+        "mode": type(pool).__name__,
+        "size": pool.size(),
+        "idle": pool.checkedin(),
+        "in_use": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.db_max_overflow,
+        **metrics.snapshot(),
+    }
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """DB 커넥션 풀 상태 (MySQL max_connections 대비 풀 크기 산정용)"""
+    return {
+        "sync": _pool_stats(engine.pool, MeteredQueuePool.metrics),
+        "async": _pool_stats(async_engine.pool, MeteredAsyncQueuePool.metrics),
+    }
+
+
+def _is_pool_idle(pool, metrics: PoolMetrics) -> bool:
+    if not isinstance(pool, QueuePool) or pool.checkedin() == 0 or pool.checkedout() > 0:
+        return False
+    return time.monotonic() - metrics.last_checkin_at >= settings.db_pool_idle_timeout
+
+
+def reap_idle_connections() -> bool:
+    """
+    풀 전체가 DB_POOL_IDLE_TIMEOUT 이상 사용되지 않았으면 유휴 커넥션을 모두 반납.
+    engine.dispose()는 새 풀로 교체하므로 사용 중인 커넥션에는 영향이 없다.
+    """
+    if not _is_pool_idle(engine.pool, MeteredQueuePool.metrics):
+        return False
+    engine.dispose()
+    return True
+
+
+async def reap_idle_async_connections() -> bool:
+    """reap_idle_connections의 비동기 엔진 버전"""
+    if not _is_pool_idle(async_engine.pool, MeteredAsyncQueuePool.metrics):
+        return False
+    await async_engine.dispose()
+    return True
 
 
 def init_db():
@@ -72,3 +369,8 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
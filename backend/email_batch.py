@@ -0,0 +1,248 @@
+"""
+대량(batch) 이메일 발송
+
+템플릿(string.Template) + 수신자 목록을 받아 수신자별로 렌더링한 메시지를 발송한다.
+- 수신자마다 별도 메시지 (To 헤더에 본인만 표시)
+- 소수의 워커가 SMTP 커넥션 풀의 세션을 재사용하여 세션당 여러 MAIL FROM/RCPT TO/DATA 트랜잭션을 처리
+- EmailLog는 bulk INSERT로 생성하고, 발송 결과는 flush_size 단위 bulk UPDATE로 반영
+- smtp_host별 발송 속도 제한/circuit breaker(outbound_limiter)를 따르며, 차단 중인 목적지로는 발송하지 않고 바로 실패 처리
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from string import Template
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal, EmailLog
+from email_service import EmailService
+from outbound_limiter import KIND_SMTP, OUTCOME_NEUTRAL, OUTCOME_SUCCESS, outbound_limiter
+from retry_engine import classify_smtp_error, smtp_outcome
+from smtp_pool import SMTPPoolKey, smtp_pool_manager
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+SHUTDOWN_ERROR_MESSAGE = "서버 종료로 인해 발송되지 않았습니다."
+
+
+class BatchTemplateError(ValueError):
+    """템플릿 렌더링 실패 (변수 누락, 잘못된 placeholder)"""
+
+
+def render_template(template: Template, variables: Dict[str, str]) -> str:
+    try:
+        return template.substitute(variables)
+    except KeyError as e:
+        raise BatchTemplateError(f"템플릿 변수 누락: {e.args[0]}")
+    except ValueError as e:
+        raise BatchTemplateError(f"잘못된 템플릿 형식: {str(e)}")
+
+
+@dataclass
+class BatchItem:
+    log_id: str
+    email: str
+    variables: Dict[str, str]
+
+
+def validate_templates(templates: Dict[str, str], items: Sequence[BatchItem]):
+    """
+    로그 생성 전 검증: 잘못된 placeholder, 수신자별 누락 변수 (BatchTemplateError).
+    발송 중 렌더링 실패로 배치 전체가 비동기로 실패하지 않도록 API에서 먼저 호출한다.
+    """
+    identifiers = set()
+    for name, source in templates.items():
+        template = Template(source)
+        if not template.is_valid():
+            raise BatchTemplateError(
+                f"잘못된 템플릿 형식 ({name}): '$' 뒤에는 변수 이름이 와야 합니다. ('$' 문자는 '$$'로 입력)"
+            )
+        identifiers.update(template.get_identifiers())
+    for item in items:
+        missing = identifiers.difference(item.variables)
+        if missing:
+            raise BatchTemplateError(f"템플릿 변수 누락 ({item.email}): {', '.join(sorted(missing))}")
+
+
+@dataclass
+class EmailBatchJob:
+    batch_id: str
+    sender_email: str
+    smtp_host: str
+    smtp_port: int
+    smtp_username: Optional[str]
+    smtp_password: Optional[str]
+    use_ssl: bool
+    verify_ssl: bool
+    subject_template: str
+    body_template: str
+    items: List[BatchItem]
+
+
+async def create_batch_logs(db: AsyncSession, job: EmailBatchJob, chunk_size: int) -> datetime:
+    """배치 수신자별 EmailLog(status=queued)를 chunk_size 단위 bulk INSERT"""
+    now = datetime.utcnow()
+    for start in range(0, len(job.items), chunk_size):
+        rows = [
+            {
+                "id": item.log_id,
+                "batch_id": job.batch_id,
+                "sender_email": job.sender_email,
+                "recipient_emails": [item.email],
+                # 로그에는 렌더링 전 템플릿 저장 (수신자별 본문 중복 저장 방지)
+                "subject": job.subject_template,
+                "body": job.body_template,
+                "smtp_host": job.smtp_host,
+                "smtp_port": job.smtp_port,
+                "use_ssl": "true" if job.use_ssl else "false",
+                "status": "queued",
+                "attachment_count": 0,
+                "total_attachment_size": 0,
+                "created_at": now,
+            }
+            for item in job.items[start:start + chunk_size]
+        ]
+        await db.execute(insert(EmailLog), rows)
+    await db.commit()
+    return now
+
+
+async def _write_results(results: List[Dict[str, Any]]):
+    """발송 결과 bulk UPDATE (primary key 기준 executemany)"""
+    if not results:
+        return
+    async with AsyncSessionLocal() as db:
+        try:
+            await db.execute(update(EmailLog), results)
+            await db.commit()
+        except Exception as e:
+            logger.error(f"배치 발송 결과 기록 실패 ({len(results)}건): {str(e)}")
+            await db.rollback()
+
+
+async def _fail_unsent(batch_id: str, error_message: str):
+    """아직 queued 상태인 배치 로그를 실패 처리"""
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(EmailLog)
+            .where(EmailLog.batch_id == batch_id, EmailLog.status == "queued")
+            .values(status="failed", error_message=error_message)
+        )
+        await db.commit()
+
+
+class EmailBatchRunner:
+    """
+    배치 발송 작업 실행기.
+    - sessions: 배치 하나당 동시에 사용하는 SMTP 세션(워커) 수
+    - flush_size: 발송 결과를 모아서 DB에 반영하는 단위
+    """
+
+    def __init__(self, sessions: int, flush_size: int):
+        self.sessions = max(1, sessions)
+        self.flush_size = max(1, flush_size)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._sent = 0
+        self._failed = 0
+
+    def submit(self, job: EmailBatchJob) -> asyncio.Task:
+        task = asyncio.create_task(self.run(job), name=f"email-batch-{job.batch_id}")
+        self._tasks[job.batch_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.batch_id, None))
+        return task
+
+    async def run(self, job: EmailBatchJob):
+        subject_template = Template(job.subject_template)
+        body_template = Template(job.body_template)
+        smtp_kwargs = EmailService.build_smtp_kwargs(
+            job.smtp_host, job.smtp_port, job.use_ssl, job.verify_ssl
+        )
+        pool_key = SMTPPoolKey.build(
+            job.smtp_host, job.smtp_port, job.smtp_username, job.smtp_password,
+            job.use_ssl, job.verify_ssl
+        )
+        # 워커들이 하나의 iterator를 공유 (await 사이에서만 전환되므로 next()는 안전)
+        items = iter(job.items)
+        guard = outbound_limiter.guard(KIND_SMTP, job.smtp_host)
+        pending: List[Dict[str, Any]] = []
+
+        async def flush():
+            nonlocal pending
+            results, pending = pending, []
+            await _write_results(results)
+
+        async def worker():
+            for item in items:
+                try:
+                    msg = EmailService.build_message(
+                        job.sender_email,
+                        [item.email],
+                        render_template(subject_template, item.variables),
+                        render_template(body_template, item.variables)
+                    )
+                    await guard.acquire()
+                    try:
+                        await smtp_pool_manager.send_message(
+                            pool_key,
+                            smtp_kwargs,
+                            job.smtp_username,
+                            job.smtp_password,
+                            msg,
+                            sender=job.sender_email,
+                            recipients=[item.email]
+                        )
+                    except Exception as e:
+                        guard.record(smtp_outcome(*classify_smtp_error(e)))
+                        raise
+                    except BaseException:
+                        # 취소 등으로 결과 없이 중단: half-open 시험 발송 슬롯을 반납
+                        guard.record(OUTCOME_NEUTRAL)
+                        raise
+                    guard.record(OUTCOME_SUCCESS)
+                    self._sent += 1
+                    pending.append({"id": item.log_id, "status": "success", "sent_at": datetime.utcnow()})
+                except Exception as e:
+                    self._failed += 1
+                    pending.append({"id": item.log_id, "status": "failed", "error_message": str(e)})
+                if len(pending) >= self.flush_size:
+                    await flush()
+
+        worker_count = min(self.sessions, len(job.items))
+        logger.info(f"배치 발송 시작: batch_id={job.batch_id}, total={len(job.items)}, sessions={worker_count}")
+        try:
+            await asyncio.gather(*(worker() for _ in range(worker_count)))
+        finally:
+            await flush()
+        logger.info(f"배치 발송 완료: batch_id={job.batch_id}")
+
+    async def shutdown(self, timeout: float):
+        """진행 중인 배치를 timeout 동안 기다린 뒤 취소하고, 미발송 건은 실패 처리"""
+        tasks = dict(self._tasks)
+        if not tasks:
+            return
+        done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for batch_id, task in tasks.items():
+            if task in pending:
+                logger.warning(f"배치 발송 중단: batch_id={batch_id}")
+                await _fail_unsent(batch_id, SHUTDOWN_ERROR_MESSAGE)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running_batches": len(self._tasks),
+            "sessions_per_batch": self.sessions,
+            "sent": self._sent,
+            "failed": self._failed,
+        }
+
+
+email_batch_runner = EmailBatchRunner(
+    sessions=settings.email_batch_sessions,
+    flush_size=settings.email_batch_flush_size
+)
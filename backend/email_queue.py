@@ -0,0 +1,187 @@
+"""
+이메일 비동기 발송 큐
+
+발송 API가 로그만 저장하고 바로 202를 반환할 수 있도록, 실제 SMTP 발송은
+프로세스 내 asyncio 큐를 소비하는 워커 코루틴이 처리한다.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from database import EmailLog
+from log_writer import log_writer
+from retry_engine import EmailAttempt, attempt_email
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+SHUTDOWN_ERROR_MESSAGE = "서버 종료로 인해 발송되지 않았습니다."
+INTERRUPTED_ERROR_MESSAGE = "서버 종료로 발송이 중단되었습니다."
+
+
+class EmailQueueFullError(Exception):
+    """대기열이 가득 차서 작업을 받을 수 없음"""
+
+
+@dataclass
+class EmailJob:
+    log_id: str
+    send_kwargs: Dict[str, Any]
+    enqueued_at: float = field(default_factory=time.monotonic)
+    attempts: Optional[List[Dict[str, Any]]] = None  # 재시도 작업이면 이전 시도 이력
+
+
+async def _apply_send_result(
+    log_id: str,
+    success: bool,
+    error_message: Optional[str],
+    attempts: Optional[List[Dict[str, Any]]] = None
+):
+    """발송 결과(와 시도 이력)를 EmailLog에 반영 (동시에 끝난 발송 결과들과 commit을 함께 하도록 log_writer로 기록)"""
+    if success:
+        values = {"status": "success", "sent_at": datetime.utcnow()}
+    else:
+        values = {"status": "failed", "error_message": error_message}
+    if attempts is not None:
+        values["attempts"] = attempts
+    try:
+        await log_writer.update(EmailLog, log_id, values, durable=True)
+    except Exception as e:
+        logger.error(f"발송 결과 기록 실패 ({log_id}): {str(e)}")
+
+
+class EmailSendQueue:
+    """
+    워커 풀 기반 이메일 발송 큐.
+    - worker_count: 동시에 SMTP 발송을 수행하는 워커 코루틴 수
+    - max_size: 대기열 최대 길이 (초과 시 EmailQueueFullError)
+    """
+
+    def __init__(self, worker_count: int, max_size: int):
+        self.worker_count = max(1, worker_count)
+        self.max_size = max_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        # drain 시간 초과로 취소된 워커가 처리 중이던 작업 (끝난 시도가 있으면 함께)
+        self._interrupted: List[Tuple[EmailJob, Optional[EmailAttempt]]] = []
+        self._busy_workers = 0
+        self._busy_seconds = 0.0
+        self._started_at: Optional[float] = None
+        self._processed = 0
+        self._failed = 0
+        self._retried = 0
+        self._total_wait_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._started_at = time.monotonic()
+        self._workers = [
+            asyncio.create_task(self._worker(idx), name=f"email-worker-{idx}")
+            for idx in range(self.worker_count)
+        ]
+        logger.info(f"이메일 발송 큐 시작: workers={self.worker_count}, max_size={self.max_size}")
+
+    def enqueue(self, job: EmailJob):
+        if not self.running:
+            raise RuntimeError("이메일 발송 큐가 시작되지 않았습니다.")
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise EmailQueueFullError("발송 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.")
+
+    async def _worker(self, idx: int):
+        while True:
+            job = await self._queue.get()
+            started = time.monotonic()
+            self._busy_workers += 1
+            self._total_wait_seconds += started - job.enqueued_at
+            attempt = None
+            try:
+                attempt = await attempt_email(job.send_kwargs, job.attempts)
+                if attempt.retry_delay is not None:
+                    # scheduler가 이 모듈을 import하므로 여기서 import (순환 import 방지)
+                    from scheduler import schedule_email_retry
+                    self._retried += 1
+                    await schedule_email_retry(job.log_id, job.send_kwargs, attempt)
+                else:
+                    if not attempt.success:
+                        self._failed += 1
+                    await _apply_send_result(
+                        job.log_id, attempt.success, attempt.error_message, attempts=attempt.attempts
+                    )
+            except asyncio.CancelledError:
+                # shutdown이 워커를 취소: 로그가 queued로 남지 않도록 shutdown에서 결과 기록
+                self._interrupted.append((job, attempt))
+                raise
+            except Exception as e:
+                self._failed += 1
+                logger.error(f"이메일 워커 {idx} 처리 실패 ({job.log_id}): {str(e)}")
+                await _apply_send_result(job.log_id, False, str(e))
+            finally:
+                self._processed += 1
+                self._busy_workers -= 1
+                self._busy_seconds += time.monotonic() - started
+                self._queue.task_done()
+
+    async def shutdown(self, timeout: float):
+        """대기 중인 작업을 timeout 동안 처리한 뒤 워커 종료"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            logger.info("이메일 발송 큐 drain 완료")
+        except asyncio.TimeoutError:
+            logger.warning(f"이메일 발송 큐 drain 시간 초과: 남은 작업 {self._queue.qsize()}건")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        # 발송 중 취소된 작업: 시도가 끝났으면 그 결과를, 아니면 실패로 기록 (재시도 예약 중이었으면 실패)
+        interrupted, self._interrupted = self._interrupted, []
+        for job, attempt in interrupted:
+            if attempt is not None and attempt.retry_delay is None:
+                await _apply_send_result(job.log_id, attempt.success, attempt.error_message, attempts=attempt.attempts)
+            else:
+                self._failed += 1
+                await _apply_send_result(
+                    job.log_id, False, INTERRUPTED_ERROR_MESSAGE,
+                    attempts=attempt.attempts if attempt is not None else job.attempts
+                )
+
+        # 처리하지 못한 작업은 pending으로 남지 않도록 실패 처리
+        while not self._queue.empty():
+            job = self._queue.get_nowait()
+            await _apply_send_result(job.log_id, False, SHUTDOWN_ERROR_MESSAGE)
+
+    def stats(self) -> Dict[str, Any]:
+        uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+        capacity = uptime * self.worker_count
+        return {
+            "enabled": settings.email_queue_enabled,
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_size": self.max_size,
+            "workers": self.worker_count,
+            "busy_workers": self._busy_workers,
+            "utilization": round(self._busy_seconds / capacity, 4) if capacity else 0.0,
+            "processed": self._processed,
+            "failed": self._failed,
+            "retried": self._retried,
+            "avg_wait_ms": round(self._total_wait_seconds / self._processed * 1000, 2) if self._processed else 0.0,
+        }
+
+
+email_queue = EmailSendQueue(
+    worker_count=settings.email_queue_workers,
+    max_size=settings.email_queue_max_size
+)
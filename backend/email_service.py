@@ -1,16 +1,97 @@
-import aiosmtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
-from email import encoders
 import base64
+import re
 import ssl
 import certifi
+from functools import lru_cache
 from typing import List, Optional, Tuple
 import logging
 
+from smtp_pool import SMTPPoolKey, smtp_pool_manager
+
 logger = logging.getLogger(__name__)
 
+_BASE64_RE = re.compile(r'[A-Za-z0-9+/]*={0,2}')
+_WHITESPACE_RE = re.compile(r'\s')
+# RFC 2045: base64 본문은 한 줄 76자 이하
+_BASE64_LINE_LENGTH = 76
+
+
+def _normalize_base64(content: str) -> str:
+    """공백/개행 제거 (공백이 없으면 복사하지 않음)"""
+    if _WHITESPACE_RE.search(content):
+        return ''.join(content.split())
+    return content
+
+
+def _base64_decoded_size(content: str) -> int:
+    """디코딩하지 않고 base64 문자열의 원본 바이트 수 계산"""
+    if len(content) % 4 != 0 or not _BASE64_RE.fullmatch(content):
+        raise ValueError("유효한 base64 문자열이 아닙니다.")
+    padding = len(content) - len(content.rstrip('='))
+    return len(content) // 4 * 3 - padding
+
+
+@lru_cache(maxsize=1)
+def _certifi_bundle() -> Optional[str]:
+    try:
+        return certifi.where()
+    except Exception as e:
+        logger.warning(f"certifi 사용 실패: {str(e)}")
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_tls_context(verify_ssl: bool, cafile: Optional[str] = None) -> ssl.SSLContext:
+    """
+    (검증 여부, CA 번들) 별로 SSLContext를 한 번만 생성하여 프로세스 전체에서 공유.
+    CA 번들 파싱은 메시지마다 반복하기에는 비용이 크므로 캐시한다.
+    생성된 컨텍스트는 읽기 전용으로만 사용해야 한다 (설정 변경 금지).
+    """
+    if not verify_ssl:
+        # For self-signed certificates, disable validation
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        return context
+    if cafile:
+        return ssl.create_default_context(cafile=cafile)
+    return ssl.create_default_context()
+
+
+def attachment_size(att: dict) -> int:
+    """
+    첨부파일 원본 크기.
+    - 'data': 원본 bytes (REST API 업로드)
+    - 'content': base64 문자열 (MCP 등 기존 호출 방식)
+    """
+    if 'data' in att:
+        return len(att['data'])
+    return _base64_decoded_size(_normalize_base64(att['content']))
+
+
+def build_attachment_part(att: dict) -> MIMEBase:
+    """
+    첨부파일 MIME 파트 생성.
+    원본 bytes는 base64로 한 번만 인코딩하고, 이미 base64인 입력은 디코딩/재인코딩 없이 줄바꿈만 맞춘다.
+    """
+    if 'data' in att:
+        encoded = base64.encodebytes(att['data']).decode('ascii')
+    else:
+        content = _normalize_base64(att['content'])
+        encoded = '\n'.join(
+            content[i:i + _BASE64_LINE_LENGTH]
+            for i in range(0, len(content), _BASE64_LINE_LENGTH)
+        )
+    part = MIMEBase('application', 'octet-stream')
+    part.set_payload(encoded)
+    part['Content-Transfer-Encoding'] = 'base64'
+    # 단순한 방식으로 헤더 설정 (이전 버전과 동일)
+    part.add_header('Content-Disposition', 'attachment', filename=att['filename'])
+    return part
+
 
 class EmailService:
     MAX_ATTACHMENTS = 10
@@ -30,11 +111,10 @@ class EmailService:
         
         total_size = 0
         for att in attachments:
-            if 'content' in att and 'filename' in att:
+            if ('content' in att or 'data' in att) and 'filename' in att:
                 try:
-                    # Base64 decode to get actual size
-                    content = base64.b64decode(att['content'])
-                    total_size += len(content)
+                    # 디코딩 없이 원본 크기만 계산
+                    total_size += attachment_size(att)
                 except Exception as e:
                     return False, f"첨부파일 처리 중 오류: {str(e)}", 0
         
@@ -43,6 +123,71 @@ class EmailService:
         
         return True, "", total_size
     
+    @staticmethod
+    def build_message(
+        sender_email: str,
+        recipient_emails: List[str],
+        subject: str,
+        body: str,
+        cc_emails: Optional[List[str]] = None
+    ) -> MIMEMultipart:
+        """첨부파일을 제외한 메시지 본체 생성"""
+        # Use MIMEMultipart (MIME format) with proper RFC 2231 encoding for filenames
+        msg = MIMEMultipart()
+        msg['From'] = sender_email
+        msg['To'] = ', '.join(recipient_emails)
+        msg['Subject'] = subject
+        
+        if cc_emails:
+            msg['Cc'] = ', '.join(cc_emails)
+        
+        # Add body
+        msg.attach(MIMEText(body, 'html' if '<html' in body.lower() else 'plain', 'utf-8'))
+        return msg
+
+    @staticmethod
+    def build_smtp_kwargs(smtp_host: str, smtp_port: int, use_ssl: bool, verify_ssl: bool) -> dict:
+        """aiosmtplib.SMTP 생성 인자 (SSL/TLS 설정 포함)"""
+        # Configure SSL/TLS settings
+        # aiosmtplib supports validate_certs and cert_bundle parameters
+        cert_bundle = None
+        ssl_context = None
+        
+        if verify_ssl:
+            # Use certifi's certificate bundle for proper validation (없으면 시스템 CA로 fallback)
+            cert_bundle = _certifi_bundle()
+        try:
+            ssl_context = get_tls_context(verify_ssl, cert_bundle)
+        except Exception as e:
+            logger.warning(f"SSL 컨텍스트 생성 실패: {str(e)}")
+            ssl_context = None
+        
+        # Port 465 uses implicit TLS (SMTP_SSL equivalent)
+        # Port 587 uses STARTTLS
+        smtp_kwargs = {
+            'hostname': smtp_host,
+            'port': smtp_port,
+            'validate_certs': verify_ssl,
+        }
+        
+        # Always add cert_bundle if verify_ssl is True
+        if verify_ssl and cert_bundle:
+            smtp_kwargs['cert_bundle'] = cert_bundle
+        
+        # Always add tls_context (both for verify_ssl True and False)
+        if ssl_context:
+            smtp_kwargs['tls_context'] = ssl_context
+        
+        if use_ssl:
+            # Port 465: 암묵적 TLS (SMTP_SSL 방식)
+            smtp_kwargs['use_tls'] = True
+            smtp_kwargs['start_tls'] = False
+        else:
+            # Port 587: STARTTLS 방식
+            smtp_kwargs['use_tls'] = False
+            smtp_kwargs['start_tls'] = True
+        return smtp_kwargs
+
     @staticmethod
     async def send_email(
         recipient_emails: List[str],
@@ -57,10 +202,12 @@ class EmailService:
         cc_emails: Optional[List[str]] = None,
         bcc_emails: Optional[List[str]] = None,
         attachments: Optional[List[dict]] = None,
-        verify_ssl: bool = True
+        verify_ssl: bool = True,
+        raise_errors: bool = False
     ) -> Tuple[bool, Optional[str]]:
         """
         Send email using SMTP
+        raise_errors: True면 SMTP 발송 예외를 그대로 전달 (재시도 엔진이 응답 코드로 오류를 분류)
         Returns: (success, error_message)
         """
         try:
@@ -69,34 +216,13 @@ class EmailService:
             if not is_valid:
                 return False, error_msg
             
-            # Use MIMEMultipart (MIME format) with proper RFC 2231 encoding for filenames
-            msg = MIMEMultipart()
-            msg['From'] = sender_email
-            msg['To'] = ', '.join(recipient_emails)
-            msg['Subject'] = subject
-            
-            if cc_emails:
-                msg['Cc'] = ', '.join(cc_emails)
-            
-            # Add body
-            msg.attach(MIMEText(body, 'html' if '<html' in body.lower() else 'plain', 'utf-8'))
+            msg = EmailService.build_message(sender_email, recipient_emails, subject, body, cc_emails)
             
             # Add attachments (단순화된 버전)
             if attachments:
                 for att in attachments:
                     try:
-                        content = base64.b64decode(att['content'])
-                        filename = att['filename']
-                        
-                        # Create MIME part for attachment
-                        part = MIMEBase('application', 'octet-stream')
-                        part.set_payload(content)
-                        encoders.encode_base64(part)
-                        
-                        # 단순한 방식으로 헤더 설정 (이전 버전과 동일)
-                        part.add_header('Content-Disposition', 'attachment', filename=filename)
-                        
-                        msg.attach(part)
+                        msg.attach(build_attachment_part(att))
                     except Exception as e:
                         logger.error(f"첨부파일 추가 실패: {str(e)}")
                         return False, f"첨부파일 처리 중 오류: {str(e)}"
@@ -112,78 +238,35 @@ class EmailService:
             if bcc_emails:
                 all_recipients.extend(bcc_emails)
             
-            # Configure SSL/TLS settings
-            # aiosmtplib supports validate_certs and cert_bundle parameters
-            cert_bundle = None
-            validate_certs = verify_ssl
-            ssl_context = None
-            
-            if verify_ssl:
-                # Use certifi's certificate bundle for proper validation
-                try:
-                    cert_bundle = certifi.where()
-                    # Create SSL context with certifi for better compatibility
-                    ssl_context = ssl.create_default_context(cafile=certifi.where())
-                    logger.debug(f"Using certifi bundle: {cert_bundle}")
-                except Exception as e:
-                    logger.warning(f"certifi 사용 실패: {str(e)}")
-                    # Fallback: create SSL context manually
-                    try:
-                        ssl_context = ssl.create_default_context()
-                    except Exception:
-                        ssl_context = None
-            else:
-                # For self-signed certificates, disable validation
-                ssl_context = ssl.create_default_context()
-                ssl_context.check_hostname = False
-                ssl_context.verify_mode = ssl.CERT_NONE
-                logger.debug("SSL verification disabled for self-signed certificates")
-            
-            # Send email using SMTP object
-            # Port 465 uses implicit TLS (SMTP_SSL equivalent)
-            # Port 587 uses STARTTLS
-            smtp_kwargs = {
-                'hostname': smtp_host,
-                'port': smtp_port,
-                'validate_certs': validate_certs,
-            }
-            
-            # Always add cert_bundle if verify_ssl is True
-            if verify_ssl and cert_bundle:
-                smtp_kwargs['cert_bundle'] = cert_bundle
-            
-            # Always add tls_context (both for verify_ssl True and False)
-            if ssl_context:
-                smtp_kwargs['tls_context'] = ssl_context
-            
-            if use_ssl:
-                # Port 465: 암묵적 TLS (SMTP_SSL 방식)
-                smtp_kwargs['use_tls'] = True
-                smtp_kwargs['start_tls'] = False
-            else:
-                # Port 587: STARTTLS 방식
-                smtp_kwargs['use_tls'] = False
-                smtp_kwargs['start_tls'] = True
-            
-            smtp = aiosmtplib.SMTP(**smtp_kwargs)
-            
-            await smtp.connect()
-            if smtp_username and smtp_password:
-                await smtp.login(smtp_username, smtp_password)
+            smtp_kwargs = EmailService.build_smtp_kwargs(smtp_host, smtp_port, use_ssl, verify_ssl)
             
             # Log message structure before sending (for debugging)
-            logger.debug("=== 이메일 메시지 구조 (전송 전) ===")
-            msg_str = msg.as_string()
-            for line in msg_str.split('\n'):
-                if 'Content-Disposition' in line or 'Content-Type' in line or 'filename' in line.lower() or 'name*' in line.lower():
-                    logger.debug(f"  {line}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("=== 이메일 메시지 구조 (전송 전) ===")
+                msg_str = msg.as_string()
+                for line in msg_str.split('\n'):
+                    if 'Content-Disposition' in line or 'Content-Type' in line or 'filename' in line.lower() or 'name*' in line.lower():
+                        logger.debug(f"  {line}")
             
-            await smtp.send_message(msg)
-            await smtp.quit()
+            # 목적지별 커넥션 풀에서 인증된 세션을 재사용하여 발송
+            pool_key = SMTPPoolKey.build(
+                smtp_host, smtp_port, smtp_username, smtp_password, use_ssl, verify_ssl
+            )
+            await smtp_pool_manager.send_message(
+                pool_key,
+                smtp_kwargs,
+                smtp_username,
+                smtp_password,
+                msg,
+                sender=sender_email,
+                recipients=all_recipients
+            )
             
             return True, None
             
         except Exception as e:
             logger.error(f"이메일 발송 실패: {str(e)}")
+            if raise_errors:
+                raise
             return False, str(e)
 
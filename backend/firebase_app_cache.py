@@ -0,0 +1,263 @@
+"""
+Firebase 앱(서비스 계정) 캐시
+
+- TTL: 로드 후 ttl이 지나면 다시 로드하며, ttl * refresh_ahead 시점부터는 기존 앱을 반환하면서 백그라운드에서 갱신
+  (키가 교체되지 않았으면 기존 앱을 그대로 유지)
+- single-flight: 같은 프로젝트를 동시에 처음 요청해도 Secrets Manager 조회/initialize_app은 한 번만 수행
+- LRU + idle 정리: max_size 초과 또는 idle_timeout 동안 사용되지 않은 앱은 캐시에서 제거하고,
+  진행 중인 발송이 끝날 시간(dispose_grace)을 둔 뒤 disposer(firebase_admin.delete_app)로 정리
+  (get() 때마다, 그리고 발송이 끊긴 프로젝트도 정리되도록 sweep()을 주기적으로 호출)
+- negative 캐시: Secret 없음 등 ValueError는 negative_ttl 동안 재조회하지 않고 같은 오류를 반환
+
+발송은 스레드 풀에서 실행되므로 threading 기반으로 동기화한다.
+기존 dict 캐시와 호환되도록 `in`, `[]`, `clear()`를 지원한다.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# loader(key, 현재 fingerprint) → (새 값, fingerprint) 또는 변경 없음(None)
+Loader = Callable[[str, Optional[str]], Optional[Tuple[Any, str]]]
+
+
+class _Entry:
+    __slots__ = ("value", "fingerprint", "loaded_at", "last_used_at", "refreshing", "retry_at")
+
+    def __init__(self, value: Any, fingerprint: Optional[str], now: float):
+        self.value = value
+        self.fingerprint = fingerprint
+        self.loaded_at = now
+        self.last_used_at = now
+        self.refreshing = False
+        self.retry_at = 0.0
+
+
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class FirebaseAppCache:
+    def __init__(
+        self,
+        loader: Loader,
+        disposer: Callable[[Any], None],
+        ttl: float,
+        max_size: int,
+        idle_timeout: float,
+        negative_ttl: float,
+        refresh_ahead: float = 0.8,
+        dispose_grace: float = 60.0
+    ):
+        self._loader = loader
+        self._disposer = disposer
+        self.ttl = ttl
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self.negative_ttl = negative_ttl
+        self.refresh_ahead = refresh_ahead
+        self.dispose_grace = dispose_grace
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._negative: Dict[str, Tuple[BaseException, float]] = {}
+        self._inflight: Dict[str, _InFlight] = {}
+        self._retired: List[Tuple[Any, float]] = []
+        self._loads = 0
+        self._hits = 0
+        self._negative_hits = 0
+
+    # ── dict 호환 ─────────────────────────────────────────────────────────
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and time.monotonic() - entry.loaded_at < self.ttl
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            return self._entries[key].value
+
+    def __setitem__(self, key: str, value: Any):
+        with self._lock:
+            self._store_locked(key, value, None, time.monotonic())
+
+    def clear(self):
+        """캐시 비우기 (앱 정리 없이 참조만 제거)"""
+        with self._lock:
+            self._entries.clear()
+            self._negative.clear()
+            self._retired.clear()
+
+    # ── 조회 ──────────────────────────────────────────────────────────────
+
+    def get(self, key: str) -> Any:
+        now = time.monotonic()
+        start_refresh = False
+        with self._lock:
+            to_dispose = self._sweep_locked(now)
+            negative = self._negative.get(key)
+            if negative is not None:
+                if negative[1] > now:
+                    self._negative_hits += 1
+                    error = negative[0]
+                    raise type(error)(*error.args)
+                del self._negative[key]
+            entry = self._entries.get(key)
+            value = None
+            if entry is not None and now - entry.loaded_at < self.ttl:
+                self._hits += 1
+                entry.last_used_at = now
+                self._entries.move_to_end(key)
+                value = entry.value
+                if (
+                    now - entry.loaded_at >= self.ttl * self.refresh_ahead
+                    and not entry.refreshing
+                    and now >= entry.retry_at
+                ):
+                    entry.refreshing = True
+                    start_refresh = True
+        self._dispose(to_dispose)
+
+        if value is None:
+            return self._load(key)
+        if start_refresh:
+            threading.Thread(
+                target=self._refresh, args=(key,), name=f"firebase-refresh-{key}", daemon=True
+            ).start()
+        return value
+
+    def _load(self, key: str) -> Any:
+        """single-flight 로드: 동시에 들어온 요청은 첫 요청의 결과를 기다린다"""
+        with self._lock:
+            flight = self._inflight.get(key)
+            owner = flight is None
+            if owner:
+                flight = _InFlight()
+                self._inflight[key] = flight
+            previous = self._entries.get(key)
+            fingerprint = previous.fingerprint if previous is not None else None
+
+        if not owner:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            result = self._loader(key, fingerprint)
+            with self._lock:
+                now = time.monotonic()
+                self._loads += 1
+                current = self._entries.get(key)
+                if result is None and current is not None:
+                    # 키가 바뀌지 않음: 기존 앱 유지
+                    current.loaded_at = now
+                    current.last_used_at = now
+                    flight.value = current.value
+                elif result is None:
+                    # 로드 중에 캐시에서 제거된 경우 이전 앱을 다시 등록
+                    self._store_locked(key, previous.value, previous.fingerprint, now)
+                    flight.value = previous.value
+                else:
+                    value, new_fingerprint = result
+                    self._store_locked(key, value, new_fingerprint, now)
+                    flight.value = value
+            return flight.value
+        except ValueError as e:
+            # Secret 없음 / 형식 오류: 잘못된 project_id로 Secrets Manager를 반복 호출하지 않도록 캐시
+            with self._lock:
+                self._negative[key] = (e, time.monotonic() + self.negative_ttl)
+            flight.error = e
+            raise
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def _refresh(self, key: str):
+        try:
+            self._load(key)
+            logger.info(f"Firebase 앱 백그라운드 갱신 완료: project_id={key}")
+        except Exception as e:
+            # 갱신 실패 시 기존 앱을 계속 사용하고 negative_ttl 후 재시도
+            logger.warning(f"Firebase 앱 백그라운드 갱신 실패 ({key}): {str(e)}")
+            with self._lock:
+                self._negative.pop(key, None)
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.retry_at = time.monotonic() + self.negative_ttl
+        finally:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False
+
+    # ── 정리 ──────────────────────────────────────────────────────────────
+
+    def _store_locked(self, key: str, value: Any, fingerprint: Optional[str], now: float):
+        old = self._entries.get(key)
+        if old is not None and old.value is not value:
+            self._retired.append((old.value, now))
+        self._entries[key] = _Entry(value, fingerprint, now)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            evicted_key, evicted = self._entries.popitem(last=False)
+            logger.info(f"Firebase 앱 캐시 LRU 제거: project_id={evicted_key}")
+            self._retired.append((evicted.value, now))
+
+    def _sweep_locked(self, now: float) -> List[Any]:
+        """idle 앱을 retire하고, grace가 지난 retired 앱을 반환"""
+        for key in [k for k, e in self._entries.items() if now - e.last_used_at > self.idle_timeout]:
+            logger.info(f"Firebase 앱 캐시 idle 제거: project_id={key}")
+            self._retired.append((self._entries.pop(key).value, now))
+        to_dispose = [value for value, retired_at in self._retired if now - retired_at >= self.dispose_grace]
+        if to_dispose:
+            self._retired = [(v, t) for v, t in self._retired if now - t < self.dispose_grace]
+        return to_dispose
+
+    def sweep(self) -> int:
+        """idle 앱 retire + grace가 지난 앱 정리 + 만료된 negative 캐시 삭제 (정리한 앱 수)"""
+        now = time.monotonic()
+        with self._lock:
+            to_dispose = self._sweep_locked(now)
+            for key in [k for k, (_, expires_at) in self._negative.items() if expires_at <= now]:
+                del self._negative[key]
+        self._dispose(to_dispose)
+        return len(to_dispose)
+
+    def _dispose(self, values: List[Any]):
+        for value in values:
+            try:
+                self._disposer(value)
+            except Exception as e:
+                logger.warning(f"Firebase 앱 정리 실패: {str(e)}")
+
+    def close(self):
+        """모든 앱 정리 (서버 종료 시)"""
+        with self._lock:
+            values = [entry.value for entry in self._entries.values()] + [value for value, _ in self._retired]
+            self._entries.clear()
+            self._retired.clear()
+            self._negative.clear()
+        self._dispose(values)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "cached": len(self._entries),
+                "max_size": self.max_size,
+                "negative_cached": len(self._negative),
+                "retired": len(self._retired),
+                "loads": self._loads,
+                "hits": self._hits,
+                "negative_hits": self._negative_hits,
+            }
@@ -0,0 +1,337 @@
+"""
+발송 API Idempotency-Key 처리
+
+클라이언트가 타임아웃 후 같은 Idempotency-Key로 재시도하면 재발송하지 않고 최초 응답(log_id 포함)을 반환한다.
+- 완료된 응답은 메모리 LRU에 보관하고, 인스턴스 간 공유/재시작 대비로 idempotency_keys 테이블에도 저장
+- 키 선점은 (scope, idempotency_key) unique index INSERT로 수행 (먼저 INSERT한 요청만 발송)
+- 처리 중인 키로 들어온 중복 요청은 최초 요청의 결과를 기다린다
+  (같은 인스턴스: asyncio.Event, 다른 인스턴스: DB 폴링, wait_timeout 초과 시 409)
+- 처리 중(in_progress) 행은 lease 동안만 유효: 처리하던 인스턴스가 죽어 lease가 지나면
+  재시도 요청이 status/created_at 조건부 UPDATE로 키를 인수한다 (완료 응답은 TTL 동안 보관)
+- 발송 전 검증 실패 등 HTTPException/예외로 끝난 요청은 키를 해제하여 같은 키로 다시 시도할 수 있다
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+
+from database import AsyncSessionLocal, IdempotencyKey
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotencyError(Exception):
+    """Idempotency-Key 충돌 (status_code로 HTTP 응답 코드 전달)"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def request_fingerprint(**fields: Any) -> str:
+    """요청 파라미터 해시 (같은 키로 다른 요청을 보냈는지 확인용)"""
+    payload = json.dumps(fields, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class StoredResponse:
+    request_hash: str
+    status_code: int
+    body: Any
+    expires_at: datetime
+
+    def to_response(self) -> JSONResponse:
+        return JSONResponse(status_code=self.status_code, content=self.body, headers={REPLAYED_HEADER: "true"})
+
+
+@dataclass
+class IdempotencyClaim:
+    scope: str
+    key: str
+    request_hash: str
+    replay: Optional[StoredResponse] = None
+    claimed_at: Optional[datetime] = None
+
+
+def _response_payload(result: Any) -> Tuple[int, Any]:
+    if isinstance(result, Response):
+        return result.status_code, json.loads(result.body)
+    return 200, jsonable_encoder(result)
+
+
+def _log_id(body: Any) -> Optional[str]:
+    if isinstance(body, dict):
+        return body.get("log_id") or body.get("logId")
+    return None
+
+
+class IdempotencyStore:
+    def __init__(
+        self,
+        cache_size: int,
+        ttl: timedelta,
+        wait_timeout: float,
+        lease: timedelta,
+        poll_interval: float = 0.2
+    ):
+        self.cache_size = max(1, cache_size)
+        self.ttl = ttl
+        self.lease = lease
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._cache: "OrderedDict[Tuple[str, str], StoredResponse]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], asyncio.Event] = {}
+        self._replayed = 0
+        self._waited = 0
+        self._taken_over = 0
+
+    def _cache_get(self, cache_key: Tuple[str, str]) -> Optional[StoredResponse]:
+        stored = self._cache.get(cache_key)
+        if stored is None:
+            return None
+        if stored.expires_at <= datetime.utcnow():
+            del self._cache[cache_key]
+            return None
+        self._cache.move_to_end(cache_key)
+        return stored
+
+    def _cache_put(self, cache_key: Tuple[str, str], stored: StoredResponse):
+        self._cache[cache_key] = stored
+        self._cache.move_to_end(cache_key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _replay(self, cache_key: Tuple[str, str], stored: StoredResponse, request_hash: str) -> IdempotencyClaim:
+        if stored.request_hash != request_hash:
+            raise IdempotencyError(422, "Idempotency-Key가 다른 요청에 이미 사용되었습니다.")
+        self._replayed += 1
+        return IdempotencyClaim(cache_key[0], cache_key[1], request_hash, replay=stored)
+
+    async def acquire(self, scope: str, key: str, request_hash: str) -> IdempotencyClaim:
+        """키 선점. 이미 완료된 키면 replay가 채워진 claim을 반환"""
+        if len(key) > MAX_KEY_LENGTH:
+            raise IdempotencyError(400, f"Idempotency-Key는 최대 {MAX_KEY_LENGTH}자까지 허용됩니다.")
+        cache_key = (scope, key)
+        deadline = asyncio.get_running_loop().time() + self.wait_timeout
+        while True:
+            stored = self._cache_get(cache_key)
+            if stored is not None:
+                return self._replay(cache_key, stored, request_hash)
+
+            event = self._inflight.get(cache_key)
+            if event is not None:
+                # 같은 인스턴스에서 처리 중: 최초 요청이 끝나면 다시 확인 (해제된 경우 이 요청이 선점)
+                self._waited += 1
+                await self._wait_event(event, deadline)
+                continue
+
+            event = asyncio.Event()
+            self._inflight[cache_key] = event
+            try:
+                claimed_at, row = await self._insert_or_get(scope, key, request_hash)
+            except BaseException:
+                self._finish_inflight(cache_key)
+                raise
+            if row is None:
+                return IdempotencyClaim(scope, key, request_hash, claimed_at=claimed_at)
+            self._finish_inflight(cache_key)
+
+            if row.request_hash != request_hash:
+                raise IdempotencyError(422, "Idempotency-Key가 다른 요청에 이미 사용되었습니다.")
+            if row.status == "completed":
+                stored = StoredResponse(row.request_hash, row.status_code, row.response_body, row.expires_at)
+                self._cache_put(cache_key, stored)
+                return self._replay(cache_key, stored, request_hash)
+            # 다른 인스턴스에서 처리 중: 완료되거나 해제될 때까지 DB 폴링
+            self._waited += 1
+            await self._poll_row(scope, key, deadline)
+
+    async def _wait_event(self, event: asyncio.Event, deadline: float):
+        remaining = deadline - asyncio.get_running_loop().time()
+        try:
+            await asyncio.wait_for(event.wait(), timeout=max(remaining, 0))
+        except asyncio.TimeoutError:
+            raise IdempotencyError(409, "같은 Idempotency-Key의 요청이 아직 처리 중입니다.")
+
+    async def _poll_row(self, scope: str, key: str, deadline: float):
+        loop = asyncio.get_running_loop()
+        while loop.time() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            async with AsyncSessionLocal() as db:
+                row = (await db.execute(
+                    select(IdempotencyKey.status, IdempotencyKey.expires_at).where(
+                        IdempotencyKey.scope == scope, IdempotencyKey.idempotency_key == key
+                    )
+                )).first()
+            # 완료/해제됐거나 lease가 지난 경우(처리하던 인스턴스 중단) 다시 선점 시도
+            if row is None or row.status != "in_progress" or row.expires_at <= datetime.utcnow():
+                return
+        raise IdempotencyError(409, "같은 Idempotency-Key의 요청이 아직 처리 중입니다.")
+
+    async def _insert_or_get(
+        self, scope: str, key: str, request_hash: str
+    ) -> Tuple[Optional[datetime], Optional[IdempotencyKey]]:
+        """
+        (선점 시각, None): INSERT 또는 만료된 행 인수로 선점 / (None, 기존 행): 유효한 행이 이미 있음.
+        선점 시각은 초 단위 (MySQL DATETIME 컬럼과 complete/release 조건 비교가 일치하도록)
+        """
+        for _ in range(3):
+            now = datetime.utcnow().replace(microsecond=0)
+            async with AsyncSessionLocal() as db:
+                db.add(IdempotencyKey(
+                    scope=scope,
+                    idempotency_key=key,
+                    request_hash=request_hash,
+                    status="in_progress",
+                    created_at=now,
+                    expires_at=now + self.lease
+                ))
+                try:
+                    await db.commit()
+                    return now, None
+                except IntegrityError:
+                    await db.rollback()
+                row = await db.scalar(
+                    select(IdempotencyKey).where(
+                        IdempotencyKey.scope == scope, IdempotencyKey.idempotency_key == key
+                    )
+                )
+                if row is None:
+                    continue
+                if row.expires_at > now:
+                    return None, row
+                # TTL이 지난 완료 행 또는 lease가 지난 in_progress 행: 조회한 상태 그대로일 때만 인수
+                # (동시에 인수하려는 다른 요청이 먼저 바꿨으면 rowcount 0 → 다시 조회)
+                # 선점 시각은 이전 선점보다 항상 커야 이전 요청의 complete/release 조건과 겹치지 않음
+                claimed_at = max(now, row.created_at.replace(microsecond=0) + timedelta(seconds=1))
+                result = await db.execute(
+                    update(IdempotencyKey)
+                    .where(
+                        IdempotencyKey.id == row.id,
+                        IdempotencyKey.status == row.status,
+                        IdempotencyKey.created_at == row.created_at
+                    )
+                    .values(
+                        request_hash=request_hash,
+                        status="in_progress",
+                        log_id=None,
+                        status_code=None,
+                        response_body=None,
+                        created_at=claimed_at,
+                        expires_at=now + self.lease
+                    )
+                )
+                await db.commit()
+                if result.rowcount == 1:
+                    if row.status == "in_progress":
+                        self._taken_over += 1
+                        logger.warning(f"Idempotency 키 lease 만료로 인수 ({scope}, {key})")
+                    return claimed_at, None
+        raise IdempotencyError(409, "같은 Idempotency-Key의 요청이 아직 처리 중입니다.")
+
+    @staticmethod
+    def _owned(claim: IdempotencyClaim):
+        """이 claim이 선점한 행 조건 (lease 만료 후 다른 요청이 인수한 행은 건드리지 않음)"""
+        conditions = [IdempotencyKey.scope == claim.scope, IdempotencyKey.idempotency_key == claim.key]
+        if claim.claimed_at is not None:
+            conditions.append(IdempotencyKey.created_at == claim.claimed_at)
+        return conditions
+
+    def _finish_inflight(self, cache_key: Tuple[str, str]):
+        event = self._inflight.pop(cache_key, None)
+        if event is not None:
+            event.set()
+
+    async def complete(self, claim: IdempotencyClaim, status_code: int, body: Any):
+        cache_key = (claim.scope, claim.key)
+        expires_at = datetime.utcnow() + self.ttl
+        self._cache_put(cache_key, StoredResponse(claim.request_hash, status_code, body, expires_at))
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(IdempotencyKey)
+                    .where(*self._owned(claim))
+                    .values(
+                        status="completed",
+                        log_id=_log_id(body),
+                        status_code=status_code,
+                        response_body=body,
+                        expires_at=expires_at
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            # 발송은 이미 끝났으므로 응답은 그대로 반환 (같은 인스턴스 재시도는 메모리 캐시로 처리)
+            logger.error(f"Idempotency 응답 저장 실패 ({claim.scope}, {claim.key}): {str(e)}")
+        finally:
+            self._finish_inflight(cache_key)
+
+    async def release(self, claim: IdempotencyClaim):
+        """처리 실패 시 키 해제 (같은 키로 재시도 가능)"""
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    delete(IdempotencyKey).where(*self._owned(claim), IdempotencyKey.status == "in_progress")
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Idempotency 키 해제 실패 ({claim.scope}, {claim.key}): {str(e)}")
+        finally:
+            self._finish_inflight((claim.scope, claim.key))
+
+    async def run(
+        self,
+        scope: str,
+        key: Optional[str],
+        request_hash: str,
+        handler: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """key가 있으면 최초 1회만 handler를 실행하고, 이후에는 저장된 응답을 반환"""
+        if not key:
+            return await handler()
+        claim = await self.acquire(scope, key, request_hash)
+        if claim.replay is not None:
+            logger.info(f"Idempotency-Key 재요청: scope={scope}, key={key}")
+            return claim.replay.to_response()
+        try:
+            result = await handler()
+        except BaseException:
+            await self.release(claim)
+            raise
+        status_code, body = _response_payload(result)
+        await self.complete(claim, status_code, body)
+        return result
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cached": len(self._cache),
+            "in_flight": len(self._inflight),
+            "replayed": self._replayed,
+            "waited": self._waited,
+            "taken_over": self._taken_over,
+        }
+
+
+idempotency_store = IdempotencyStore(
+    cache_size=settings.idempotency_cache_size,
+    ttl=timedelta(hours=settings.idempotency_ttl_hours),
+    wait_timeout=settings.idempotency_wait_timeout,
+    lease=timedelta(seconds=settings.idempotency_lease_seconds)
+)
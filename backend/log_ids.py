@@ -0,0 +1,107 @@
+"""
+발송 로그 ID (UUIDv7 생성, CHAR(36)/BINARY(16) 저장)
+
+로그 ID를 CHAR(36) 문자열 UUIDv4로 저장하면 PK와 PK를 포함하는 모든 보조 인덱스 항목이 36바이트씩 차지하고,
+무작위 값이라 InnoDB clustered index의 임의 위치에 INSERT되어 페이지 분할이 잦다.
+- 새 로그 ID는 앞 48비트가 밀리초 타임스탬프인 UUIDv7: 생성 순서대로 인덱스 끝에 추가됨
+- LOG_ID_STORAGE=binary면 BINARY(16)로 저장 (database/init_db.sql 마이그레이션으로 기존 행 변환 후 변경)
+- 저장 형식과 관계없이 모델 속성/API/커서에서는 항상 UUID 문자열 (LogId 타입이 변환)
+"""
+import os
+import threading
+import time
+import uuid
+from typing import Optional
+
+from sqlalchemy import CHAR, LargeBinary
+from sqlalchemy.dialects.mysql import BINARY
+from sqlalchemy.types import TypeDecorator
+
+from settings import settings
+
+STORAGE_CHAR = "char"
+STORAGE_BINARY = "binary"
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_seq = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    UUIDv7 (RFC 9562): 48비트 unix ms + 4비트 버전 + 12비트 카운터 + 2비트 variant + 62비트 난수.
+    같은 밀리초 안에서는 카운터를 올려 한 프로세스에서 만든 ID가 항상 증가하도록 한다.
+    """
+    global _last_ms, _last_seq
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms, _last_seq = ms, int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            # 같은 밀리초(또는 시계가 뒤로 간 경우): 카운터 증가, 넘치면 다음 밀리초로
+            _last_seq += 1
+            if _last_seq > 0xFFF:
+                _last_ms, _last_seq = _last_ms + 1, 0
+        ms, seq = _last_ms, _last_seq
+    rand = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (ms & ((1 << 48) - 1)) << 80 | 0x7 << 76 | seq << 64 | 0b10 << 62 | rand
+    return uuid.UUID(int=value)
+
+
+def new_log_id() -> str:
+    return str(uuid7())
+
+
+def is_log_id(value: str) -> bool:
+    """UUID 형식인지 (binary에서는 형식이 잘못된 ID로 기본 키 조회(Session.get)를 하면 오류이므로 먼저 확인)"""
+    try:
+        uuid.UUID(str(value))
+    except ValueError:
+        return False
+    return True
+
+
+def _binary_storage() -> bool:
+    return settings.log_id_storage.lower() == STORAGE_BINARY
+
+
+class LogId(TypeDecorator):
+    """
+    로그 ID 컬럼 타입. 파이썬 쪽 값은 항상 UUID 문자열이며, binary면 DB에는 16바이트로 저장한다.
+    binary에서 UUID 형식이 아닌 값은
+    - INSERT/UPDATE 값이면 ValueError (잘못된 ID가 빈 바이트로 저장되지 않도록)
+    - 조회 조건(비교/IN)이면 어떤 행과도 일치하지 않는 빈 바이트로 바인딩 (존재하지 않는 로그 ID 조회는 char와 같이 404/빈 목록)
+    """
+    impl = CHAR(36)
+    cache_ok = True
+
+    def __init__(self, binary: Optional[bool] = None, lenient: bool = False):
+        super().__init__()
+        self.binary = _binary_storage() if binary is None else binary
+        self.lenient = lenient
+
+    def coerce_compared_value(self, op, value):
+        """컬럼과 비교하는 값은 형식이 잘못되어도 오류 대신 빈 바이트로 바인딩"""
+        return LogId(binary=self.binary, lenient=True)
+
+    def load_dialect_impl(self, dialect):
+        if not self.binary:
+            return dialect.type_descriptor(CHAR(36))
+        if dialect.name == "mysql":
+            return dialect.type_descriptor(BINARY(16))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None or not self.binary:
+            return value
+        try:
+            return uuid.UUID(str(value)).bytes
+        except ValueError:
+            if self.lenient:
+                return b""
+            raise ValueError(f"로그 ID가 UUID 형식이 아닙니다: {value!r}")
+
+    def process_result_value(self, value, dialect):
+        if value is None or not self.binary:
+            return value
+        return str(uuid.UUID(bytes=bytes(value)))
@@ -0,0 +1,164 @@
+"""
+로그 목록 조회 쿼리 헬퍼
+
+OFFSET 페이지네이션은 skip 만큼의 행을 읽고 버려야 하므로 깊은 페이지일수록 느려진다.
+(created_at, id) 복합 인덱스를 타는 keyset(cursor) 페이지네이션을 제공한다.
+목록 화면용 summary 모드는 필요한 컬럼만 SELECT 하여 body/수신자/토큰 JSON 전송을 피한다.
+검색 필터는 (필터 컬럼, created_at, id) 복합 인덱스의 범위 스캔으로 처리되도록 구성한다.
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass, fields as dataclass_fields
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, and_, or_, select
+
+from database import EmailLog, PushLog
+
+# summary 모드에서 조회하는 컬럼 (body, 수신자/토큰 JSON 제외)
+EMAIL_LOG_SUMMARY_COLUMNS = (
+    EmailLog.id,
+    EmailLog.sender_email,
+    EmailLog.subject,
+    EmailLog.smtp_host,
+    EmailLog.status,
+    EmailLog.attachment_count,
+    EmailLog.total_attachment_size,
+    EmailLog.created_at,
+    EmailLog.sent_at,
+)
+
+PUSH_LOG_SUMMARY_COLUMNS = (
+    PushLog.id,
+    PushLog.firebase_project_id,
+    PushLog.title,
+    PushLog.status,
+    PushLog.success_count,
+    PushLog.failure_count,
+    PushLog.created_at,
+    PushLog.sent_at,
+)
+
+LOG_FIELDS_FULL = "full"
+LOG_FIELDS_SUMMARY = "summary"
+
+
+class InvalidCursorError(ValueError):
+    """잘못된 커서 값"""
+
+
+@dataclass
+class LogFilters:
+    """로그 검색 조건 (None인 항목은 적용하지 않음)"""
+    status: Optional[str] = None
+    sender_email: Optional[str] = None
+    smtp_host: Optional[str] = None
+    firebase_project_id: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    has_attachments: Optional[bool] = None
+    batch_id: Optional[str] = None
+    parent_log_id: Optional[str] = None
+
+    def is_empty(self) -> bool:
+        return all(getattr(self, f.name) is None for f in dataclass_fields(self))
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    """created_at은 naive UTC로 저장되므로 timezone이 있는 입력은 UTC로 변환"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def apply_log_filters(stmt: Select, model, filters: Optional[LogFilters]) -> Select:
+    """
+    검색 조건 적용. 모델에 없는 조건(예: 푸시 로그의 smtp_host)은 무시된다.
+    created_from은 포함, created_to는 미포함 구간 [created_from, created_to).
+    """
+    if filters is None:
+        return stmt
+    for name in ("status", "sender_email", "smtp_host", "firebase_project_id", "batch_id", "parent_log_id"):
+        value = getattr(filters, name)
+        if value is not None and hasattr(model, name):
+            stmt = stmt.where(getattr(model, name) == value)
+    if filters.created_from is not None:
+        stmt = stmt.where(model.created_at >= _to_naive_utc(filters.created_from))
+    if filters.created_to is not None:
+        stmt = stmt.where(model.created_at < _to_naive_utc(filters.created_to))
+    if filters.has_attachments is not None and hasattr(model, "attachment_count"):
+        if filters.has_attachments:
+            stmt = stmt.where(model.attachment_count > 0)
+        else:
+            stmt = stmt.where(or_(model.attachment_count == 0, model.attachment_count.is_(None)))
+    return stmt
+
+
+def encode_cursor(created_at: datetime, log_id: Any) -> str:
+    """마지막 행의 (created_at, id)를 불투명한 커서 문자열로 인코딩"""
+    payload = json.dumps({"c": created_at.isoformat(), "i": str(log_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["c"]), str(payload["i"])
+    except (binascii.Error, ValueError, KeyError, TypeError, UnicodeError):
+        raise InvalidCursorError("유효하지 않은 cursor 값입니다.")
+
+
+def apply_keyset_pagination(
+    stmt: Select,
+    model,
+    cursor: Optional[str],
+    limit: int,
+    skip: int = 0
+) -> Select:
+    """
+    최신순 정렬 + 커서 조건 적용.
+    다음 페이지 존재 여부를 알기 위해 limit + 1 행을 조회한다.
+    skip은 하위 호환용 (deprecated) 이며 cursor가 있으면 무시된다.
+    """
+    stmt = stmt.order_by(model.created_at.desc(), model.id.desc())
+    if cursor:
+        created_at, log_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < log_id)
+            )
+        )
+    elif skip:
+        stmt = stmt.offset(skip)
+    return stmt.limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """limit + 1 행 조회 결과를 (현재 페이지, next_cursor)로 분리"""
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
+
+
+def summary_select(model) -> Select:
+    """ORM 엔티티 대신 summary 컬럼만 조회하는 SELECT (identity map 적재 없음)"""
+    columns = EMAIL_LOG_SUMMARY_COLUMNS if model is EmailLog else PUSH_LOG_SUMMARY_COLUMNS
+    return select(*columns)
+
+
+def rows_to_json(rows: Sequence[Any]) -> List[Dict[str, Any]]:
+    """컬럼 조회 결과(Row)를 JSON 직렬화 가능한 dict 목록으로 변환"""
+    items = []
+    for row in rows:
+        item = row._asdict()
+        for key, value in item.items():
+            if isinstance(value, datetime):
+                item[key] = value.isoformat()
+        items.append(item)
+    return items
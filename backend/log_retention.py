@@ -0,0 +1,439 @@
+"""
+발송 로그 보관 기간(retention) 관리 / 아카이브
+
+email_logs, push_logs는 삭제 없이 계속 쌓여서 오래될수록 목록 조회/인덱스 스캔이 느려지고 디스크를 차지했다.
+테이블별 보관 기간(일)이 지난 로그를 gzip 압축 NDJSON 파일로 아카이브한 뒤 삭제한다.
+- created_at 월 단위 RANGE 파티션이 있는 MySQL 테이블(database/init_db.sql 참고): 앞으로 쓸 월 파티션을 미리 만들고
+  (pmax를 REORGANIZE), 보관 기간이 지난 월 파티션은 아카이브 후 DROP PARTITION (행 단위 DELETE 없이 바로 공간 반환)
+- 파티션이 없는 테이블(SQLite, 마이그레이션 전 MySQL): (created_at, id) 순서로 batch_size건씩 아카이브 후 DELETE
+- 푸시 로그의 토큰별 결과(push_deliveries)는 로그와 함께 아카이브/삭제
+- 예약/outbox 대기/재시도 대기 중인 로그는 삭제하지 않는다 (이런 로그가 남은 파티션은 다음 실행까지 유지)
+- 아카이브는 배치마다 gzip member를 이어 붙이고 fsync한 뒤 삭제하므로, 중간에 중단되어도 삭제된 로그는 파일에 남아 있다
+  (파일명에 실행 시각이 들어가므로 중단 후 재실행하면 같은 로그가 다른 파일에 한 번 더 아카이브될 수 있음)
+- archive_s3_bucket이 있으면 파일을 S3에 업로드하고 로컬 파일은 삭제 (업로드에 실패하면 로컬에 남김)
+- 여러 인스턴스 중 한 곳에서만 실행 (MySQL GET_LOCK)
+- 목록 조회는 cutoff()를 created_at 하한으로 사용하여 MySQL이 만료된 파티션을 읽지 않도록 한다 (partition pruning)
+"""
+import asyncio
+import gzip
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, delete, select, text
+from sqlalchemy.engine import Connection
+
+from database import EmailLog, PushDelivery, PushLog, engine
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 아직 발송이 끝나지 않아 삭제하면 안 되는 상태 (예약, outbox 대기/발송 중, 재시도 대기)
+ACTIVE_STATUSES = ("scheduled", "queued", "sending", "retrying")
+MAX_PARTITION = "pmax"
+LOCK_NAME = "ig_notification_log_retention"
+RETENTION_MODELS = (EmailLog, PushLog)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    """value가 속한 달의 1일 기준으로 months개월 뒤 1일"""
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime) -> str:
+    """월 파티션 이름 (p202501: 2025-01, 상한 VALUES LESS THAN ('2025-02-01'))"""
+    return f"p{month:%Y%m}"
+
+
+def partition_month(name: str) -> Optional[datetime]:
+    if not name.startswith("p"):
+        return None
+    try:
+        return datetime.strptime(name[1:], "%Y%m")
+    except ValueError:
+        return None
+
+
+def plan_partitions(
+    names: Sequence[str],
+    now: datetime,
+    premake_months: int,
+    cutoff: Optional[datetime]
+) -> Tuple[List[datetime], List[str]]:
+    """
+    (새로 만들 월 목록, 삭제할 파티션 이름 목록).
+    이번 달부터 premake_months개월 뒤까지 파티션이 있어야 하고, 상한(다음 달 1일)이 cutoff 이하인 파티션은 만료.
+    """
+    months = sorted(month for month in map(partition_month, names) if month is not None)
+    target = add_months(now, premake_months)
+    month = add_months(months[-1], 1) if months else add_months(now, 0)
+    create = []
+    while month <= target:
+        create.append(month)
+        month = add_months(month, 1)
+    expired = [partition_name(m) for m in months if cutoff is not None and add_months(m, 1) <= cutoff]
+    return create, expired
+
+
+def reorganize_sql(table: str, months: Sequence[datetime]) -> str:
+    """pmax를 나눠 월 파티션 추가 (pmax가 비어 있으면 메타데이터만 바뀜)"""
+    parts = ", ".join(
+        f"PARTITION {partition_name(month)} VALUES LESS THAN ('{add_months(month, 1):%Y-%m-%d}')" for month in months
+    )
+    return (
+        f"ALTER TABLE {table} REORGANIZE PARTITION {MAX_PARTITION} INTO "
+        f"({parts}, PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE))"
+    )
+
+
+def _json_default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class ArchiveFile:
+    """gzip 압축 NDJSON. append마다 gzip member를 하나 추가하고 디스크에 기록 (이어 붙인 member도 하나의 gzip으로 읽힘)"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.rows = 0
+
+    def append(self, rows: Sequence[Dict[str, Any]]):
+        if not rows:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.path, "ab") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False, default=_json_default).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileobj.fileno())
+        self.rows += len(rows)
+
+
+@dataclass
+class _Archive:
+    """테이블 1회 정리의 아카이브 파일 (deliveries: 푸시 로그의 토큰별 결과)"""
+    logs: ArchiveFile
+    deliveries: Optional[ArchiveFile] = None
+
+    def files(self) -> List[ArchiveFile]:
+        return [file for file in (self.logs, self.deliveries) if file is not None]
+
+
+class LogRetention:
+    """
+    - retention_days: {테이블 이름: 보관 기간(일)} (0 이하면 삭제하지 않음)
+    - interval: 실행 주기(초)
+    - batch_size: 한 번에 아카이브/삭제하는 로그 수
+    - premake_months: 미리 만들어 둘 월 파티션 수 (이번 달 이후)
+    - archive_dir: 아카이브 파일 디렉토리 (archive_enabled=False면 아카이브 없이 삭제)
+    - archive_s3_bucket / archive_s3_prefix: 아카이브 파일 업로드 위치 (비어 있으면 로컬에만 보관)
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        retention_days: Dict[str, int],
+        interval: float,
+        batch_size: int,
+        premake_months: int,
+        archive_enabled: bool,
+        archive_dir: str,
+        archive_s3_bucket: str = "",
+        archive_s3_prefix: str = ""
+    ):
+        self.enabled = enabled
+        self.retention_days = dict(retention_days)
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self.premake_months = max(0, premake_months)
+        self.archive_enabled = archive_enabled
+        self.archive_dir = Path(archive_dir)
+        self.archive_s3_bucket = archive_s3_bucket
+        self.archive_s3_prefix = archive_s3_prefix
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._runs = 0
+        self._archived: Dict[str, int] = {}
+        self._deleted: Dict[str, int] = {}
+        self._partitions_created = 0
+        self._partitions_dropped = 0
+        self._partitions_skipped = 0
+        self._uploaded = 0
+        self._upload_errors = 0
+        self._errors = 0
+        self._last_run_at: Optional[datetime] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def cutoff(self, model, now: Optional[datetime] = None) -> Optional[datetime]:
+        """이 시각 이전에 생성된 로그는 만료 (목록 조회 하한으로도 사용, 보관 기간이 없으면 None)"""
+        days = self.retention_days.get(model.__tablename__, 0)
+        if not self.enabled or days <= 0:
+            return None
+        return (now or datetime.utcnow()) - timedelta(days=days)
+
+    async def start(self):
+        if self.running:
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="log-retention")
+        logger.info(f"로그 retention 시작: {self.retention_days} (일), interval={self.interval}s")
+        if self.archive_enabled and not self.archive_s3_bucket:
+            logger.warning(
+                f"LOG_ARCHIVE_S3_BUCKET이 없어 삭제한 로그의 아카이브를 로컬({self.archive_dir})에만 보관합니다. "
+                "컨테이너 디스크라면 task 종료 시 아카이브가 사라집니다."
+            )
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._errors += 1
+                logger.error(f"로그 retention 실패: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def shutdown(self):
+        """실행 루프를 멈춤 (진행 중인 실행은 현재 배치까지만 처리)"""
+        if not self.running:
+            return
+        self._stopping = True
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def run_once(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """1회 실행 (동기, 스레드에서 호출). 반환값은 테이블별 삭제 건수"""
+        now = now or datetime.utcnow()
+        run_id = f"{now:%Y%m%dT%H%M%S}"
+        deleted: Dict[str, int] = {}
+        with engine.connect() as conn:
+            if not self._acquire_lock(conn):
+                logger.info("다른 인스턴스가 로그 retention을 실행 중입니다.")
+                return deleted
+            try:
+                for model in RETENTION_MODELS:
+                    if self._stopping:
+                        break
+                    table = model.__tablename__
+                    cutoff = self.cutoff(model, now)
+                    partitions = self._partitions(conn, table)
+                    if partitions:
+                        deleted[table] = self._rotate_partitions(conn, model, partitions, now, cutoff, run_id)
+                    elif cutoff is not None:
+                        deleted[table] = self._purge_rows(conn, model, cutoff, run_id)
+            finally:
+                self._release_lock(conn)
+        self._runs += 1
+        self._last_run_at = now
+        for table, count in deleted.items():
+            self._deleted[table] = self._deleted.get(table, 0) + count
+            if count:
+                logger.info(f"만료 로그 삭제: {table} {count}건")
+        return deleted
+
+    def _acquire_lock(self, conn: Connection) -> bool:
+        if conn.dialect.name != "mysql":
+            return True
+        return conn.execute(text("SELECT GET_LOCK(:name, 0)"), {"name": LOCK_NAME}).scalar() == 1
+
+    def _release_lock(self, conn: Connection):
+        if conn.dialect.name == "mysql":
+            conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": LOCK_NAME})
+        conn.commit()
+
+    def _partitions(self, conn: Connection, table: str) -> List[str]:
+        """테이블의 파티션 이름 (파티션이 없거나 MySQL이 아니면 빈 목록)"""
+        if conn.dialect.name != "mysql":
+            return []
+        return list(conn.execute(
+            text(
+                "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+                "ORDER BY PARTITION_ORDINAL_POSITION"
+            ),
+            {"table": table}
+        ).scalars())
+
+    def _rotate_partitions(
+        self,
+        conn: Connection,
+        model,
+        partitions: List[str],
+        now: datetime,
+        cutoff: Optional[datetime],
+        run_id: str
+    ) -> int:
+        table = model.__tablename__
+        create, expired = plan_partitions(partitions, now, self.premake_months, cutoff)
+        if create and MAX_PARTITION in partitions:
+            conn.execute(text(reorganize_sql(table, create)))
+            conn.commit()
+            self._partitions_created += len(create)
+            logger.info(f"월 파티션 추가: {table} {[partition_name(month) for month in create]}")
+
+        deleted = 0
+        for name in expired:
+            if self._stopping:
+                break
+            active = conn.execute(
+                text(f"SELECT COUNT(*) FROM {table} PARTITION ({name}) WHERE status IN :active")
+                .bindparams(bindparam("active", expanding=True)),
+                {"active": list(ACTIVE_STATUSES)}
+            ).scalar()
+            if active:
+                self._partitions_skipped += 1
+                logger.warning(f"처리 중인 로그 {active}건이 남아 있어 파티션을 유지합니다: {table} {name}")
+                continue
+            archive = self._archive_file(table, name, run_id)
+            for rows in self._batches(conn, model, f"{table} PARTITION ({name})"):
+                self._archive_rows(conn, model, rows, archive)
+                conn.commit()
+                deleted += len(rows)
+            if self._stopping:
+                break
+            conn.execute(text(f"ALTER TABLE {table} DROP PARTITION {name}"))
+            conn.commit()
+            self._partitions_dropped += 1
+            logger.info(f"만료 파티션 삭제: {table} {name}")
+            self._finish_archive(archive)
+        return deleted
+
+    def _purge_rows(self, conn: Connection, model, cutoff: datetime, run_id: str) -> int:
+        """파티션이 없는 테이블: 만료된 로그를 batch_size건씩 아카이브 후 DELETE"""
+        table = model.__tablename__
+        archive = self._archive_file(table, f"before-{cutoff:%Y%m%d}", run_id)
+        deleted = 0
+        for rows in self._batches(conn, model, table, cutoff):
+            self._archive_rows(conn, model, rows, archive)
+            conn.execute(delete(model).where(model.id.in_([row["id"] for row in rows])))
+            conn.commit()
+            deleted += len(rows)
+            if self._stopping:
+                break
+        self._finish_archive(archive)
+        return deleted
+
+    def _batches(self, conn: Connection, model, source: str, cutoff: Optional[datetime] = None):
+        """source(테이블 또는 파티션)의 로그를 (created_at, id) 순서로 batch_size건씩 (처리 중인 로그 제외)"""
+        columns = list(model.__table__.columns)
+        conditions = ["status NOT IN :active"]
+        params: Dict[str, Any] = {"active": list(ACTIVE_STATUSES), "limit": self.batch_size}
+        if cutoff is not None:
+            conditions.append("created_at < :cutoff")
+            params["cutoff"] = cutoff
+        last = None
+        while not self._stopping:
+            where = list(conditions)
+            # id는 LOG_ID_STORAGE=binary면 BINARY(16)이므로 모델 컬럼 타입으로 바인딩
+            binds = [bindparam("active", expanding=True)]
+            if last is not None:
+                where.append("(created_at > :last_created_at OR (created_at = :last_created_at AND id > :last_id))")
+                params.update(last_created_at=last[0], last_id=last[1])
+                binds.append(bindparam("last_id", type_=model.id.type))
+            stmt = (
+                text(
+                    f"SELECT {', '.join(column.name for column in columns)} FROM {source} "
+                    f"WHERE {' AND '.join(where)} ORDER BY created_at, id LIMIT :limit"
+                )
+                .bindparams(*binds)
+                .columns(*columns)
+            )
+            rows = [dict(row._mapping) for row in conn.execute(stmt, params)]
+            if not rows:
+                return
+            yield rows
+            last = (rows[-1]["created_at"], rows[-1]["id"])
+
+    def _archive_rows(self, conn: Connection, model, rows: List[Dict[str, Any]], archive: Optional[_Archive]):
+        """로그 배치 아카이브 + 푸시 로그면 토큰별 결과도 아카이브 후 삭제 (로그 삭제는 호출하는 쪽에서)"""
+        table = model.__tablename__
+        if archive is not None:
+            archive.logs.append(rows)
+            self._archived[table] = self._archived.get(table, 0) + len(rows)
+        if model is not PushLog:
+            return
+        ids = [row["id"] for row in rows]
+        deliveries = PushDelivery.__table__
+        if archive is not None:
+            result = conn.execute(
+                select(deliveries).where(deliveries.c.push_log_id.in_(ids)).order_by(deliveries.c.push_log_id, deliveries.c.seq)
+            )
+            archive.deliveries.append([dict(row._mapping) for row in result])
+        conn.execute(delete(deliveries).where(deliveries.c.push_log_id.in_(ids)))
+
+    def _archive_file(self, table: str, label: str, run_id: str) -> Optional[_Archive]:
+        """{archive_dir}/{테이블}/{테이블}-{파티션 또는 before-cutoff}-{실행 시각}.ndjson.gz"""
+        if not self.archive_enabled:
+            return None
+        directory = self.archive_dir / table
+        archive = _Archive(ArchiveFile(directory / f"{table}-{label}-{run_id}.ndjson.gz"))
+        if table == PushLog.__tablename__:
+            archive.deliveries = ArchiveFile(directory / f"{PushDelivery.__tablename__}-{label}-{run_id}.ndjson.gz")
+        return archive
+
+    def _finish_archive(self, archive: Optional[_Archive]):
+        if archive is None:
+            return
+        for file in archive.files():
+            if file.rows:
+                self._upload(file.path)
+
+    def _upload(self, path: Path):
+        """S3 업로드 후 로컬 파일 삭제 (버킷이 없으면 로컬에 보관)"""
+        if not self.archive_s3_bucket:
+            return
+        key = f"{self.archive_s3_prefix}{path.relative_to(self.archive_dir).as_posix()}"
+        try:
+            import boto3
+            boto3.client("s3", region_name="ap-northeast-2").upload_file(str(path), self.archive_s3_bucket, key)
+        except Exception as e:
+            self._upload_errors += 1
+            logger.error(f"아카이브 업로드 실패 ({path}): {str(e)}")
+            return
+        path.unlink()
+        self._uploaded += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "retention_days": self.retention_days,
+            "runs": self._runs,
+            "last_run_at": self._last_run_at.isoformat() if self._last_run_at else None,
+            "archived": dict(self._archived),
+            "deleted": dict(self._deleted),
+            "partitions_created": self._partitions_created,
+            "partitions_dropped": self._partitions_dropped,
+            "partitions_skipped": self._partitions_skipped,
+            "uploaded": self._uploaded,
+            "upload_errors": self._upload_errors,
+            "errors": self._errors,
+        }
+
+
+log_retention = LogRetention(
+    enabled=settings.log_retention_enabled,
+    retention_days={
+        EmailLog.__tablename__: settings.log_retention_email_days,
+        PushLog.__tablename__: settings.log_retention_push_days,
+    },
+    interval=settings.log_retention_interval,
+    batch_size=settings.log_retention_batch_size,
+    premake_months=settings.log_partition_premake_months,
+    archive_enabled=settings.log_archive_enabled,
+    archive_dir=settings.log_archive_dir,
+    archive_s3_bucket=settings.log_archive_s3_bucket,
+    archive_s3_prefix=settings.log_archive_s3_prefix
+)
@@ -0,0 +1,357 @@
+"""
+발송 로그 write-behind 기록
+
+발송 1건마다 로그 INSERT(commit + refresh)와 결과 UPDATE(commit)로 DB 왕복이 여러 번 생기던 것을,
+로그 변경을 메모리에 모아 batch_size건 또는 flush_interval초마다 한 트랜잭션으로 기록한다.
+- upsert: 전체 행 → 테이블별 multi-row INSERT ... ON DUPLICATE KEY UPDATE 한 문장
+  (동기 발송은 로그 INSERT를 기다리지 않고 발송 결과가 반영된 최종 행만 기록)
+- update: 이미 저장된 로그의 상태 변경 → 바꾸는 컬럼이 같은 행끼리 executemany UPDATE
+  (필수 컬럼이 없는 행은 strict 모드 MySQL에서 INSERT ... ON DUPLICATE KEY UPDATE로 기록할 수 없음)
+- 같은 로그의 변경이 flush 전에 여러 번 들어오면 하나로 합친다
+- children: 로그와 같은 트랜잭션으로 기록할 자식 테이블 행 (푸시 토큰별 결과 등, 테이블별 multi-row upsert)
+- durable=True: 해당 변경이 commit될 때까지 기다림 (flush 중에 들어온 변경들이 다음 commit 1번을 공유하는 group commit)
+- 메모리 제한: 기록 대기 중인 로그가 max_pending건이면 자리가 날 때까지 기다리고(back-pressure),
+  put_timeout을 넘으면 버퍼를 거치지 않고 직접 기록
+- 기록 실패: DB 연결 문제면 배치를 그대로 버퍼에 되돌려 다시 기록하고, 값 문제(제약 위반 등)면 한 건씩 기록해
+  실패한 변경만 되돌린다. 한 건씩 기록해도 MAX_WRITE_ATTEMPTS번 실패한 변경은 오류 로그를 남기고 버림
+- 종료 시 남은 변경을 모두 flush
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam
+from sqlalchemy.exc import InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database import AsyncSessionLocal
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 자식 행 upsert 한 문장의 최대 행 수
+CHILD_CHUNK_SIZE = 500
+# 한 건씩 기록해도 이 횟수만큼 실패한 변경은 버림 (계속 실패하는 변경이 버퍼 앞을 막지 않도록)
+MAX_WRITE_ATTEMPTS = 3
+
+
+def _connection_error(error: Exception) -> bool:
+    """DB 연결/커넥션 풀 문제 (변경 내용과 무관하게 모두 실패하므로 나눠 기록하지 않음)"""
+    return isinstance(error, (OperationalError, InterfaceError, PoolTimeoutError, OSError))
+
+
+def row_values(log) -> Dict[str, Any]:
+    """ORM 로그 객체 → 전체 컬럼 값 (값이 없는 컬럼은 모델 기본값)"""
+    values = {}
+    for column in log.__table__.columns:
+        value = getattr(log, column.key)
+        if value is None and column.default is not None:
+            value = column.default.arg(None) if column.default.is_callable else column.default.arg
+        values[column.key] = value
+    return values
+
+
+def upsert_statement(dialect: str, table, rows: List[Dict[str, Any]]):
+    """
+    multi-row INSERT ... ON DUPLICATE KEY UPDATE 한 문장.
+    이미 있는 행은 rows에 있는 컬럼 중 기본 키와 created_at을 제외한 컬럼만 갱신한다 (모든 행의 컬럼 구성이 같아야 함).
+    """
+    keys = [c.key for c in table.primary_key.columns]
+    columns = [key for key in rows[0] if key not in keys and key != "created_at"]
+    if dialect == "sqlite":
+        stmt = sqlite_insert(table).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=keys, set_={key: stmt.excluded[key] for key in columns}
+        )
+    stmt = mysql_insert(table).values(rows)
+    return stmt.on_duplicate_key_update({key: stmt.inserted[key] for key in columns})
+
+
+@dataclass
+class _Pending:
+    model: Any
+    log_id: str
+    values: Dict[str, Any]
+    full_row: bool
+    children: List[Tuple[Any, List[Dict[str, Any]]]] = field(default_factory=list)
+    waiters: List[asyncio.Future] = field(default_factory=list)
+    failures: int = 0
+
+    def merge(self, other: "_Pending"):
+        self.values.update(other.values)
+        self.full_row = self.full_row or other.full_row
+        self.children.extend(other.children)
+
+
+def _resolve(entries: List[_Pending]):
+    """기록된 변경의 durable 대기자 완료"""
+    for entry in entries:
+        for waiter in entry.waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        entry.waiters = []
+
+
+class LogWriter:
+    """
+    - batch_size: 한 트랜잭션으로 기록하는 최대 로그 수 (이만큼 쌓이면 flush_interval을 기다리지 않고 기록)
+    - flush_interval: 버퍼를 기록하는 최대 간격(초)
+    - max_pending: 기록 대기(버퍼 + 기록 중) 로그 최대 수
+    - put_timeout: 버퍼가 가득 찼을 때 자리를 기다리는 최대 시간(초)
+    """
+
+    def __init__(self, enabled: bool, batch_size: int, flush_interval: float, max_pending: int, put_timeout: float):
+        self.enabled = enabled
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max(self.batch_size, max_pending)
+        self.put_timeout = put_timeout
+        self._pending: Dict[Tuple[str, str], _Pending] = {}
+        self._flushing: Dict[Tuple[str, str], _Pending] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._written = 0
+        self._merged = 0
+        self._batches = 0
+        self._errors = 0
+        self._overflow = 0
+        self._dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run(), name="log-writer")
+        logger.info(f"로그 write-behind 시작: batch_size={self.batch_size}, flush_interval={self.flush_interval}s")
+
+    async def upsert(self, log, durable: bool = False, children: Optional[List[Tuple[Any, List[Dict[str, Any]]]]] = None):
+        """로그 전체 행 기록 (아직 저장되지 않은 로그면 INSERT), children은 [(자식 모델, 행 목록)]"""
+        await self._put(_Pending(type(log), log.id, row_values(log), True, list(children or [])), durable)
+
+    async def update(
+        self,
+        model,
+        log_id: str,
+        values: Dict[str, Any],
+        durable: bool = False,
+        children: Optional[List[Tuple[Any, List[Dict[str, Any]]]]] = None
+    ):
+        """이미 저장된 로그의 컬럼 변경"""
+        await self._put(_Pending(model, log_id, dict(values), False, list(children or [])), durable)
+
+    def pending(self, model, log_id: str):
+        """아직 기록되지 않은 전체 행이 있으면 로그 객체로 반환 (로그 상세 조회가 flush 전에도 결과를 볼 수 있도록)"""
+        key = (model.__tablename__, log_id)
+        for buffer in (self._pending, self._flushing):
+            entry = buffer.get(key)
+            if entry is not None and entry.full_row:
+                return model(**entry.values)
+        return None
+
+    async def _put(self, entry: _Pending, durable: bool):
+        if not self.running:
+            await self._write([entry])
+            return
+        key = (entry.model.__tablename__, entry.log_id)
+        if key not in self._pending and not await self._wait_for_space():
+            # DB 기록이 계속 밀리면 버퍼를 늘리지 않고 요청 경로에서 직접 기록
+            self._overflow += 1
+            await self._write([entry])
+            return
+
+        current = self._pending.get(key)
+        if current is None:
+            self._pending[key] = current = entry
+        else:
+            current.merge(entry)
+            self._merged += 1
+        waiter = None
+        if durable:
+            waiter = asyncio.get_running_loop().create_future()
+            current.waiters.append(waiter)
+        if durable or len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        if waiter is not None:
+            await waiter
+
+    async def _wait_for_space(self) -> bool:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.put_timeout
+        while len(self._pending) + len(self._flushing) >= self.max_pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            self._space.clear()
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._space.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    async def _write(self, entries: List[_Pending]):
+        """한 트랜잭션으로 기록: 전체 행은 테이블별 multi-row upsert, 컬럼 변경은 컬럼 조합별 executemany UPDATE"""
+        upserts: Dict[Any, List[Dict[str, Any]]] = {}
+        updates: Dict[Tuple[Any, Tuple[str, ...]], List[Dict[str, Any]]] = {}
+        children: Dict[Tuple[Any, Tuple[str, ...]], List[Dict[str, Any]]] = {}
+        for entry in entries:
+            for model, rows in entry.children:
+                for row in rows:
+                    children.setdefault((model.__table__, tuple(row)), []).append(row)
+            if entry.full_row:
+                upserts.setdefault(entry.model.__table__, []).append(entry.values)
+            else:
+                columns = tuple(sorted(entry.values))
+                params = {f"v_{key}": value for key, value in entry.values.items()}
+                updates.setdefault((entry.model.__table__, columns), []).append({"v_id": entry.log_id, **params})
+
+        async with AsyncSessionLocal() as db:
+            dialect = db.bind.dialect.name
+            for table, rows in upserts.items():
+                await db.execute(upsert_statement(dialect, table, rows))
+            for (table, columns), rows in updates.items():
+                stmt = (
+                    table.update()
+                    .where(table.c.id == bindparam("v_id"))
+                    .values({key: bindparam(f"v_{key}") for key in columns})
+                )
+                await db.execute(stmt, rows)
+            for (table, _), rows in children.items():
+                for start in range(0, len(rows), CHILD_CHUNK_SIZE):
+                    await db.execute(upsert_statement(dialect, table, rows[start:start + CHILD_CHUNK_SIZE]))
+            await db.commit()
+        self._written += len(entries)
+
+    async def _write_each(self, entries: List[_Pending], error: Exception) -> List[Tuple[_Pending, Exception]]:
+        """
+        배치 기록이 값 문제로 실패: 한 건씩 기록해 실패하는 변경만 골라냄 (기록된 변경의 대기자는 바로 완료).
+        도중에 연결 오류가 나면 남은 변경은 실패 횟수를 세지 않고 그대로 되돌림.
+        """
+        if len(entries) == 1:
+            entries[0].failures += 1
+            return [(entries[0], error)]
+        failed: List[Tuple[_Pending, Exception]] = []
+        for index, entry in enumerate(entries):
+            try:
+                await self._write([entry])
+            except Exception as e:
+                if _connection_error(e):
+                    failed.extend((rest, e) for rest in entries[index:])
+                    break
+                entry.failures += 1
+                failed.append((entry, e))
+            else:
+                _resolve([entry])
+        return failed
+
+    async def flush(self):
+        """버퍼의 변경을 batch_size건씩 기록 (실패한 변경은 버퍼로 되돌려 다음 flush에 다시 기록)"""
+        if self._lock is None:
+            return
+        async with self._lock:
+            while self._pending:
+                keys = list(self._pending)[:self.batch_size]
+                self._flushing = {key: self._pending.pop(key) for key in keys}
+                entries = list(self._flushing.values())
+                try:
+                    await self._write(entries)
+                except Exception as e:
+                    self._errors += 1
+                    logger.error(f"로그 {len(entries)}건 기록 실패: {str(e)}")
+                    if _connection_error(e):
+                        failed = [(entry, e) for entry in entries]
+                    else:
+                        failed = await self._write_each(entries, e)
+                    retry = []
+                    for entry, error in failed:
+                        for waiter in entry.waiters:
+                            if not waiter.done():
+                                waiter.set_exception(error)
+                        entry.waiters = []
+                        if entry.failures >= MAX_WRITE_ATTEMPTS:
+                            self._dropped += 1
+                            logger.error(
+                                f"로그 변경 {entry.failures}회 기록 실패로 버림: {entry.model.__tablename__} {entry.log_id} "
+                                f"(columns={sorted(entry.values)}): {str(error)}"
+                            )
+                        else:
+                            retry.append(entry)
+                    self._requeue(retry)
+                    return
+                finally:
+                    self._flushing = {}
+                    self._space.set()
+                self._batches += 1
+                _resolve(entries)
+
+    def _requeue(self, entries: List[_Pending]):
+        """기록하지 못한 변경을 버퍼 앞쪽으로 되돌림 (그 사이 들어온 같은 로그의 변경이 더 최신)"""
+        restored: Dict[Tuple[str, str], _Pending] = {}
+        for entry in entries:
+            key = (entry.model.__tablename__, entry.log_id)
+            newer = self._pending.pop(key, None)
+            if newer is not None:
+                entry.merge(newer)
+                entry.waiters.extend(newer.waiters)
+            restored[key] = entry
+        restored.update(self._pending)
+        self._pending = restored
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"로그 flush 실패: {str(e)}")
+
+    async def shutdown(self):
+        """flush 루프를 멈추고 남은 변경을 모두 기록"""
+        if not self.running:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await self.flush()
+        if self._pending:
+            logger.error(f"종료 시 기록하지 못한 로그 {len(self._pending)}건")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "pending": len(self._pending) + len(self._flushing),
+            "max_pending": self.max_pending,
+            "written": self._written,
+            "merged": self._merged,
+            "batches": self._batches,
+            "avg_batch_size": round(self._written / self._batches, 2) if self._batches else 0.0,
+            "errors": self._errors,
+            "overflow": self._overflow,
+            "dropped": self._dropped,
+        }
+
+
+log_writer = LogWriter(
+    enabled=settings.log_writer_enabled,
+    batch_size=settings.log_writer_batch_size,
+    flush_interval=settings.log_writer_flush_interval,
+    max_pending=settings.log_writer_max_pending,
+    put_timeout=settings.log_writer_put_timeout
+)
@@ -1,25 +1,56 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form, Header, Request
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.security import APIKeyHeader
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from sqlalchemy.orm import Session
-from typing import List, Optional
-import uuid
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+import asyncio
 from datetime import datetime
-import base64
 import logging
+import hashlib
 import hmac
 from pathlib import Path
 
-from database import get_db, init_db, EmailLog, PushLog, engine
-from models import EmailSendResponse, EmailLogResponse, PushSendResponse, PushLogResponse
+from database import (
+    get_async_db, init_db, EmailLog, JobPayload, PushDelivery, PushLog, PushTokenHealth, engine, async_engine, get_pool_stats,
+    reap_idle_connections, reap_idle_async_connections
+)
+from models import (
+    EmailSendResponse, EmailLogResponse, EmailLogSummaryResponse,
+    EmailBatchRequest, EmailBatchResponse, EmailBatchStatusResponse,
+    PushSendResponse, PushFanoutResponse, PushLogResponse, PushLogSummaryResponse, PushDeliveryResponse,
+    DeadTokenResponse
+)
 from email_service import EmailService
+from smtp_pool import smtp_pool_manager
+from email_queue import email_queue, EmailJob, EmailQueueFullError
+from email_batch import (
+    BatchItem, BatchTemplateError, EmailBatchJob, create_batch_logs, email_batch_runner, validate_templates
+)
 from push_service import PushService
+from push_deliveries import add_pending_deliveries, list_deliveries, result_rows, save_delivery_rows, token_history
+from push_fanout import (
+    PushFanoutJob, create_fanout_logs, dedupe_tokens, parse_token_file, format_sse, push_fanout_runner
+)
+from log_ids import is_log_id, new_log_id
+from log_queries import (
+    InvalidCursorError, LOG_FIELDS_FULL, LOG_FIELDS_SUMMARY, LogFilters,
+    apply_keyset_pagination, apply_log_filters, rows_to_json, split_page, summary_select
+)
+from idempotency import IdempotencyError, idempotency_store, request_fingerprint
+from log_retention import log_retention
+from log_writer import log_writer
+from outbound_limiter import KIND_FCM, KIND_SMTP, outbound_limiter
+from outbox import add_outbox_job, outbox
+from request_limiter import request_limiter
+from retry_engine import attempt_email, attempt_push, retry_policy
+from scheduler import (
+    KIND_EMAIL, KIND_PUSH, check_payload_key, encode_payload, parse_send_at, schedule_retry, send_scheduler
+)
+from token_registry import EXPORT_FORMATS, export_dead_tokens, token_registry
 from settings import settings
 
 # 로깅 레벨을 환경 변수에서 읽기
@@ -27,9 +58,60 @@ log_level = getattr(logging, settings.log_level.upper(), logging.INFO)
 logging.basicConfig(level=log_level, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+async def _reap_idle_db_connections():
+    """일정 시간 사용되지 않은 DB 커넥션을 주기적으로 반납 (공유 MySQL max_connections 보호)"""
+    interval = max(settings.db_pool_idle_timeout / 2, 1)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if await asyncio.to_thread(reap_idle_connections):
+                logger.info("유휴 DB 커넥션 반납 완료")
+            if await reap_idle_async_connections():
+                logger.info("유휴 비동기 DB 커넥션 반납 완료")
+        except Exception as e:
+            logger.warning(f"유휴 DB 커넥션 정리 실패: {str(e)}")
+
+
+async def _reap_idle_smtp_pools():
+    """SMTP_POOL_IDLE_TIMEOUT을 넘긴 유휴 SMTP 세션을 주기적으로 닫고, 사용되지 않는 풀 제거"""
+    interval = max(settings.smtp_pool_idle_timeout / 2, 1)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await smtp_pool_manager.reap_idle()
+        except Exception as e:
+            logger.warning(f"유휴 SMTP 세션 정리 실패: {str(e)}")
+
+
+async def _sweep_firebase_apps():
+    """FIREBASE_APP_IDLE_TIMEOUT 동안 발송이 없는 프로젝트의 Firebase 앱을 주기적으로 정리"""
+    interval = max(min(settings.firebase_app_idle_timeout / 2, 300), 1)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            disposed = await asyncio.to_thread(PushService.sweep_firebase_apps)
+            if disposed:
+                logger.info(f"유휴 Firebase 앱 정리: {disposed}개")
+        except Exception as e:
+            logger.warning(f"유휴 Firebase 앱 정리 실패: {str(e)}")
+
+
+async def _refresh_token_registry():
+    """다른 인스턴스가 기록한 dead 토큰을 주기적으로 메모리에 반영"""
+    while True:
+        await asyncio.sleep(settings.push_token_registry_refresh_interval)
+        try:
+            await asyncio.to_thread(token_registry.load)
+        except Exception as e:
+            logger.warning(f"dead 토큰 레지스트리 갱신 실패: {str(e)}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    if settings.scheduler_enabled or settings.outbox_enabled:
+        # 인스턴스마다 다른 임시 키로 암호화하면 다른 task/재시작 후 payload를 복호화할 수 없으므로 시작 중단
+        check_payload_key()
     try:
         init_db()
         logger.info(f"Database initialized. Connection URL: {settings.database_url[:50]}...")
@@ -42,8 +124,49 @@ async def lifespan(app: FastAPI):
         logger.error(f"Database initialization failed: {str(e)}. Server will continue without database.")
         logger.exception(e)
 
+    if token_registry.enabled:
+        try:
+            loaded = await asyncio.to_thread(token_registry.load)
+            logger.info(f"dead 토큰 레지스트리 로드: {loaded}건")
+        except Exception as e:
+            logger.warning(f"dead 토큰 레지스트리 로드 실패: {str(e)}")
+
+    if settings.log_writer_enabled:
+        await log_writer.start()
+    if settings.email_queue_enabled:
+        await email_queue.start()
+    if settings.outbox_enabled:
+        await outbox.start()
+    if settings.scheduler_enabled:
+        await send_scheduler.start()
+    if settings.log_retention_enabled:
+        await log_retention.start()
+    background_tasks = [asyncio.create_task(_reap_idle_db_connections())]
+    if smtp_pool_manager.enabled:
+        background_tasks.append(asyncio.create_task(_reap_idle_smtp_pools()))
+    background_tasks.append(asyncio.create_task(_sweep_firebase_apps()))
+    # Secrets Manager/Firebase 응답이 느려도 서버 시작(ALB 헬스 체크)을 막지 않도록 백그라운드에서 사전 초기화
+    prewarm_projects = [p.strip() for p in settings.firebase_prewarm_projects.split(",") if p.strip()]
+    if prewarm_projects:
+        background_tasks.append(asyncio.create_task(PushService.prewarm(prewarm_projects)))
+    if token_registry.enabled:
+        background_tasks.append(asyncio.create_task(_refresh_token_registry()))
+
     yield
-    # Shutdown (필요한 경우 정리 작업)
+    for task in background_tasks:
+        task.cancel()
+    await log_retention.shutdown()
+    # Shutdown: 예약 작업 방출을 멈추고, 대기 중인 발송 작업을 처리한 뒤 SMTP 세션 정리
+    await send_scheduler.shutdown(timeout=settings.email_queue_drain_timeout)
+    await outbox.shutdown(timeout=settings.email_queue_drain_timeout)
+    await email_queue.shutdown(timeout=settings.email_queue_drain_timeout)
+    await email_batch_runner.shutdown(timeout=settings.email_queue_drain_timeout)
+    await push_fanout_runner.shutdown(timeout=settings.email_queue_drain_timeout)
+    # 발송 작업이 모두 끝난 뒤 남은 로그 변경 기록
+    await log_writer.shutdown()
+    await smtp_pool_manager.close_all()
+    await asyncio.to_thread(PushService.shutdown_executor)
+    await async_engine.dispose()
 
 app = FastAPI(
     title="IG Notification API", 
@@ -70,10 +193,8 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={"detail": exc.errors()}
     )
 
-# Rate Limiting 설정
-limiter = Limiter(key_func=get_remote_address)
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+# Rate Limiting 설정 (엔드포인트별, 클라이언트 IP 또는 등록된 API 키 단위, 저장소는 RATE_LIMIT_STORAGE)
+limiter = request_limiter
 
 # CORS 설정 - 보안을 위해 제한적으로 설정
 # 통합 서버이므로 같은 origin에서 서빙되지만, 외부 API 호출을 위한 CORS 설정
@@ -91,7 +212,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["Content-Type", "Authorization", "X-API-Key", "Accept"],  # 필요한 헤더만 명시
-    expose_headers=["Content-Type", "Content-Length"],
+    expose_headers=["Content-Type", "Content-Length", "X-Next-Cursor", "Retry-After"],
     max_age=3600,  # Preflight 요청 캐시 시간
 )
 
@@ -106,6 +227,62 @@ if FRONTEND_DIST_DIR.exists() and (FRONTEND_DIST_DIR / "index.html").exists():
     # 정적 파일 (JS, CSS 등) 서빙
     app.mount("/assets", StaticFiles(directory=str(FRONTEND_DIST_DIR / "assets")), name="assets")
 
+# 로그 목록 커서 페이지네이션 응답 헤더
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+LOG_FIELDS_PATTERN = f"^({LOG_FIELDS_FULL}|{LOG_FIELDS_SUMMARY})$"
+
+# 첨부파일 업로드 읽기 단위
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+async def _read_upload_limited(
+    file: UploadFile,
+    remaining: int,
+    detail: str = "첨부파일 총 크기는 30MB를 넘을 수 없습니다."
+) -> bytearray:
+    """
+    업로드 파일을 청크 단위로 읽으면서 남은 허용 크기를 넘는 즉시 중단.
+    초과 요청은 허용 크기 + 청크 1개까지만 읽으며, 읽은 버퍼를 bytes로 다시 복사하지 않고 그대로 반환한다.
+    """
+    buffer = bytearray()
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer += chunk
+        if len(buffer) > remaining:
+            raise HTTPException(status_code=400, detail=detail)
+    return buffer
+
+
+async def _upload_fingerprints(
+    files: List[UploadFile],
+    limit: int,
+    detail: str = "첨부파일 총 크기는 30MB를 넘을 수 없습니다."
+) -> List[tuple]:
+    """
+    Idempotency-Key 요청 비교용 첨부파일 (파일명, 크기, 내용 sha256) 목록.
+    청크 단위로 읽으며 해시하고 발송 처리에서 다시 읽을 수 있도록 처음 위치로 되돌린다.
+    """
+    fingerprints = []
+    total_size = 0
+    for file in files:
+        digest = hashlib.sha256()
+        size = 0
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if total_size + size > limit:
+                raise HTTPException(status_code=400, detail=detail)
+            digest.update(chunk)
+        await file.seek(0)
+        total_size += size
+        fingerprints.append((file.filename, size, digest.hexdigest()))
+    return fingerprints
+
+
 # API 키 인증 (선택적 - API_KEY가 설정된 경우에만 활성화)
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
@@ -136,8 +313,20 @@ async def verify_api_key(x_api_key: Optional[str] = Header(None, alias="X-API-Ke
     return x_api_key
 
 
-@app.post("/api/v1/email/send", response_model=EmailSendResponse, dependencies=[Depends(verify_api_key)])
-@limiter.limit("10/minute")  # Rate limiting: 분당 10회 제한
+async def _run_idempotent(scope: str, idempotency_key: Optional[str], request_hash: str, handler):
+    """Idempotency-Key가 있으면 최초 응답을 저장/재사용 (충돌은 HTTP 오류로 변환)"""
+    try:
+        return await idempotency_store.run(scope, idempotency_key, request_hash, handler)
+    except IdempotencyError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+
+@app.post(
+    "/api/v1/email/send",
+    response_model=EmailSendResponse,
+    responses={202: {"model": EmailSendResponse, "description": "큐 모드: 발송 요청 접수"}},
+    dependencies=[Depends(verify_api_key), Depends(limiter.limit("10/minute"))]  # Rate limiting: 분당 10회 제한
+)
 async def send_email(
     request: Request,
     recipient_emails: str = Form(...),  # JSON string
@@ -153,12 +342,60 @@ async def send_email(
     subject: str = Form(...),
     body: str = Form(...),
     files: List[UploadFile] = File(default=[]),
-    db: Session = Depends(get_db)
+    send_at: Optional[str] = Form(None),  # 예약 발송 시각 (ISO 8601)
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     이메일 발송 API
     files 파라미터는 multipart/form-data에서 여러 파일을 받을 수 있습니다.
+    send_at이 있으면 로그를 scheduled 상태로 저장하고 해당 시각에 발송합니다.
+    Idempotency-Key 헤더가 있으면 같은 키의 재요청은 재발송 없이 최초 응답을 반환합니다.
     """
+    fields = dict(
+        recipient_emails=recipient_emails,
+        sender_email=sender_email,
+        smtp_host=smtp_host,
+        smtp_port=smtp_port,
+        smtp_username=smtp_username,
+        smtp_password=smtp_password,
+        use_ssl=use_ssl,
+        verify_ssl=verify_ssl,
+        cc_emails=cc_emails,
+        bcc_emails=bcc_emails,
+        subject=subject,
+        body=body,
+        send_at=send_at
+    )
+    # 같은 파일명/크기라도 내용이 다르면 다른 요청으로 판단 (키가 없으면 비교하지 않으므로 해시 생략)
+    request_hash = request_fingerprint(
+        files=await _upload_fingerprints(files, EmailService.MAX_TOTAL_SIZE)
+        if idempotency_key and isinstance(files, list) else [],
+        **fields
+    )
+    return await _run_idempotent(
+        "email_send", idempotency_key, request_hash,
+        lambda: _process_send_email(files=files, db=db, **fields)
+    )
+
+
+async def _process_send_email(
+    recipient_emails: str,
+    sender_email: str,
+    smtp_host: str,
+    smtp_port: int,
+    smtp_username: Optional[str],
+    smtp_password: Optional[str],
+    use_ssl: str,
+    verify_ssl: str,
+    cc_emails: Optional[str],
+    bcc_emails: Optional[str],
+    subject: str,
+    body: str,
+    files: List[UploadFile],
+    send_at: Optional[str],
+    db: AsyncSession
+):
     import json
     from email_validator import validate_email, EmailNotValidError
     
@@ -182,6 +419,12 @@ async def send_email(
         if len(recipient_list) == 0:
             raise HTTPException(status_code=400, detail="받는 사람 이메일을 최소 1개 이상 입력해주세요.")
         
+        # 예약 발송 시각 (이미 지난 시각이면 즉시 발송)
+        try:
+            scheduled_at = parse_send_at(send_at)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
         # 이메일 형식 검증
         def validate_email_list(emails: List[str], field_name: str = "이메일"):
             for email in emails:
@@ -242,20 +485,43 @@ async def send_email(
                         detail="허용되지 않은 파일 타입입니다."
                     )
                 
-                content = await file.read()
-                total_size += len(content)
-                
-                if total_size > 30 * 1024 * 1024:  # 30MB
-                    raise HTTPException(status_code=400, detail="첨부파일 총 크기는 30MB를 넘을 수 없습니다.")
+                # 30MB 제한을 읽는 도중에 적용, 원본 bytes 그대로 전달 (base64 인코딩은 MIME 생성 시 1회)
+                data = await _read_upload_limited(file, EmailService.MAX_TOTAL_SIZE - total_size)
+                total_size += len(data)
                 
                 attachments.append({
                     'filename': file.filename,
-                    'content': base64.b64encode(content).decode('utf-8')
+                    'data': data
                 })
         
+        send_kwargs = dict(
+            recipient_emails=recipient_list,
+            sender_email=sender_email,
+            smtp_host=smtp_host,
+            smtp_port=smtp_port,
+            smtp_username=smtp_username,
+            smtp_password=smtp_password,
+            use_ssl=use_ssl_bool,
+            subject=subject,
+            body=body,
+            cc_emails=cc_list,
+            bcc_emails=bcc_list,
+            attachments=attachments if attachments else None,
+            verify_ssl=verify_ssl_bool
+        )
+        
         # Create email log
+        use_outbox = outbox.running and not scheduled_at
+        if scheduled_at:
+            status = "scheduled"
+        else:
+            status = "queued" if use_outbox or settings.email_queue_enabled else "pending"
+        # 예약/outbox/큐 모드는 스케줄러·워커가 로그를 읽으므로 발송 전에 저장,
+        # 동기 발송은 pending 행을 따로 저장하지 않고 결과가 반영된 행을 write-behind로 한 번만 기록
+        write_behind = log_writer.running and status == "pending"
         try:
             email_log = EmailLog(
+                id=new_log_id(),
                 sender_email=sender_email,
                 recipient_emails=recipient_list,
                 cc_emails=cc_list,
@@ -265,53 +531,99 @@ async def send_email(
                 smtp_host=smtp_host,
                 smtp_port=smtp_port,
                 use_ssl="true" if use_ssl_bool else "false",
-                status="pending",
+                status=status,
                 attachment_count=len(attachments),
-                total_attachment_size=total_size
+                total_attachment_size=total_size,
+                send_at=scheduled_at,
+                created_at=datetime.utcnow()
             )
-            db.add(email_log)
-            db.commit()
-            db.refresh(email_log)
-            logger.info(f"Email log created with ID: {email_log.id}")
+            if not write_behind:
+                db.add(email_log)
+                if scheduled_at:
+                    # 발송 정보는 로그와 같은 트랜잭션으로 저장 (스케줄러가 payload 없는 로그를 보지 않도록)
+                    db.add(JobPayload(log_id=email_log.id, kind=KIND_EMAIL, payload=encode_payload(send_kwargs)))
+                elif use_outbox:
+                    # outbox 작업도 로그와 같은 트랜잭션으로 저장 (로그만 남고 작업이 사라지지 않도록)
+                    add_outbox_job(db, KIND_EMAIL, email_log.id, encode_payload(send_kwargs))
+                await db.commit()
+                logger.info(f"Email log created with ID: {email_log.id}")
         except Exception as e:
             logger.error(f"Failed to create email log: {str(e)}")
-            db.rollback()
+            await db.rollback()
             raise HTTPException(
                 status_code=500,
                 detail=f"로그 저장 실패: {str(e)}"
             )
         
-        # Send email
-        success, error_message = await EmailService.send_email(
-            recipient_emails=recipient_list,
-            sender_email=sender_email,
-            smtp_host=smtp_host,
-            smtp_port=smtp_port,
-            smtp_username=smtp_username,
-            smtp_password=smtp_password,
-            use_ssl=use_ssl_bool,
-            subject=subject,
-            body=body,
-            cc_emails=cc_list,
-            bcc_emails=bcc_list,
-            attachments=attachments if attachments else None,
-            verify_ssl=verify_ssl_bool
-        )
+        if scheduled_at:
+            send_scheduler.add(KIND_EMAIL, email_log.id, scheduled_at)
+            return JSONResponse(
+                status_code=202,
+                content=EmailSendResponse(
+                    log_id=email_log.id,
+                    status=email_log.status,
+                    message=f"이메일 예약 발송이 등록되었습니다. (send_at: {scheduled_at.isoformat()}Z)",
+                    created_at=email_log.created_at
+                ).model_dump(mode="json")
+            )
+        
+        # outbox/큐 모드: 발송은 워커가 처리하고 바로 202 반환 (최종 상태는 로그 조회 API로 확인)
+        if use_outbox or settings.email_queue_enabled:
+            if use_outbox:
+                outbox.notify()
+            else:
+                try:
+                    email_queue.enqueue(EmailJob(log_id=email_log.id, send_kwargs=send_kwargs))
+                except EmailQueueFullError as e:
+                    email_log.status = "failed"
+                    email_log.error_message = str(e)
+                    await db.commit()
+                    raise HTTPException(status_code=503, detail=str(e))
+            
+            return JSONResponse(
+                status_code=202,
+                content=EmailSendResponse(
+                    log_id=email_log.id,
+                    status=email_log.status,
+                    message="이메일 발송 요청이 접수되었습니다.",
+                    created_at=email_log.created_at
+                ).model_dump(mode="json")
+            )
+        
+        # Send email (일시적 오류는 재시도 예약)
+        attempt = await attempt_email(send_kwargs)
+        error_message = attempt.error_message
         
         # Update log
-        if success:
-            email_log.status = "success"
-            email_log.sent_at = datetime.utcnow()
+        if attempt.retry_delay is not None:
+            if write_behind:
+                # 재시도 예약은 저장된 로그를 갱신하므로 먼저 기록
+                await log_writer.upsert(email_log, durable=True)
+            await schedule_retry(
+                db, KIND_EMAIL, email_log.id, attempt.retry_delay,
+                {"error_message": error_message, "attempts": attempt.attempts},
+                send_kwargs
+            )
+            message = f"이메일 발송이 일시적으로 실패하여 재시도 예정입니다: {error_message}"
         else:
-            email_log.status = "failed"
-            email_log.error_message = error_message
-        
-        db.commit()
+            if attempt.success:
+                email_log.status = "success"
+                email_log.sent_at = datetime.utcnow()
+                message = "이메일이 성공적으로 발송되었습니다."
+            else:
+                email_log.status = "failed"
+                email_log.error_message = error_message
+                message = f"이메일 발송 실패: {error_message}"
+            email_log.attempts = attempt.attempts
+            if write_behind:
+                await log_writer.upsert(email_log)
+            else:
+                await db.commit()
         
         return EmailSendResponse(
             log_id=email_log.id,
-            status=email_log.status,
-            message="이메일이 성공적으로 발송되었습니다." if success else f"이메일 발송 실패: {error_message}",
+            status=attempt.status,
+            message=message,
             created_at=email_log.created_at
         )
         
@@ -329,19 +641,169 @@ async def send_email(
         )
 
 
-@app.get("/api/v1/email/logs", response_model=List[EmailLogResponse])
+@app.post(
+    "/api/v1/email/batch",
+    response_model=EmailBatchResponse,
+    status_code=202,
+    dependencies=[Depends(verify_api_key), Depends(limiter.limit("10/minute"))]  # Rate limiting: 분당 10회 제한
+)
+async def send_email_batch(
+    request: Request,
+    payload: EmailBatchRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    대량 이메일 발송 API
+    subject/body는 string.Template 형식($name, ${name})이며 수신자별 variables로 치환되어 각각 별도 메시지로 발송된다.
+    수신자별 EmailLog를 queued 상태로 생성하고 202를 반환하며, 진행 상황은 batch_id로 조회한다.
+    """
+    if len(payload.recipients) > settings.email_batch_max_recipients:
+        raise HTTPException(
+            status_code=400,
+            detail=f"배치당 최대 {settings.email_batch_max_recipients}명까지 발송 가능합니다."
+        )
+
+    job = EmailBatchJob(
+        batch_id=new_log_id(),
+        sender_email=payload.sender_email,
+        smtp_host=payload.smtp_host,
+        smtp_port=payload.smtp_port,
+        smtp_username=payload.smtp_username,
+        smtp_password=payload.smtp_password,
+        use_ssl=payload.use_ssl,
+        verify_ssl=payload.verify_ssl,
+        subject_template=payload.subject,
+        body_template=payload.body,
+        items=[
+            BatchItem(log_id=new_log_id(), email=recipient.email, variables=recipient.variables)
+            for recipient in payload.recipients
+        ]
+    )
+    try:
+        validate_templates({"subject": job.subject_template, "body": job.body_template}, job.items)
+    except BatchTemplateError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        created_at = await create_batch_logs(db, job, settings.email_batch_flush_size)
+    except Exception as e:
+        logger.error(f"Failed to create batch email logs: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="로그 저장 실패")
+
+    email_batch_runner.submit(job)
+    return EmailBatchResponse(
+        batch_id=job.batch_id,
+        status="queued",
+        message="대량 이메일 발송 요청이 접수되었습니다.",
+        total=len(job.items),
+        created_at=created_at
+    )
+
+
+@app.get(
+    "/api/v1/email/batch/{batch_id}",
+    response_model=EmailBatchStatusResponse,
+    dependencies=[Depends(verify_api_key)]
+)
+async def get_email_batch(
+    batch_id: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    배치 발송 진행 상황 (상태별 건수). 개별 로그는 /api/v1/email/logs?batch_id= 로 조회
+    """
+    result = await db.execute(
+        select(EmailLog.status, func.count())
+        .where(EmailLog.batch_id == batch_id)
+        .group_by(EmailLog.status)
+    )
+    status_counts = {status: count for status, count in result.all()}
+    if not status_counts:
+        raise HTTPException(status_code=404, detail="배치를 찾을 수 없습니다.")
+    return EmailBatchStatusResponse(
+        batch_id=batch_id,
+        total=sum(status_counts.values()),
+        status_counts=status_counts
+    )
+
+
+async def _get_log(db: AsyncSession, model, log_id: str):
+    """로그 기본 키 조회 (UUID 형식이 아닌 ID는 조회하지 않고 None → 404)"""
+    if not is_log_id(log_id):
+        return None
+    return await db.get(model, log_id)
+
+
+async def _query_log_page(
+    db: AsyncSession,
+    model,
+    response: Response,
+    fields: str,
+    cursor: Optional[str],
+    skip: int,
+    limit: int,
+    filters: Optional[LogFilters] = None
+):
+    """
+    로그 목록 한 페이지 조회.
+    summary 모드는 목록용 컬럼만 SELECT 하고 Pydantic 검증 없이 바로 JSON으로 직렬화한다.
+    """
+    summary = fields == LOG_FIELDS_SUMMARY
+    stmt = summary_select(model) if summary else select(model)
+    stmt = apply_log_filters(stmt, model, filters)
+    # 보관 기간이 지난 로그는 조회하지 않음 (월 파티션 테이블은 만료 대상 파티션을 읽지 않음)
+    cutoff = log_retention.cutoff(model)
+    if cutoff is not None:
+        stmt = stmt.where(model.created_at >= cutoff)
+    result = await db.execute(apply_keyset_pagination(stmt, model, cursor, limit, skip))
+    logs, next_cursor = split_page(result.all() if summary else result.scalars().all(), limit)
+    logger.info(f"Retrieved {len(logs)} {model.__tablename__} from database (fields={fields})")
+
+    if summary:
+        response = JSONResponse(content=rows_to_json(logs))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response if summary else logs
+
+
+@app.get(
+    "/api/v1/email/logs",
+    response_model=List[EmailLogResponse],
+    responses={200: {"model": List[Union[EmailLogResponse, EmailLogSummaryResponse]]}}
+)
 async def get_email_logs(
-    skip: int = 0,
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, deprecated=True, description="하위 호환용. cursor 사용 권장"),
     limit: int = 100,
-    db: Session = Depends(get_db)
+    fields: str = Query(LOG_FIELDS_FULL, pattern=LOG_FIELDS_PATTERN, description="summary: 목록용 컬럼만 조회"),
+    status: Optional[str] = None,
+    sender_email: Optional[str] = None,
+    smtp_host: Optional[str] = None,
+    created_from: Optional[datetime] = Query(None, description="조회 시작 시각 (포함, ISO 8601)"),
+    created_to: Optional[datetime] = Query(None, description="조회 종료 시각 (미포함, ISO 8601)"),
+    has_attachments: Optional[bool] = None,
+    batch_id: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     이메일 발송 로그 조회
+    다음 페이지가 있으면 X-Next-Cursor 응답 헤더로 커서를 반환하며, 다음 요청의 cursor 파라미터로 전달한다.
+    status, sender_email, smtp_host, created_from/created_to, has_attachments, batch_id로 검색할 수 있다.
     """
+    filters = LogFilters(
+        status=status,
+        sender_email=sender_email,
+        smtp_host=smtp_host,
+        created_from=created_from,
+        created_to=created_to,
+        has_attachments=has_attachments,
+        batch_id=batch_id
+    )
     try:
-        logs = db.query(EmailLog).order_by(EmailLog.created_at.desc()).offset(skip).limit(limit).all()
-        logger.info(f"Retrieved {len(logs)} email logs from database")
-        return logs
+        return await _query_log_page(db, EmailLog, response, fields, cursor, skip, limit, filters)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error retrieving email logs: {str(e)}")
         raise HTTPException(
@@ -353,19 +815,24 @@ async def get_email_logs(
 @app.get("/api/v1/email/logs/{log_id}", response_model=EmailLogResponse)
 async def get_email_log(
     log_id: str,  # MySQL에서는 UUID를 문자열로 저장하므로 str로 변경
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     특정 이메일 발송 로그 상세 조회
     """
-    log = db.query(EmailLog).filter(EmailLog.id == log_id).first()
+    # write-behind로 아직 기록되지 않은 동기 발송 결과도 조회
+    log = await _get_log(db, EmailLog, log_id) or log_writer.pending(EmailLog, log_id)
     if not log:
         raise HTTPException(status_code=404, detail="로그를 찾을 수 없습니다.")
     return log
 
 
-@app.post("/api/v1/push/send", response_model=PushSendResponse, dependencies=[Depends(verify_api_key)])
-@limiter.limit("10/minute")
+@app.post(
+    "/api/v1/push/send",
+    response_model=PushSendResponse,
+    responses={202: {"model": PushSendResponse, "description": "send_at 예약 발송 등록"}},
+    dependencies=[Depends(verify_api_key), Depends(limiter.limit("10/minute"))]  # Rate limiting: 분당 10회 제한
+)
 async def send_push(
     request: Request,
     firebase_project_id: str = Form(...),  # Firebase 프로젝트 ID
@@ -373,13 +840,40 @@ async def send_push(
     title: str = Form(...),
     body: str = Form(...),
     data: Optional[str] = Form(None),  # JSON 객체 문자열
-    db: Session = Depends(get_db)
+    send_at: Optional[str] = Form(None),  # 예약 발송 시각 (ISO 8601)
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     FCM 푸시 알림 발송 API
     device_tokens: JSON 배열 문자열 (예: ["token1", "token2"])
     data: JSON 객체 문자열 (선택, 예: {"key": "value"})
+    send_at: 예약 발송 시각 (선택, 예: 2026-01-01T09:00:00+09:00)
+    Idempotency-Key 헤더가 있으면 같은 키의 재요청은 재발송 없이 최초 응답을 반환합니다.
     """
+    fields = dict(
+        firebase_project_id=firebase_project_id,
+        device_tokens=device_tokens,
+        title=title,
+        body=body,
+        data=data,
+        send_at=send_at
+    )
+    return await _run_idempotent(
+        "push_send", idempotency_key, request_fingerprint(**fields),
+        lambda: _process_send_push(db=db, **fields)
+    )
+
+
+async def _process_send_push(
+    firebase_project_id: str,
+    device_tokens: str,
+    title: str,
+    body: str,
+    data: Optional[str],
+    send_at: Optional[str],
+    db: AsyncSession
+):
     import json
 
     try:
@@ -391,6 +885,10 @@ async def send_push(
 
         if not isinstance(token_list, list):
             raise HTTPException(status_code=400, detail="device_tokens는 JSON 배열이어야 합니다.")
+        if not all(isinstance(token, str) for token in token_list):
+            raise HTTPException(status_code=400, detail="device_tokens는 문자열 JSON 배열이어야 합니다.")
+        # 토큰별 결과는 (로그, 토큰)당 한 행이므로 중복 토큰은 한 번만 발송
+        token_list = dedupe_tokens(token_list)
 
         # 토큰 수 검증
         if len(token_list) == 0:
@@ -408,74 +906,105 @@ async def send_push(
             if not isinstance(data_dict, dict):
                 raise HTTPException(status_code=400, detail="data는 JSON 객체여야 합니다.")
 
-        # PushLog DB 기록 (pending 상태로 저장)
+        try:
+            scheduled_at = parse_send_at(send_at)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        # PushLog DB 기록 (pending 상태로 저장, 예약 발송은 scheduled, outbox 모드는 queued)
+        use_outbox = outbox.running and not scheduled_at
+        if scheduled_at:
+            status = "scheduled"
+        else:
+            status = "queued" if use_outbox else "pending"
+        # 동기 발송은 결과가 반영된 행을 write-behind로 한 번만 기록 (이메일 발송과 동일)
+        write_behind = log_writer.running and status == "pending"
         try:
             push_log = PushLog(
+                id=new_log_id(),
                 firebase_project_id=firebase_project_id,
                 title=title,
                 body=body,
                 data=data_dict,
-                device_tokens=token_list,
-                status="pending"
+                token_count=len(token_list),
+                status=status,
+                send_at=scheduled_at,
+                created_at=datetime.utcnow()
             )
-            db.add(push_log)
-            db.commit()
-            db.refresh(push_log)
-            logger.info(f"Push log created with ID: {push_log.id}")
+            if not write_behind:
+                db.add(push_log)
+                await add_pending_deliveries(db, push_log.id, token_list)
+                if use_outbox:
+                    add_outbox_job(db, KIND_PUSH, push_log.id)
+                await db.commit()
+                logger.info(f"Push log created with ID: {push_log.id}")
         except Exception as e:
             logger.error(f"Failed to create push log: {str(e)}")
-            db.rollback()
+            await db.rollback()
             raise HTTPException(status_code=500, detail=f"로그 저장 실패: {str(e)}")
 
-        # 푸시 발송
-        try:
-            success_count, failure_count, failed_tokens = PushService.send_push(
-                firebase_project_id=firebase_project_id,
-                device_tokens=token_list,
-                title=title,
-                body=body,
-                data=data_dict
+        if scheduled_at:
+            send_scheduler.add(KIND_PUSH, push_log.id, scheduled_at)
+            return JSONResponse(
+                status_code=202,
+                content=PushSendResponse(
+                    logId=push_log.id,
+                    status=push_log.status,
+                    message=f"푸시 알림 예약 발송이 등록되었습니다. (send_at: {scheduled_at.isoformat()}Z)",
+                    successCount=0,
+                    failureCount=0,
+                    createdAt=push_log.created_at
+                ).model_dump(mode="json")
             )
-            # 상태 결정
-            if failure_count == 0:
-                push_log.status = "success"
-            elif success_count == 0:
-                push_log.status = "failed"
-            else:
-                push_log.status = "partial"
-
-            push_log.success_count = success_count
-            push_log.failure_count = failure_count
-            push_log.failed_tokens = failed_tokens if failed_tokens else None
-            push_log.sent_at = datetime.utcnow()
-        except RuntimeError as e:
-            # Firebase 미초기화 등 런타임 에러
-            error_msg = str(e)
-            logger.error(f"Push 발송 실패 (RuntimeError): {error_msg}")
-            push_log.status = "failed"
-            push_log.error_message = error_msg
-            success_count = 0
-            failure_count = len(token_list)
-        except Exception as e:
-            error_msg = str(e)
-            logger.error(f"Push 발송 실패: {error_msg}")
-            push_log.status = "failed"
-            push_log.error_message = error_msg
-            success_count = 0
-            failure_count = len(token_list)
 
-        db.commit()
+        if use_outbox:
+            outbox.notify()
+            return JSONResponse(
+                status_code=202,
+                content=PushSendResponse(
+                    logId=push_log.id,
+                    status=push_log.status,
+                    message="푸시 알림 발송 요청이 접수되었습니다.",
+                    successCount=0,
+                    failureCount=0,
+                    createdAt=push_log.created_at
+                ).model_dump(mode="json")
+            )
+
+        # 푸시 발송 (일시적 오류로 실패한 토큰은 재시도 예약)
+        attempt = await attempt_push(firebase_project_id, token_list, title, body, data_dict)
+        if write_behind:
+            # pending 행 없이 결과가 반영된 토큰별 행을 로그와 함께 기록
+            deliveries = [(PushDelivery, result_rows(push_log.id, attempt.results, token_list, push_log.created_at))]
+        else:
+            await save_delivery_rows(db, result_rows(push_log.id, attempt.results))
+        if attempt.retry_delay is not None:
+            if write_behind:
+                await log_writer.upsert(push_log, durable=True, children=deliveries)
+            await schedule_retry(db, KIND_PUSH, push_log.id, attempt.retry_delay, attempt.log_values())
+            message = (
+                f"푸시 알림 일부가 일시적으로 실패하여 재시도 예정입니다. "
+                f"(성공: {attempt.success_count}, 실패: {attempt.failure_count}, 재시도: {len(attempt.retry_tokens)})"
+            )
+        else:
+            for key, value in attempt.log_values().items():
+                setattr(push_log, key, value)
+            if write_behind:
+                await log_writer.upsert(push_log, children=deliveries)
+            else:
+                await db.commit()
+            message = (
+                f"푸시 알림이 성공적으로 발송되었습니다. (성공: {attempt.success_count}, 실패: {attempt.failure_count})"
+                if attempt.status != "failed"
+                else f"푸시 알림 발송 실패: {attempt.error_message}"
+            )
 
         return PushSendResponse(
             logId=push_log.id,
-            status=push_log.status,
-            message=(
-                f"푸시 알림이 성공적으로 발송되었습니다. (성공: {success_count}, 실패: {failure_count})"
-                if push_log.status != "failed"
-                else f"푸시 알림 발송 실패: {push_log.error_message}"
-            ),
-            successCount=success_count,
-            failureCount=failure_count,
+            status=attempt.status,
+            message=message,
+            successCount=attempt.success_count,
+            failureCount=attempt.failure_count,
             createdAt=push_log.created_at
         )
 
@@ -486,19 +1015,197 @@ async def send_push(
         raise HTTPException(status_code=500, detail="서버 오류가 발생했습니다. 관리자에게 문의하세요.")
 
 
-@app.get("/api/v1/push/logs", response_model=List[PushLogResponse])
+@app.post(
+    "/api/v1/push/fanout",
+    response_model=PushFanoutResponse,
+    status_code=202,
+    responses={200: {"content": {"text/event-stream": {}}, "description": "stream=true: 진행 상황 SSE"}},
+    dependencies=[Depends(verify_api_key), Depends(limiter.limit("10/minute"))]  # Rate limiting: 분당 10회 제한
+)
+async def send_push_fanout(
+    request: Request,
+    firebase_project_id: str = Form(...),
+    title: str = Form(...),
+    body: str = Form(...),
+    device_tokens: Optional[str] = Form(None),  # JSON 배열 문자열
+    data: Optional[str] = Form(None),  # JSON 객체 문자열
+    stream: bool = Form(False),  # true면 진행 상황을 SSE로 응답
+    file: Optional[UploadFile] = File(None),  # 토큰 파일 (.ndjson / .jsonl / .csv)
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    대량 푸시 fan-out 발송 API
+    토큰 수 제한(500개) 없이 device_tokens 또는 토큰 파일을 받아 500개 단위 chunk로 나누어 동시에 발송한다.
+    부모 로그 ID를 즉시 반환(202)하며, chunk별 결과는 /api/v1/push/logs?parent_log_id= 로 조회한다.
+    """
+    import json
+
+    token_list = []
+    if device_tokens:
+        try:
+            token_list = json.loads(device_tokens)
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="device_tokens가 유효한 JSON 배열이 아닙니다.")
+        if not isinstance(token_list, list) or not all(isinstance(token, str) for token in token_list):
+            raise HTTPException(status_code=400, detail="device_tokens는 문자열 JSON 배열이어야 합니다.")
+    if file is not None and file.filename:
+        content = await _read_upload_limited(
+            file,
+            settings.push_fanout_max_file_mb * 1024 * 1024,
+            detail=f"토큰 파일은 {settings.push_fanout_max_file_mb}MB를 넘을 수 없습니다."
+        )
+        try:
+            token_list = token_list + parse_token_file(file.filename, content)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise HTTPException(status_code=400, detail=f"토큰 파일 처리 실패: {str(e)}")
+
+    token_list = dedupe_tokens(token_list)
+    if not token_list:
+        raise HTTPException(status_code=400, detail="device_tokens 또는 토큰 파일로 최소 1개 이상의 토큰을 입력해주세요.")
+    if len(token_list) > settings.push_fanout_max_tokens:
+        raise HTTPException(
+            status_code=400,
+            detail=f"fan-out 발송은 최대 {settings.push_fanout_max_tokens}개 토큰까지 허용됩니다."
+        )
+
+    data_dict = None
+    if data:
+        try:
+            data_dict = json.loads(data)
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="data가 유효한 JSON 객체가 아닙니다.")
+        if not isinstance(data_dict, dict):
+            raise HTTPException(status_code=400, detail="data는 JSON 객체여야 합니다.")
+
+    job = PushFanoutJob.build(firebase_project_id, token_list, title, body, data_dict)
+    try:
+        created_at = await create_fanout_logs(db, job)
+    except Exception as e:
+        logger.error(f"Failed to create fan-out push logs: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="로그 저장 실패")
+
+    if stream:
+        # 작업 시작 전에 구독해야 started 이벤트를 놓치지 않음
+        queue = push_fanout_runner.subscribe(job.log_id)
+        push_fanout_runner.submit(job)
+        return StreamingResponse(push_fanout_runner.iter_events(job.log_id, queue), media_type="text/event-stream")
+
+    push_fanout_runner.submit(job)
+    return PushFanoutResponse(
+        logId=job.log_id,
+        status="pending",
+        message="푸시 fan-out 발송 요청이 접수되었습니다.",
+        totalTokens=job.total_tokens,
+        totalChunks=len(job.chunks),
+        createdAt=created_at
+    )
+
+
+@app.get("/api/v1/push/fanout/{log_id}/events", dependencies=[Depends(verify_api_key)])
+async def get_push_fanout_events(
+    log_id: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    fan-out 진행 상황 SSE 구독. 이미 끝난 작업이면 최종 결과(done) 이벤트 하나만 전달한다.
+    """
+    if push_fanout_runner.is_running(log_id):
+        queue = push_fanout_runner.subscribe(log_id)
+        return StreamingResponse(push_fanout_runner.iter_events(log_id, queue), media_type="text/event-stream")
+
+    log = await _get_log(db, PushLog, log_id)
+    if not log or log.parent_log_id is not None:
+        raise HTTPException(status_code=404, detail="로그를 찾을 수 없습니다.")
+
+    async def final_event():
+        yield format_sse("done", {
+            "log_id": log.id,
+            "status": log.status,
+            "success_count": log.success_count,
+            "failure_count": log.failure_count,
+        })
+
+    return StreamingResponse(final_event(), media_type="text/event-stream")
+
+
+@app.get(
+    "/api/v1/push/tokens/dead",
+    response_model=List[DeadTokenResponse],
+    dependencies=[Depends(verify_api_key)]
+)
+async def get_dead_tokens(
+    response: Response,
+    firebase_project_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    FCM이 영구 실패(UNREGISTERED, SENDER_ID_MISMATCH, INVALID_ARGUMENT)로 응답한 토큰 목록.
+    클라이언트 앱의 토큰 정리용이며, 다음 페이지는 X-Next-Cursor 헤더로 반환한다.
+    """
+    stmt = select(PushTokenHealth).where(PushTokenHealth.firebase_project_id == firebase_project_id)
+    try:
+        result = await db.execute(apply_keyset_pagination(stmt, PushTokenHealth, cursor, limit))
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    tokens, next_cursor = split_page(result.scalars().all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return tokens
+
+
+@app.get("/api/v1/push/tokens/dead/export", dependencies=[Depends(verify_api_key)])
+async def export_dead_tokens_file(
+    firebase_project_id: str,
+    format: str = Query("ndjson", pattern=f"^({'|'.join(EXPORT_FORMATS)})$"),
+):
+    """
+    dead 토큰 전체를 NDJSON 또는 CSV 파일로 스트리밍 다운로드
+    """
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_dead_tokens(firebase_project_id, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="dead-tokens-{firebase_project_id}.{format}"'}
+    )
+
+
+@app.get(
+    "/api/v1/push/logs",
+    response_model=List[PushLogResponse],
+    responses={200: {"model": List[Union[PushLogResponse, PushLogSummaryResponse]]}}
+)
 async def get_push_logs(
-    skip: int = 0,
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, deprecated=True, description="하위 호환용. cursor 사용 권장"),
     limit: int = 100,
-    db: Session = Depends(get_db)
+    fields: str = Query(LOG_FIELDS_FULL, pattern=LOG_FIELDS_PATTERN, description="summary: 목록용 컬럼만 조회"),
+    status: Optional[str] = None,
+    firebase_project_id: Optional[str] = None,
+    created_from: Optional[datetime] = Query(None, description="조회 시작 시각 (포함, ISO 8601)"),
+    created_to: Optional[datetime] = Query(None, description="조회 종료 시각 (미포함, ISO 8601)"),
+    parent_log_id: Optional[str] = Query(None, description="fan-out 부모 로그 ID (chunk 로그 조회)"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     푸시 발송 로그 목록 조회
+    다음 페이지가 있으면 X-Next-Cursor 응답 헤더로 커서를 반환한다.
+    status, firebase_project_id, created_from/created_to, parent_log_id로 검색할 수 있다.
     """
+    filters = LogFilters(
+        status=status,
+        firebase_project_id=firebase_project_id,
+        created_from=created_from,
+        created_to=created_to,
+        parent_log_id=parent_log_id
+    )
     try:
-        logs = db.query(PushLog).order_by(PushLog.created_at.desc()).offset(skip).limit(limit).all()
-        logger.info(f"Retrieved {len(logs)} push logs from database")
-        return logs
+        return await _query_log_page(db, PushLog, response, fields, cursor, skip, limit, filters)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error retrieving push logs: {str(e)}")
         raise HTTPException(status_code=500, detail="로그 조회 중 오류가 발생했습니다.")
@@ -507,17 +1214,110 @@ async def get_push_logs(
 @app.get("/api/v1/push/logs/{log_id}", response_model=PushLogResponse)
 async def get_push_log(
     log_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     푸시 발송 로그 상세 조회
     """
-    log = db.query(PushLog).filter(PushLog.id == log_id).first()
+    log = await _get_log(db, PushLog, log_id) or log_writer.pending(PushLog, log_id)
     if not log:
         raise HTTPException(status_code=404, detail="로그를 찾을 수 없습니다.")
     return log
 
 
+@app.get("/api/v1/push/logs/{log_id}/deliveries", response_model=List[PushDeliveryResponse])
+async def get_push_log_deliveries(
+    log_id: str,
+    response: Response,
+    status: Optional[str] = Query(None, description="pending, retrying, success, failed"),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    푸시 로그의 토큰별 발송 결과 (요청한 토큰 순서)
+    다음 페이지가 있으면 X-Next-Cursor 응답 헤더로 커서를 반환한다.
+    """
+    try:
+        deliveries, next_cursor = await list_deliveries(db, log_id, status, cursor, limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return deliveries
+
+
+@app.get(
+    "/api/v1/push/deliveries",
+    response_model=List[PushDeliveryResponse],
+    dependencies=[Depends(verify_api_key)]
+)
+async def get_token_deliveries(
+    response: Response,
+    token: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    토큰이 받은 푸시 발송 이력 (최신순)
+    다음 페이지가 있으면 X-Next-Cursor 응답 헤더로 커서를 반환한다.
+    """
+    try:
+        deliveries, next_cursor = await token_history(db, token, cursor, limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return deliveries
+
+
+@app.get("/api/v1/metrics", dependencies=[Depends(verify_api_key)])
+async def get_metrics():
+    """
+    발송 파이프라인 상태 지표 (큐 깊이, 워커 사용률, SMTP 풀, 푸시 스레드 풀, DB 커넥션 풀)
+    """
+    return {
+        "email_queue": email_queue.stats(),
+        "email_batch": email_batch_runner.stats(),
+        "smtp_pools": smtp_pool_manager.stats(),
+        "push_executor": PushService.executor_stats(),
+        "push_fanout": push_fanout_runner.stats(),
+        "push_token_registry": token_registry.stats(),
+        "idempotency": idempotency_store.stats(),
+        "scheduler": send_scheduler.stats(),
+        "outbox": outbox.stats(),
+        "log_writer": log_writer.stats(),
+        "log_retention": log_retention.stats(),
+        "retry": retry_policy.stats(),
+        "rate_limit": limiter.stats(),
+        "db_pool": get_pool_stats(),
+    }
+
+
+@app.get("/api/v1/admin/outbound", dependencies=[Depends(verify_api_key)])
+async def get_outbound_state():
+    """
+    목적지(smtp_host, firebase_project_id)별 현재 발송 속도 제한과 circuit breaker 상태
+    """
+    return outbound_limiter.stats()
+
+
+@app.post(
+    "/api/v1/admin/outbound/{kind}/{destination}/reset",
+    dependencies=[Depends(verify_api_key)]
+)
+async def reset_outbound_state(kind: str, destination: str):
+    """
+    목적지 상태 초기화 (breaker를 닫고 속도를 기본값으로 되돌림). 장애 복구를 확인한 뒤 사용한다.
+    """
+    if kind not in (KIND_SMTP, KIND_FCM):
+        raise HTTPException(status_code=400, detail=f"kind는 {KIND_SMTP} 또는 {KIND_FCM}이어야 합니다.")
+    if not outbound_limiter.reset(kind, destination):
+        raise HTTPException(status_code=404, detail="해당 목적지의 상태가 없습니다.")
+    return {"kind": kind, "destination": destination, "reset": True}
+
+
 @app.get("/api/health")
 async def health_check():
     """Health Check API - CommonWebDevGuide.md에 따라 /api/health 경로 사용"""
@@ -4,11 +4,26 @@ MCP Server for IG Notification System
 import asyncio
 from typing import Any, Dict
 from email_service import EmailService
+from smtp_pool import smtp_pool_manager
 from database import SessionLocal, EmailLog
+from log_queries import InvalidCursorError, apply_keyset_pagination, split_page
+from sqlalchemy import select
 from datetime import datetime
 import uuid
 
 
+# list_email_logs 응답에 필요한 컬럼
+MCP_EMAIL_LOG_LIST_COLUMNS = (
+    EmailLog.id,
+    EmailLog.sender_email,
+    EmailLog.recipient_emails,
+    EmailLog.subject,
+    EmailLog.status,
+    EmailLog.created_at,
+    EmailLog.sent_at,
+)
+
+
 class MCPServer:
     def __init__(self):
         self.email_service = EmailService()
@@ -206,12 +221,25 @@ class MCPServer:
         List email logs
         """
         try:
-            skip = params.get("skip", 0)
+            skip = params.get("skip", 0)  # deprecated: cursor 사용 권장
             limit = params.get("limit", 100)
+            cursor = params.get("cursor")
             
             db = SessionLocal()
             try:
-                logs = db.query(EmailLog).order_by(EmailLog.created_at.desc()).offset(skip).limit(limit).all()
+                try:
+                    # 목록에 필요한 컬럼만 조회 (body 등 대용량 컬럼 제외, ORM 엔티티 생성 없음)
+                    stmt = apply_keyset_pagination(
+                        select(*MCP_EMAIL_LOG_LIST_COLUMNS), EmailLog, cursor, limit, skip
+                    )
+                except InvalidCursorError as e:
+                    return {
+                        "error": {
+                            "code": -32602,
+                            "message": str(e)
+                        }
+                    }
+                logs, next_cursor = split_page(db.execute(stmt).all(), limit)
                 
                 result = []
                 for log in logs:
@@ -228,7 +256,8 @@ class MCPServer:
                 return {
                     "result": {
                         "logs": result,
-                        "total": len(result)
+                        "total": len(result),
+                        "next_cursor": next_cursor
                     }
                 }
             finally:
@@ -302,6 +331,7 @@ async def main():
         pass
     finally:
         await runner.cleanup()
+        await smtp_pool_manager.close_all()
 
 
 if __name__ == "__main__":
@@ -52,10 +52,66 @@ class EmailLogResponse(BaseModel):
     total_attachment_size: int
     created_at: datetime
     sent_at: Optional[datetime]
+    batch_id: Optional[str] = None
+    send_at: Optional[datetime] = None
+    attempts: Optional[List[Dict[str, Any]]] = None
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class EmailLogSummaryResponse(BaseModel):
+    """로그 목록 summary 모드 (?fields=summary) 응답 항목"""
+    id: UUID
+    sender_email: str
+    subject: str
+    smtp_host: str
+    status: str
+    attachment_count: int
+    total_attachment_size: int
+    created_at: datetime
+    sent_at: Optional[datetime]
+
+
+class EmailBatchRecipient(BaseModel):
+    email: EmailStr
+    # 제목/본문 템플릿의 $name 또는 ${name} 치환 값
+    variables: Dict[str, str] = {}
+
+
+class EmailBatchRequest(BaseModel):
+    sender_email: EmailStr
+    smtp_host: str
+    smtp_port: int
+    smtp_username: Optional[str] = None
+    smtp_password: Optional[str] = None
+    use_ssl: bool = True
+    verify_ssl: bool = True
+    subject: str  # string.Template 형식 템플릿
+    body: str  # string.Template 형식 템플릿
+    recipients: List[EmailBatchRecipient]
+
+    @field_validator('recipients')
+    @classmethod
+    def validate_recipients(cls, v):
+        if len(v) == 0:
+            raise ValueError('받는 사람을 최소 1명 이상 입력해주세요.')
+        return v
+
+
+class EmailBatchResponse(BaseModel):
+    batch_id: UUID
+    status: str
+    message: str
+    total: int
+    created_at: datetime
+
+
+class EmailBatchStatusResponse(BaseModel):
+    batch_id: UUID
+    total: int
+    status_counts: Dict[str, int]  # 예: {"queued": 10, "success": 90}
+
+
 class PushSendResponse(BaseModel):
     logId: UUID
     status: str
@@ -65,20 +121,68 @@ class PushSendResponse(BaseModel):
     createdAt: datetime
 
 
+class PushFanoutResponse(BaseModel):
+    logId: UUID
+    status: str
+    message: str
+    totalTokens: int
+    totalChunks: int
+    createdAt: datetime
+
+
+class DeadTokenResponse(BaseModel):
+    """dead 토큰 레지스트리 항목"""
+    token: str
+    error_code: str
+    failure_count: int
+    created_at: datetime  # 최초 실패 시각
+    last_failed_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PushDeliveryResponse(BaseModel):
+    """푸시 토큰별 발송 결과"""
+    push_log_id: str
+    token: str
+    status: str  # pending, retrying, success, failed
+    message_id: Optional[str] = None
+    error_code: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class PushLogResponse(BaseModel):
     id: UUID
     firebase_project_id: str
     title: str
     body: str
     data: Optional[Dict[str, Any]]
-    device_tokens: List[str]
+    token_count: int  # 토큰별 결과는 /api/v1/push/logs/{log_id}/deliveries
     success_count: int
     failure_count: int
-    failed_tokens: Optional[List[str]]
     status: str
     error_message: Optional[str]
     created_at: datetime
     sent_at: Optional[datetime]
+    parent_log_id: Optional[str] = None
+    chunk_index: Optional[int] = None
+    send_at: Optional[datetime] = None
+    attempts: Optional[List[Dict[str, Any]]] = None
 
     model_config = ConfigDict(from_attributes=True)
 
+
+
+class PushLogSummaryResponse(BaseModel):
+    """로그 목록 summary 모드 (?fields=summary) 응답 항목"""
+    id: UUID
+    firebase_project_id: str
+    title: str
+    status: str
+    success_count: int
+    failure_count: int
+    created_at: datetime
+    sent_at: Optional[datetime]
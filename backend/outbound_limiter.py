@@ -0,0 +1,296 @@
+"""
+목적지별 발송 속도 제한 + circuit breaker
+
+request_limiter의 API 요청 제한(클라이언트 IP/API 키 기준)과 별개로, 실제 발송 대상(smtp_host, firebase_project_id)마다
+토큰 버킷과 circuit breaker를 둔다.
+- 토큰 버킷: 기본 속도(rate/초, burst)로 시작하여 421/451 응답이나 FCM QUOTA_EXCEEDED를 받으면 속도를 절반으로 줄이고,
+  성공할 때마다 조금씩 기본 속도까지 회복한다 (AIMD)
+- circuit breaker: 연속 failure_threshold회 목적지 장애(연결 실패, 4xx, FCM UNAVAILABLE 등)가 나면 reset_timeout 동안 열려서
+  발송을 시도하지 않고, 이후 1건만 시험 발송(half-open)하여 성공하면 닫는다
+- 토큰을 max_wait 안에 얻을 수 없거나 breaker가 열려 있으면 DestinationUnavailableError (retry_after: 다시 시도할 시점까지 초)
+  → 재시도 엔진이 그 시각 이후로 재시도를 미루고, 재시도할 수 없으면 바로 실패 처리한다
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+KIND_SMTP = "smtp"
+KIND_FCM = "fcm"
+
+# 발송 결과가 목적지 상태에 주는 신호
+OUTCOME_SUCCESS = "success"
+OUTCOME_THROTTLED = "throttled"  # 속도를 줄여야 함 (breaker 실패로도 집계)
+OUTCOME_FAILURE = "failure"  # 목적지 장애
+OUTCOME_NEUTRAL = "neutral"  # 수신자/요청 문제 (목적지 상태와 무관)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+CODE_CIRCUIT_OPEN = "CIRCUIT_OPEN"
+CODE_RATE_LIMITED = "RATE_LIMITED"
+
+
+class DestinationUnavailableError(Exception):
+    """목적지가 일시적으로 발송을 받을 수 없음 (circuit open 또는 속도 제한 대기 초과)"""
+
+    def __init__(self, message: str, code: str, retry_after: float):
+        super().__init__(message)
+        self.code = code
+        self.retry_after = retry_after
+
+
+class AdaptiveTokenBucket:
+    """
+    비동기 토큰 버킷. acquire는 토큰을 미리 예약(음수 허용)하고 부족한 만큼 기다리므로 대기 순서대로 발송된다.
+    - rate: 현재 초당 토큰 수 (base_rate ~ min_rate 사이에서 조정)
+    - burst: 버킷 최대 크기
+    """
+
+    def __init__(
+        self,
+        base_rate: float,
+        burst: float,
+        min_rate: float,
+        decrease_factor: float = 0.5,
+        increase_ratio: float = 0.02,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.base_rate = base_rate
+        self.rate = base_rate
+        self.burst = max(burst, 1.0)
+        self.min_rate = min(min_rate, base_rate)
+        self.decrease_factor = decrease_factor
+        self.increase_ratio = increase_ratio
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self._last_decrease = float("-inf")
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, cost: float, max_wait: float) -> float:
+        """cost만큼 토큰을 예약하고 기다려야 하는 시간(초)을 반환 (max_wait를 넘으면 예약하지 않고 RATE_LIMITED)"""
+        now = self._clock()
+        self._refill(now)
+        cost = min(cost, self.burst)
+        wait = max(0.0, (cost - self._tokens) / self.rate)
+        if wait > max_wait:
+            raise DestinationUnavailableError("발송 속도 제한으로 대기 시간이 너무 깁니다.", CODE_RATE_LIMITED, wait)
+        self._tokens -= cost
+        return wait
+
+    def on_throttled(self):
+        """속도 감소 (같은 순간 몰린 응답으로 한 번에 최저 속도까지 떨어지지 않도록 1초에 한 번만)"""
+        now = self._clock()
+        if now - self._last_decrease < 1.0:
+            return
+        self._refill(now)
+        self._last_decrease = now
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+
+    def on_success(self):
+        if self.rate < self.base_rate:
+            self._refill(self._clock())
+            self.rate = min(self.base_rate, self.rate + self.base_rate * self.increase_ratio)
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill(self._clock())
+        return {
+            "rate": round(self.rate, 3),
+            "base_rate": self.base_rate,
+            "burst": self.burst,
+            "tokens": round(self._tokens, 3),
+        }
+
+
+class CircuitBreaker:
+    """
+    - failure_threshold: breaker를 여는 연속 실패 수
+    - reset_timeout: 열린 뒤 half-open(시험 발송 1건)까지의 시간(초).
+      시험 발송이 reset_timeout 안에 결과를 기록하지 못하면(취소 등) 다음 요청으로 다시 시험한다
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self.open_count = 0
+
+    def check(self) -> Optional[float]:
+        """발송 가능하면 None, 아니면 다시 시도할 수 있을 때까지 남은 시간(초)"""
+        if self.state == STATE_OPEN:
+            remaining = self._opened_at + self.reset_timeout - self._clock()
+            if remaining > 0:
+                return remaining
+            self.state = STATE_HALF_OPEN
+            self._probing = False
+        if self.state == STATE_HALF_OPEN:
+            now = self._clock()
+            if self._probing and now - self._probe_started < self.reset_timeout:
+                # 시험 발송 결과를 기다리는 중
+                return min(self.reset_timeout, 1.0)
+            self._probing = True
+            self._probe_started = now
+        return None
+
+    def record(self, outcome: str):
+        if outcome == OUTCOME_SUCCESS:
+            self.state = STATE_CLOSED
+            self.consecutive_failures = 0
+        elif outcome in (OUTCOME_FAILURE, OUTCOME_THROTTLED):
+            self.consecutive_failures += 1
+            if self.state == STATE_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != STATE_OPEN:
+                    self.open_count += 1
+                self.state = STATE_OPEN
+                self._opened_at = self._clock()
+        elif self.state == STATE_HALF_OPEN:
+            # 목적지 상태를 판단할 수 없는 결과 → 다음 요청으로 다시 시험
+            self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        retry_after = self._opened_at + self.reset_timeout - self._clock() if self.state == STATE_OPEN else None
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "open_count": self.open_count,
+            "retry_after": round(max(retry_after, 0.0), 3) if retry_after is not None else None,
+        }
+
+
+class DestinationGuard:
+    """목적지 하나의 토큰 버킷 + circuit breaker"""
+
+    def __init__(self, kind: str, destination: str, bucket: AdaptiveTokenBucket, breaker: CircuitBreaker, max_wait: float):
+        self.kind = kind
+        self.destination = destination
+        self.bucket = bucket
+        self.breaker = breaker
+        self.max_wait = max_wait
+        self.outcomes: Dict[str, int] = {}
+        self.rejected = 0
+
+    async def acquire(self, cost: float = 1.0):
+        retry_after = self.breaker.check()
+        if retry_after is not None:
+            self.rejected += 1
+            raise DestinationUnavailableError(
+                f"{self.destination} 발송이 일시적으로 차단되었습니다. (circuit open)", CODE_CIRCUIT_OPEN, retry_after
+            )
+        try:
+            wait = self.bucket.reserve(cost, self.max_wait)
+        except DestinationUnavailableError:
+            self.rejected += 1
+            self.breaker.record(OUTCOME_NEUTRAL)
+            raise
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def record(self, outcome: str):
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        previous = self.breaker.state
+        self.breaker.record(outcome)
+        if outcome == OUTCOME_SUCCESS:
+            self.bucket.on_success()
+        elif outcome == OUTCOME_THROTTLED:
+            self.bucket.on_throttled()
+        if self.breaker.state != previous:
+            logger.warning(f"circuit breaker {previous} → {self.breaker.state}: {self.kind}:{self.destination}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "destination": self.destination,
+            "limiter": self.bucket.stats(),
+            "breaker": self.breaker.stats(),
+            "outcomes": dict(self.outcomes),
+            "rejected": self.rejected,
+        }
+
+
+class _NoopGuard:
+    """제한 비활성화 시 사용"""
+
+    async def acquire(self, cost: float = 1.0):
+        return None
+
+    def record(self, outcome: str):
+        return None
+
+
+_NOOP_GUARD = _NoopGuard()
+
+
+class OutboundLimiter:
+    """(kind, destination)별 DestinationGuard 레지스트리"""
+
+    def __init__(
+        self,
+        enabled: bool,
+        limits: Dict[str, Tuple[float, float]],
+        min_rate_ratio: float,
+        max_wait: float,
+        failure_threshold: int,
+        reset_timeout: float
+    ):
+        self.enabled = enabled
+        self.limits = limits  # kind → (초당 rate, burst)
+        self.min_rate_ratio = min_rate_ratio
+        self.max_wait = max_wait
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._guards: Dict[Tuple[str, str], DestinationGuard] = {}
+
+    def guard(self, kind: str, destination: str):
+        if not self.enabled:
+            return _NOOP_GUARD
+        key = (kind, destination)
+        guard = self._guards.get(key)
+        if guard is None:
+            rate, burst = self.limits[kind]
+            guard = DestinationGuard(
+                kind,
+                destination,
+                AdaptiveTokenBucket(rate, burst, min_rate=rate * self.min_rate_ratio),
+                CircuitBreaker(self.failure_threshold, self.reset_timeout),
+                self.max_wait
+            )
+            self._guards[key] = guard
+        return guard
+
+    def reset(self, kind: str, destination: str) -> bool:
+        """목적지 상태 초기화 (운영자가 장애 복구를 확인한 경우)"""
+        return self._guards.pop((kind, destination), None) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "limits": {kind: {"rate": rate, "burst": burst} for kind, (rate, burst) in self.limits.items()},
+            "destinations": [guard.stats() for guard in self._guards.values()],
+        }
+
+
+outbound_limiter = OutboundLimiter(
+    enabled=settings.outbound_limit_enabled,
+    limits={
+        KIND_SMTP: (settings.smtp_rate_per_host, settings.smtp_burst_per_host),
+        KIND_FCM: (settings.fcm_rate_per_project, settings.fcm_burst_per_project),
+    },
+    min_rate_ratio=settings.outbound_min_rate_ratio,
+    max_wait=settings.outbound_max_wait,
+    failure_threshold=settings.circuit_failure_threshold,
+    reset_timeout=settings.circuit_reset_timeout
+)
@@ -0,0 +1,270 @@
+"""
+발송 작업 outbox
+
+발송 API는 로그와 outbox_jobs 행을 같은 트랜잭션으로 저장하고 바로 202를 반환한다.
+모든 인스턴스(ECS task)의 디스패처가 outbox를 폴링하여 작업을 나눠 처리하므로, 처리량은 task 수에 비례하고
+발송 도중 task가 종료되어도 작업이 사라지지 않는다.
+- 선점: SELECT ... FOR UPDATE SKIP LOCKED로 다른 인스턴스가 잡고 있는 행을 건너뛰고, 조건부 UPDATE로 lease(lease_token,
+  leased_until)를 기록한다 (SKIP LOCKED가 없는 SQLite에서도 조건부 UPDATE로 한 워커만 선점)
+- 처리 중: lease의 1/3마다 leased_until을 연장(heartbeat)하고, 발송 직전 로그를 조건부 UPDATE(queued → sending)로 선점
+- 완료: 발송 결과를 로그에 기록한 뒤 자신의 lease_token인 행만 삭제
+- lease 만료: heartbeat가 끊겨 leased_until이 지난 작업은 처리하던 인스턴스가 중단된 것으로 보고 다른 워커가 다시 가져간다.
+  결과가 이미 기록된 작업은 다시 발송하지 않고, 발송을 시작한 뒤(sending) 중단된 작업은 중복 발송 대신 실패 처리하며
+  (run_outbox_job), max_claims번 선점되고도 완료되지 않은 작업은 실패 처리
+- 종료 시: 진행 중인 작업을 timeout 동안 기다리고, 끝나지 않은 작업은 lease를 풀어 다른 인스턴스가 바로 가져가게 한다
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal, EmailLog, OutboxJob, PushLog
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+POISON_ERROR_MESSAGE = "발송 작업이 반복해서 완료되지 않아 중단되었습니다."
+# outbox 워커가 발송을 시작한 로그 상태 (queued → sending → success/failed/retrying)
+STATUS_SENDING = "sending"
+_LOG_MODELS = {"email": EmailLog, "push": PushLog}
+
+
+def add_outbox_job(db: AsyncSession, kind: str, log_id: str, payload: Optional[bytes] = None) -> OutboxJob:
+    """호출하는 쪽의 트랜잭션에 outbox 작업 추가 (commit은 호출하는 쪽에서)"""
+    job = OutboxJob(id=str(uuid.uuid4()), kind=kind, log_id=log_id, payload=payload, available_at=datetime.utcnow())
+    db.add(job)
+    return job
+
+
+def _claimable(now: datetime):
+    return and_(
+        OutboxJob.available_at <= now,
+        or_(OutboxJob.leased_until.is_(None), OutboxJob.leased_until < now)
+    )
+
+
+class OutboxDispatcher:
+    """
+    - concurrency: 인스턴스당 동시에 처리하는 작업 수 (한 번에 선점하는 최대 건수)
+    - poll_interval: outbox가 비어 있을 때 폴링 주기(초)
+    - lease_seconds: 선점 유지 시간 (1건 발송 시간보다 충분히 길어야 함)
+    - max_claims: 이 횟수만큼 선점되고도 완료되지 않은 작업은 실패 처리
+    """
+
+    def __init__(self, enabled: bool, concurrency: int, poll_interval: float, lease_seconds: float, max_claims: int):
+        self.enabled = enabled
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_claims = max(1, max_claims)
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._inflight: Dict[asyncio.Task, OutboxJob] = {}
+        self._claimed = 0
+        self._completed = 0
+        self._failed = 0
+        self._lease_lost = 0
+        self._poisoned = 0
+        self._heartbeat_lost = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="outbox-dispatcher")
+        logger.info(f"outbox 디스패처 시작: concurrency={self.concurrency}")
+
+    def notify(self):
+        """이 인스턴스에서 방금 작업을 등록했으면 폴링 주기를 기다리지 않고 바로 선점"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def claim(self, limit: int, now: Optional[datetime] = None) -> List[OutboxJob]:
+        """최대 limit건 선점 (다른 워커가 잡고 있거나 lease가 살아 있는 작업은 제외)"""
+        now = now or datetime.utcnow()
+        token = str(uuid.uuid4())
+        async with AsyncSessionLocal() as db:
+            ids = (await db.execute(
+                select(OutboxJob.id)
+                .where(_claimable(now))
+                .order_by(OutboxJob.available_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )).scalars().all()
+            if not ids:
+                await db.rollback()
+                return []
+            await db.execute(
+                update(OutboxJob)
+                .where(OutboxJob.id.in_(ids), _claimable(now))
+                .values(lease_token=token, leased_until=now + self.lease, claim_count=OutboxJob.claim_count + 1)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            jobs = (await db.execute(select(OutboxJob).where(OutboxJob.lease_token == token))).scalars().all()
+        self._claimed += len(jobs)
+        return list(jobs)
+
+    async def complete(self, job: OutboxJob) -> bool:
+        """작업 삭제 (lease가 만료되어 다른 워커가 다시 선점했으면 False)"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                delete(OutboxJob).where(OutboxJob.id == job.id, OutboxJob.lease_token == job.lease_token)
+            )
+            await db.commit()
+        if result.rowcount != 1:
+            self._lease_lost += 1
+            logger.warning(f"outbox lease 만료 후 완료: {job.kind} {job.log_id}")
+            return False
+        return True
+
+    async def release(self, jobs: List[OutboxJob], delay: float = 0.0):
+        """lease를 풀어 다른 워커가 다시 선점할 수 있게 함"""
+        if not jobs:
+            return
+        async with AsyncSessionLocal() as db:
+            for job in jobs:
+                await db.execute(
+                    update(OutboxJob)
+                    .where(OutboxJob.id == job.id, OutboxJob.lease_token == job.lease_token)
+                    .values(
+                        lease_token=None,
+                        leased_until=None,
+                        available_at=datetime.utcnow() + timedelta(seconds=delay)
+                    )
+                )
+            await db.commit()
+
+    async def _poison(self, job: OutboxJob):
+        """반복해서 완료되지 않는 작업 (처리 중 프로세스가 계속 종료되는 등) → 로그 실패 처리 후 삭제"""
+        self._poisoned += 1
+        logger.error(f"outbox 작업 중단: {job.kind} {job.log_id} (claim_count={job.claim_count})")
+        model = _LOG_MODELS[job.kind]
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(model)
+                .where(model.id == job.log_id, model.status.in_(("queued", STATUS_SENDING)))
+                .values(status="failed", error_message=POISON_ERROR_MESSAGE)
+            )
+            await db.commit()
+        await self.complete(job)
+
+    async def _heartbeat(self, job: OutboxJob):
+        """처리 중인 작업의 lease를 lease의 1/3마다 연장 (다른 워커가 선점해 lease를 잃으면 중단)"""
+        interval = self.lease.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with AsyncSessionLocal() as db:
+                    result = await db.execute(
+                        update(OutboxJob)
+                        .where(OutboxJob.id == job.id, OutboxJob.lease_token == job.lease_token)
+                        .values(leased_until=datetime.utcnow() + self.lease)
+                    )
+                    await db.commit()
+            except Exception as e:
+                logger.warning(f"outbox lease 연장 실패 ({job.kind} {job.log_id}): {str(e)}")
+                continue
+            if result.rowcount != 1:
+                self._heartbeat_lost += 1
+                logger.warning(f"outbox lease를 잃음: {job.kind} {job.log_id}")
+                return
+
+    async def process(self, job: OutboxJob):
+        if job.claim_count > self.max_claims:
+            await self._poison(job)
+            return
+        # scheduler가 outbox 모듈을 import하므로 여기서 import (순환 import 방지)
+        from scheduler import run_outbox_job
+        heartbeat = asyncio.create_task(self._heartbeat(job), name=f"outbox-heartbeat-{job.log_id}")
+        try:
+            await run_outbox_job(job.kind, job.log_id, job.payload)
+        except Exception as e:
+            # 발송 결과를 기록하지 못함 → 잠시 후 다시 선점 (claim_count가 max_claims를 넘으면 중단)
+            self._failed += 1
+            logger.error(f"outbox 작업 처리 실패 ({job.kind} {job.log_id}): {str(e)}")
+            await self.release([job], delay=self.poll_interval * job.claim_count)
+            return
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+        if await self.complete(job):
+            self._completed += 1
+
+    def _spawn(self, job: OutboxJob):
+        task = asyncio.create_task(self.process(job), name=f"outbox-{job.kind}-{job.log_id}")
+        self._inflight[task] = job
+        task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task):
+        self._inflight.pop(task, None)
+        # 빈 슬롯이 생겼으므로 남은 작업 선점
+        self.notify()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            free = self.concurrency - len(self._inflight)
+            if free > 0:
+                try:
+                    for job in await self.claim(free):
+                        self._spawn(job)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"outbox 선점 실패: {str(e)}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def shutdown(self, timeout: float):
+        """선점을 멈추고 진행 중인 작업을 timeout 동안 기다림 (끝나지 않은 작업은 lease를 풀어 다른 인스턴스가 처리)"""
+        if not self.running:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+        inflight = dict(self._inflight)
+        if not inflight:
+            return
+        _, pending = await asyncio.wait(inflight.keys(), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        unfinished = [inflight[task] for task in pending]
+        if unfinished:
+            logger.warning(f"outbox 미완료 작업 {len(unfinished)}건 lease 해제")
+            await self.release(unfinished)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "concurrency": self.concurrency,
+            "inflight": len(self._inflight),
+            "claimed": self._claimed,
+            "completed": self._completed,
+            "failed": self._failed,
+            "lease_lost": self._lease_lost,
+            "poisoned": self._poisoned,
+            "heartbeat_lost": self._heartbeat_lost,
+        }
+
+
+outbox = OutboxDispatcher(
+    enabled=settings.outbox_enabled,
+    concurrency=settings.outbox_concurrency,
+    poll_interval=settings.outbox_poll_interval,
+    lease_seconds=settings.outbox_lease_seconds,
+    max_claims=settings.outbox_max_claims
+)
@@ -0,0 +1,141 @@
+"""
+푸시 토큰별 발송 결과 (push_deliveries)
+
+PushLog에 토큰 목록(device_tokens)과 실패 토큰(failed_tokens)을 JSON 배열로 저장하면 행이 커지고, 로그를 읽을 때마다
+최대 500개 토큰을 역직렬화하며, "토큰 X가 받은 발송"을 찾으려면 테이블 전체의 JSON을 스캔해야 했다.
+토큰별 결과를 (push_log_id, token_hash) 한 행으로 분리하고 로그에는 토큰 수/성공/실패 집계만 남긴다.
+- 발송 전 저장: 예약/outbox 발송은 pending 행을 로그와 같은 트랜잭션으로 multi-row INSERT (발송할 토큰을 여기서 읽음)
+- 결과 반영: 토큰별 status/message_id/error_code를 multi-row INSERT ... ON DUPLICATE KEY UPDATE로 기록
+- 조회: 로그 상세의 토큰별 결과 (seq 커서 페이지네이션), token_hash 인덱스로 토큰별 발송 이력
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import PushDelivery
+from log_queries import InvalidCursorError, decode_cursor, encode_cursor
+from log_writer import upsert_statement
+from token_registry import token_hash
+
+STATUS_PENDING = "pending"
+STATUS_RETRYING = "retrying"
+STATUS_SUCCESS = "success"
+STATUS_FAILED = "failed"
+
+# 한 문장으로 기록하는 최대 행 수
+INSERT_CHUNK_SIZE = 500
+
+# 토큰 → (status, message_id, error_code)
+DeliveryResults = Dict[str, Tuple[str, Optional[str], Optional[str]]]
+
+
+def pending_rows(push_log_id: str, tokens: Sequence[str], now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    now = now or datetime.utcnow()
+    return [
+        dict(
+            push_log_id=push_log_id, token_hash=token_hash(token), seq=seq, token=token,
+            status=STATUS_PENDING, message_id=None, error_code=None, created_at=now, updated_at=now
+        )
+        for seq, token in enumerate(tokens)
+    ]
+
+
+def result_rows(
+    push_log_id: str,
+    results: DeliveryResults,
+    tokens: Optional[Sequence[str]] = None,
+    now: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    """
+    발송 결과 행.
+    tokens(요청의 토큰 순서)를 주면 seq/created_at도 기록하고(pending 행 없이 결과만 저장하는 경우),
+    없으면 이미 저장된 행의 결과 컬럼만 갱신한다.
+    """
+    now = now or datetime.utcnow()
+    rows = []
+    if tokens is None:
+        for token, (status, message_id, error_code) in results.items():
+            rows.append(dict(
+                push_log_id=push_log_id, token_hash=token_hash(token), token=token,
+                status=status, message_id=message_id, error_code=error_code, updated_at=now
+            ))
+        return rows
+    for seq, token in enumerate(tokens):
+        status, message_id, error_code = results.get(token, (STATUS_PENDING, None, None))
+        rows.append(dict(
+            push_log_id=push_log_id, token_hash=token_hash(token), seq=seq, token=token,
+            status=status, message_id=message_id, error_code=error_code, created_at=now, updated_at=now
+        ))
+    return rows
+
+
+async def add_pending_deliveries(db: AsyncSession, push_log_id: str, tokens: Sequence[str]):
+    """호출하는 쪽의 트랜잭션에 pending 행 bulk INSERT (commit은 호출하는 쪽에서)"""
+    rows = pending_rows(push_log_id, tokens)
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        await db.execute(insert(PushDelivery).values(rows[start:start + INSERT_CHUNK_SIZE]))
+
+
+async def save_delivery_rows(db: AsyncSession, rows: List[Dict[str, Any]]):
+    """결과 행 upsert (commit은 호출하는 쪽에서)"""
+    dialect = db.bind.dialect.name
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        await db.execute(upsert_statement(dialect, PushDelivery.__table__, rows[start:start + INSERT_CHUNK_SIZE]))
+
+
+async def load_tokens_by_status(db: AsyncSession, push_log_id: str) -> Dict[str, List[str]]:
+    """{status: [토큰, ...]} (요청 순서)"""
+    result = await db.execute(
+        select(PushDelivery.token, PushDelivery.status)
+        .where(PushDelivery.push_log_id == push_log_id)
+        .order_by(PushDelivery.seq)
+    )
+    tokens: Dict[str, List[str]] = {}
+    for token, status in result.all():
+        tokens.setdefault(status, []).append(token)
+    return tokens
+
+
+async def list_deliveries(
+    db: AsyncSession,
+    push_log_id: str,
+    status: Optional[str],
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[PushDelivery], Optional[str]]:
+    """로그의 토큰별 결과 한 페이지 (요청 순서, 커서는 마지막 행의 seq)"""
+    stmt = select(PushDelivery).where(PushDelivery.push_log_id == push_log_id)
+    if status is not None:
+        stmt = stmt.where(PushDelivery.status == status)
+    if cursor:
+        try:
+            stmt = stmt.where(PushDelivery.seq > int(cursor))
+        except ValueError:
+            raise InvalidCursorError("유효하지 않은 deliveries_cursor 값입니다.")
+    rows = (await db.execute(stmt.order_by(PushDelivery.seq).limit(limit + 1))).scalars().all()
+    page = list(rows[:limit])
+    next_cursor = str(page[-1].seq) if len(rows) > limit and page else None
+    return page, next_cursor
+
+
+async def token_history(
+    db: AsyncSession,
+    token: str,
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[PushDelivery], Optional[str]]:
+    """토큰이 받은 발송 (최신순, token_hash 인덱스 범위 스캔)"""
+    stmt = select(PushDelivery).where(PushDelivery.token_hash == token_hash(token))
+    if cursor:
+        created_at, log_id = decode_cursor(cursor)
+        stmt = stmt.where(or_(
+            PushDelivery.created_at < created_at,
+            and_(PushDelivery.created_at == created_at, PushDelivery.push_log_id < log_id)
+        ))
+    stmt = stmt.order_by(PushDelivery.created_at.desc(), PushDelivery.push_log_id.desc()).limit(limit + 1)
+    rows = (await db.execute(stmt)).scalars().all()
+    page = list(rows[:limit])
+    next_cursor = encode_cursor(page[-1].created_at, page[-1].push_log_id) if len(rows) > limit and page else None
+    return page, next_cursor
@@ -0,0 +1,357 @@
+"""
+대량 푸시 fan-out 발송
+
+send_each 한도(500개)를 넘는 토큰 목록을 500개 단위 chunk로 나누어 동시에 발송한다.
+- 부모 PushLog 1건 + chunk별 자식 PushLog (parent_log_id, chunk_index)
+- chunk 동시 실행 수는 PushService.send_push_async의 프로젝트별 세마포어(PUSH_PROJECT_CONCURRENCY)로 제한
+- chunk에서 일시적 오류로 실패한 토큰은 재시도 엔진의 백오프만큼 기다린 뒤 그 토큰만 다시 발송
+- chunk가 끝날 때마다 부모 집계와 토큰별 결과(push_deliveries, 자식 로그 기준)를 기록하고 구독자에게 진행 이벤트(SSE)를 전달
+"""
+import asyncio
+import csv
+import io
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal, PushLog
+from log_ids import new_log_id
+from push_deliveries import DeliveryResults, result_rows, save_delivery_rows
+from push_service import PushService
+from retry_engine import attempt_push
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+SHUTDOWN_ERROR_MESSAGE = "서버 종료로 인해 발송되지 않았습니다."
+
+
+def dedupe_tokens(tokens: List[str]) -> List[str]:
+    """순서를 유지하면서 중복/빈 토큰 제거 (같은 기기에 중복 발송 방지)"""
+    return [token for token in dict.fromkeys(tokens) if token]
+
+
+def parse_token_file(filename: str, content: bytes) -> List[str]:
+    """
+    업로드된 토큰 파일 파싱.
+    - .ndjson / .jsonl: 한 줄에 JSON 문자열 하나 또는 {"token": "..."} 객체
+    - .csv: 첫 번째 컬럼 (첫 행이 'token' 헤더면 건너뜀)
+    """
+    text = content.decode("utf-8-sig")
+    lowered = (filename or "").lower()
+    tokens = []
+    if lowered.endswith((".ndjson", ".jsonl")):
+        for line_no, line in enumerate(text.splitlines(), start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                value = json.loads(line)
+            except json.JSONDecodeError:
+                raise ValueError(f"{line_no}번째 줄이 유효한 JSON이 아닙니다.")
+            if isinstance(value, dict):
+                value = value.get("token")
+            if not isinstance(value, str):
+                raise ValueError(f"{line_no}번째 줄에 토큰 문자열이 없습니다.")
+            tokens.append(value.strip())
+    elif lowered.endswith(".csv"):
+        for idx, row in enumerate(csv.reader(io.StringIO(text))):
+            if not row:
+                continue
+            cell = row[0].strip()
+            if idx == 0 and cell.lower() == "token":
+                continue
+            tokens.append(cell)
+    else:
+        raise ValueError("토큰 파일은 .ndjson, .jsonl, .csv 형식만 지원합니다.")
+    return tokens
+
+
+def format_sse(event: str, payload: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False, default=str)}\n\n"
+
+
+@dataclass
+class PushFanoutJob:
+    log_id: str
+    firebase_project_id: str
+    title: str
+    body: str
+    data: Optional[dict]
+    chunks: List[Tuple[str, List[str]]]  # (자식 로그 ID, 토큰 목록)
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(len(tokens) for _, tokens in self.chunks)
+
+    @classmethod
+    def build(
+        cls,
+        firebase_project_id: str,
+        tokens: List[str],
+        title: str,
+        body: str,
+        data: Optional[dict] = None,
+        chunk_size: int = PushService.MAX_TOKENS
+    ) -> "PushFanoutJob":
+        chunks = [
+            (new_log_id(), tokens[start:start + chunk_size])
+            for start in range(0, len(tokens), chunk_size)
+        ]
+        return cls(new_log_id(), firebase_project_id, title, body, data, chunks)
+
+
+def _final_status(success_count: int, failure_count: int) -> str:
+    if failure_count == 0:
+        return "success"
+    if success_count == 0:
+        return "failed"
+    return "partial"
+
+
+async def create_fanout_logs(db: AsyncSession, job: PushFanoutJob) -> datetime:
+    """부모 PushLog + chunk별 자식 PushLog(pending)를 bulk INSERT"""
+    now = datetime.utcnow()
+    base = {
+        "firebase_project_id": job.firebase_project_id,
+        "title": job.title,
+        "body": job.body,
+        "data": job.data,
+        "success_count": 0,
+        "failure_count": 0,
+        "status": "pending",
+        "created_at": now,
+    }
+    # 토큰별 결과는 chunk가 끝날 때 자식 로그 기준으로 기록 (부모에는 중복 저장하지 않음)
+    await db.execute(insert(PushLog), [{**base, "id": job.log_id, "token_count": job.total_tokens}])
+    rows = [
+        {**base, "id": child_id, "token_count": len(tokens), "parent_log_id": job.log_id, "chunk_index": idx}
+        for idx, (child_id, tokens) in enumerate(job.chunks)
+    ]
+    for start in range(0, len(rows), 500):
+        await db.execute(insert(PushLog), rows[start:start + 500])
+    await db.commit()
+    return now
+
+
+async def _record_chunk_result(
+    parent_id: str,
+    child_id: str,
+    success_count: int,
+    failure_count: int,
+    tokens: List[str],
+    results: DeliveryResults,
+    error_message: Optional[str],
+    attempts: Optional[List[Dict[str, Any]]] = None
+):
+    """자식 로그 결과(시도 이력, 토큰별 결과 포함) 기록 + 부모 집계 증가 (한 트랜잭션)"""
+    async with AsyncSessionLocal() as db:
+        try:
+            await db.execute(
+                update(PushLog)
+                .where(PushLog.id == child_id)
+                .values(
+                    status=_final_status(success_count, failure_count),
+                    success_count=success_count,
+                    failure_count=failure_count,
+                    error_message=error_message,
+                    attempts=attempts,
+                    sent_at=datetime.utcnow()
+                )
+            )
+            await db.execute(
+                update(PushLog)
+                .where(PushLog.id == parent_id)
+                .values(
+                    success_count=PushLog.success_count + success_count,
+                    failure_count=PushLog.failure_count + failure_count
+                )
+            )
+            await save_delivery_rows(db, result_rows(child_id, results, tokens))
+            await db.commit()
+        except Exception as e:
+            logger.error(f"fan-out chunk 결과 기록 실패 ({child_id}): {str(e)}")
+            await db.rollback()
+
+
+async def _finalize_parent(parent_id: str, success_count: int, failure_count: int):
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(PushLog)
+            .where(PushLog.id == parent_id)
+            .values(status=_final_status(success_count, failure_count), sent_at=datetime.utcnow())
+        )
+        await db.commit()
+
+
+async def _fail_unsent(parent_id: str, error_message: str):
+    """아직 pending인 자식 로그를 실패 처리하고 부모 집계에 반영"""
+    async with AsyncSessionLocal() as db:
+        pending_filter = (PushLog.parent_log_id == parent_id, PushLog.status == "pending")
+        children = (await db.execute(select(PushLog.token_count).where(*pending_filter))).scalars().all()
+        unsent = sum(count or 0 for count in children)
+        await db.execute(
+            update(PushLog).where(*pending_filter).values(status="failed", error_message=error_message)
+        )
+        parent = await db.get(PushLog, parent_id)
+        if parent is not None:
+            parent.failure_count = (parent.failure_count or 0) + unsent
+            parent.status = _final_status(parent.success_count or 0, parent.failure_count)
+            parent.error_message = error_message
+            parent.sent_at = datetime.utcnow()
+        await db.commit()
+
+
+class PushFanoutRunner:
+    """
+    fan-out 작업 실행기.
+    - concurrency: 작업 하나당 동시에 진행하는 chunk 수 (실제 FCM 호출은 프로젝트 세마포어로 추가 제한)
+    진행 상황은 subscribe()로 받은 asyncio.Queue에 (event, payload) 형태로 전달된다.
+    """
+
+    def __init__(self, concurrency: int):
+        self.concurrency = max(1, concurrency)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self._progress: Dict[str, Dict[str, Any]] = {}
+
+    def is_running(self, log_id: str) -> bool:
+        return log_id in self._tasks
+
+    def subscribe(self, log_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(log_id, []).append(queue)
+        # 진행 중인 작업에 나중에 구독한 경우 현재 진행 상황부터 전달
+        if log_id in self._progress:
+            queue.put_nowait(("progress", dict(self._progress[log_id])))
+        return queue
+
+    def unsubscribe(self, log_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(log_id)
+        if queues and queue in queues:
+            queues.remove(queue)
+            if not queues:
+                self._subscribers.pop(log_id, None)
+
+    def _publish(self, log_id: str, event: str, payload: Dict[str, Any]):
+        for queue in self._subscribers.get(log_id, []):
+            queue.put_nowait((event, payload))
+
+    async def iter_events(self, log_id: str, queue: asyncio.Queue) -> AsyncIterator[str]:
+        """구독 큐의 이벤트를 SSE 문자열로 변환 (done 이벤트 후 종료)"""
+        try:
+            while True:
+                event, payload = await queue.get()
+                yield format_sse(event, payload)
+                if event == "done":
+                    break
+        finally:
+            self.unsubscribe(log_id, queue)
+
+    def submit(self, job: PushFanoutJob) -> asyncio.Task:
+        task = asyncio.create_task(self.run(job), name=f"push-fanout-{job.log_id}")
+        self._tasks[job.log_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.log_id, None))
+        return task
+
+    async def run(self, job: PushFanoutJob):
+        progress = {
+            "log_id": job.log_id,
+            "total_tokens": job.total_tokens,
+            "total_chunks": len(job.chunks),
+            "completed_chunks": 0,
+            "success_count": 0,
+            "failure_count": 0,
+        }
+        self._progress[job.log_id] = progress
+        self._publish(job.log_id, "started", dict(progress))
+        chunks = iter(enumerate(job.chunks))
+
+        async def worker():
+            for idx, (child_id, tokens) in chunks:
+                attempt = await attempt_push(job.firebase_project_id, tokens, job.title, job.body, job.data)
+                # 일시적 오류(UNAVAILABLE/INTERNAL 등)로 실패한 토큰만 백오프 후 다시 발송
+                while attempt.retry_delay is not None:
+                    logger.info(
+                        f"fan-out chunk 재시도 예정 ({job.log_id} #{idx}): "
+                        f"tokens={len(attempt.retry_tokens)}, delay={attempt.retry_delay:.1f}s"
+                    )
+                    await asyncio.sleep(attempt.retry_delay)
+                    attempt = await attempt_push(
+                        job.firebase_project_id, attempt.retry_tokens, job.title, job.body, job.data, prior=attempt
+                    )
+                if attempt.error_message:
+                    logger.error(f"fan-out chunk 발송 실패 ({job.log_id} #{idx}): {attempt.error_message}")
+                success_count, failure_count = attempt.success_count, attempt.failure_count
+                await _record_chunk_result(
+                    job.log_id, child_id, success_count, failure_count, tokens, attempt.results,
+                    attempt.error_message, attempt.attempts
+                )
+                progress["completed_chunks"] += 1
+                progress["success_count"] += success_count
+                progress["failure_count"] += failure_count
+                self._publish(job.log_id, "chunk", {
+                    **progress,
+                    "chunk_index": idx,
+                    "chunk_success_count": success_count,
+                    "chunk_failure_count": failure_count,
+                })
+
+        logger.info(
+            f"푸시 fan-out 시작: log_id={job.log_id}, tokens={job.total_tokens}, chunks={len(job.chunks)}"
+        )
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, len(job.chunks)))]
+        try:
+            await asyncio.gather(*workers)
+            await _finalize_parent(job.log_id, progress["success_count"], progress["failure_count"])
+            logger.info(f"푸시 fan-out 완료: log_id={job.log_id}")
+            self._publish(job.log_id, "done", {
+                **progress,
+                "status": _final_status(progress["success_count"], progress["failure_count"]),
+            })
+        except Exception as e:
+            # 워커/부모 집계 기록 실패: 남은 chunk를 실패 처리하고 구독자가 끝없이 기다리지 않도록 done 전달
+            # (취소는 shutdown이 같은 처리를 함)
+            error_message = f"fan-out 처리 실패: {str(e)}"
+            logger.error(f"푸시 fan-out 실패 ({job.log_id}): {str(e)}")
+            try:
+                await _fail_unsent(job.log_id, error_message)
+            except Exception as db_error:
+                logger.error(f"fan-out 미발송 chunk 실패 처리 실패 ({job.log_id}): {str(db_error)}")
+            self._publish(job.log_id, "done", {**progress, "status": "failed", "error": error_message})
+        finally:
+            # 한 워커가 실패해도 gather는 나머지 워커를 취소하지 않으므로 직접 취소
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._progress.pop(job.log_id, None)
+
+    async def shutdown(self, timeout: float):
+        """진행 중인 fan-out을 timeout 동안 기다린 뒤 취소하고, 미발송 chunk는 실패 처리"""
+        tasks = dict(self._tasks)
+        if not tasks:
+            return
+        done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for log_id, task in tasks.items():
+            if task in pending:
+                logger.warning(f"푸시 fan-out 중단: log_id={log_id}")
+                await _fail_unsent(log_id, SHUTDOWN_ERROR_MESSAGE)
+                self._publish(log_id, "done", {"log_id": log_id, "status": "failed", "error": SHUTDOWN_ERROR_MESSAGE})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running_jobs": len(self._tasks),
+            "concurrency_per_job": self.concurrency,
+            "in_progress": [dict(progress) for progress in self._progress.values()],
+        }
+
+
+push_fanout_runner = PushFanoutRunner(concurrency=settings.push_project_concurrency)
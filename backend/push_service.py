@@ -1,8 +1,18 @@
+import asyncio
+import functools
+import hashlib
+import itertools
 import logging
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import boto3
 from botocore.exceptions import ClientError
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from firebase_app_cache import FirebaseAppCache
+from settings import settings
+from token_registry import fcm_error_code, token_registry
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +25,54 @@ except ImportError:
     FIREBASE_AVAILABLE = False
     logger.warning("firebase-admin 패키지가 설치되지 않았습니다. 푸시 알림 기능이 비활성화됩니다.")
 
-# 앱별 Firebase 앱 인스턴스 캐시 {firebase_project_id: firebase_admin.App}
-_firebase_app_cache = {}
+# FCM 호출(send_each, Secrets Manager 조회)은 동기 I/O이므로 이벤트 루프 밖의 전용 스레드 풀에서 실행
+_push_executor: Optional[ThreadPoolExecutor] = None
+_push_executor_lock = threading.Lock()
+
+# 프로젝트별 동시 발송 제한 {firebase_project_id: (event_loop, asyncio.Semaphore)}
+_project_semaphores: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = {}
+_project_in_flight: Dict[str, int] = {}
+
+
+def _get_push_executor() -> ThreadPoolExecutor:
+    global _push_executor
+    with _push_executor_lock:
+        if _push_executor is None:
+            _push_executor = ThreadPoolExecutor(
+                max_workers=settings.push_executor_workers,
+                thread_name_prefix="fcm-push"
+            )
+        return _push_executor
+
+
+def _get_project_semaphore(firebase_project_id: str) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    entry = _project_semaphores.get(firebase_project_id)
+    if entry is None or entry[0] is not loop:
+        entry = (loop, asyncio.Semaphore(settings.push_project_concurrency))
+        _project_semaphores[firebase_project_id] = entry
+    return entry[1]
+
+
+# Secrets Manager 클라이언트는 생성 시 botocore 서비스 모델을 로드하므로 프로세스당 하나만 만들어 재사용
+# (boto3 클라이언트는 스레드 간 공유 가능)
+_secrets_client = None
+_secrets_client_lock = threading.Lock()
+
+
+def _get_secrets_client():
+    global _secrets_client
+    with _secrets_client_lock:
+        if _secrets_client is None:
+            _secrets_client = boto3.client('secretsmanager', region_name='ap-northeast-2')
+        return _secrets_client
+
+
+def _reset_secrets_client():
+    """캐시된 Secrets Manager 클라이언트 제거 (테스트/자격 증명 변경 시)"""
+    global _secrets_client
+    with _secrets_client_lock:
+        _secrets_client = None
 
 
 def _load_service_account_from_aws(firebase_project_id: str) -> dict:
@@ -26,8 +82,7 @@ def _load_service_account_from_aws(firebase_project_id: str) -> dict:
     """
     secret_id = f"prod/ignite-pilot/{firebase_project_id}-android-key"
     try:
-        client = boto3.client('secretsmanager', region_name='ap-northeast-2')
-        response = client.get_secret_value(SecretId=secret_id)
+        response = _get_secrets_client().get_secret_value(SecretId=secret_id)
         secret = json.loads(response['SecretString'])
         if secret.get('type') != 'service_account':
             raise ValueError(f"Secret '{secret_id}'이 서비스 계정 키 형식이 아닙니다.")
@@ -41,6 +96,77 @@ def _load_service_account_from_aws(firebase_project_id: str) -> dict:
         raise ValueError(f"Secret '{secret_id}'의 내용이 유효한 JSON이 아닙니다.")
 
 
+def _load_firebase_app(firebase_project_id: str, current_fingerprint: Optional[str]) -> Optional[Tuple[Any, str]]:
+    """
+    FirebaseAppCache loader.
+    서비스 계정 키가 캐시된 앱과 같으면 None(기존 앱 유지), 교체되었으면 새 이름으로 앱을 초기화한다.
+    """
+    logger.info(f"Firebase 서비스 계정 로드 중: project_id={firebase_project_id}")
+    service_account_info = _load_service_account_from_aws(firebase_project_id)
+    fingerprint = hashlib.sha256(
+        json.dumps(service_account_info, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    if fingerprint == current_fingerprint:
+        return None
+
+    cred = credentials.Certificate(service_account_info)
+    # firebase_admin은 앱 이름으로 구분 (DEFAULT는 첫 번째 앱에만 사용).
+    # 키 교체 시 기존 앱은 진행 중인 발송이 끝난 뒤 정리되므로 새 앱은 다른 이름으로 만든다.
+    app_name = f"app_{firebase_project_id}_{next(_app_generation)}"
+    try:
+        app = firebase_admin.initialize_app(cred, name=app_name)
+    except ValueError:
+        app = firebase_admin.get_app(app_name)
+    logger.info(f"Firebase 앱 초기화 완료: project_id={firebase_project_id}, app={app_name}")
+    return app, fingerprint
+
+
+def _delete_firebase_app(app: Any):
+    if FIREBASE_AVAILABLE:
+        firebase_admin.delete_app(app)
+
+
+_app_generation = itertools.count()
+
+# 앱별 Firebase 앱 인스턴스 캐시 {firebase_project_id: firebase_admin.App}
+_firebase_app_cache = FirebaseAppCache(
+    loader=_load_firebase_app,
+    disposer=_delete_firebase_app,
+    ttl=settings.firebase_app_cache_ttl,
+    max_size=settings.firebase_app_cache_max_size,
+    idle_timeout=settings.firebase_app_idle_timeout,
+    negative_ttl=settings.firebase_app_negative_ttl
+)
+
+
+# 발송 전 dead 토큰으로 걸러진 토큰의 에러 코드
+ERROR_DEAD_TOKEN = "DEAD_TOKEN"
+
+
+class FailedTokens(list):
+    """
+    실패 토큰 목록 + 토큰별 FCM 에러 코드 (error_codes).
+    list이므로 기존처럼 실패 토큰 목록으로 다룰 수 있고, 재시도 엔진은 error_codes로 일시적 오류를 구분한다.
+    message_ids에는 발송에 성공한 토큰의 FCM message ID가 담긴다 (토큰별 결과 기록용).
+    """
+
+    def __init__(
+        self,
+        failures: Sequence[Tuple[str, Optional[str]]] = (),
+        message_ids: Optional[Dict[str, Optional[str]]] = None
+    ):
+        super().__init__(token for token, _ in failures)
+        self.error_codes: Dict[str, Optional[str]] = dict(failures)
+        self.message_ids: Dict[str, Optional[str]] = dict(message_ids or {})
+
+    def __add__(self, other: List[str]) -> "FailedTokens":
+        merged = FailedTokens([(token, self.error_codes.get(token)) for token in self], self.message_ids)
+        merged.extend(other)
+        merged.error_codes.update(getattr(other, "error_codes", {}))
+        merged.message_ids.update(getattr(other, "message_ids", {}))
+        return merged
+
+
 class PushService:
     MAX_TOKENS = 500
 
@@ -48,29 +174,91 @@ class PushService:
     def _get_firebase_app(cls, firebase_project_id: str) -> 'firebase_admin.App':
         """
         firebase_project_id에 해당하는 Firebase 앱 인스턴스 반환.
-        캐시에 없으면 AWS Secrets Manager에서 서비스 계정 키를 로드해 초기화.
+        캐시에 없으면 AWS Secrets Manager에서 서비스 계정 키를 로드해 초기화 (동시 요청은 한 번만 로드).
         """
         if not FIREBASE_AVAILABLE:
             raise RuntimeError("firebase-admin 패키지가 설치되지 않았습니다.")
 
-        if firebase_project_id in _firebase_app_cache:
-            return _firebase_app_cache[firebase_project_id]
+        return _firebase_app_cache.get(firebase_project_id)
 
-        logger.info(f"Firebase 앱 초기화 중: project_id={firebase_project_id}")
-        service_account_info = _load_service_account_from_aws(firebase_project_id)
-        cred = credentials.Certificate(service_account_info)
+    @classmethod
+    async def send_push_async(
+        cls,
+        firebase_project_id: str,
+        device_tokens: List[str],
+        title: str,
+        body: str,
+        data: Optional[dict] = None
+    ) -> Tuple[int, int, List[str]]:
+        """
+        send_push의 비동기 버전.
+        동기 FCM 호출을 스레드 풀에서 실행하여 이벤트 루프를 막지 않으며,
+        프로젝트별 동시 실행 수는 PUSH_PROJECT_CONCURRENCY로 제한한다.
+        """
+        semaphore = _get_project_semaphore(firebase_project_id)
+        async with semaphore:
+            _project_in_flight[firebase_project_id] = _project_in_flight.get(firebase_project_id, 0) + 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    _get_push_executor(),
+                    functools.partial(
+                        cls.send_push,
+                        firebase_project_id=firebase_project_id,
+                        device_tokens=device_tokens,
+                        title=title,
+                        body=body,
+                        data=data
+                    )
+                )
+            finally:
+                _project_in_flight[firebase_project_id] -= 1
 
-        # firebase_admin은 앱 이름으로 구분 (DEFAULT는 첫 번째 앱에만 사용)
-        app_name = f"app_{firebase_project_id}"
-        try:
-            app = firebase_admin.initialize_app(cred, name=app_name)
-        except ValueError:
-            # 이미 동일 이름으로 초기화된 경우 (동시 요청 레이스 컨디션 방어)
-            app = firebase_admin.get_app(app_name)
+    @classmethod
+    async def prewarm(cls, firebase_project_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        서비스 계정 키 조회 + Firebase 앱 초기화를 프로젝트별로 동시에 미리 수행.
+        실패해도 서버 시작을 막지 않으며, 결과는 {project_id: 오류 메시지 또는 None}.
+        """
+        if not FIREBASE_AVAILABLE or not firebase_project_ids:
+            return {}
+        results = await asyncio.gather(
+            *(asyncio.to_thread(cls._get_firebase_app, project_id) for project_id in firebase_project_ids),
+            return_exceptions=True
+        )
+        outcome = {}
+        for project_id, result in zip(firebase_project_ids, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Firebase 앱 사전 초기화 실패 ({project_id}): {str(result)}")
+                outcome[project_id] = str(result)
+            else:
+                outcome[project_id] = None
+        logger.info(f"Firebase 앱 사전 초기화 완료: {sum(1 for v in outcome.values() if v is None)}/{len(outcome)}")
+        return outcome
 
-        _firebase_app_cache[firebase_project_id] = app
-        logger.info(f"Firebase 앱 초기화 완료: project_id={firebase_project_id}")
-        return app
+    @staticmethod
+    def executor_stats() -> Dict[str, Any]:
+        return {
+            "max_workers": settings.push_executor_workers,
+            "project_concurrency": settings.push_project_concurrency,
+            "in_flight": {k: v for k, v in _project_in_flight.items() if v},
+            "firebase_apps": _firebase_app_cache.stats(),
+        }
+
+    @staticmethod
+    def sweep_firebase_apps() -> int:
+        """사용되지 않는 Firebase 앱 정리 (발송이 없는 프로젝트의 앱/인증 정보가 계속 남지 않도록 주기적으로 호출)"""
+        return _firebase_app_cache.sweep()
+
+    @staticmethod
+    def shutdown_executor():
+        """진행 중인 FCM 호출이 끝날 때까지 기다린 뒤 스레드 풀 종료 및 Firebase 앱 정리"""
+        global _push_executor
+        with _push_executor_lock:
+            executor, _push_executor = _push_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        _firebase_app_cache.close()
 
     @classmethod
     def send_push(
@@ -86,17 +274,27 @@ class PushService:
 
         Args:
             firebase_project_id: Firebase 프로젝트 ID (Secret 조회에 사용)
-            device_tokens: 디바이스 토큰 목록 (최대 500개)
+            device_tokens: 디바이스 토큰 목록 (최대 500개, dead 토큰은 발송하지 않고 실패로 집계)
             title: 알림 제목
             body: 알림 내용
             data: 추가 데이터 (선택, 모든 값은 문자열로 변환)
 
         Returns:
             Tuple[success_count, failure_count, failed_tokens]
+            failed_tokens는 FailedTokens이며 error_codes에 토큰별 FCM 에러 코드,
+            message_ids에 성공한 토큰의 FCM message ID가 담긴다.
         """
         if len(device_tokens) > cls.MAX_TOKENS:
             raise ValueError(f"토큰은 최대 {cls.MAX_TOKENS}개까지 허용됩니다.")
 
+        # 이전에 영구 실패(UNREGISTERED 등)로 기록된 토큰은 FCM 호출 전에 제외
+        device_tokens, skipped_tokens = token_registry.filter_tokens(firebase_project_id, device_tokens)
+        skipped_tokens = FailedTokens([(token, ERROR_DEAD_TOKEN) for token in skipped_tokens])
+        if skipped_tokens:
+            logger.info(f"dead 토큰 {len(skipped_tokens)}건 발송 제외: project_id={firebase_project_id}")
+        if not device_tokens:
+            return 0, len(skipped_tokens), skipped_tokens
+
         app = cls._get_firebase_app(firebase_project_id)
 
         # FCM data 값은 모두 문자열이어야 함
@@ -110,11 +308,13 @@ class PushService:
                 token=device_tokens[0]
             )
             try:
-                messaging.send(message, app=app)
-                return 1, 0, []
+                message_id = messaging.send(message, app=app)
+                return 1, len(skipped_tokens), FailedTokens(message_ids={device_tokens[0]: message_id}) + skipped_tokens
             except Exception as e:
                 logger.error(f"단일 토큰 발송 실패 ({device_tokens[0]}): {str(e)}")
-                return 0, 1, [device_tokens[0]]
+                failures = [(device_tokens[0], fcm_error_code(e))]
+                token_registry.record_failures(firebase_project_id, failures, batch_had_success=False)
+                return 0, 1 + len(skipped_tokens), FailedTokens(failures) + skipped_tokens
         else:
             messages = [
                 messaging.Message(
@@ -128,12 +328,28 @@ class PushService:
                 batch_response = messaging.send_each(messages, app=app)
             except Exception as e:
                 logger.error(f"다중 토큰 발송 실패: {str(e)}")
-                return 0, len(device_tokens), list(device_tokens)
+                error_code = fcm_error_code(e)
+                return (
+                    0,
+                    len(device_tokens) + len(skipped_tokens),
+                    FailedTokens([(token, error_code) for token in device_tokens]) + skipped_tokens
+                )
 
-            failedTokens = []
+            failures = []
+            message_ids = {}
             for idx, resp in enumerate(batch_response.responses):
-                if not resp.success:
-                    failedTokens.append(device_tokens[idx])
+                if resp.success:
+                    message_ids[device_tokens[idx]] = resp.message_id
+                else:
+                    failures.append((device_tokens[idx], fcm_error_code(resp.exception)))
                     logger.warning(f"토큰 발송 실패 ({device_tokens[idx]}): {resp.exception}")
+            if failures:
+                token_registry.record_failures(
+                    firebase_project_id, failures, batch_had_success=batch_response.success_count > 0
+                )
 
-            return batch_response.success_count, batch_response.failure_count, failedTokens
+            return (
+                batch_response.success_count,
+                batch_response.failure_count + len(skipped_tokens),
+                FailedTokens(failures, message_ids) + skipped_tokens
+            )
@@ -0,0 +1,277 @@
+"""
+발송 API 요청 제한 (rate limit)
+
+slowapi(프로세스 메모리 카운터, 접속 IP 기준)를 대체한다.
+- sliding window counter: 현재 window 카운트 + 직전 window 카운트 × 남은 비율로 요청 수를 추정 (window 경계의 2배 burst 방지)
+- 저장소: memory(인스턴스별) 또는 database(모든 ECS task가 같은 MySQL 카운터를 공유, 원자적 INSERT ... ON DUPLICATE KEY UPDATE)
+  DB 오류 시에는 요청을 막지 않고 인스턴스 메모리 카운터로 대신 제한한다
+- 클라이언트 식별: ALB 뒤에서는 접속 IP가 ALB이므로 X-Forwarded-For에서 신뢰하는 프록시 수(trusted_proxies)만큼
+  오른쪽 항목을 건너뛴 주소를 사용 (클라이언트가 임의로 넣은 왼쪽 항목은 무시)
+- API 키별 한도: api_key_limits에 등록된 키(sha256 앞 16자리)로 요청하면 IP 대신 키 단위로 해당 한도를 적용
+"""
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Tuple
+
+from fastapi import HTTPException, Request
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database import AsyncSessionLocal, RateLimitCounter
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+STORAGE_MEMORY = "memory"
+STORAGE_DATABASE = "database"
+
+API_KEY_HASH_LENGTH = 16
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """'10/minute' → (10, 60)"""
+    try:
+        count, period = rate.strip().split("/")
+        return int(count), _PERIODS[period.strip().lower().rstrip("s")]
+    except (ValueError, KeyError):
+        raise ValueError(f"잘못된 rate limit 형식입니다: {rate} (예: 10/minute)")
+
+
+def parse_api_key_limits(value: str) -> Dict[str, Tuple[int, int]]:
+    """'키해시=600/minute,키해시=100/second' → {키해시: (600, 60), ...}"""
+    limits = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        key_hash, _, rate = item.partition("=")
+        limits[key_hash.strip().lower()] = parse_rate(rate)
+    return limits
+
+
+def api_key_hash(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:API_KEY_HASH_LENGTH]
+
+
+def client_ip(request: Request, trusted_proxies: int) -> str:
+    """
+    실제 클라이언트 IP.
+    X-Forwarded-For는 프록시를 지날 때마다 오른쪽에 추가되므로, 신뢰하는 프록시 수만큼 오른쪽에서 센 주소가 클라이언트이다.
+    """
+    peer = request.client.host if request.client else "unknown"
+    if trusted_proxies <= 0:
+        return peer
+    forwarded = [ip.strip() for ip in request.headers.get("x-forwarded-for", "").split(",") if ip.strip()]
+    if not forwarded:
+        return peer
+    return forwarded[-min(trusted_proxies, len(forwarded))]
+
+
+def sliding_window_count(previous: int, current: int, elapsed_ratio: float) -> float:
+    """직전 window 카운트는 현재 window에서 지난 비율만큼 줄여서 반영"""
+    return previous * (1 - elapsed_ratio) + current
+
+
+class MemoryRateLimitStorage:
+    """인스턴스 메모리 카운터 (단일 인스턴스/로컬 개발용, DB 저장소 장애 시 대체)"""
+
+    def __init__(self):
+        self._counters: Dict[Tuple[str, int], int] = {}
+        self._expires: Dict[Tuple[str, int], float] = {}
+
+    def _purge(self, now: float):
+        for key in [key for key, expires in self._expires.items() if expires <= now]:
+            self._counters.pop(key, None)
+            self._expires.pop(key, None)
+
+    async def hit(self, key: str, window_index: int, window: int) -> Tuple[int, int]:
+        """현재 window 카운트를 1 증가시키고 (직전 window 카운트, 증가 후 현재 window 카운트)를 반환"""
+        now = time.time()
+        if len(self._expires) > 10000:
+            self._purge(now)
+        current_key = (key, window_index)
+        self._counters[current_key] = self._counters.get(current_key, 0) + 1
+        self._expires[current_key] = (window_index + 2) * window
+        return self._counters.get((key, window_index - 1), 0), self._counters[current_key]
+
+    async def undo(self, key: str, window_index: int):
+        current_key = (key, window_index)
+        if self._counters.get(current_key, 0) > 0:
+            self._counters[current_key] -= 1
+
+    def clear(self):
+        self._counters.clear()
+        self._expires.clear()
+
+
+class DatabaseRateLimitStorage:
+    """
+    rate_limit_counters 테이블 (limit_key, window_start) 카운터.
+    증가는 INSERT ... ON DUPLICATE KEY UPDATE hits = hits + 1 한 문장으로 처리하여 여러 task가 동시에 증가해도 누락이 없다.
+    """
+
+    def __init__(self, purge_interval: float = 60):
+        self.purge_interval = purge_interval
+        self._last_purge = 0.0
+
+    @staticmethod
+    def _upsert(dialect: str, values: Dict[str, Any]):
+        table = RateLimitCounter.__table__
+        if dialect == "sqlite":
+            stmt = sqlite_insert(table).values(**values)
+            return stmt.on_conflict_do_update(
+                index_elements=["limit_key", "window_start"], set_={"hits": table.c.hits + 1}
+            )
+        stmt = mysql_insert(table).values(**values)
+        return stmt.on_duplicate_key_update(hits=table.c.hits + 1)
+
+    async def hit(self, key: str, window_index: int, window: int) -> Tuple[int, int]:
+        async with AsyncSessionLocal() as db:
+            await db.execute(self._upsert(db.bind.dialect.name, dict(
+                limit_key=key,
+                window_start=window_index,
+                hits=1,
+                expires_at=datetime.utcfromtimestamp((window_index + 2) * window)
+            )))
+            result = await db.execute(
+                select(RateLimitCounter.window_start, RateLimitCounter.hits).where(
+                    RateLimitCounter.limit_key == key,
+                    RateLimitCounter.window_start.in_([window_index - 1, window_index])
+                )
+            )
+            counts = dict(result.all())
+            await self._purge(db)
+            await db.commit()
+        return counts.get(window_index - 1, 0), counts.get(window_index, 0)
+
+    async def undo(self, key: str, window_index: int):
+        async with AsyncSessionLocal() as db:
+            table = RateLimitCounter.__table__
+            await db.execute(
+                table.update()
+                .where(table.c.limit_key == key, table.c.window_start == window_index, table.c.hits > 0)
+                .values(hits=table.c.hits - 1)
+            )
+            await db.commit()
+
+    async def _purge(self, db):
+        """만료된 window 행 정리 (인스턴스마다 purge_interval에 한 번)"""
+        now = time.monotonic()
+        if now - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = now
+        await db.execute(delete(RateLimitCounter).where(RateLimitCounter.expires_at < datetime.utcnow()))
+
+
+class RequestLimiter:
+    """
+    - storage: memory | database
+    - api_key_limits: {API 키 sha256 앞 16자리: (limit, window초)}
+    - trusted_proxies: 클라이언트 앞단 프록시(ALB 등) 수
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        storage: str,
+        trusted_proxies: int,
+        api_key_limits: Dict[str, Tuple[int, int]],
+        clock: Callable[[], float] = time.time
+    ):
+        self.enabled = enabled
+        self.storage_name = storage
+        self.trusted_proxies = trusted_proxies
+        self.api_key_limits = api_key_limits
+        self._clock = clock
+        self._memory = MemoryRateLimitStorage()
+        self._storage = DatabaseRateLimitStorage() if storage == STORAGE_DATABASE else self._memory
+        self._allowed = 0
+        self._rejected = 0
+        self._storage_errors = 0
+
+    def identify(self, request: Request, default: Tuple[int, int]) -> Tuple[str, Tuple[int, int]]:
+        """(카운터 식별자, 적용 한도): 등록된 API 키면 키 단위, 아니면 클라이언트 IP 단위"""
+        api_key = request.headers.get("x-api-key")
+        if api_key and self.api_key_limits:
+            key_hash = api_key_hash(api_key)
+            if key_hash in self.api_key_limits:
+                return f"key:{key_hash}", self.api_key_limits[key_hash]
+        return f"ip:{client_ip(request, self.trusted_proxies)}", default
+
+    async def _hit(self, key: str, window_index: int, window: int) -> Tuple[int, int]:
+        try:
+            return await self._storage.hit(key, window_index, window)
+        except Exception as e:
+            # 공유 카운터를 쓸 수 없어도 발송 API는 막지 않음 (인스턴스 메모리 카운터로 제한)
+            self._storage_errors += 1
+            logger.warning(f"rate limit 저장소 오류, 메모리 카운터 사용: {str(e)}")
+            return await self._memory.hit(key, window_index, window)
+
+    async def check(self, scope: str, request: Request, rate: Tuple[int, int]):
+        """한도를 넘으면 429 (Retry-After: 추정 요청 수가 한도 아래로 내려갈 때까지 초)"""
+        if not self.enabled:
+            return
+        identity, (limit, window) = self.identify(request, rate)
+        key = f"{scope}:{identity}"
+        now = self._clock()
+        window_index = int(now // window)
+        elapsed_ratio = (now - window_index * window) / window
+        previous, current = await self._hit(key, window_index, window)
+        if sliding_window_count(previous, current, elapsed_ratio) <= limit:
+            self._allowed += 1
+            return
+
+        # 거절된 요청은 카운트하지 않음 (계속 재시도하는 클라이언트가 한도 회복을 늦추지 않도록)
+        try:
+            await self._storage.undo(key, window_index)
+        except Exception:
+            await self._memory.undo(key, window_index)
+        self._rejected += 1
+        if previous and current - 1 < limit:
+            # 직전 window 비중이 줄어들면 허용: previous × (1 - r) + current ≤ limit
+            retry_after = window * ((1 - (limit - current) / previous) - elapsed_ratio)
+        else:
+            retry_after = window * (1 - elapsed_ratio)
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded: {limit} per {window} seconds",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+    def limit(self, rate: str):
+        """FastAPI dependency: dependencies=[Depends(limiter.limit("10/minute"))] (엔드포인트 경로별 카운터)"""
+        parsed = parse_rate(rate)
+
+        async def dependency(request: Request):
+            route = request.scope.get("route")
+            await self.check(getattr(route, "path", request.url.path), request, parsed)
+
+        return dependency
+
+    def reset(self):
+        """인스턴스 메모리 카운터 초기화 (공유 DB 카운터는 window 만료로 정리)"""
+        self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "storage": self.storage_name,
+            "trusted_proxies": self.trusted_proxies,
+            "api_key_limits": len(self.api_key_limits),
+            "allowed": self._allowed,
+            "rejected": self._rejected,
+            "storage_errors": self._storage_errors,
+        }
+
+
+request_limiter = RequestLimiter(
+    enabled=settings.rate_limit_enabled,
+    storage=settings.rate_limit_storage,
+    trusted_proxies=settings.rate_limit_trusted_proxies,
+    api_key_limits=parse_api_key_limits(settings.rate_limit_api_key_limits)
+)
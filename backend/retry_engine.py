@@ -0,0 +1,384 @@
+"""
+발송 재시도 엔진
+
+SMTP 응답 코드와 FCM 에러 코드를 일시적(transient)/영구(permanent) 오류로 분류하고 일시적 오류만 재시도한다.
+- 재시도 간격: 상한이 있는 지수 백오프 + full jitter (같은 시각에 실패한 작업이 동시에 재시도하지 않도록)
+- 목적지(smtp_host, firebase_project_id)별 재시도 예산: window 동안의 재시도 수를
+  max(budget_min, 첫 시도 수 × budget_ratio) 이하로 제한하여 장애 중인 목적지에 재시도가 몰리지 않도록 한다
+- 푸시는 일시적 오류로 실패한 토큰만 다시 발송한다
+- 시도 이력은 로그의 attempts(JSON)에 남긴다
+- 발송 전 outbound_limiter로 목적지별 속도 제한/circuit breaker를 거치고, 발송 결과를 목적지 상태에 반영한다.
+  목적지가 차단 중이면(DestinationUnavailableError) 발송하지 않고 일시적 오류로 보아 차단이 풀린 뒤로 재시도를 미룬다
+
+이 모듈은 한 번의 시도와 재시도 여부만 결정한다. 재시도 예약(status='retrying')은 호출하는 쪽에서
+scheduler.schedule_retry로 처리한다 (fan-out chunk는 실행 중인 작업 안에서 대기 후 재시도).
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import aiosmtplib
+
+from email_service import EmailService
+from outbound_limiter import (
+    CODE_CIRCUIT_OPEN, CODE_RATE_LIMITED, KIND_FCM, KIND_SMTP, OUTCOME_FAILURE, OUTCOME_NEUTRAL, OUTCOME_SUCCESS, OUTCOME_THROTTLED,
+    DestinationUnavailableError, outbound_limiter
+)
+from push_deliveries import STATUS_FAILED, STATUS_SUCCESS, DeliveryResults
+from push_service import PushService
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+STATUS_RETRYING = "retrying"
+
+# 잠시 후 다시 보내면 성공할 수 있는 FCM 에러 코드 (firebase_admin 예외의 code 기준)
+TRANSIENT_FCM_ERRORS = frozenset({
+    "UNAVAILABLE",
+    "INTERNAL",
+    "UNKNOWN",
+    "DEADLINE_EXCEEDED",
+    "RESOURCE_EXHAUSTED",  # QUOTA_EXCEEDED
+    "QUOTA_EXCEEDED",
+})
+
+# 목적지가 발송 속도를 줄이라고 알려주는 응답 (토큰 버킷 속도 감소)
+THROTTLE_SMTP_CODES = frozenset({"421", "451"})
+THROTTLE_FCM_ERRORS = frozenset({"RESOURCE_EXHAUSTED", "QUOTA_EXCEEDED"})
+# 목적지 차단으로 발송하지 않은 경우 (차단이 풀린 뒤 재시도)
+DEFERRED_CODES = frozenset({CODE_CIRCUIT_OPEN, CODE_RATE_LIMITED})
+
+
+def classify_smtp_error(exc: BaseException) -> Tuple[bool, Optional[str]]:
+    """
+    SMTP 발송 예외 → (일시적 오류 여부, 오류 코드).
+    응답 코드 4xx는 일시적, 5xx는 영구 오류이며 연결 끊김/타임아웃은 일시적 오류로 본다.
+    """
+    if isinstance(exc, aiosmtplib.SMTPRecipientsRefused):
+        codes = [recipient.code for recipient in exc.recipients]
+        return bool(codes) and all(400 <= code < 500 for code in codes), str(codes[0]) if codes else None
+    if isinstance(exc, aiosmtplib.SMTPResponseException):
+        return 400 <= exc.code < 500, str(exc.code)
+    if isinstance(exc, (ConnectionError, TimeoutError, asyncio.TimeoutError, aiosmtplib.SMTPServerDisconnected)):
+        return True, type(exc).__name__
+    return False, None
+
+
+def is_transient_fcm_error(error_code: Optional[str]) -> bool:
+    return error_code in TRANSIENT_FCM_ERRORS
+
+
+def smtp_outcome(transient: bool, code: Optional[str]) -> str:
+    """SMTP 발송 실패 → 목적지 상태 신호 (영구 오류는 수신자/메시지 문제로 보고 반영하지 않음)"""
+    if code in THROTTLE_SMTP_CODES:
+        return OUTCOME_THROTTLED
+    return OUTCOME_FAILURE if transient else OUTCOME_NEUTRAL
+
+
+def fcm_outcome(success_count: int, error_codes: List[Optional[str]]) -> str:
+    """FCM 발송 결과 → 목적지 상태 신호"""
+    if any(code in THROTTLE_FCM_ERRORS for code in error_codes):
+        return OUTCOME_THROTTLED
+    if success_count > 0:
+        return OUTCOME_SUCCESS
+    if any(is_transient_fcm_error(code) for code in error_codes):
+        return OUTCOME_FAILURE
+    return OUTCOME_NEUTRAL
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rand: Callable[[], float] = random.random) -> float:
+    """attempt번째 실패 후 대기 시간 (full jitter: 0 ~ min(cap, base × 2^(attempt-1)))"""
+    return rand() * min(cap, base * (2 ** (attempt - 1)))
+
+
+class RetryBudget:
+    """
+    목적지별 재시도 예산.
+    window(초) 동안의 재시도 수가 max(min_retries, 첫 시도 수 × ratio)를 넘으면 더 이상 재시도하지 않는다.
+    """
+
+    def __init__(self, ratio: float, min_retries: int, window: float):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._requests: Dict[str, Deque[float]] = {}
+        self._retries: Dict[str, Deque[float]] = {}
+        self._exhausted = 0
+
+    def _trim(self, events: Dict[str, Deque[float]], destination: str, now: float) -> Deque[float]:
+        queue = events.setdefault(destination, deque())
+        while queue and now - queue[0] > self.window:
+            queue.popleft()
+        return queue
+
+    def record_request(self, destination: str):
+        now = time.monotonic()
+        self._trim(self._requests, destination, now).append(now)
+
+    def try_acquire(self, destination: str) -> bool:
+        now = time.monotonic()
+        requests = self._trim(self._requests, destination, now)
+        retries = self._trim(self._retries, destination, now)
+        if len(retries) >= max(self.min_retries, len(requests) * self.ratio):
+            self._exhausted += 1
+            return False
+        retries.append(now)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "exhausted": self._exhausted,
+            "destinations": {
+                destination: {
+                    "requests": len(self._trim(self._requests, destination, now)),
+                    "retries": len(self._trim(self._retries, destination, now)),
+                }
+                for destination in list(self._requests)
+            },
+        }
+
+
+class RetryPolicy:
+    """
+    - max_attempts: 첫 시도를 포함한 최대 시도 수
+    - base_delay / max_delay: 백오프 기준/상한(초)
+    """
+
+    def __init__(self, enabled: bool, max_attempts: int, base_delay: float, max_delay: float, budget: RetryBudget):
+        self.enabled = enabled
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self._scheduled = 0
+
+    def record_first_attempt(self, destination: str):
+        self.budget.record_request(destination)
+
+    def next_delay(self, destination: str, attempt: int, transient: bool) -> Optional[float]:
+        """attempt번째 시도가 실패했을 때 재시도까지의 대기 시간 (재시도하지 않으면 None)"""
+        if not self.enabled or not transient or attempt >= self.max_attempts:
+            return None
+        if not self.budget.try_acquire(destination):
+            logger.warning(f"재시도 예산 소진으로 재시도하지 않음: destination={destination}")
+            return None
+        self._scheduled += 1
+        return backoff_delay(attempt, self.base_delay, self.max_delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "max_attempts": self.max_attempts,
+            "scheduled": self._scheduled,
+            "budget": self.budget.stats(),
+        }
+
+
+def attempt_record(attempt: int, retry_in: Optional[float] = None, **details) -> Dict[str, Any]:
+    """로그 attempts(JSON)에 남기는 시도 1건"""
+    return {
+        "attempt": attempt,
+        "at": datetime.utcnow().isoformat(),
+        **details,
+        "retry_in": round(retry_in, 3) if retry_in is not None else None,
+    }
+
+
+@dataclass
+class EmailAttempt:
+    success: bool
+    error_message: Optional[str]
+    attempts: List[Dict[str, Any]]
+    retry_delay: Optional[float] = None
+
+    @property
+    def status(self) -> str:
+        if self.success:
+            return "success"
+        return STATUS_RETRYING if self.retry_delay is not None else "failed"
+
+
+async def attempt_email(send_kwargs: Dict[str, Any], attempts: Optional[List[Dict[str, Any]]] = None) -> EmailAttempt:
+    """이메일 1회 발송 시도. attempts는 이전 시도 이력 (첫 시도는 None)"""
+    attempts = list(attempts or [])
+    attempt = len(attempts) + 1
+    destination = send_kwargs.get("smtp_host") or ""
+    if attempt == 1:
+        retry_policy.record_first_attempt(destination)
+
+    guard = outbound_limiter.guard(KIND_SMTP, destination)
+    transient, code, retry_after = False, None, 0.0
+    try:
+        await guard.acquire()
+    except DestinationUnavailableError as e:
+        success, error_message = False, str(e)
+        transient, code, retry_after = True, e.code, e.retry_after
+    else:
+        try:
+            # 첨부파일 검증 실패 등은 (False, 메시지)로 반환되며 영구 오류로 처리
+            success, error_message = await EmailService.send_email(**send_kwargs, raise_errors=True)
+            guard.record(OUTCOME_SUCCESS if success else OUTCOME_NEUTRAL)
+        except Exception as e:
+            success, error_message = False, str(e)
+            transient, code = classify_smtp_error(e)
+            guard.record(smtp_outcome(transient, code))
+        except BaseException:
+            # 취소 등으로 결과 없이 중단: half-open 시험 발송 슬롯을 반납
+            guard.record(OUTCOME_NEUTRAL)
+            raise
+
+    delay = None if success else retry_policy.next_delay(destination, attempt, transient)
+    if delay is not None:
+        delay = max(delay, retry_after)
+    if success:
+        attempts.append(attempt_record(attempt, success=True))
+    else:
+        attempts.append(attempt_record(
+            attempt, delay, success=False, error=error_message, code=code, transient=transient
+        ))
+    return EmailAttempt(success, error_message, attempts, delay)
+
+
+@dataclass
+class PushAttempt:
+    success_count: int = 0
+    failed_tokens: List[str] = field(default_factory=list)  # 영구 실패 (누적)
+    retry_tokens: List[str] = field(default_factory=list)  # 다음 시도에서 다시 보낼 토큰
+    results: DeliveryResults = field(default_factory=dict)  # 토큰별 최종 결과 (누적, push_deliveries에 기록)
+    attempts: List[Dict[str, Any]] = field(default_factory=list)
+    retry_delay: Optional[float] = None
+    error_message: Optional[str] = None
+
+    @property
+    def failure_count(self) -> int:
+        return len(self.failed_tokens)
+
+    @property
+    def status(self) -> str:
+        if self.retry_delay is not None:
+            return STATUS_RETRYING
+        if self.failure_count == 0:
+            return "success"
+        return "failed" if self.success_count == 0 else "partial"
+
+    def log_values(self) -> Dict[str, Any]:
+        """PushLog에 반영할 값 (재시도 대기 중이면 status/sent_at은 호출하는 쪽에서 설정)"""
+        values = dict(
+            success_count=self.success_count,
+            failure_count=self.failure_count,
+            error_message=self.error_message,
+            attempts=self.attempts,
+        )
+        if self.retry_delay is None:
+            values.update(status=self.status, sent_at=datetime.utcnow())
+        return values
+
+
+async def attempt_push(
+    firebase_project_id: str,
+    device_tokens: List[str],
+    title: str,
+    body: str,
+    data: Optional[dict] = None,
+    prior: Optional[PushAttempt] = None
+) -> PushAttempt:
+    """
+    푸시 1회 발송 시도. prior는 이전 시도까지의 누적 결과 (첫 시도는 None)이며,
+    재시도할 때는 prior.retry_tokens를 device_tokens로 넘긴다.
+    """
+    prior = prior or PushAttempt()
+    attempts = list(prior.attempts)
+    attempt = len(attempts) + 1
+    if attempt == 1:
+        retry_policy.record_first_attempt(firebase_project_id)
+
+    guard = outbound_limiter.guard(KIND_FCM, firebase_project_id)
+    error_message, retry_after = None, 0.0
+    try:
+        # FCM 할당량은 메시지(토큰) 단위이므로 토큰 수만큼 소비
+        await guard.acquire(cost=len(device_tokens))
+        success_count, _, failed_tokens = await PushService.send_push_async(
+            firebase_project_id=firebase_project_id,
+            device_tokens=device_tokens,
+            title=title,
+            body=body,
+            data=data
+        )
+        error_codes = getattr(failed_tokens, "error_codes", {})
+        guard.record(fcm_outcome(success_count, [error_codes.get(token) for token in failed_tokens]))
+    except DestinationUnavailableError as e:
+        # 발송하지 않았으므로 전체 토큰을 일시적 오류로 처리
+        success_count, failed_tokens = 0, list(device_tokens)
+        error_codes = {token: e.code for token in device_tokens}
+        error_message, retry_after = str(e), e.retry_after
+    except Exception as e:
+        # Firebase 앱 초기화 실패(Secret 없음 등)는 재시도해도 같은 결과이므로 영구 오류로 처리
+        logger.error(f"Push 발송 실패: {str(e)}")
+        success_count, failed_tokens, error_codes = 0, list(device_tokens), {}
+        error_message = str(e)
+        guard.record(OUTCOME_NEUTRAL)
+    except BaseException:
+        # 취소 등으로 결과 없이 중단: half-open 시험 발송 슬롯을 반납
+        guard.record(OUTCOME_NEUTRAL)
+        raise
+
+    transient_tokens = [
+        token for token in failed_tokens
+        if is_transient_fcm_error(error_codes.get(token)) or error_codes.get(token) in DEFERRED_CODES
+    ]
+    delay = retry_policy.next_delay(firebase_project_id, attempt, bool(transient_tokens))
+    if delay is not None:
+        delay = max(delay, retry_after)
+    retry_tokens = transient_tokens if delay is not None else []
+    retry_set = set(retry_tokens)
+    permanent_tokens = [token for token in failed_tokens if token not in retry_set]
+    failed_set = set(failed_tokens)
+    message_ids = getattr(failed_tokens, "message_ids", {})
+    results = dict(prior.results)
+    for token in device_tokens:
+        if token in retry_set:
+            results[token] = (STATUS_RETRYING, None, error_codes.get(token))
+        elif token in failed_set:
+            results[token] = (STATUS_FAILED, None, error_codes.get(token))
+        else:
+            results[token] = (STATUS_SUCCESS, message_ids.get(token), None)
+
+    attempts.append(attempt_record(
+        attempt,
+        delay,
+        tokens=len(device_tokens),
+        success_count=success_count,
+        failure_count=len(failed_tokens),
+        retry_tokens=len(retry_tokens),
+        codes=dict(Counter(error_codes.get(token) or "UNKNOWN" for token in failed_tokens)),
+        error=error_message
+    ))
+    return PushAttempt(
+        success_count=prior.success_count + success_count,
+        failed_tokens=list(prior.failed_tokens) + permanent_tokens,
+        retry_tokens=retry_tokens,
+        results=results,
+        attempts=attempts,
+        retry_delay=delay,
+        error_message=error_message
+    )
+
+
+retry_policy = RetryPolicy(
+    # 재시도는 예약 발송 스케줄러가 실행하므로 스케줄러가 꺼져 있으면 재시도하지 않음
+    enabled=settings.retry_enabled and settings.scheduler_enabled,
+    max_attempts=settings.retry_max_attempts,
+    base_delay=settings.retry_base_delay,
+    max_delay=settings.retry_max_delay,
+    budget=RetryBudget(
+        ratio=settings.retry_budget_ratio,
+        min_retries=settings.retry_budget_min,
+        window=settings.retry_budget_window
+    )
+)
@@ -0,0 +1,497 @@
+"""
+예약(지연) 발송 스케줄러
+
+발송 API에 send_at이 있으면 로그를 status='scheduled'로 저장하고, 이 스케줄러가 시각이 되면 발송한다.
+- (status, send_at) 인덱스로 lookahead 구간만 증분 로드하여 메모리 heap에 보관
+- 만기된 작업은 release_rate(초당 건수) 간격으로 내보내 정각에 몰린 예약이 한 번에 터지지 않도록 평탄화
+- 발송 전 조건부 UPDATE(status='scheduled' → pending/queued)로 선점하므로 재시작이나
+  여러 인스턴스가 같은 작업을 로드해도 한 번만 발송된다
+- 다른 인스턴스가 등록했지만 발송되지 않고 남은 작업은 orphan_grace가 지나면 다시 로드한다
+- outbox/큐 없이 직접 발송하는 작업은 선점 시 send_at을 선점 시각으로 바꾸고 결과 기록 후 payload를 삭제한다.
+  발송 중 인스턴스가 죽어 claim_timeout이 지나도록 pending으로 남은 작업은 다시 로드해 발송한다
+- 재시도 엔진이 일시적 오류로 재시도를 결정한 로그(status='retrying')도 같은 방식으로 send_at에 다시 발송한다
+- outbox를 사용하면 선점과 같은 트랜잭션으로 outbox 작업을 등록하고, 발송은 outbox 워커가 처리한다
+
+예약 이메일은 로그에 없는 SMTP 인증 정보/첨부파일을 job_payloads에 Fernet으로 암호화해 보관한다.
+푸시는 발송할 토큰을 push_deliveries에서 읽는다 (재시도는 status='retrying'인 토큰만 다시 발송).
+"""
+import asyncio
+import base64
+import heapq
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from cryptography.fernet import Fernet, InvalidToken
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal, EmailLog, JobPayload, PushDelivery, PushLog
+from email_queue import EmailJob, EmailQueueFullError, _apply_send_result, email_queue
+from log_writer import log_writer
+from outbox import STATUS_SENDING, add_outbox_job, outbox
+from push_deliveries import (
+    STATUS_FAILED, STATUS_PENDING, load_tokens_by_status, result_rows, save_delivery_rows
+)
+from retry_engine import STATUS_RETRYING, EmailAttempt, PushAttempt, attempt_email, attempt_push
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+KIND_EMAIL = "email"
+KIND_PUSH = "push"
+LOG_MODELS = {KIND_EMAIL: EmailLog, KIND_PUSH: PushLog}
+# 스케줄러가 로드하는 상태 (예약 발송, 재시도 대기)
+PENDING_STATUSES = ("scheduled", STATUS_RETRYING)
+
+SHUTDOWN_ERROR_MESSAGE = "서버 종료로 인해 발송되지 않았습니다."
+INTERRUPTED_ERROR_MESSAGE = "발송 중 작업이 중단되어 결과를 확인할 수 없습니다."
+PAYLOAD_KEY_REQUIRED_MESSAGE = (
+    "JOB_PAYLOAD_KEY가 설정되지 않았습니다. 예약 발송/outbox는 모든 인스턴스가 같은 키로 payload를 복호화해야 합니다."
+)
+
+
+def parse_send_at(value: Optional[str], now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    send_at(ISO 8601) → UTC naive datetime.
+    시간대가 없으면 UTC로 간주하고, 이미 지난 시각이면 None(즉시 발송)을 반환한다.
+    """
+    if not value:
+        return None
+    try:
+        send_at = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError("send_at은 ISO 8601 형식이어야 합니다. (예: 2026-01-01T09:00:00+09:00)")
+    if send_at.tzinfo is not None:
+        send_at = send_at.astimezone(timezone.utc).replace(tzinfo=None)
+    now = now or datetime.utcnow()
+    if send_at <= now:
+        return None
+    if not settings.scheduler_enabled:
+        raise ValueError("예약 발송이 비활성화되어 있습니다. (SCHEDULER_ENABLED)")
+    if send_at > now + timedelta(days=settings.scheduler_max_days):
+        raise ValueError(f"send_at은 최대 {settings.scheduler_max_days}일 이후까지 지정할 수 있습니다.")
+    return send_at
+
+
+def check_payload_key():
+    """local 외 환경에서 JOB_PAYLOAD_KEY 없이 payload를 저장하는 기능(예약 발송/outbox)을 켜면 시작하지 않음"""
+    if not settings.job_payload_key and settings.env_name != "local":
+        raise RuntimeError(PAYLOAD_KEY_REQUIRED_MESSAGE)
+
+
+@lru_cache(maxsize=1)
+def _fernet() -> Fernet:
+    key = settings.job_payload_key
+    if not key:
+        check_payload_key()
+        # local 개발 환경만 프로세스 한정 키 사용 (재시작 전에 등록된 예약 이메일은 복호화 불가)
+        logger.warning("JOB_PAYLOAD_KEY가 설정되지 않아 임시 키를 사용합니다. 재시작 시 예약 이메일이 실패합니다.")
+        key = Fernet.generate_key()
+    return Fernet(key)
+
+
+def encode_payload(send_kwargs: Dict[str, Any]) -> bytes:
+    """EmailService.send_email 인자 → 암호화된 payload (첨부 bytes는 base64 content로 저장)"""
+    data = dict(send_kwargs)
+    if data.get("attachments"):
+        data["attachments"] = [
+            {"filename": att["filename"], "content": base64.b64encode(att["data"]).decode("ascii")}
+            if "data" in att else att
+            for att in data["attachments"]
+        ]
+    return _fernet().encrypt(json.dumps(data).encode("utf-8"))
+
+
+def decode_payload(payload: bytes) -> Dict[str, Any]:
+    return json.loads(_fernet().decrypt(payload))
+
+
+async def schedule_retry(
+    db: AsyncSession,
+    kind: str,
+    log_id: str,
+    delay: float,
+    values: Dict[str, Any],
+    payload: Optional[Dict[str, Any]] = None
+) -> datetime:
+    """
+    일시적 오류로 실패한 발송을 delay초 뒤에 다시 시도하도록 예약 (status='retrying', send_at=다음 시도 시각).
+    payload(이메일: send_kwargs)는 job_payloads에 저장한다.
+    """
+    send_at = datetime.utcnow() + timedelta(seconds=delay)
+    model = LOG_MODELS[kind]
+    await db.execute(
+        update(model)
+        .where(model.id == log_id)
+        .values(status=STATUS_RETRYING, send_at=send_at, **values)
+    )
+    if payload is not None:
+        await db.merge(JobPayload(log_id=log_id, kind=kind, payload=encode_payload(payload)))
+    await db.commit()
+    send_scheduler.add(kind, log_id, send_at)
+    return send_at
+
+
+async def schedule_email_retry(log_id: str, send_kwargs: Dict[str, Any], attempt: EmailAttempt):
+    async with AsyncSessionLocal() as db:
+        await schedule_retry(
+            db, KIND_EMAIL, log_id, attempt.retry_delay,
+            {"error_message": attempt.error_message, "attempts": attempt.attempts},
+            send_kwargs
+        )
+
+
+async def _pop_payload(db: AsyncSession, log_id: str) -> Optional[JobPayload]:
+    """선점한 작업의 payload를 꺼내고 삭제 (SMTP 인증 정보를 오래 보관하지 않음)"""
+    row = await db.get(JobPayload, log_id)
+    if row is not None:
+        await db.delete(row)
+        await db.commit()
+    return row
+
+
+async def _decode_email_payload(log_id: str, payload: Optional[bytes]) -> Optional[Dict[str, Any]]:
+    """예약/outbox 이메일 payload 복호화 (실패하면 로그를 failed로 기록하고 None)"""
+    if payload is None:
+        await _apply_send_result(log_id, False, "예약 발송 정보를 찾을 수 없습니다.")
+        return None
+    try:
+        return decode_payload(payload)
+    except InvalidToken:
+        await _apply_send_result(log_id, False, "예약 발송 정보를 복호화할 수 없습니다. (JOB_PAYLOAD_KEY 확인)")
+        return None
+
+
+async def _send_email_now(log_id: str, send_kwargs: Dict[str, Any], attempts: Optional[List[Dict[str, Any]]]):
+    attempt = await attempt_email(send_kwargs, attempts)
+    if attempt.retry_delay is not None:
+        await schedule_email_retry(log_id, send_kwargs, attempt)
+    else:
+        await _apply_send_result(log_id, attempt.success, attempt.error_message, attempts=attempt.attempts)
+
+
+async def _send_scheduled_email(log_id: str):
+    async with AsyncSessionLocal() as db:
+        email_log = await db.get(EmailLog, log_id)
+        attempts = email_log.attempts if email_log is not None else None
+        row = await db.get(JobPayload, log_id)
+    send_kwargs = await _decode_email_payload(log_id, row.payload if row is not None else None)
+
+    if send_kwargs is not None and email_queue.running:
+        async with AsyncSessionLocal() as db:
+            await _pop_payload(db, log_id)
+        try:
+            email_queue.enqueue(EmailJob(log_id=log_id, send_kwargs=send_kwargs, attempts=attempts))
+        except EmailQueueFullError as e:
+            await _apply_send_result(log_id, False, str(e))
+        return
+    if send_kwargs is not None:
+        await _send_email_now(log_id, send_kwargs, attempts)
+    # 결과(또는 재시도 예약)를 기록한 뒤 payload 삭제: 발송 중 중단되면 복구 시 payload로 다시 발송
+    # (재시도 예약이면 schedule_retry가 같은 payload를 다시 저장했으므로 유지)
+    async with AsyncSessionLocal() as db:
+        email_log = await db.get(EmailLog, log_id)
+        if email_log is None or email_log.status != STATUS_RETRYING:
+            await _pop_payload(db, log_id)
+
+
+async def _send_push(push_log: PushLog, payload: Optional[bytes]):
+    """
+    푸시 발송: push_deliveries에서 아직 결과가 없는(pending) 토큰과 이전 시도에서 일시적 오류로 실패한(retrying) 토큰만 발송.
+    payload는 토큰을 job_payloads에 보관하던 이전 버전이 예약한 재시도 (payload의 토큰을 발송).
+    """
+    log_id = push_log.id
+    async with AsyncSessionLocal() as db:
+        tokens_by_status = await load_tokens_by_status(db, log_id)
+    if payload is not None:
+        token_list = decode_payload(payload)["tokens"]
+    else:
+        token_list = tokens_by_status.get(STATUS_PENDING, []) + tokens_by_status.get(STATUS_RETRYING, [])
+    prior = None
+    if push_log.attempts:
+        prior = PushAttempt(
+            success_count=push_log.success_count or 0,
+            failed_tokens=tokens_by_status.get(STATUS_FAILED, []),
+            attempts=list(push_log.attempts)
+        )
+
+    attempt = await attempt_push(
+        push_log.firebase_project_id, token_list, push_log.title, push_log.body, push_log.data, prior=prior
+    )
+    rows = result_rows(log_id, attempt.results)
+    if attempt.retry_delay is not None:
+        async with AsyncSessionLocal() as db:
+            await save_delivery_rows(db, rows)
+            await schedule_retry(db, KIND_PUSH, log_id, attempt.retry_delay, attempt.log_values())
+        return
+    await log_writer.update(PushLog, log_id, attempt.log_values(), durable=True, children=[(PushDelivery, rows)])
+
+
+async def _send_scheduled_push(log_id: str):
+    async with AsyncSessionLocal() as db:
+        push_log = await db.get(PushLog, log_id)
+        if push_log is None:
+            logger.error(f"예약 푸시 로그가 없습니다: {log_id}")
+            return
+        row = await _pop_payload(db, log_id)
+    await _send_push(push_log, row.payload if row is not None else None)
+
+
+async def run_outbox_job(kind: str, log_id: str, payload: Optional[bytes]):
+    """
+    outbox 작업 1건 발송. 발송 전 로그를 조건부 UPDATE(queued → sending)로 선점한다.
+    - 이전 실행이 결과를 기록한 뒤 작업 완료 전에 중단된 경우(로그가 이미 queued가 아님)에는 다시 발송하지 않는다.
+    - 이전 실행이 발송을 시작한 뒤(sending) lease를 잃은 경우 발송 여부를 알 수 없으므로 중복 발송 대신 실패 처리
+      (이전 워커가 살아 있어 나중에 결과를 기록하면 그 결과로 덮어씀)
+    """
+    model = LOG_MODELS[kind]
+    async with AsyncSessionLocal() as db:
+        log = await db.get(model, log_id)
+        if log is None:
+            logger.error(f"outbox 작업의 로그가 없습니다: {kind} {log_id}")
+            return
+        if log.status == STATUS_SENDING:
+            logger.warning(f"발송 중 중단된 outbox 작업: {kind} {log_id}")
+            await db.execute(
+                update(model)
+                .where(model.id == log_id, model.status == STATUS_SENDING)
+                .values(status="failed", error_message=INTERRUPTED_ERROR_MESSAGE)
+            )
+            await db.commit()
+            return
+        if log.status != "queued":
+            logger.info(f"이미 처리된 outbox 작업: {kind} {log_id} (status={log.status})")
+            return
+        result = await db.execute(
+            update(model).where(model.id == log_id, model.status == "queued").values(status=STATUS_SENDING)
+        )
+        await db.commit()
+    if result.rowcount != 1:
+        logger.info(f"다른 워커가 선점한 outbox 작업: {kind} {log_id}")
+        return
+
+    if kind == KIND_EMAIL:
+        send_kwargs = await _decode_email_payload(log_id, payload)
+        if send_kwargs is not None:
+            await _send_email_now(log_id, send_kwargs, log.attempts)
+    else:
+        await _send_push(log, payload)
+
+
+class SendScheduler:
+    """
+    - poll_interval: DB 증분 로드 주기(초)
+    - lookahead: 한 번에 메모리로 올리는 구간(초)
+    - release_rate: 만기 작업을 내보내는 초당 최대 건수
+    """
+
+    def __init__(
+        self,
+        poll_interval: float,
+        lookahead: float,
+        release_rate: float,
+        orphan_grace: float = 60.0,
+        claim_timeout: float = 600.0
+    ):
+        self.poll_interval = poll_interval
+        self.lookahead = timedelta(seconds=lookahead)
+        self.release_rate = max(release_rate, 0.1)
+        self.orphan_grace = timedelta(seconds=orphan_grace)
+        self.claim_timeout = timedelta(seconds=claim_timeout)
+        self._heap: List[Tuple[datetime, str, str]] = []
+        self._queued: Set[str] = set()
+        self._loaded_until: Optional[datetime] = None
+        self._next_load_at: Optional[datetime] = None
+        self._next_release = 0.0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._dispatching: Dict[asyncio.Task, Tuple[str, str]] = {}
+        self._loaded = 0
+        self._fired = 0
+        self._claim_lost = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="send-scheduler")
+        logger.info(f"예약 발송 스케줄러 시작: release_rate={self.release_rate}/s")
+
+    def add(self, kind: str, log_id: str, send_at: datetime):
+        """API에서 방금 등록한 예약을 lookahead 구간이면 바로 heap에 추가 (아니면 이후 DB 로드로 반영)"""
+        if not self.running or send_at >= datetime.utcnow() + self.lookahead:
+            return
+        self._push(send_at, kind, log_id)
+        self._wakeup.set()
+
+    def _push(self, send_at: datetime, kind: str, log_id: str):
+        if log_id in self._queued:
+            return
+        heapq.heappush(self._heap, (send_at, kind, log_id))
+        self._queued.add(log_id)
+
+    def _stale_claim(self, model, now: datetime):
+        """직접 발송으로 선점(pending, send_at=선점 시각)된 뒤 claim_timeout이 지나도록 결과가 없는 작업"""
+        return and_(model.status == "pending", model.send_at < now - self.claim_timeout)
+
+    async def load(self, now: Optional[datetime] = None) -> int:
+        """
+        send_at < now + lookahead인 예약을 로드 (이전 로드 구간 이후 + 오래 남아 있는 작업)
+        + 발송 중 중단되어 pending으로 남은 작업
+        """
+        now = now or datetime.utcnow()
+        horizon = now + self.lookahead
+        count = 0
+        async with AsyncSessionLocal() as db:
+            for kind, model in LOG_MODELS.items():
+                stmt = select(model.id, model.send_at).where(
+                    model.status.in_(PENDING_STATUSES), model.send_at < horizon
+                )
+                if self._loaded_until is not None:
+                    stmt = stmt.where(or_(
+                        model.send_at >= self._loaded_until,
+                        model.send_at < now - self.orphan_grace
+                    ))
+                for log_id, send_at in (await db.execute(stmt)).all():
+                    self._push(send_at, kind, log_id)
+                    count += 1
+                stale = select(model.id, model.send_at).where(self._stale_claim(model, now))
+                for log_id, send_at in (await db.execute(stale)).all():
+                    logger.warning(f"발송 중 중단된 예약 작업 복구: {kind} {log_id}")
+                    self._push(send_at, kind, log_id)
+                    count += 1
+        self._loaded_until = horizon
+        self._loaded += count
+        return count
+
+    async def claim(self, kind: str, log_id: str) -> bool:
+        """
+        조건부 UPDATE로 선점 (이미 다른 인스턴스/이전 실행이 선점했으면 False).
+        outbox를 사용하면 같은 트랜잭션에서 payload를 outbox 작업으로 옮긴다 (발송은 outbox 워커가 처리).
+        직접 발송(pending)이면 send_at을 선점 시각으로 바꿔, claim_timeout 후에도 pending이면 복구 대상이 된다.
+        """
+        model = LOG_MODELS[kind]
+        now = datetime.utcnow()
+        values: Dict[str, Any] = {}
+        if outbox.running or (kind == KIND_EMAIL and email_queue.running):
+            values["status"] = "queued"
+        else:
+            values.update(status="pending", send_at=now)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(model)
+                .where(model.id == log_id, or_(model.status.in_(PENDING_STATUSES), self._stale_claim(model, now)))
+                .values(**values)
+            )
+            if result.rowcount == 1 and outbox.running:
+                row = await db.get(JobPayload, log_id)
+                add_outbox_job(db, kind, log_id, row.payload if row is not None else None)
+                if row is not None:
+                    await db.delete(row)
+            await db.commit()
+        return result.rowcount == 1
+
+    async def fire(self, kind: str, log_id: str) -> Optional[asyncio.Task]:
+        if not await self.claim(kind, log_id):
+            self._claim_lost += 1
+            return None
+        self._fired += 1
+        if outbox.running:
+            outbox.notify()
+            return None
+        handler = _send_scheduled_email if kind == KIND_EMAIL else _send_scheduled_push
+        task = asyncio.create_task(handler(log_id), name=f"scheduled-{kind}-{log_id}")
+        self._dispatching[task] = (kind, log_id)
+        task.add_done_callback(lambda t: self._dispatching.pop(t, None))
+        return task
+
+    async def _pace(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self._next_release > now:
+            await asyncio.sleep(self._next_release - now)
+        self._next_release = max(now, self._next_release) + 1 / self.release_rate
+
+    async def _run(self):
+        while True:
+            try:
+                now = datetime.utcnow()
+                if self._next_load_at is None or now >= self._next_load_at:
+                    self._next_load_at = now + timedelta(seconds=self.poll_interval)
+                    await self.load(now)
+                while self._heap and self._heap[0][0] <= datetime.utcnow():
+                    _, kind, log_id = heapq.heappop(self._heap)
+                    self._queued.discard(log_id)
+                    await self._pace()
+                    await self.fire(kind, log_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"예약 발송 스케줄러 오류: {str(e)}")
+
+            now = datetime.utcnow()
+            wait = (self._next_load_at - now).total_seconds()
+            if self._heap:
+                wait = min(wait, (self._heap[0][0] - now).total_seconds())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(wait, 0.01))
+            except asyncio.TimeoutError:
+                pass
+
+    async def shutdown(self, timeout: float):
+        """새 작업 방출을 멈추고 진행 중인 발송을 timeout 동안 기다림 (scheduled 상태는 다음 시작 시 다시 로드)"""
+        if not self.running:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._heap.clear()
+        self._queued.clear()
+        self._loaded_until = None
+        self._next_load_at = None
+
+        dispatching = dict(self._dispatching)
+        if not dispatching:
+            return
+        _, pending = await asyncio.wait(dispatching.keys(), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for task in pending:
+            kind, log_id = dispatching[task]
+            model = LOG_MODELS[kind]
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(model)
+                    .where(model.id == log_id, model.status.in_(("pending", "queued")))
+                    .values(status="failed", error_message=SHUTDOWN_ERROR_MESSAGE)
+                )
+                await db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.scheduler_enabled,
+            "running": self.running,
+            "heap_size": len(self._heap),
+            "next_send_at": self._heap[0][0].isoformat() if self._heap else None,
+            "dispatching": len(self._dispatching),
+            "loaded": self._loaded,
+            "fired": self._fired,
+            "claim_lost": self._claim_lost,
+        }
+
+
+send_scheduler = SendScheduler(
+    poll_interval=settings.scheduler_poll_interval,
+    lookahead=settings.scheduler_lookahead,
+    release_rate=settings.scheduler_release_rate,
+    claim_timeout=settings.scheduler_claim_timeout
+)
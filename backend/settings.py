@@ -20,6 +20,121 @@ class Settings(BaseSettings):
     log_level: str = phase_config.LOG_LEVEL
     host: str = phase_config.HOST
     env_name: str = phase_config.ENV_NAME
+
+    # SMTP 커넥션 풀
+    smtp_pool_enabled: bool = phase_config.SMTP_POOL_ENABLED
+    smtp_pool_max_size: int = phase_config.SMTP_POOL_MAX_SIZE
+    smtp_pool_idle_timeout: float = phase_config.SMTP_POOL_IDLE_TIMEOUT
+
+    # 이메일 비동기 발송 큐 (활성화 시 발송 API는 202 반환 후 워커가 발송)
+    email_queue_enabled: bool = phase_config.EMAIL_QUEUE_ENABLED
+    email_queue_workers: int = phase_config.EMAIL_QUEUE_WORKERS
+    email_queue_max_size: int = phase_config.EMAIL_QUEUE_MAX_SIZE
+    email_queue_drain_timeout: float = phase_config.EMAIL_QUEUE_DRAIN_TIMEOUT
+
+    # 대량(batch) 이메일 발송
+    email_batch_max_recipients: int = phase_config.EMAIL_BATCH_MAX_RECIPIENTS
+    email_batch_sessions: int = phase_config.EMAIL_BATCH_SESSIONS
+    email_batch_flush_size: int = phase_config.EMAIL_BATCH_FLUSH_SIZE
+
+    # 예약 발송 (send_at): DB 증분 로드 주기/구간, 만기 작업 방출 속도(초당), 최대 예약 기간
+    scheduler_enabled: bool = phase_config.SCHEDULER_ENABLED
+    scheduler_poll_interval: float = phase_config.SCHEDULER_POLL_INTERVAL
+    scheduler_lookahead: float = phase_config.SCHEDULER_LOOKAHEAD
+    scheduler_release_rate: float = phase_config.SCHEDULER_RELEASE_RATE
+    scheduler_max_days: int = phase_config.SCHEDULER_MAX_DAYS
+    scheduler_claim_timeout: float = phase_config.SCHEDULER_CLAIM_TIMEOUT
+    job_payload_key: str = phase_config.JOB_PAYLOAD_KEY
+
+    # 발송 작업 outbox
+    outbox_enabled: bool = phase_config.OUTBOX_ENABLED
+    outbox_concurrency: int = phase_config.OUTBOX_CONCURRENCY
+    outbox_poll_interval: float = phase_config.OUTBOX_POLL_INTERVAL
+    outbox_lease_seconds: float = phase_config.OUTBOX_LEASE_SECONDS
+    outbox_max_claims: int = phase_config.OUTBOX_MAX_CLAIMS
+
+    # 발송 로그 write-behind
+    log_writer_enabled: bool = phase_config.LOG_WRITER_ENABLED
+    log_writer_batch_size: int = phase_config.LOG_WRITER_BATCH_SIZE
+    log_writer_flush_interval: float = phase_config.LOG_WRITER_FLUSH_INTERVAL
+    log_writer_max_pending: int = phase_config.LOG_WRITER_MAX_PENDING
+    log_writer_put_timeout: float = phase_config.LOG_WRITER_PUT_TIMEOUT
+
+    # 발송 로그 보관 기간 / 아카이브 (MySQL 월 파티션이 있으면 파티션 단위로 삭제)
+    log_retention_enabled: bool = phase_config.LOG_RETENTION_ENABLED
+    log_retention_email_days: int = phase_config.LOG_RETENTION_EMAIL_DAYS
+    log_retention_push_days: int = phase_config.LOG_RETENTION_PUSH_DAYS
+    log_retention_interval: float = phase_config.LOG_RETENTION_INTERVAL
+    log_retention_batch_size: int = phase_config.LOG_RETENTION_BATCH_SIZE
+    log_partition_premake_months: int = phase_config.LOG_PARTITION_PREMAKE_MONTHS
+    log_archive_enabled: bool = phase_config.LOG_ARCHIVE_ENABLED
+    log_archive_dir: str = phase_config.LOG_ARCHIVE_DIR
+    log_archive_s3_bucket: str = phase_config.LOG_ARCHIVE_S3_BUCKET
+    log_archive_s3_prefix: str = phase_config.LOG_ARCHIVE_S3_PREFIX
+
+    # 로그 ID 저장 형식 (char: CHAR(36), binary: BINARY(16)), API에는 항상 UUID 문자열
+    log_id_storage: str = phase_config.LOG_ID_STORAGE
+
+    # 발송 재시도 (일시적 오류만 지수 백오프+jitter로 재시도, 목적지별 재시도 예산)
+    retry_enabled: bool = phase_config.RETRY_ENABLED
+    retry_max_attempts: int = phase_config.RETRY_MAX_ATTEMPTS
+    retry_base_delay: float = phase_config.RETRY_BASE_DELAY
+    retry_max_delay: float = phase_config.RETRY_MAX_DELAY
+    retry_budget_ratio: float = phase_config.RETRY_BUDGET_RATIO
+    retry_budget_min: int = phase_config.RETRY_BUDGET_MIN
+    retry_budget_window: float = phase_config.RETRY_BUDGET_WINDOW
+
+    # 목적지별 발송 속도 제한 + circuit breaker
+    outbound_limit_enabled: bool = phase_config.OUTBOUND_LIMIT_ENABLED
+    smtp_rate_per_host: float = phase_config.SMTP_RATE_PER_HOST
+    smtp_burst_per_host: float = phase_config.SMTP_BURST_PER_HOST
+    fcm_rate_per_project: float = phase_config.FCM_RATE_PER_PROJECT
+    fcm_burst_per_project: float = phase_config.FCM_BURST_PER_PROJECT
+    outbound_min_rate_ratio: float = phase_config.OUTBOUND_MIN_RATE_RATIO
+    outbound_max_wait: float = phase_config.OUTBOUND_MAX_WAIT
+    circuit_failure_threshold: int = phase_config.CIRCUIT_FAILURE_THRESHOLD
+    circuit_reset_timeout: float = phase_config.CIRCUIT_RESET_TIMEOUT
+
+    # 발송 API Idempotency-Key (같은 키 재요청 시 재발송 없이 최초 응답 반환)
+    idempotency_ttl_hours: int = phase_config.IDEMPOTENCY_TTL_HOURS
+    idempotency_cache_size: int = phase_config.IDEMPOTENCY_CACHE_SIZE
+    idempotency_wait_timeout: float = phase_config.IDEMPOTENCY_WAIT_TIMEOUT
+    idempotency_lease_seconds: float = phase_config.IDEMPOTENCY_LEASE_SECONDS
+
+    # 발송 API rate limit
+    rate_limit_enabled: bool = phase_config.RATE_LIMIT_ENABLED
+    rate_limit_storage: str = phase_config.RATE_LIMIT_STORAGE
+    rate_limit_trusted_proxies: int = phase_config.RATE_LIMIT_TRUSTED_PROXIES
+    rate_limit_api_key_limits: str = phase_config.RATE_LIMIT_API_KEY_LIMITS
+
+    # FCM 푸시 발송 스레드 풀 (이벤트 루프 밖에서 send_each 실행)
+    push_executor_workers: int = phase_config.PUSH_EXECUTOR_WORKERS
+    push_project_concurrency: int = phase_config.PUSH_PROJECT_CONCURRENCY
+
+    # Firebase 앱(서비스 계정) 캐시: TTL 만료 전 백그라운드 갱신, LRU/idle 정리, Secret 없음은 negative 캐시
+    firebase_app_cache_ttl: float = phase_config.FIREBASE_APP_CACHE_TTL
+    firebase_app_cache_max_size: int = phase_config.FIREBASE_APP_CACHE_MAX_SIZE
+    firebase_app_idle_timeout: float = phase_config.FIREBASE_APP_IDLE_TIMEOUT
+    firebase_app_negative_ttl: float = phase_config.FIREBASE_APP_NEGATIVE_TTL
+    # 서버 시작 시 미리 초기화할 Firebase 프로젝트 ID (쉼표 구분)
+    firebase_prewarm_projects: str = phase_config.FIREBASE_PREWARM_PROJECTS
+
+    # FCM dead 토큰 레지스트리 (UNREGISTERED 등 영구 실패 토큰은 발송 전 제외)
+    push_token_prefilter_enabled: bool = phase_config.PUSH_TOKEN_PREFILTER_ENABLED
+    push_token_registry_refresh_interval: float = phase_config.PUSH_TOKEN_REGISTRY_REFRESH_INTERVAL
+
+    # 대량 푸시 fan-out (500개 단위 chunk 동시 발송)
+    push_fanout_max_tokens: int = phase_config.PUSH_FANOUT_MAX_TOKENS
+    push_fanout_max_file_mb: int = phase_config.PUSH_FANOUT_MAX_FILE_MB
+
+    # DB 커넥션 풀 (queue: 크기 제한 QueuePool, null: 요청마다 연결 생성/해제)
+    db_pool_mode: str = phase_config.DB_POOL_MODE
+    db_pool_size: int = phase_config.DB_POOL_SIZE
+    db_max_overflow: int = phase_config.DB_MAX_OVERFLOW
+    db_pool_recycle: int = phase_config.DB_POOL_RECYCLE
+    db_pool_pre_ping: bool = phase_config.DB_POOL_PRE_PING
+    db_pool_timeout: float = phase_config.DB_POOL_TIMEOUT
+    db_pool_idle_timeout: float = phase_config.DB_POOL_IDLE_TIMEOUT
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,300 @@
+"""
+SMTP 커넥션 풀
+
+(smtp_host, smtp_port, username, TLS 모드) 단위로 인증까지 끝난 SMTP 세션을 재사용한다.
+메시지마다 TCP/TLS 핸드셰이크 + login + quit을 반복하지 않도록 하기 위함.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from email.message import Message
+from typing import Any, Dict, List, Optional, Sequence
+
+import aiosmtplib
+
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SMTPPoolKey:
+    """풀 식별 키 (비밀번호는 원문 대신 해시만 보관)"""
+    host: str
+    port: int
+    username: Optional[str]
+    password_digest: Optional[str]
+    use_ssl: bool
+    verify_ssl: bool
+
+    @classmethod
+    def build(
+        cls,
+        host: str,
+        port: int,
+        username: Optional[str],
+        password: Optional[str],
+        use_ssl: bool,
+        verify_ssl: bool
+    ) -> "SMTPPoolKey":
+        # 같은 username이라도 비밀번호가 다르면 다른 풀을 사용 (잘못된 비밀번호로 인증된 세션 재사용 방지)
+        digest = hashlib.sha256(password.encode("utf-8")).hexdigest() if password else None
+        return cls(host, int(port), username, digest, bool(use_ssl), bool(verify_ssl))
+
+
+class _PooledConnection:
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+
+
+class SMTPConnectionPool:
+    """
+    단일 SMTP 목적지에 대한 비동기 커넥션 풀.
+    - max_size: 동시에 열 수 있는 최대 세션 수 (초과 요청은 대기)
+    - idle_timeout: 이 시간(초) 이상 쉬고 있던 세션은 재사용하지 않고 닫음
+    - 재사용 전 NOOP으로 세션 상태를 확인하고, 발송 중 SMTPServerDisconnected가 나면 재연결 후 1회 재시도
+    """
+
+    def __init__(
+        self,
+        key: SMTPPoolKey,
+        smtp_kwargs: Dict[str, Any],
+        username: Optional[str],
+        password: Optional[str],
+        max_size: int,
+        idle_timeout: float
+    ):
+        self.key = key
+        self._smtp_kwargs = smtp_kwargs
+        self._username = username
+        self._password = password
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self._idle: List[_PooledConnection] = []
+        self._in_use = 0
+        self._last_active = time.monotonic()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bind_loop(self):
+        """
+        asyncio 객체는 이벤트 루프에 묶여 있으므로 루프가 바뀌면 (테스트 클라이언트 등) 풀을 새로 구성
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._idle:
+                logger.debug(f"이벤트 루프 변경으로 SMTP 풀 초기화: {self.key.host}:{self.key.port}")
+            self._idle = []
+            self._in_use = 0
+            self._semaphore = asyncio.Semaphore(self.max_size)
+            self._loop = loop
+
+    async def _connect(self) -> _PooledConnection:
+        smtp = aiosmtplib.SMTP(**self._smtp_kwargs)
+        await smtp.connect()
+        try:
+            if self._username and self._password:
+                await smtp.login(self._username, self._password)
+        except Exception:
+            await self._close_smtp(smtp)
+            raise
+        logger.debug(f"SMTP 세션 생성: {self.key.host}:{self.key.port}")
+        return _PooledConnection(smtp)
+
+    @staticmethod
+    async def _close_smtp(smtp: aiosmtplib.SMTP):
+        try:
+            if smtp.is_connected:
+                await smtp.quit()
+        except Exception:
+            smtp.close()
+
+    async def _is_healthy(self, conn: _PooledConnection) -> bool:
+        if not conn.smtp.is_connected:
+            return False
+        try:
+            await conn.smtp.noop()
+            return True
+        except Exception as e:
+            logger.debug(f"SMTP 세션 NOOP 실패, 재연결 예정: {str(e)}")
+            return False
+
+    async def acquire(self) -> _PooledConnection:
+        self._bind_loop()
+        await self._semaphore.acquire()
+        # 연결 중인 세션도 사용 중으로 집계 (관리자가 빈 풀로 보고 정리하지 않도록)
+        self._in_use += 1
+        try:
+            while self._idle:
+                conn = self._idle.pop()
+                if time.monotonic() - conn.last_used_at > self.idle_timeout:
+                    await self._close_smtp(conn.smtp)
+                    continue
+                if await self._is_healthy(conn):
+                    return conn
+                conn.smtp.close()
+            return await self._connect()
+        except BaseException:
+            self._in_use -= 1
+            self._semaphore.release()
+            raise
+
+    async def release(self, conn: _PooledConnection, discard: bool = False):
+        if self._loop is not asyncio.get_running_loop():
+            # 다른 루프에서 만들어진 세션은 풀에 돌려보내지 않음
+            conn.smtp.close()
+            return
+        self._in_use -= 1
+        if discard or not conn.smtp.is_connected:
+            self._last_active = time.monotonic()
+            await self._close_smtp(conn.smtp)
+        else:
+            conn.last_used_at = self._last_active = time.monotonic()
+            self._idle.append(conn)
+        self._semaphore.release()
+
+    async def send_message(
+        self,
+        message: Message,
+        sender: Optional[str] = None,
+        recipients: Optional[Sequence[str]] = None
+    ):
+        """풀에서 세션을 빌려 메시지를 발송"""
+        conn = await self.acquire()
+        discard = False
+        try:
+            try:
+                return await conn.smtp.send_message(message, sender=sender, recipients=recipients)
+            except aiosmtplib.SMTPServerDisconnected:
+                # 서버가 idle 세션을 끊은 경우: 새 세션으로 1회 재시도
+                logger.info(f"SMTP 세션 끊김, 재연결 후 재시도: {self.key.host}:{self.key.port}")
+                conn.smtp.close()
+                conn = await self._connect()
+                return await conn.smtp.send_message(message, sender=sender, recipients=recipients)
+        except aiosmtplib.SMTPResponseException:
+            # 트랜잭션 단위 오류(수신자 거부 등)는 RSET 후 세션 재사용
+            try:
+                await conn.smtp.rset()
+            except Exception:
+                discard = True
+            raise
+        except Exception:
+            discard = True
+            raise
+        finally:
+            await self.release(conn, discard=discard)
+
+    async def reap_idle(self):
+        """idle_timeout을 넘긴 유휴 세션 정리"""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        now = time.monotonic()
+        alive = []
+        for conn in self._idle:
+            if now - conn.last_used_at > self.idle_timeout:
+                await self._close_smtp(conn.smtp)
+            else:
+                alive.append(conn)
+        self._idle = alive
+
+    def is_unused(self) -> bool:
+        """세션이 하나도 없고 idle_timeout 동안 사용되지 않은 풀"""
+        return (
+            not self._idle and self._in_use == 0
+            and time.monotonic() - self._last_active > self.idle_timeout
+        )
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        if self._loop is not asyncio.get_running_loop():
+            return
+        for conn in idle:
+            await self._close_smtp(conn.smtp)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "host": self.key.host,
+            "port": self.key.port,
+            "username": self.key.username,
+            "use_ssl": self.key.use_ssl,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "max_size": self.max_size,
+        }
+
+
+class SMTPPoolManager:
+    """목적지별 SMTPConnectionPool 레지스트리"""
+
+    def __init__(self, enabled: bool, max_size: int, idle_timeout: float):
+        self.enabled = enabled
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._pools: Dict[SMTPPoolKey, SMTPConnectionPool] = {}
+
+    def get_pool(
+        self,
+        key: SMTPPoolKey,
+        smtp_kwargs: Dict[str, Any],
+        username: Optional[str],
+        password: Optional[str]
+    ) -> SMTPConnectionPool:
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = SMTPConnectionPool(
+                key, smtp_kwargs, username, password,
+                max_size=self.max_size,
+                idle_timeout=self.idle_timeout
+            )
+            self._pools[key] = pool
+        return pool
+
+    async def send_message(
+        self,
+        key: SMTPPoolKey,
+        smtp_kwargs: Dict[str, Any],
+        username: Optional[str],
+        password: Optional[str],
+        message: Message,
+        sender: Optional[str] = None,
+        recipients: Optional[Sequence[str]] = None
+    ):
+        if not self.enabled:
+            # 풀 비활성화: 기존처럼 메시지마다 connect/login/quit
+            smtp = aiosmtplib.SMTP(**smtp_kwargs)
+            await smtp.connect()
+            try:
+                if username and password:
+                    await smtp.login(username, password)
+                return await smtp.send_message(message, sender=sender, recipients=recipients)
+            finally:
+                await SMTPConnectionPool._close_smtp(smtp)
+
+        pool = self.get_pool(key, smtp_kwargs, username, password)
+        return await pool.send_message(message, sender=sender, recipients=recipients)
+
+    async def reap_idle(self):
+        """모든 풀의 유휴 세션 정리 + 세션이 없는 풀은 레지스트리에서 제거 (목적지별 풀이 계속 쌓이지 않도록)"""
+        for key, pool in list(self._pools.items()):
+            await pool.reap_idle()
+            if pool.is_unused() and self._pools.get(key) is pool:
+                del self._pools[key]
+
+    async def close_all(self):
+        pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            await pool.close()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [pool.stats() for pool in self._pools.values()]
+
+
+smtp_pool_manager = SMTPPoolManager(
+    enabled=settings.smtp_pool_enabled,
+    max_size=settings.smtp_pool_max_size,
+    idle_timeout=settings.smtp_pool_idle_timeout
+)
@@ -0,0 +1,77 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contextlib import ExitStack
+from dataclasses import dataclass
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from database import Base
+from request_limiter import request_limiter
+
+
+@pytest.fixture(autouse=True)
+def reset_request_limiter():
+    """API 테스트들이 같은 클라이언트(testclient)로 요청하므로 테스트마다 rate limit 카운터 초기화"""
+    request_limiter.reset()
+    yield
+
+
+def make_log_id(index):
+    """LOG_ID_STORAGE=binary에서도 기록할 수 있는 UUID 형식 로그 ID"""
+    return f"00000000-0000-0000-0000-{index:012d}"
+
+
+@dataclass
+class TempDb:
+    engine: Engine
+    async_session_local: async_sessionmaker
+    session: Session  # 데이터 삽입/검증용 동기 세션
+
+
+@pytest.fixture
+def temp_db(tmp_path):
+    """
+    임시 SQLite DB 생성 함수 (여러 인스턴스가 공유하는 DB 역할).
+    modules의 AsyncSessionLocal, sync_modules의 SessionLocal, engine_modules의 engine을 대체하고
+    override_db면 API의 get_async_db도 대체한다. 테스트가 끝나면 모두 되돌린다.
+    """
+    with ExitStack() as stack:
+        def create(*modules, sync_modules=(), engine_modules=(), override_db=False, expire_on_commit=True):
+            dbPath = tmp_path / "test.db"
+            syncEngine = create_engine(f"sqlite:///{dbPath}")
+            stack.callback(syncEngine.dispose)
+            Base.metadata.create_all(bind=syncEngine)
+            asyncEngine = create_async_engine(f"sqlite+aiosqlite:///{dbPath}", poolclass=NullPool)
+            asyncSessionLocal = async_sessionmaker(asyncEngine, expire_on_commit=False)
+            syncSessionLocal = sessionmaker(bind=syncEngine, expire_on_commit=expire_on_commit)
+
+            for module in modules:
+                stack.enter_context(patch(f"{module}.AsyncSessionLocal", asyncSessionLocal))
+            for module in sync_modules:
+                stack.enter_context(patch(f"{module}.SessionLocal", syncSessionLocal))
+            for module in engine_modules:
+                stack.enter_context(patch(f"{module}.engine", syncEngine))
+            if override_db:
+                from database import get_async_db
+                from main import app
+
+                async def overrideGetAsyncDb():
+                    async with asyncSessionLocal() as db:
+                        yield db
+
+                app.dependency_overrides[get_async_db] = overrideGetAsyncDb
+                stack.callback(app.dependency_overrides.pop, get_async_db, None)
+
+            session = syncSessionLocal()
+            stack.callback(session.close)
+            return TempDb(engine=syncEngine, async_session_local=asyncSessionLocal, session=session)
+
+        yield create
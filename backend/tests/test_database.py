@@ -0,0 +1,68 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from unittest.mock import patch
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import NullPool
+
+import database
+from database import MeteredQueuePool, _build_engine_kwargs
+
+
+class TestEnginePoolConfig:
+    def test_queue_pool_by_default(self):
+        """기본 설정은 크기 제한 QueuePool"""
+        with patch.object(database.settings, "db_pool_mode", "queue"), \
+             patch.object(database.settings, "db_pool_size", 7), \
+             patch.object(database.settings, "db_max_overflow", 3):
+            kwargs = _build_engine_kwargs("mysql+pymysql://u:p@host/db", MeteredQueuePool)
+
+        assert kwargs["poolclass"] is MeteredQueuePool
+        assert kwargs["pool_size"] == 7
+        assert kwargs["max_overflow"] == 3
+        assert kwargs["pool_pre_ping"] is True
+        assert kwargs["connect_args"]["read_timeout"] == 30
+
+    def test_null_pool_opt_in(self):
+        """DB_POOL_MODE=null이면 NullPool 유지"""
+        with patch.object(database.settings, "db_pool_mode", "null"):
+            kwargs = _build_engine_kwargs("mysql+pymysql://u:p@host/db", MeteredQueuePool)
+
+        assert kwargs["poolclass"] is NullPool
+        assert "pool_size" not in kwargs
+
+    def test_mysql_only_connect_args(self):
+        """read/write timeout은 MySQL 드라이버에만 전달"""
+        kwargs = _build_engine_kwargs("sqlite:////tmp/test.db", MeteredQueuePool)
+        assert "connect_args" not in kwargs
+
+
+class TestPoolMetrics:
+    def test_stats_track_checkout(self):
+        """checkout 횟수와 사용 중 커넥션 수 기록"""
+        if not isinstance(database.engine.pool, MeteredQueuePool):
+            pytest.skip("DB_POOL_MODE=null")
+        before = database.get_pool_stats()["sync"]["checkouts"]
+        with database.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            stats = database.get_pool_stats()["sync"]
+            assert stats["in_use"] == 1
+        stats = database.get_pool_stats()["sync"]
+        assert stats["checkouts"] == before + 1
+        assert stats["in_use"] == 0
+        assert stats["idle"] >= 1
+
+    def test_reap_idle_connections(self):
+        """유휴 시간이 지나면 풀의 커넥션을 모두 반납"""
+        if not isinstance(database.engine.pool, MeteredQueuePool):
+            pytest.skip("DB_POOL_MODE=null")
+        with database.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        with patch.object(database.settings, "db_pool_idle_timeout", 3600):
+            assert database.reap_idle_connections() is False
+        with patch.object(database.settings, "db_pool_idle_timeout", 0):
+            assert database.reap_idle_connections() is True
+        assert database.get_pool_stats()["sync"]["idle"] == 0
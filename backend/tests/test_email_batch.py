@@ -0,0 +1,143 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from string import Template
+from unittest.mock import patch, AsyncMock
+import uuid
+
+import aiosmtplib
+import pytest
+
+from database import EmailLog
+from email_batch import (
+    BatchItem, BatchTemplateError, EmailBatchJob, EmailBatchRunner, create_batch_logs, render_template,
+    validate_templates
+)
+from outbound_limiter import KIND_SMTP, OUTCOME_FAILURE, STATE_HALF_OPEN, OutboundLimiter
+
+
+@pytest.fixture
+def batch_db(temp_db):
+    """임시 SQLite DB (비동기 세션 팩토리, 검증용 동기 세션)"""
+    db = temp_db("email_batch")
+    return db.async_session_local, db.session
+
+
+def make_job(recipients):
+    return EmailBatchJob(
+        batch_id=str(uuid.uuid4()),
+        sender_email="from@example.com",
+        smtp_host="smtp.example.com",
+        smtp_port=587,
+        smtp_username="user",
+        smtp_password="pw",
+        use_ssl=False,
+        verify_ssl=True,
+        subject_template="$name님 안내",
+        body_template="안녕하세요 ${name}님, 코드: $code",
+        items=[
+            BatchItem(log_id=str(uuid.uuid4()), email=email, variables=variables)
+            for email, variables in recipients
+        ]
+    )
+
+
+class TestRenderTemplate:
+    def test_render(self):
+        """수신자별 변수 치환"""
+        assert render_template(Template("$name님"), {"name": "홍길동"}) == "홍길동님"
+
+    def test_missing_variable(self):
+        """변수 누락 시 BatchTemplateError"""
+        with pytest.raises(BatchTemplateError):
+            render_template(Template("$name님"), {})
+
+    def test_validate_before_send(self):
+        """잘못된 placeholder와 수신자별 누락 변수는 로그 생성 전에 검출"""
+        job = make_job([("a@example.com", {"name": "A", "code": "1"}), ("b@example.com", {"name": "B"})])
+        with pytest.raises(BatchTemplateError, match="b@example.com"):
+            validate_templates({"subject": job.subject_template, "body": job.body_template}, job.items)
+        with pytest.raises(BatchTemplateError, match="body"):
+            validate_templates({"body": "가격 $ 10"}, job.items)
+        validate_templates({"subject": job.subject_template, "body": "가격 $$10"}, job.items[:1])
+
+
+class TestEmailBatchRunner:
+    @pytest.mark.asyncio
+    async def test_sends_personalized_messages(self, batch_db):
+        """수신자마다 별도 메시지 발송, 결과는 bulk UPDATE로 반영"""
+        asyncSessionLocal, session = batch_db
+        job = make_job([
+            ("a@example.com", {"name": "A", "code": "1"}),
+            ("b@example.com", {"name": "B", "code": "2"}),
+            ("c@example.com", {"name": "C"}),  # code 누락 → 실패
+        ])
+        async with asyncSessionLocal() as db:
+            await create_batch_logs(db, job, chunk_size=2)
+
+        runner = EmailBatchRunner(sessions=2, flush_size=1)
+        with patch("email_batch.smtp_pool_manager.send_message", new_callable=AsyncMock) as mockSend:
+            await runner.run(job)
+
+        assert mockSend.await_count == 2
+        sent = {call.kwargs["recipients"][0]: call.args[4] for call in mockSend.await_args_list}
+        assert sent["a@example.com"]["To"] == "a@example.com"
+        assert sent["a@example.com"]["Subject"] == "A님 안내"
+        assert sent["b@example.com"].get_payload()[0].get_payload(decode=True).decode() == "안녕하세요 B님, 코드: 2"
+
+        logs = {log.recipient_emails[0]: log for log in session.query(EmailLog).filter_by(batch_id=job.batch_id)}
+        assert logs["a@example.com"].status == "success"
+        assert logs["a@example.com"].sent_at is not None
+        assert logs["c@example.com"].status == "failed"
+        assert "code" in logs["c@example.com"].error_message
+        assert runner.stats()["sent"] == 2
+        assert runner.stats()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_smtp_error_marks_failed(self, batch_db):
+        """SMTP 오류는 해당 수신자만 실패 처리"""
+        asyncSessionLocal, session = batch_db
+        job = make_job([
+            ("a@example.com", {"name": "A", "code": "1"}),
+            ("b@example.com", {"name": "B", "code": "2"}),
+        ])
+        async with asyncSessionLocal() as db:
+            await create_batch_logs(db, job, chunk_size=100)
+
+        async def fakeSend(*args, recipients=None, **kwargs):
+            if recipients == ["b@example.com"]:
+                raise aiosmtplib.SMTPRecipientsRefused([])
+
+        runner = EmailBatchRunner(sessions=4, flush_size=100)
+        with patch("email_batch.smtp_pool_manager.send_message", side_effect=fakeSend):
+            await runner.run(job)
+
+        statuses = {log.recipient_emails[0]: log.status for log in session.query(EmailLog).filter_by(batch_id=job.batch_id)}
+        assert statuses == {"a@example.com": "success", "b@example.com": "failed"}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_releases_half_open(self, batch_db):
+        """시험 발송 중 배치가 취소되면 다음 발송이 바로 다시 시험할 수 있음"""
+        asyncSessionLocal, session = batch_db
+        job = make_job([("a@example.com", {"name": "A", "code": "1"})])
+        async with asyncSessionLocal() as db:
+            await create_batch_logs(db, job, chunk_size=100)
+
+        limiter = OutboundLimiter(
+            enabled=True, limits={KIND_SMTP: (10, 10)}, min_rate_ratio=0.1, max_wait=5,
+            failure_threshold=1, reset_timeout=30
+        )
+        guard = limiter.guard(KIND_SMTP, job.smtp_host)
+        guard.record(OUTCOME_FAILURE)
+        guard.breaker._opened_at -= 30  # reset_timeout 경과
+
+        runner = EmailBatchRunner(sessions=1, flush_size=100)
+        with patch("email_batch.outbound_limiter", limiter), \
+             patch("email_batch.smtp_pool_manager.send_message", new=AsyncMock(side_effect=asyncio.CancelledError)):
+            with pytest.raises(asyncio.CancelledError):
+                await runner.run(job)
+
+        assert guard.breaker.state == STATE_HALF_OPEN
+        assert guard.breaker.check() is None
@@ -0,0 +1,95 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from unittest.mock import ANY, patch, AsyncMock
+import pytest
+
+from email_queue import EmailSendQueue, EmailJob, EmailQueueFullError
+
+
+class TestEmailSendQueue:
+    @pytest.mark.asyncio
+    async def test_worker_sends_and_records_result(self):
+        """워커가 발송 후 로그에 결과 반영"""
+        queue = EmailSendQueue(worker_count=2, max_size=10)
+        with patch("retry_engine.EmailService.send_email", new=AsyncMock(return_value=(True, None))) as mockSend, \
+             patch("email_queue._apply_send_result", new_callable=AsyncMock) as mockApply:
+            await queue.start()
+            queue.enqueue(EmailJob(log_id="log-1", send_kwargs={"subject": "a"}))
+            queue.enqueue(EmailJob(log_id="log-2", send_kwargs={"subject": "b"}))
+            await queue.shutdown(timeout=5)
+
+        assert mockSend.await_count == 2
+        mockApply.assert_any_call("log-1", True, None, attempts=ANY)
+        mockApply.assert_any_call("log-2", True, None, attempts=ANY)
+        stats = queue.stats()
+        assert stats["processed"] == 2
+        assert stats["failed"] == 0
+        assert stats["running"] is False
+
+    @pytest.mark.asyncio
+    async def test_send_exception_marks_failed(self):
+        """발송 중 예외 → 실패로 기록"""
+        queue = EmailSendQueue(worker_count=1, max_size=10)
+        with patch("retry_engine.EmailService.send_email", new=AsyncMock(side_effect=Exception("boom"))), \
+             patch("email_queue._apply_send_result", new_callable=AsyncMock) as mockApply:
+            await queue.start()
+            queue.enqueue(EmailJob(log_id="log-1", send_kwargs={}))
+            await queue.shutdown(timeout=5)
+
+        mockApply.assert_called_once_with("log-1", False, "boom", attempts=ANY)
+        assert queue.stats()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_full(self):
+        """대기열 초과 → EmailQueueFullError"""
+        queue = EmailSendQueue(worker_count=1, max_size=1)
+        blocker = asyncio.Event()
+
+        async def slowSend(**kwargs):
+            await blocker.wait()
+            return True, None
+
+        with patch("retry_engine.EmailService.send_email", new=slowSend), \
+             patch("email_queue._apply_send_result", new_callable=AsyncMock):
+            await queue.start()
+            queue.enqueue(EmailJob(log_id="log-1", send_kwargs={}))
+            await asyncio.sleep(0)  # 워커가 첫 작업을 가져가도록 양보
+            queue.enqueue(EmailJob(log_id="log-2", send_kwargs={}))
+            with pytest.raises(EmailQueueFullError):
+                queue.enqueue(EmailJob(log_id="log-3", send_kwargs={}))
+            assert queue.stats()["queue_depth"] == 1
+            assert queue.stats()["busy_workers"] == 1
+            blocker.set()
+            await queue.shutdown(timeout=5)
+
+    @pytest.mark.asyncio
+    async def test_shutdown_timeout_fails_remaining_jobs(self):
+        """drain 시간 초과 시 발송 중이던 작업과 남은 작업 모두 실패 처리 (queued로 남지 않음)"""
+        queue = EmailSendQueue(worker_count=1, max_size=10)
+        blocker = asyncio.Event()
+
+        async def slowSend(**kwargs):
+            await blocker.wait()
+            return True, None
+
+        with patch("retry_engine.EmailService.send_email", new=slowSend), \
+             patch("email_queue._apply_send_result", new_callable=AsyncMock) as mockApply:
+            await queue.start()
+            queue.enqueue(EmailJob(log_id="log-1", send_kwargs={}))
+            await asyncio.sleep(0)
+            queue.enqueue(EmailJob(log_id="log-2", send_kwargs={}))
+            await queue.shutdown(timeout=0.05)
+
+        assert [(call.args[0], call.args[1]) for call in mockApply.call_args_list] == [
+            ("log-1", False), ("log-2", False)
+        ]
+        assert mockApply.call_args_list[0].args[2] == "서버 종료로 발송이 중단되었습니다."
+
+    def test_enqueue_before_start(self):
+        """시작 전 enqueue → RuntimeError"""
+        queue = EmailSendQueue(worker_count=1, max_size=1)
+        with pytest.raises(RuntimeError):
+            queue.enqueue(EmailJob(log_id="log-1", send_kwargs={}))
@@ -1,5 +1,5 @@
 import base64
-from email_service import EmailService
+from email_service import EmailService, attachment_size, build_attachment_part, get_tls_context, _certifi_bundle
 
 
 class TestEmailService:
@@ -40,3 +40,57 @@ class TestEmailService:
         assert error_msg == ""
         assert total_size > 0
 
+
+    def test_validate_attachments_raw_bytes(self):
+        """원본 bytes 첨부파일은 디코딩 없이 길이로 크기 계산"""
+        attachments = [
+            {'filename': 'file1.txt', 'data': b'12345'},
+            {'filename': 'file2.txt', 'content': base64.b64encode(b'1234').decode()}
+        ]
+        is_valid, error_msg, total_size = EmailService.validate_attachments(attachments)
+        assert is_valid is True
+        assert total_size == 9
+
+    def test_validate_attachments_invalid_base64(self):
+        """base64가 아닌 content는 오류"""
+        attachments = [{'filename': 'file1.txt', 'content': '@@not-base64@@'}]
+        is_valid, error_msg, total_size = EmailService.validate_attachments(attachments)
+        assert is_valid is False
+        assert "첨부파일 처리 중 오류" in error_msg
+
+
+class TestAttachmentPart:
+    def test_raw_bytes_encoded_once(self):
+        """원본 bytes → base64 MIME 파트 (디코딩하면 원본과 동일)"""
+        data = bytes(range(256)) * 10
+        part = build_attachment_part({'filename': 'a.pdf', 'data': data})
+        assert part['Content-Transfer-Encoding'] == 'base64'
+        assert part.get_payload(decode=True) == data
+        assert all(len(line) <= 76 for line in part.get_payload().splitlines())
+
+    def test_base64_content_not_reencoded(self):
+        """base64 입력은 디코딩 없이 76자 줄바꿈만 적용"""
+        data = b'x' * 1000
+        content = base64.b64encode(data).decode()
+        part = build_attachment_part({'filename': 'a.txt', 'content': content})
+        assert part.get_payload().replace('\n', '') == content
+        assert part.get_payload(decode=True) == data
+        assert part.get_filename() == 'a.txt'
+
+    def test_attachment_size_with_padding_and_newlines(self):
+        """패딩/개행이 포함된 base64 문자열 크기 계산"""
+        for length in (1, 2, 3, 100):
+            content = base64.encodebytes(b'y' * length).decode()
+            assert attachment_size({'filename': 'a', 'content': content}) == length
+
+
+class TestTlsContext:
+    def test_context_cached_per_mode(self):
+        """같은 (검증 여부, CA 번들)이면 동일한 SSLContext 재사용"""
+        import ssl
+        bundle = _certifi_bundle()
+        assert get_tls_context(True, bundle) is get_tls_context(True, bundle)
+        insecure = get_tls_context(False)
+        assert insecure is not get_tls_context(True, bundle)
+        assert insecure.verify_mode == ssl.CERT_NONE
+        assert insecure.check_hostname is False
@@ -0,0 +1,202 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from firebase_app_cache import FirebaseAppCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFirebaseAppCache:
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.patcher = patch("firebase_app_cache.time.monotonic", self.clock)
+        self.patcher.start()
+        self.loaded = []
+        self.disposed = []
+
+    def teardown_method(self):
+        self.patcher.stop()
+
+    def _make_cache(self, loader=None, **kwargs):
+        options = dict(ttl=100, max_size=10, idle_timeout=1000, negative_ttl=30, dispose_grace=10)
+        options.update(kwargs)
+        return FirebaseAppCache(
+            loader=loader or self._loader,
+            disposer=self.disposed.append,
+            **options
+        )
+
+    def _loader(self, key, fingerprint):
+        self.loaded.append((key, fingerprint))
+        return f"app-{key}-{len(self.loaded)}", "fp-1"
+
+    def test_get_loads_once_and_caches(self):
+        """첫 조회만 loader 호출"""
+        cache = self._make_cache()
+
+        assert cache.get("p1") == "app-p1-1"
+        assert cache.get("p1") == "app-p1-1"
+        assert self.loaded == [("p1", None)]
+        assert "p1" in cache
+
+    def test_expired_entry_reloads_with_fingerprint(self):
+        """TTL 만료 후 재로드 시 현재 fingerprint 전달, 변경 없으면 기존 앱 유지"""
+        loader = MagicMock(side_effect=[("app-v1", "fp-1"), None])
+        cache = self._make_cache(loader=loader)
+        cache.get("p1")
+
+        self.clock.now += 101
+        assert "p1" not in cache
+        assert cache.get("p1") == "app-v1"
+
+        loader.assert_called_with("p1", "fp-1")
+        assert self.disposed == []
+
+    def test_rotated_key_retires_old_app_after_grace(self):
+        """키 교체 시 새 앱으로 바꾸고 기존 앱은 grace 이후 정리"""
+        loader = MagicMock(side_effect=[("app-v1", "fp-1"), ("app-v2", "fp-2")])
+        cache = self._make_cache(loader=loader)
+        cache.get("p1")
+
+        self.clock.now += 101
+        assert cache.get("p1") == "app-v2"
+        assert self.disposed == []
+
+        self.clock.now += 11
+        cache.get("p1")
+        assert self.disposed == ["app-v1"]
+
+    def test_refresh_ahead_in_background(self):
+        """TTL의 refresh_ahead 비율이 지나면 기존 앱을 반환하고 백그라운드에서 갱신"""
+        refreshed = threading.Event()
+
+        def loader(key, fingerprint):
+            if fingerprint is None:
+                return "app-v1", "fp-1"
+            refreshed.set()
+            return "app-v2", "fp-2"
+
+        cache = self._make_cache(loader=loader)
+        cache.get("p1")
+
+        self.clock.now += 85
+        assert cache.get("p1") == "app-v1"
+        assert refreshed.wait(timeout=5)
+        for _ in range(100):
+            if cache["p1"] == "app-v2":
+                break
+            threading.Event().wait(0.01)
+        assert cache["p1"] == "app-v2"
+
+    def test_concurrent_loads_single_flight(self):
+        """동시 첫 요청은 loader를 한 번만 호출하고 같은 앱을 공유"""
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def loader(key, fingerprint):
+            calls.append(key)
+            started.set()
+            release.wait(timeout=5)
+            return "app", "fp"
+
+        cache = self._make_cache(loader=loader)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get("p1"))) for _ in range(5)]
+        threads[0].start()
+        started.wait(timeout=5)
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert calls == ["p1"]
+        assert results == ["app"] * 5
+
+    def test_missing_secret_negative_cached(self):
+        """ValueError(Secret 없음)는 negative_ttl 동안 loader 재호출 없이 같은 오류"""
+        loader = MagicMock(side_effect=ValueError("Secret 'x'을 찾을 수 없습니다."))
+        cache = self._make_cache(loader=loader)
+
+        for _ in range(3):
+            with pytest.raises(ValueError, match="찾을 수 없습니다"):
+                cache.get("typo-project")
+        assert loader.call_count == 1
+
+        self.clock.now += 31
+        with pytest.raises(ValueError):
+            cache.get("typo-project")
+        assert loader.call_count == 2
+
+    def test_transient_error_not_cached(self):
+        """AWS 일시 오류(RuntimeError)는 negative 캐시하지 않음"""
+        loader = MagicMock(side_effect=[RuntimeError("throttled"), ("app", "fp")])
+        cache = self._make_cache(loader=loader)
+
+        with pytest.raises(RuntimeError):
+            cache.get("p1")
+        assert cache.get("p1") == "app"
+
+    def test_lru_eviction_disposes_after_grace(self):
+        """max_size 초과 시 가장 오래 사용되지 않은 앱 제거"""
+        cache = self._make_cache(max_size=2)
+        cache.get("p1")
+        cache.get("p2")
+        cache.get("p1")
+        cache.get("p3")
+
+        assert "p2" not in cache
+        assert "p1" in cache and "p3" in cache
+
+        self.clock.now += 11
+        cache.get("p1")
+        assert self.disposed == ["app-p2-2"]
+
+    def test_idle_app_disposed(self):
+        """idle_timeout 동안 사용되지 않은 앱 정리"""
+        cache = self._make_cache(ttl=10000, idle_timeout=50)
+        cache.get("p1")
+
+        self.clock.now += 51
+        cache.get("p2")
+        assert "p1" not in cache
+
+        self.clock.now += 11
+        cache.get("p2")
+        assert self.disposed == ["app-p1-1"]
+
+    def test_sweep_without_get(self):
+        """발송이 끊긴 프로젝트도 주기적 sweep으로 정리"""
+        cache = self._make_cache(ttl=10000, idle_timeout=50)
+        cache.get("p1")
+
+        self.clock.now += 51
+        assert cache.sweep() == 0
+        assert "p1" not in cache
+        self.clock.now += 11
+        assert cache.sweep() == 1
+        assert self.disposed == ["app-p1-1"]
+
+    def test_close_disposes_all(self):
+        """close 시 캐시된 앱 모두 정리"""
+        cache = self._make_cache()
+        cache.get("p1")
+        cache.get("p2")
+
+        cache.close()
+
+        assert sorted(self.disposed) == ["app-p1-1", "app-p2-2"]
+        assert cache.stats()["cached"] == 0
@@ -0,0 +1,275 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+import idempotency
+import main
+from database import IdempotencyKey, PushLog
+from idempotency import IdempotencyError, IdempotencyStore, request_fingerprint
+from retry_engine import EmailAttempt
+from tests.conftest import make_log_id
+
+
+@pytest.fixture
+def idem_db(temp_db):
+    """임시 SQLite DB로 idempotency 저장소와 get_async_db를 대체"""
+    idempotency.idempotency_store.clear()
+    yield temp_db("idempotency", override_db=True).session
+    idempotency.idempotency_store.clear()
+
+
+def make_store(**overrides):
+    options = dict(cache_size=100, ttl=timedelta(hours=1), wait_timeout=2, lease=timedelta(minutes=5), poll_interval=0.01)
+    options.update(overrides)
+    return IdempotencyStore(**options)
+
+
+class TestIdempotencyStore:
+    @pytest.mark.asyncio
+    async def test_first_request_runs_and_replays(self, idem_db):
+        """같은 키 두 번째 요청은 handler 실행 없이 저장된 응답 반환"""
+        store = make_store()
+        calls = []
+
+        async def handler():
+            calls.append(1)
+            return {"log_id": make_log_id(1), "status": "success"}
+
+        first = await store.run("push_send", "key-1", "hash-a", handler)
+        second = await store.run("push_send", "key-1", "hash-a", handler)
+
+        assert first == {"log_id": make_log_id(1), "status": "success"}
+        assert json.loads(second.body) == first
+        assert second.headers["Idempotent-Replayed"] == "true"
+        assert calls == [1]
+        row = idem_db.scalars(select(IdempotencyKey)).one()
+        assert row.status == "completed"
+        assert row.log_id == make_log_id(1)
+
+    @pytest.mark.asyncio
+    async def test_replay_from_db_after_restart(self, idem_db):
+        """메모리 캐시가 비어도 DB에 완료된 응답이 있으면 재사용"""
+        store = make_store()
+
+        async def handler():
+            return {"logId": make_log_id(2)}
+
+        await store.run("push_send", "key-2", "hash-a", handler)
+        restarted = make_store()
+        replay = await restarted.run("push_send", "key-2", "hash-a", handler)
+
+        assert json.loads(replay.body) == {"logId": make_log_id(2)}
+
+    @pytest.mark.asyncio
+    async def test_different_request_same_key(self, idem_db):
+        """같은 키로 다른 요청 → 422"""
+        store = make_store()
+
+        async def handler():
+            return {"log_id": make_log_id(3)}
+
+        await store.run("email_send", "key-3", "hash-a", handler)
+        with pytest.raises(IdempotencyError) as excInfo:
+            await store.run("email_send", "key-3", "hash-b", handler)
+        assert excInfo.value.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicate_waits_for_first(self, idem_db):
+        """처리 중인 키의 중복 요청은 최초 요청 결과를 기다림"""
+        store = make_store()
+        release = asyncio.Event()
+        calls = []
+
+        async def handler():
+            calls.append(1)
+            await release.wait()
+            return {"log_id": make_log_id(4)}
+
+        first = asyncio.create_task(store.run("push_send", "key-4", "hash-a", handler))
+        await asyncio.sleep(0.05)
+        second = asyncio.create_task(store.run("push_send", "key-4", "hash-a", handler))
+        await asyncio.sleep(0.05)
+        assert not second.done()
+        release.set()
+
+        assert await first == {"log_id": make_log_id(4)}
+        assert json.loads((await second).body) == {"log_id": make_log_id(4)}
+        assert calls == [1]
+
+    @pytest.mark.asyncio
+    async def test_in_progress_on_other_instance_times_out(self, idem_db):
+        """다른 인스턴스가 처리 중인 키는 wait_timeout 후 409"""
+        other = make_store()
+        claim = await other.acquire("push_send", "key-5", "hash-a")
+        other._inflight.clear()
+
+        store = make_store(wait_timeout=0.1)
+        with pytest.raises(IdempotencyError) as excInfo:
+            await store.acquire("push_send", "key-5", "hash-a")
+        assert excInfo.value.status_code == 409
+
+        await other.complete(claim, 200, {"log_id": make_log_id(5)})
+        replay = await store.acquire("push_send", "key-5", "hash-a")
+        assert replay.replay.body == {"log_id": make_log_id(5)}
+
+    @pytest.mark.asyncio
+    async def test_failed_handler_releases_key(self, idem_db):
+        """handler 예외 시 키 해제 → 같은 키로 재시도 가능"""
+        store = make_store()
+
+        async def failing():
+            raise ValueError("검증 실패")
+
+        async def handler():
+            return {"log_id": make_log_id(6)}
+
+        with pytest.raises(ValueError):
+            await store.run("email_send", "key-6", "hash-a", failing)
+        assert idem_db.scalars(select(IdempotencyKey)).all() == []
+        assert await store.run("email_send", "key-6", "hash-a", handler) == {"log_id": make_log_id(6)}
+
+    @pytest.mark.asyncio
+    async def test_expired_key_reusable(self, idem_db):
+        """만료된 키는 새 요청으로 처리"""
+        idem_db.add(IdempotencyKey(
+            scope="push_send",
+            idempotency_key="key-7",
+            request_hash="hash-old",
+            status="completed",
+            status_code=200,
+            response_body={"log_id": make_log_id(70)},
+            expires_at=datetime.utcnow() - timedelta(minutes=1)
+        ))
+        idem_db.commit()
+        store = make_store()
+
+        async def handler():
+            return {"log_id": make_log_id(71)}
+
+        assert await store.run("push_send", "key-7", "hash-new", handler) == {"log_id": make_log_id(71)}
+
+    @pytest.mark.asyncio
+    async def test_stale_in_progress_taken_over(self, idem_db):
+        """처리하던 인스턴스가 죽어 lease가 지난 키는 재시도가 인수, 늦게 끝난 원래 요청은 덮어쓰지 않음"""
+        dead = make_store(lease=timedelta(seconds=-1))
+        staleClaim = await dead.acquire("email_send", "key-10", "hash-a")
+        dead._inflight.clear()
+
+        store = make_store()
+        claim = await store.acquire("email_send", "key-10", "hash-a")
+        assert claim.replay is None
+        assert store.stats()["taken_over"] == 1
+        row = idem_db.scalars(select(IdempotencyKey)).one()
+        assert row.status == "in_progress"
+        assert row.expires_at > datetime.utcnow() + timedelta(minutes=4)
+
+        await dead.release(staleClaim)
+        await dead.complete(staleClaim, 200, {"log_id": make_log_id(100)})
+        await store.complete(claim, 200, {"log_id": make_log_id(101)})
+        idem_db.expire_all()
+        row = idem_db.scalars(select(IdempotencyKey)).one()
+        assert (row.status, row.response_body) == ("completed", {"log_id": make_log_id(101)})
+
+    @pytest.mark.asyncio
+    async def test_waiter_takes_over_when_lease_expires(self, idem_db):
+        """다른 인스턴스 처리 중 lease가 지나면 대기하던 요청이 409 없이 인수"""
+        other = make_store(lease=timedelta(seconds=1))
+        await other.acquire("push_send", "key-11", "hash-a")
+        other._inflight.clear()
+
+        store = make_store(wait_timeout=5)
+        claim = await store.acquire("push_send", "key-11", "hash-a")
+        assert claim.replay is None
+        assert store.stats()["taken_over"] == 1
+
+    def test_request_fingerprint_order_independent(self):
+        """파라미터 순서와 무관한 해시"""
+        assert request_fingerprint(a=1, b="x") == request_fingerprint(b="x", a=1)
+        assert request_fingerprint(a=1) != request_fingerprint(a=2)
+
+
+class TestIdempotentSendRoutes:
+    def test_push_send_retry_not_resent(self, idem_db):
+        """같은 Idempotency-Key로 재시도하면 FCM 재발송 없이 같은 logId 반환"""
+        form = {
+            "firebase_project_id": "test-project",
+            "device_tokens": json.dumps(["token_a"]),
+            "title": "제목",
+            "body": "내용"
+        }
+        headers = {"Idempotency-Key": "retry-1"}
+        with patch.object(main.limiter, "enabled", False), \
+             patch("main.PushService.send_push", return_value=(1, 0, [])) as mockSend:
+            client = TestClient(main.app)
+            first = client.post("/api/v1/push/send", data=form, headers=headers)
+            second = client.post("/api/v1/push/send", data=form, headers=headers)
+            changed = client.post("/api/v1/push/send", data={**form, "title": "다른 제목"}, headers=headers)
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert second.json() == first.json()
+        assert second.headers["Idempotent-Replayed"] == "true"
+        assert mockSend.call_count == 1
+        assert changed.status_code == 422
+        assert len(idem_db.scalars(select(PushLog)).all()) == 1
+
+    def test_validation_error_not_stored(self, idem_db):
+        """발송 전 검증 실패(400)는 저장하지 않아 같은 키로 수정 후 재요청 가능"""
+        headers = {"Idempotency-Key": "retry-2"}
+        with patch.object(main.limiter, "enabled", False), \
+             patch("main.PushService.send_push", return_value=(1, 0, [])) as mockSend:
+            client = TestClient(main.app)
+            bad = client.post("/api/v1/push/send", data={
+                "firebase_project_id": "test-project",
+                "device_tokens": "not-json",
+                "title": "제목",
+                "body": "내용"
+            }, headers=headers)
+            assert bad.status_code == 400
+            good = client.post("/api/v1/push/send", data={
+                "firebase_project_id": "test-project",
+                "device_tokens": json.dumps(["token_a"]),
+                "title": "제목",
+                "body": "내용"
+            }, headers=headers)
+
+        assert good.status_code == 200
+        assert mockSend.call_count == 1
+
+    def test_email_send_compares_attachment_content(self, idem_db):
+        """같은 파일명/크기라도 첨부파일 내용이 다르면 같은 키 재사용으로 422"""
+        form = {
+            "recipient_emails": json.dumps(["to@example.com"]),
+            "sender_email": "from@example.com",
+            "smtp_host": "smtp.example.com",
+            "smtp_port": "587",
+            "subject": "제목",
+            "body": "내용"
+        }
+        headers = {"Idempotency-Key": "retry-3"}
+        with patch.object(main.limiter, "enabled", False), \
+             patch("email_validator.validate_email"), \
+             patch.object(main.settings, "email_queue_enabled", False), \
+             patch("main.attempt_email", return_value=EmailAttempt(True, None, [])) as mockSend:
+            client = TestClient(main.app)
+            first = client.post("/api/v1/email/send", data=form, headers=headers,
+                                files=[("files", ("a.txt", b"aaaa", "text/plain"))])
+            second = client.post("/api/v1/email/send", data=form, headers=headers,
+                                 files=[("files", ("a.txt", b"aaaa", "text/plain"))])
+            changed = client.post("/api/v1/email/send", data=form, headers=headers,
+                                  files=[("files", ("a.txt", b"bbbb", "text/plain"))])
+
+        assert first.status_code == 200
+        assert second.json() == first.json()
+        assert changed.status_code == 422
+        assert mockSend.call_count == 1
+        assert mockSend.call_args.args[0]["attachments"][0]["data"] == b"aaaa"
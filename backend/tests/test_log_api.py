@@ -0,0 +1,447 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from main import app
+from database import EmailLog, PushLog
+
+
+@pytest.fixture
+def log_db(temp_db):
+    """임시 SQLite DB로 get_async_db를 대체하고, 데이터 삽입용 동기 세션을 반환"""
+    return temp_db(override_db=True).session
+
+
+def make_email_log(index: int, createdAt: datetime, **overrides) -> EmailLog:
+    fields = dict(
+        id=str(uuid.uuid4()),
+        sender_email=f"sender{index}@example.com",
+        recipient_emails=[f"to{index}@example.com"],
+        subject=f"제목 {index}",
+        body="본문" * 100,
+        smtp_host="smtp.example.com",
+        smtp_port=587,
+        status="success",
+        attachment_count=0,
+        total_attachment_size=0,
+        created_at=createdAt,
+    )
+    fields.update(overrides)
+    return EmailLog(**fields)
+
+
+def make_push_log(index: int, createdAt: datetime, **overrides) -> PushLog:
+    fields = dict(
+        id=str(uuid.uuid4()),
+        firebase_project_id="test-project",
+        title=f"알림 {index}",
+        body="내용",
+        token_count=1,
+        success_count=1,
+        failure_count=0,
+        status="success",
+        created_at=createdAt,
+    )
+    fields.update(overrides)
+    return PushLog(**fields)
+
+
+class TestLogAPI:
+    def test_email_logs_newest_first(self, log_db):
+        """이메일 로그 목록은 최신순"""
+        base = datetime(2025, 1, 1)
+        for i in range(3):
+            log_db.add(make_email_log(i, base + timedelta(minutes=i)))
+        log_db.commit()
+
+        client = TestClient(app)
+        response = client.get("/api/v1/email/logs")
+        assert response.status_code == 200
+        subjects = [log["subject"] for log in response.json()]
+        assert subjects == ["제목 2", "제목 1", "제목 0"]
+
+    def test_email_log_detail(self, log_db):
+        """이메일 로그 상세 조회 / 없는 ID는 404"""
+        log = make_email_log(0, datetime(2025, 1, 1))
+        log_db.add(log)
+        log_db.commit()
+
+        client = TestClient(app)
+        response = client.get(f"/api/v1/email/logs/{log.id}")
+        assert response.status_code == 200
+        assert response.json()["id"] == log.id
+
+        response = client.get(f"/api/v1/email/logs/{uuid.uuid4()}")
+        assert response.status_code == 404
+
+    def test_push_logs_and_detail(self, log_db):
+        """푸시 로그 목록 / 상세 조회"""
+        log = make_push_log(0, datetime(2025, 1, 1))
+        log_db.add(log)
+        log_db.commit()
+
+        client = TestClient(app)
+        response = client.get("/api/v1/push/logs?skip=0&limit=10")
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()] == [log.id]
+
+        response = client.get(f"/api/v1/push/logs/{log.id}")
+        assert response.status_code == 200
+        assert response.json()["token_count"] == 1
+
+
+class TestCursorPagination:
+    def test_cursor_walks_all_rows_once(self, log_db):
+        """커서로 끝까지 조회하면 모든 행이 정확히 한 번씩 반환 (created_at 동률 포함)"""
+        base = datetime(2025, 1, 1)
+        expectedIds = set()
+        for i in range(7):
+            # 일부 행은 created_at이 동일 → id로 순서 결정
+            log = make_email_log(i, base + timedelta(minutes=i // 2))
+            expectedIds.add(log.id)
+            log_db.add(log)
+        log_db.commit()
+
+        client = TestClient(app)
+        seenIds = []
+        cursor = None
+        pageCount = 0
+        while True:
+            url = "/api/v1/email/logs?limit=3" + (f"&cursor={cursor}" if cursor else "")
+            response = client.get(url)
+            assert response.status_code == 200
+            seenIds.extend(item["id"] for item in response.json())
+            pageCount += 1
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert pageCount == 3
+        assert len(seenIds) == 7
+        assert set(seenIds) == expectedIds
+
+    def test_push_logs_cursor(self, log_db):
+        """푸시 로그도 커서 페이지네이션 지원"""
+        base = datetime(2025, 1, 1)
+        for i in range(3):
+            log_db.add(make_push_log(i, base + timedelta(minutes=i)))
+        log_db.commit()
+
+        client = TestClient(app)
+        first = client.get("/api/v1/push/logs?limit=2")
+        assert [item["title"] for item in first.json()] == ["알림 2", "알림 1"]
+        second = client.get(f"/api/v1/push/logs?limit=2&cursor={first.headers['X-Next-Cursor']}")
+        assert [item["title"] for item in second.json()] == ["알림 0"]
+        assert "X-Next-Cursor" not in second.headers
+
+    def test_invalid_cursor(self, log_db):
+        """잘못된 커서 → 400"""
+        client = TestClient(app)
+        response = client.get("/api/v1/email/logs?cursor=not-a-cursor")
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_mcp_list_email_logs_cursor(self, log_db):
+        """MCP list_email_logs도 next_cursor 반환"""
+        from unittest.mock import patch
+        from mcp_server import MCPServer
+
+        base = datetime(2025, 1, 1)
+        for i in range(3):
+            log_db.add(make_email_log(i, base + timedelta(minutes=i)))
+        log_db.commit()
+
+        server = MCPServer()
+        with patch("mcp_server.SessionLocal", sessionmaker(bind=log_db.get_bind())):
+            first = await server.list_email_logs({"limit": 2})
+            nextCursor = first["result"]["next_cursor"]
+            second = await server.list_email_logs({"limit": 2, "cursor": nextCursor})
+
+        assert [log["subject"] for log in first["result"]["logs"]] == ["제목 2", "제목 1"]
+        assert [log["subject"] for log in second["result"]["logs"]] == ["제목 0"]
+        assert second["result"]["next_cursor"] is None
+
+
+class TestSummaryProjection:
+    def test_email_logs_summary(self, log_db):
+        """summary 모드는 목록용 컬럼만 반환"""
+        base = datetime(2025, 1, 1)
+        for i in range(3):
+            log_db.add(make_email_log(i, base + timedelta(minutes=i)))
+        log_db.commit()
+
+        client = TestClient(app)
+        full = client.get("/api/v1/email/logs?limit=2")
+        summary = client.get("/api/v1/email/logs?limit=2&fields=summary")
+        assert summary.status_code == 200
+        items = summary.json()
+        assert [item["subject"] for item in items] == ["제목 2", "제목 1"]
+        assert "body" not in items[0]
+        assert "recipient_emails" not in items[0]
+        assert items[0]["status"] == "success"
+        assert len(summary.content) < len(full.content)
+        # 커서는 full/summary 모드 모두 동일하게 동작
+        assert summary.headers["X-Next-Cursor"] == full.headers["X-Next-Cursor"]
+
+    def test_push_logs_summary(self, log_db):
+        """푸시 summary 모드는 토큰 목록 제외"""
+        log_db.add(make_push_log(0, datetime(2025, 1, 1)))
+        log_db.commit()
+
+        client = TestClient(app)
+        items = client.get("/api/v1/push/logs?fields=summary").json()
+        assert items[0]["success_count"] == 1
+        assert "device_tokens" not in items[0]
+        assert items[0]["created_at"] == "2025-01-01T00:00:00"
+
+    def test_invalid_fields(self, log_db):
+        """지원하지 않는 fields 값 → 422"""
+        client = TestClient(app)
+        assert client.get("/api/v1/email/logs?fields=everything").status_code == 422
+
+
+class TestLogFilters:
+    def test_email_log_filters(self, log_db):
+        """status / sender / 기간 / 첨부파일 필터"""
+        base = datetime(2025, 1, 1)
+        log_db.add(make_email_log(0, base, status="failed"))
+        log_db.add(make_email_log(1, base + timedelta(hours=1), status="success", attachment_count=2))
+        log_db.add(make_email_log(2, base + timedelta(hours=2), status="failed", smtp_host="smtp.other.com"))
+        log_db.commit()
+
+        client = TestClient(app)
+
+        def subjects(query):
+            response = client.get(f"/api/v1/email/logs?{query}")
+            assert response.status_code == 200
+            return [item["subject"] for item in response.json()]
+
+        assert subjects("status=failed") == ["제목 2", "제목 0"]
+        assert subjects("sender_email=sender1@example.com") == ["제목 1"]
+        assert subjects("smtp_host=smtp.other.com") == ["제목 2"]
+        assert subjects("has_attachments=true") == ["제목 1"]
+        assert subjects("has_attachments=false&status=failed") == ["제목 2", "제목 0"]
+        assert subjects("created_from=2025-01-01T01:00:00&created_to=2025-01-01T02:00:00") == ["제목 1"]
+        # timezone이 있는 입력은 UTC로 변환 (KST 10:00 = UTC 01:00)
+        assert subjects("created_from=2025-01-01T10:00:00%2B09:00&fields=summary") == ["제목 2", "제목 1"]
+
+    def test_push_log_filters(self, log_db):
+        """프로젝트 + 상태 + 기간 필터 (예: 최근 1시간 프로젝트 X 실패 건)"""
+        base = datetime(2025, 1, 1)
+        log_db.add(make_push_log(0, base, firebase_project_id="project-x", status="failed"))
+        log_db.add(make_push_log(1, base + timedelta(minutes=90), firebase_project_id="project-x", status="failed"))
+        log_db.add(make_push_log(2, base + timedelta(minutes=90), firebase_project_id="project-y", status="failed"))
+        log_db.add(make_push_log(3, base + timedelta(minutes=95), firebase_project_id="project-x", status="success"))
+        log_db.commit()
+
+        client = TestClient(app)
+        response = client.get(
+            "/api/v1/push/logs?firebase_project_id=project-x&status=failed"
+            "&created_from=2025-01-01T01:00:00"
+        )
+        assert [item["title"] for item in response.json()] == ["알림 1"]
+
+    def test_filters_with_cursor(self, log_db):
+        """필터와 커서를 함께 사용"""
+        base = datetime(2025, 1, 1)
+        for i in range(5):
+            log_db.add(make_email_log(i, base + timedelta(minutes=i), status="failed" if i % 2 == 0 else "success"))
+        log_db.commit()
+
+        client = TestClient(app)
+        first = client.get("/api/v1/email/logs?status=failed&limit=2")
+        second = client.get(f"/api/v1/email/logs?status=failed&limit=2&cursor={first.headers['X-Next-Cursor']}")
+        assert [item["subject"] for item in first.json()] == ["제목 4", "제목 2"]
+        assert [item["subject"] for item in second.json()] == ["제목 0"]
+
+
+class TestSendPersistence:
+    def test_push_send_records_log(self, log_db):
+        """푸시 발송 결과가 비동기 세션으로 저장됨"""
+        import json
+        from unittest.mock import patch
+
+        with patch("main.PushService.send_push", return_value=(1, 1, ["token_b"])):
+            client = TestClient(app)
+            response = client.post("/api/v1/push/send", data={
+                "firebase_project_id": "test-project",
+                "device_tokens": json.dumps(["token_a", "token_b"]),
+                "title": "제목",
+                "body": "내용"
+            })
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "partial"
+        saved = log_db.get(PushLog, body["logId"])
+        assert saved.status == "partial"
+        assert saved.token_count == 2
+
+        deliveries = client.get(f"/api/v1/push/logs/{saved.id}/deliveries").json()
+        assert [(d["token"], d["status"]) for d in deliveries] == [("token_a", "success"), ("token_b", "failed")]
+        failed = client.get(f"/api/v1/push/logs/{saved.id}/deliveries?status=failed").json()
+        assert [d["token"] for d in failed] == ["token_b"]
+
+    def _email_form(self):
+        import json
+        return {
+            "recipient_emails": json.dumps(["to@example.com"]),
+            "sender_email": "from@example.com",
+            "smtp_host": "smtp.example.com",
+            "smtp_port": "587",
+            "subject": "제목",
+            "body": "본문"
+        }
+
+    def test_email_attachment_passed_as_raw_bytes(self, log_db):
+        """업로드 첨부파일은 base64 변환 없이 원본 bytes로 전달"""
+        from unittest.mock import patch, AsyncMock
+
+        with patch("email_validator.validate_email"), \
+             patch("main.EmailService.send_email", new_callable=AsyncMock, return_value=(True, None)) as mockSend:
+            client = TestClient(app)
+            response = client.post(
+                "/api/v1/email/send",
+                data=self._email_form(),
+                files=[("files", ("report.pdf", b"%PDF-raw", "application/pdf"))]
+            )
+
+        assert response.status_code == 200
+        attachments = mockSend.await_args.kwargs["attachments"]
+        assert attachments == [{"filename": "report.pdf", "data": b"%PDF-raw"}]
+        saved = log_db.get(EmailLog, response.json()["log_id"])
+        assert saved.total_attachment_size == len(b"%PDF-raw")
+
+    def test_email_attachment_size_limit_while_reading(self, log_db):
+        """총 크기 제한은 업로드를 읽는 도중에 적용"""
+        from unittest.mock import patch, AsyncMock
+
+        with patch("email_validator.validate_email"), \
+             patch("main.EmailService.MAX_TOTAL_SIZE", 10), \
+             patch("main.UPLOAD_CHUNK_SIZE", 4), \
+             patch("main.EmailService.send_email", new_callable=AsyncMock) as mockSend:
+            client = TestClient(app)
+            response = client.post(
+                "/api/v1/email/send",
+                data=self._email_form(),
+                files=[
+                    ("files", ("a.txt", b"x" * 6, "text/plain")),
+                    ("files", ("b.txt", b"y" * 6, "text/plain"))
+                ]
+            )
+
+        assert response.status_code == 400
+        assert "30MB" in response.json()["detail"]
+        mockSend.assert_not_awaited()
+
+    def test_email_batch_creates_logs(self, log_db):
+        """배치 발송 API: 수신자별 queued 로그 bulk 생성 후 202, batch_id로 진행 상황 조회"""
+        from unittest.mock import patch
+
+        payload = {
+            "sender_email": "from@example.com",
+            "smtp_host": "smtp.example.com",
+            "smtp_port": 587,
+            "subject": "$name님 안내",
+            "body": "본문",
+            "recipients": [
+                {"email": "a@example.com", "variables": {"name": "A"}},
+                {"email": "b@example.com", "variables": {"name": "B"}}
+            ]
+        }
+        with patch("main.email_batch_runner.submit") as mockSubmit:
+            client = TestClient(app)
+            response = client.post("/api/v1/email/batch", json=payload)
+
+        assert response.status_code == 202
+        batchId = response.json()["batch_id"]
+        assert response.json()["total"] == 2
+        job = mockSubmit.call_args.args[0]
+        assert [item.email for item in job.items] == ["a@example.com", "b@example.com"]
+
+        logs = log_db.query(EmailLog).filter_by(batch_id=batchId).all()
+        assert sorted(log.recipient_emails[0] for log in logs) == ["a@example.com", "b@example.com"]
+        assert {log.status for log in logs} == {"queued"}
+
+        status = client.get(f"/api/v1/email/batch/{batchId}").json()
+        assert status["total"] == 2
+        assert status["status_counts"] == {"queued": 2}
+        listed = client.get(f"/api/v1/email/logs?batch_id={batchId}").json()
+        assert len(listed) == 2 and listed[0]["batch_id"] == batchId
+        assert client.get(f"/api/v1/email/batch/{uuid.uuid4()}").status_code == 404
+
+    def test_email_batch_rejects_invalid_template(self, log_db):
+        """템플릿 오류/변수 누락은 로그를 만들지 않고 400"""
+        from unittest.mock import patch
+
+        payload = {
+            "sender_email": "from@example.com",
+            "smtp_host": "smtp.example.com",
+            "smtp_port": 587,
+            "subject": "$name님 안내",
+            "body": "본문",
+            "recipients": [
+                {"email": "a@example.com", "variables": {"name": "A"}},
+                {"email": "b@example.com", "variables": {}}
+            ]
+        }
+        with patch("main.email_batch_runner.submit") as mockSubmit:
+            response = TestClient(app).post("/api/v1/email/batch", json=payload)
+
+        assert response.status_code == 400
+        assert "b@example.com" in response.json()["detail"]
+        mockSubmit.assert_not_called()
+        assert log_db.query(EmailLog).count() == 0
+
+    def test_push_fanout_streams_progress(self, temp_db):
+        """fan-out 발송: 토큰 파일 업로드 + SSE 진행 이벤트, chunk 로그는 parent_log_id로 조회"""
+        import json
+        from unittest.mock import patch
+
+        log_db = temp_db("push_fanout", override_db=True).session
+        tokenFile = "\n".join(json.dumps(f"token_{i}") for i in range(600)).encode("utf-8")
+
+        with patch("push_service.PushService.send_push", side_effect=lambda **kw: (len(kw["device_tokens"]), 0, [])):
+            client = TestClient(app)
+            response = client.post(
+                "/api/v1/push/fanout",
+                data={
+                    "firebase_project_id": "test-project",
+                    "title": "제목",
+                    "body": "내용",
+                    "device_tokens": json.dumps(["token_0", "extra"]),
+                    "stream": "true"
+                },
+                files={"file": ("tokens.ndjson", tokenFile, "application/x-ndjson")}
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [line[len("event: "):] for line in response.text.splitlines() if line.startswith("event: ")]
+        assert events == ["started", "chunk", "chunk", "done"]
+        done = json.loads(response.text.strip().splitlines()[-1][len("data: "):])
+        assert done["success_count"] == 601  # 중복 토큰(token_0) 제거
+        assert done["status"] == "success"
+
+        parent = log_db.get(PushLog, done["log_id"])
+        assert parent.status == "success"
+        children = client.get(f"/api/v1/push/logs?parent_log_id={parent.id}").json()
+        assert sorted(child["chunk_index"] for child in children) == [0, 1]
+
+        final = client.get(f"/api/v1/push/fanout/{parent.id}/events")
+        assert "event: done" in final.text
+
+    def test_push_fanout_requires_tokens(self, log_db):
+        """토큰이 없으면 400"""
+        client = TestClient(app)
+        response = client.post("/api/v1/push/fanout", data={
+            "firebase_project_id": "test-project", "title": "제목", "body": "내용"
+        })
+        assert response.status_code == 400
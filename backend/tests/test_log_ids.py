@@ -0,0 +1,103 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import uuid
+
+import pytest
+from sqlalchemy import Column, MetaData, String, Table, create_engine, insert, select, text, update
+from sqlalchemy.exc import StatementError
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateTable
+
+from log_ids import LogId, is_log_id, new_log_id, uuid7
+
+
+def build_table(binary):
+    metadata = MetaData()
+    table = Table(
+        "logs", metadata,
+        Column("id", LogId(binary=binary), primary_key=True),
+        Column("parent_id", LogId(binary=binary), nullable=True),
+        Column("status", String(16)),
+    )
+    return metadata, table
+
+
+@pytest.fixture
+def binary_db(tmp_path):
+    """LogId(binary=True) 컬럼을 가진 임시 SQLite 테이블"""
+    metadata, table = build_table(binary=True)
+    engine = create_engine(f"sqlite:///{tmp_path / 'ids.db'}")
+    metadata.create_all(engine)
+    try:
+        yield engine, table
+    finally:
+        engine.dispose()
+
+
+class TestUuid7:
+    def test_version_and_timestamp(self):
+        before = time.time_ns() // 1_000_000
+        value = uuid7()
+        assert value.version == 7
+        assert value.variant == uuid.RFC_4122
+        assert before <= value.int >> 80 <= time.time_ns() // 1_000_000 + 1
+
+    def test_monotonic_within_process(self):
+        """같은 밀리초에 만든 ID도 생성 순서대로 정렬됨 (문자열/바이트 모두)"""
+        ids = [new_log_id() for _ in range(5000)]
+        assert ids == sorted(ids)
+        assert len(set(ids)) == len(ids)
+        assert [uuid.UUID(i).bytes for i in ids] == sorted(uuid.UUID(i).bytes for i in ids)
+
+
+class TestLogIdType:
+    def test_mysql_ddl(self):
+        _, binaryTable = build_table(binary=True)
+        _, charTable = build_table(binary=False)
+        assert "id BINARY(16) NOT NULL" in str(CreateTable(binaryTable).compile(dialect=mysql.dialect()))
+        assert "id CHAR(36) NOT NULL" in str(CreateTable(charTable).compile(dialect=mysql.dialect()))
+
+    def test_binary_round_trip_keeps_uuid_strings(self, binary_db):
+        """DB에는 16바이트로 저장되고, 조회/조건에는 UUID 문자열 그대로 사용"""
+        engine, table = binary_db
+        parent, child = new_log_id(), new_log_id()
+        with engine.begin() as conn:
+            conn.execute(insert(table), [
+                {"id": parent, "parent_id": None, "status": "success"},
+                {"id": child, "parent_id": parent, "status": "success"},
+            ])
+        with engine.connect() as conn:
+            assert conn.execute(select(table.c.id).where(table.c.parent_id == parent)).scalar() == child
+            assert conn.execute(select(table.c.id).order_by(table.c.id)).scalars().all() == [parent, child]
+            assert conn.execute(select(table.c.id).where(table.c.id < child)).scalars().all() == [parent]
+            raw = conn.execute(text("SELECT id FROM logs WHERE parent_id IS NULL")).scalar()
+        assert raw == uuid.UUID(parent).bytes
+
+    def test_binary_invalid_id_matches_nothing(self, binary_db):
+        engine, table = binary_db
+        with engine.begin() as conn:
+            conn.execute(insert(table), [{"id": new_log_id(), "status": "success"}])
+        with engine.connect() as conn:
+            assert conn.execute(select(table).where(table.c.id == "not-a-uuid")).first() is None
+
+    def test_binary_invalid_id_rejected_on_write(self, binary_db):
+        """INSERT/UPDATE 값은 빈 바이트로 저장하지 않고 오류, 조회 조건(IN 포함)은 그대로 허용"""
+        engine, table = binary_db
+        valid = new_log_id()
+        with engine.begin() as conn:
+            conn.execute(insert(table), [{"id": valid, "status": "success"}])
+        with pytest.raises(StatementError, match="UUID"):
+            with engine.begin() as conn:
+                conn.execute(insert(table), [{"id": "log-1", "status": "success"}])
+        with pytest.raises(StatementError, match="UUID"):
+            with engine.begin() as conn:
+                conn.execute(update(table).where(table.c.id == valid).values(parent_id="log-1"))
+        with engine.connect() as conn:
+            assert conn.execute(select(table.c.id).where(table.c.id.in_(["log-1", valid]))).scalars().all() == [valid]
+
+    def test_is_log_id(self):
+        assert is_log_id(new_log_id())
+        assert not is_log_id("log-1")
@@ -0,0 +1,141 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gzip
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select
+
+from database import EmailLog, PushDelivery, PushLog
+from log_retention import LogRetention, plan_partitions, reorganize_sql
+from push_deliveries import pending_rows
+
+NOW = datetime(2026, 3, 15, 12, 0, 0)
+
+
+@pytest.fixture
+def retention_db(temp_db):
+    """임시 SQLite DB로 log_retention의 engine을 대체"""
+    return temp_db(engine_modules=("log_retention",), expire_on_commit=False).session
+
+
+def make_retention(tmp_path, **overrides):
+    options = dict(
+        enabled=True, retention_days={"email_logs": 30, "push_logs": 30}, interval=3600, batch_size=2,
+        premake_months=2, archive_enabled=True, archive_dir=str(tmp_path / "archive")
+    )
+    options.update(overrides)
+    return LogRetention(**options)
+
+
+def add_email_log(session, created_at, status="success"):
+    log = EmailLog(
+        sender_email="a@example.com", recipient_emails=["b@example.com"], subject="s", body="b",
+        smtp_host="smtp.example.com", smtp_port=587, status=status, created_at=created_at
+    )
+    session.add(log)
+    session.commit()
+    return log
+
+
+def add_push_log(session, created_at, tokens=("t1", "t2")):
+    log = PushLog(
+        firebase_project_id="proj", title="t", body="b", token_count=len(tokens), status="success", created_at=created_at
+    )
+    session.add(log)
+    session.commit()
+    session.add_all(PushDelivery(**row) for row in pending_rows(log.id, tokens))
+    session.commit()
+    return log
+
+
+def read_archive(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestPartitionPlan:
+    def test_creates_upcoming_months_and_expires_old_ones(self):
+        """이번 달부터 premake 개월 뒤까지 파티션을 만들고, 상한이 cutoff 이하인 파티션만 만료"""
+        create, expired = plan_partitions(
+            ["p202512", "p202601", "p202602", "p202603", "pmax"], NOW, 2, datetime(2026, 2, 10)
+        )
+        assert [f"{month:%Y%m}" for month in create] == ["202604", "202605"]
+        assert expired == ["p202512", "p202601"]
+
+    def test_only_pmax_starts_from_current_month(self):
+        create, expired = plan_partitions(["pmax"], NOW, 1, None)
+        assert [f"{month:%Y%m}" for month in create] == ["202603", "202604"]
+        assert expired == []
+
+    def test_reorganize_sql(self):
+        sql = reorganize_sql("push_logs", [datetime(2026, 12, 1)])
+        assert sql == (
+            "ALTER TABLE push_logs REORGANIZE PARTITION pmax INTO "
+            "(PARTITION p202612 VALUES LESS THAN ('2027-01-01'), PARTITION pmax VALUES LESS THAN (MAXVALUE))"
+        )
+
+
+class TestPurge:
+    def test_expired_logs_archived_then_deleted(self, retention_db, tmp_path):
+        """보관 기간이 지난 로그만 아카이브 후 삭제, 처리 중인 로그와 최근 로그는 유지"""
+        old = [add_email_log(retention_db, NOW - timedelta(days=40, minutes=i)).id for i in range(3)]
+        scheduled = add_email_log(retention_db, NOW - timedelta(days=40), status="scheduled").id
+        recent = add_email_log(retention_db, NOW - timedelta(days=1)).id
+        old_push = add_push_log(retention_db, NOW - timedelta(days=31)).id
+        recent_push = add_push_log(retention_db, NOW - timedelta(days=2)).id
+
+        retention = make_retention(tmp_path)
+        assert retention.run_once(now=NOW) == {"email_logs": 3, "push_logs": 1}
+
+        retention_db.expire_all()
+        assert set(retention_db.execute(select(EmailLog.id)).scalars()) == {scheduled, recent}
+        assert list(retention_db.execute(select(PushLog.id)).scalars()) == [recent_push]
+        assert set(retention_db.execute(select(PushDelivery.push_log_id)).scalars()) == {recent_push}
+
+        emails = read_archive(next((tmp_path / "archive" / "email_logs").glob("email_logs-*.ndjson.gz")))
+        assert sorted(row["id"] for row in emails) == sorted(old)
+        assert emails[0]["recipient_emails"] == ["b@example.com"]
+        deliveries = read_archive(next((tmp_path / "archive" / "push_logs").glob("push_deliveries-*.ndjson.gz")))
+        assert [(row["push_log_id"], row["token"]) for row in deliveries] == [(old_push, "t1"), (old_push, "t2")]
+        assert retention.stats()["archived"] == {"email_logs": 3, "push_logs": 1}
+
+    def test_zero_days_keeps_table(self, retention_db, tmp_path):
+        add_email_log(retention_db, NOW - timedelta(days=400))
+        retention = make_retention(tmp_path, retention_days={"email_logs": 0, "push_logs": 30}, archive_enabled=False)
+        assert retention.run_once(now=NOW) == {"push_logs": 0}
+        assert retention.cutoff(EmailLog, NOW) is None
+        assert not (tmp_path / "archive").exists()
+
+    def test_archive_uploaded_to_s3(self, retention_db, tmp_path):
+        """버킷이 설정되어 있으면 업로드 후 로컬 파일 삭제"""
+        add_email_log(retention_db, NOW - timedelta(days=40))
+        retention = make_retention(tmp_path, archive_s3_bucket="archive-bucket", archive_s3_prefix="logs/")
+        with patch("boto3.client") as client:
+            retention.run_once(now=NOW)
+
+        [(path, bucket, key)] = [call.args for call in client.return_value.upload_file.call_args_list]
+        assert bucket == "archive-bucket"
+        assert key.startswith("logs/email_logs/email_logs-before-20260213-")
+        assert not os.path.exists(path)
+        assert retention.stats()["uploaded"] == 1
+
+
+class TestListPruning:
+    def test_list_hides_expired_logs(self, tmp_path, temp_db):
+        """보관 기간이 지난 로그는 삭제 전이라도 목록에 나오지 않음"""
+        from fastapi.testclient import TestClient
+        from main import app
+
+        session = temp_db(override_db=True, expire_on_commit=False).session
+        now = datetime.utcnow()
+        add_email_log(session, now - timedelta(days=40))
+        recent = add_email_log(session, now - timedelta(days=1))
+
+        with patch("main.log_retention", make_retention(tmp_path)):
+            response = TestClient(app).get("/api/v1/email/logs")
+        assert [log["id"] for log in response.json()] == [recent.id]
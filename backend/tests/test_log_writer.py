@@ -0,0 +1,217 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import mysql
+from sqlalchemy.exc import OperationalError
+
+from database import PushLog
+from log_writer import MAX_WRITE_ATTEMPTS, LogWriter, row_values, upsert_statement
+
+
+@pytest.fixture
+def writer_db(temp_db):
+    """임시 SQLite DB로 로그 기록의 AsyncSessionLocal을 대체"""
+    return temp_db("log_writer", expire_on_commit=False).session
+
+
+def make_writer(**overrides):
+    options = dict(enabled=True, batch_size=100, flush_interval=10, max_pending=1000, put_timeout=1)
+    options.update(overrides)
+    return LogWriter(**options)
+
+
+def make_push_log(index=0, status="success"):
+    return PushLog(
+        id=f"00000000-0000-0000-0000-{index:012d}", firebase_project_id="proj", title="t", body="b",
+        token_count=1, status=status, success_count=1, created_at=datetime.utcnow()
+    )
+
+
+def stored(session):
+    session.expire_all()
+    return {log.id: log for log in session.execute(select(PushLog)).scalars()}
+
+
+class TestUpsert:
+    def test_mysql_statement_is_single_multi_row_upsert(self):
+        rows = [row_values(make_push_log(i)) for i in range(3)]
+        sql = str(upsert_statement("mysql", PushLog.__table__, rows).compile(dialect=mysql.dialect()))
+        assert sql.count("INSERT INTO push_logs") == 1
+        assert "ON DUPLICATE KEY UPDATE" in sql
+        assert "created_at = VALUES(created_at)" not in sql
+        assert sql.count("), (") == 2
+
+    def test_row_values_fills_model_defaults(self):
+        values = row_values(PushLog(id="x", firebase_project_id="p", title="t", body="b"))
+        assert values["status"] == "pending"
+        assert values["failure_count"] == 0
+        assert isinstance(values["created_at"], datetime)
+
+    @pytest.mark.asyncio
+    async def test_buffered_until_flush_and_merged(self, writer_db):
+        """flush 전에는 DB에 쓰지 않고, 같은 로그의 변경은 하나로 합쳐서 한 번에 기록"""
+        writer = make_writer()
+        await writer.start()
+        for i in range(3):
+            await writer.upsert(make_push_log(i, status="pending"))
+        await writer.update(PushLog, make_push_log(0).id, {"status": "failed", "error_message": "boom"})
+
+        assert stored(writer_db) == {}
+        assert writer.pending(PushLog, make_push_log(0).id).status == "failed"
+
+        await writer.shutdown()
+        logs = stored(writer_db)
+        assert len(logs) == 3
+        assert logs[make_push_log(0).id].status == "failed"
+        assert logs[make_push_log(0).id].error_message == "boom"
+        assert writer.stats()["batches"] == 1
+        assert writer.stats()["merged"] == 1
+        assert writer.pending(PushLog, make_push_log(0).id) is None
+
+    @pytest.mark.asyncio
+    async def test_upsert_updates_existing_row(self, writer_db):
+        log = make_push_log(status="pending")
+        writer_db.add(log)
+        writer_db.commit()
+        created_at = log.created_at
+
+        writer = make_writer()
+        await writer.upsert(make_push_log(status="success"))  # 시작 전에는 바로 기록
+        saved = stored(writer_db)[log.id]
+        assert saved.status == "success"
+        assert saved.created_at == created_at
+
+
+class TestDurable:
+    @pytest.mark.asyncio
+    async def test_concurrent_durable_updates_share_commits(self, writer_db):
+        """durable 변경은 commit 후 반환되고, 동시에 들어온 변경들은 commit을 함께 함"""
+        for i in range(20):
+            writer_db.add(make_push_log(i, status="queued"))
+        writer_db.commit()
+
+        writer = make_writer()
+        await writer.start()
+        await asyncio.gather(*(
+            writer.update(PushLog, make_push_log(i).id, {"status": "success", "sent_at": datetime.utcnow()}, durable=True)
+            for i in range(20)
+        ))
+        assert {log.status for log in stored(writer_db).values()} == {"success"}
+        assert writer.stats()["batches"] < 20
+        await writer.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_is_retried(self, writer_db):
+        """기록에 실패하면 durable 대기자에게 오류를 알리고, 변경은 버퍼에 남겨 다음 flush에 다시 기록"""
+        writer = make_writer()
+        await writer.start()
+        original = writer._write
+        calls = 0
+
+        async def flaky(entries):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise RuntimeError("db down")
+            await original(entries)
+
+        with patch.object(writer, "_write", new=flaky):
+            with pytest.raises(RuntimeError):
+                await writer.upsert(make_push_log(), durable=True)
+            assert writer.stats()["errors"] == 1
+            await writer.flush()
+
+        assert make_push_log().id in stored(writer_db)
+        await writer.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_failing_entry_is_isolated_and_dropped(self, writer_db):
+        """값 문제로 배치가 실패하면 한 건씩 기록해 나머지는 기록하고, 계속 실패하는 변경은 MAX_WRITE_ATTEMPTS 후 버림"""
+        writer = make_writer()
+        await writer.start()
+        original = writer._write
+        poison = make_push_log(1).id
+
+        async def rejectPoison(entries):
+            if any(entry.log_id == poison for entry in entries):
+                raise ValueError("Data too long")
+            await original(entries)
+
+        with patch.object(writer, "_write", new=rejectPoison):
+            for i in range(3):
+                await writer.upsert(make_push_log(i))
+            await writer.flush()
+            assert set(stored(writer_db)) == {make_push_log(0).id, make_push_log(2).id}
+            assert writer.stats()["pending"] == 1
+
+            for _ in range(MAX_WRITE_ATTEMPTS - 1):
+                await writer.flush()
+            await writer.upsert(make_push_log(3))
+            await writer.flush()
+
+        assert writer.stats()["dropped"] == 1
+        assert writer.stats()["pending"] == 0
+        assert poison not in stored(writer_db)
+        assert make_push_log(3).id in stored(writer_db)
+        await writer.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_connection_error_keeps_batch(self, writer_db):
+        """DB 연결 오류는 나눠 기록하지 않고 배치를 그대로 되돌리며 실패 횟수에 넣지 않음"""
+        writer = make_writer()
+        await writer.start()
+        calls = 0
+
+        async def down(entries):
+            nonlocal calls
+            calls += 1
+            raise OperationalError("INSERT", {}, ConnectionRefusedError("db down"))
+
+        for i in range(3):
+            await writer.upsert(make_push_log(i))
+        with patch.object(writer, "_write", new=down):
+            for _ in range(MAX_WRITE_ATTEMPTS + 1):
+                await writer.flush()
+
+        assert calls == MAX_WRITE_ATTEMPTS + 1
+        assert writer.stats()["dropped"] == 0
+        assert writer.stats()["pending"] == 3
+        await writer.shutdown()
+        assert len(stored(writer_db)) == 3
+
+
+
+class TestBackPressure:
+    @pytest.mark.asyncio
+    async def test_full_buffer_waits_for_flush(self, writer_db):
+        """기록 대기 로그가 max_pending건이면 flush로 자리가 날 때까지 기다림"""
+        writer = make_writer(batch_size=2, max_pending=2)
+        await writer.start()
+        for i in range(5):
+            await writer.upsert(make_push_log(i))
+        assert writer.stats()["pending"] <= 2
+        await writer.shutdown()
+        assert len(stored(writer_db)) == 5
+        assert writer.stats()["overflow"] == 0
+
+    @pytest.mark.asyncio
+    async def test_stalled_flush_falls_back_to_direct_write(self, writer_db):
+        writer = make_writer(batch_size=1, max_pending=1, put_timeout=0.05)
+        await writer.start()
+        await writer._lock.acquire()  # flush가 끝나지 않는 상황
+        try:
+            await writer.upsert(make_push_log(0))
+            await writer.upsert(make_push_log(1))
+        finally:
+            writer._lock.release()
+        assert writer.stats()["overflow"] == 1
+        assert set(stored(writer_db)) == {make_push_log(1).id}
+        await writer.shutdown()
+        assert len(stored(writer_db)) == 2
@@ -0,0 +1,218 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from unittest.mock import patch, AsyncMock
+
+import aiosmtplib
+import pytest
+
+from outbound_limiter import (
+    CODE_CIRCUIT_OPEN, CODE_RATE_LIMITED, KIND_FCM, KIND_SMTP, OUTCOME_FAILURE, OUTCOME_NEUTRAL,
+    OUTCOME_SUCCESS, OUTCOME_THROTTLED, STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN,
+    AdaptiveTokenBucket, CircuitBreaker, DestinationUnavailableError, OutboundLimiter
+)
+from push_service import FailedTokens
+from retry_engine import RetryBudget, RetryPolicy, attempt_email, attempt_push
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_limiter(**overrides):
+    options = dict(
+        enabled=True,
+        limits={KIND_SMTP: (10, 10), KIND_FCM: (1000, 1000)},
+        min_rate_ratio=0.1,
+        max_wait=5,
+        failure_threshold=2,
+        reset_timeout=30
+    )
+    options.update(overrides)
+    return OutboundLimiter(**options)
+
+
+def make_policy():
+    return RetryPolicy(True, 3, 1, 10, RetryBudget(ratio=1, min_retries=10, window=60))
+
+
+class TestTokenBucket:
+    def test_reserve_waits_for_missing_tokens(self):
+        """burst를 다 쓰면 부족한 토큰만큼 대기, max_wait를 넘으면 예약하지 않음"""
+        clock = FakeClock()
+        bucket = AdaptiveTokenBucket(10, 2, min_rate=1, clock=clock)
+        assert bucket.reserve(1, max_wait=5) == 0
+        assert bucket.reserve(1, max_wait=5) == 0
+        assert bucket.reserve(1, max_wait=5) == pytest.approx(0.1)
+        with pytest.raises(DestinationUnavailableError) as excinfo:
+            bucket.reserve(2, max_wait=0.1)
+        assert excinfo.value.code == CODE_RATE_LIMITED
+
+        clock.now += 1
+        assert bucket.reserve(2, max_wait=0) == 0
+
+    def test_aimd(self):
+        """throttle 신호 → 절반 (1초에 한 번, 최저 min_rate), 성공 → base_rate까지 조금씩 회복"""
+        clock = FakeClock()
+        bucket = AdaptiveTokenBucket(10, 10, min_rate=3, clock=clock)
+        bucket.on_throttled()
+        bucket.on_throttled()
+        assert bucket.rate == 5
+        clock.now += 1
+        bucket.on_throttled()
+        assert bucket.rate == 3
+
+        for _ in range(100):
+            bucket.on_success()
+        assert bucket.rate == 10
+
+
+class TestCircuitBreaker:
+    def test_open_half_open_close(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+        breaker.record(OUTCOME_FAILURE)
+        breaker.record(OUTCOME_NEUTRAL)  # 수신자 문제는 연속 실패를 끊지 않음
+        assert breaker.state == STATE_CLOSED
+        breaker.record(OUTCOME_THROTTLED)
+        assert breaker.state == STATE_OPEN
+        assert breaker.check() == 30
+
+        # reset_timeout 후 시험 발송 1건만 허용
+        clock.now += 30
+        assert breaker.check() is None
+        assert breaker.state == STATE_HALF_OPEN
+        assert breaker.check() is not None
+        breaker.record(OUTCOME_SUCCESS)
+        assert breaker.state == STATE_CLOSED
+        assert breaker.check() is None
+
+    def test_half_open_failure_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record(OUTCOME_FAILURE)
+        clock.now += 10
+        assert breaker.check() is None
+        breaker.record(OUTCOME_FAILURE)
+        assert breaker.state == STATE_OPEN
+        assert breaker.open_count == 2
+
+    def test_abandoned_probe_expires(self):
+        """결과를 기록하지 못한 시험 발송은 reset_timeout 후 다음 요청이 다시 시험"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record(OUTCOME_FAILURE)
+        clock.now += 10
+        assert breaker.check() is None
+        clock.now += 5
+        assert breaker.check() is not None
+        clock.now += 5
+        assert breaker.check() is None
+        assert breaker.state == STATE_HALF_OPEN
+
+
+class TestOutboundLimiter:
+    @pytest.mark.asyncio
+    async def test_guard_per_destination(self):
+        """목적지별로 독립된 상태, 비활성화 시 제한 없음"""
+        limiter = make_limiter()
+        first = limiter.guard(KIND_SMTP, "smtp.a.com")
+        assert limiter.guard(KIND_SMTP, "smtp.a.com") is first
+        first.record(OUTCOME_FAILURE)
+        first.record(OUTCOME_FAILURE)
+        with pytest.raises(DestinationUnavailableError) as excinfo:
+            await first.acquire()
+        assert excinfo.value.code == CODE_CIRCUIT_OPEN
+        await limiter.guard(KIND_SMTP, "smtp.b.com").acquire()
+
+        stats = {d["destination"]: d for d in limiter.stats()["destinations"]}
+        assert stats["smtp.a.com"]["breaker"]["state"] == STATE_OPEN
+        assert stats["smtp.a.com"]["rejected"] == 1
+        assert stats["smtp.b.com"]["breaker"]["state"] == STATE_CLOSED
+
+        assert limiter.reset(KIND_SMTP, "smtp.a.com")
+        await limiter.guard(KIND_SMTP, "smtp.a.com").acquire()
+
+        disabled = make_limiter(enabled=False)
+        for _ in range(100):
+            await disabled.guard(KIND_SMTP, "smtp.a.com").acquire()
+        assert disabled.stats()["destinations"] == []
+
+
+class TestRetryIntegration:
+    @pytest.mark.asyncio
+    async def test_421_slows_destination_and_open_circuit_defers(self):
+        """421 → 속도 감소 + breaker 실패 집계, breaker가 열리면 발송하지 않고 차단이 풀린 뒤로 재시도"""
+        limiter = make_limiter()
+        send = AsyncMock(side_effect=aiosmtplib.SMTPResponseException(421, "slow down"))
+        with patch("retry_engine.outbound_limiter", limiter), \
+             patch("retry_engine.retry_policy", make_policy()), \
+             patch("retry_engine.EmailService.send_email", new=send):
+            await attempt_email({"smtp_host": "smtp.a.com"})
+            await attempt_email({"smtp_host": "smtp.a.com"})
+            deferred = await attempt_email({"smtp_host": "smtp.a.com"})
+
+        assert send.await_count == 2
+        guard = limiter.guard(KIND_SMTP, "smtp.a.com")
+        assert guard.bucket.rate == 5
+        assert deferred.status == "retrying"
+        assert deferred.retry_delay >= 29
+        assert deferred.attempts[0]["code"] == CODE_CIRCUIT_OPEN
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_releases_half_open(self):
+        """시험 발송이 취소되면 다음 요청이 바로 다시 시험할 수 있음"""
+        limiter = make_limiter(failure_threshold=1)
+        for guard in (limiter.guard(KIND_SMTP, "smtp.a.com"), limiter.guard(KIND_FCM, "proj")):
+            guard.record(OUTCOME_FAILURE)
+            guard.breaker._opened_at -= 30  # reset_timeout 경과
+        with patch("retry_engine.outbound_limiter", limiter), \
+             patch("retry_engine.retry_policy", make_policy()), \
+             patch("retry_engine.EmailService.send_email", new=AsyncMock(side_effect=asyncio.CancelledError)), \
+             patch("retry_engine.PushService.send_push_async", new=AsyncMock(side_effect=asyncio.CancelledError)):
+            with pytest.raises(asyncio.CancelledError):
+                await attempt_email({"smtp_host": "smtp.a.com"})
+            with pytest.raises(asyncio.CancelledError):
+                await attempt_push("proj", ["t1"], "제목", "내용")
+
+        for guard in (limiter.guard(KIND_SMTP, "smtp.a.com"), limiter.guard(KIND_FCM, "proj")):
+            assert guard.breaker.state == STATE_HALF_OPEN
+            assert guard.breaker.check() is None
+
+    @pytest.mark.asyncio
+    async def test_quota_exceeded_throttles_fcm_project(self):
+        """QUOTA_EXCEEDED 토큰은 재시도, 프로젝트 발송 속도는 감소"""
+        limiter = make_limiter()
+        failed = FailedTokens([("t2", "QUOTA_EXCEEDED")])
+        with patch("retry_engine.outbound_limiter", limiter), \
+             patch("retry_engine.retry_policy", make_policy()), \
+             patch("retry_engine.PushService.send_push_async", new=AsyncMock(return_value=(1, 1, failed))):
+            attempt = await attempt_push("proj", ["t1", "t2"], "제목", "내용")
+
+        assert attempt.retry_tokens == ["t2"]
+        guard = limiter.guard(KIND_FCM, "proj")
+        assert guard.bucket.rate == 500
+        assert guard.outcomes == {OUTCOME_THROTTLED: 1}
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast_without_retry(self):
+        """재시도할 수 없으면 발송 없이 바로 실패"""
+        limiter = make_limiter(failure_threshold=1)
+        limiter.guard(KIND_FCM, "proj").record(OUTCOME_FAILURE)
+        send = AsyncMock()
+        policy = RetryPolicy(False, 3, 1, 10, RetryBudget(ratio=1, min_retries=10, window=60))
+        with patch("retry_engine.outbound_limiter", limiter), \
+             patch("retry_engine.retry_policy", policy), \
+             patch("retry_engine.PushService.send_push_async", new=send):
+            attempt = await attempt_push("proj", ["t1", "t2"], "제목", "내용")
+
+        send.assert_not_awaited()
+        assert attempt.status == "failed"
+        assert attempt.failed_tokens == ["t1", "t2"]
+        assert attempt.attempts[0]["codes"] == {CODE_CIRCUIT_OPEN: 2}
@@ -0,0 +1,251 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, PropertyMock, patch
+
+import pytest
+from sqlalchemy import select
+
+from database import EmailLog, JobPayload, OutboxJob, PushDelivery, PushLog
+from outbox import POISON_ERROR_MESSAGE, OutboxDispatcher
+from push_deliveries import pending_rows
+from push_service import FailedTokens
+from scheduler import INTERRUPTED_ERROR_MESSAGE, KIND_EMAIL, KIND_PUSH, SendScheduler, encode_payload
+
+
+@pytest.fixture
+def outbox_db(temp_db):
+    """임시 SQLite DB로 outbox/스케줄러/로그 기록의 AsyncSessionLocal을 대체 (여러 인스턴스가 공유하는 DB 역할)"""
+    return temp_db("outbox", "log_writer", "scheduler", expire_on_commit=False).session
+
+
+def make_dispatcher(**overrides):
+    options = dict(enabled=True, concurrency=4, poll_interval=0.05, lease_seconds=60, max_claims=3)
+    options.update(overrides)
+    return OutboxDispatcher(**options)
+
+
+def add_push_job(session, status="queued", **job_values):
+    log = PushLog(firebase_project_id="proj", title="t", body="b", token_count=2, status=status)
+    session.add(log)
+    session.commit()
+    session.add_all(PushDelivery(**row) for row in pending_rows(log.id, ["t1", "t2"]))
+    job = OutboxJob(kind=KIND_PUSH, log_id=log.id, available_at=datetime.utcnow(), **job_values)
+    session.add(job)
+    session.commit()
+    return log, job
+
+
+class TestClaim:
+    @pytest.mark.asyncio
+    async def test_concurrent_claims_do_not_overlap(self, outbox_db):
+        """두 인스턴스가 동시에 선점해도 같은 작업을 가져가지 않음"""
+        for _ in range(5):
+            add_push_job(outbox_db)
+        first, second = make_dispatcher(), make_dispatcher()
+
+        a, b = await asyncio.gather(first.claim(3), second.claim(3))
+        a_ids, b_ids = {job.id for job in a}, {job.id for job in b}
+        assert not a_ids & b_ids
+        # SKIP LOCKED가 없는 SQLite에서는 조건부 UPDATE에서 진 쪽이 다음 폴링에서 나머지를 가져감
+        rest = await second.claim(5)
+        claimed = [job.id for job in a + b + rest]
+        assert len(claimed) == len(set(claimed)) == 5
+        assert all(job.claim_count == 1 for job in a + b + rest)
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_reclaimed(self, outbox_db):
+        """lease가 살아 있는 동안은 선점 불가, 만료되면 다른 워커가 다시 선점하고 이전 워커의 완료는 무시"""
+        add_push_job(outbox_db)
+        crashed, survivor = make_dispatcher(), make_dispatcher()
+        now = datetime.utcnow()
+
+        [job] = await crashed.claim(1, now=now)
+        assert await survivor.claim(1, now=now + timedelta(seconds=30)) == []
+        [reclaimed] = await survivor.claim(1, now=now + timedelta(seconds=61))
+        assert reclaimed.id == job.id
+        assert reclaimed.claim_count == 2
+
+        assert await crashed.complete(job) is False
+        assert crashed.stats()["lease_lost"] == 1
+        assert await survivor.complete(reclaimed) is True
+        assert outbox_db.execute(select(OutboxJob)).first() is None
+
+
+class TestProcess:
+    @pytest.mark.asyncio
+    async def test_push_job_sent_and_removed(self, outbox_db):
+        log, _ = add_push_job(outbox_db)
+        dispatcher = make_dispatcher()
+        send = AsyncMock(return_value=(2, 0, FailedTokens()))
+        with patch("retry_engine.PushService.send_push_async", new=send):
+            [job] = await dispatcher.claim(1)
+            await dispatcher.process(job)
+
+        assert send.await_args.kwargs["device_tokens"] == ["t1", "t2"]
+        outbox_db.expire_all()
+        assert outbox_db.get(PushLog, log.id).status == "success"
+        assert outbox_db.get(OutboxJob, job.id) is None
+        assert dispatcher.stats()["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_already_recorded_job_is_not_resent(self, outbox_db):
+        """결과 기록 후 작업 삭제 전에 중단된 작업 → 다시 발송하지 않고 정리만"""
+        add_push_job(outbox_db, status="success")
+        dispatcher = make_dispatcher()
+        send = AsyncMock()
+        with patch("retry_engine.PushService.send_push_async", new=send):
+            [job] = await dispatcher.claim(1)
+            await dispatcher.process(job)
+
+        send.assert_not_awaited()
+        assert outbox_db.get(OutboxJob, job.id) is None
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_extends_lease_during_slow_send(self, outbox_db):
+        """발송이 lease보다 오래 걸려도 heartbeat로 연장되어 다른 워커가 선점하지 않음"""
+        log, _ = add_push_job(outbox_db)
+        dispatcher, survivor = make_dispatcher(lease_seconds=0.3), make_dispatcher()
+
+        async def slowSend(**kwargs):
+            await asyncio.sleep(0.8)
+            return 2, 0, FailedTokens()
+
+        with patch("retry_engine.PushService.send_push_async", new=slowSend):
+            [job] = await dispatcher.claim(1)
+            task = asyncio.create_task(dispatcher.process(job))
+            await asyncio.sleep(0.5)
+            assert await survivor.claim(1) == []
+            await task
+
+        outbox_db.expire_all()
+        assert outbox_db.get(PushLog, log.id).status == "success"
+        assert dispatcher.stats()["completed"] == 1
+        assert dispatcher.stats()["lease_lost"] == 0
+
+    @pytest.mark.asyncio
+    async def test_lease_expired_mid_send_is_not_resent(self, outbox_db):
+        """발송 중 lease가 만료되어 다른 워커가 다시 선점해도 sending 상태인 로그는 다시 발송하지 않음"""
+        log, _ = add_push_job(outbox_db)
+        slow, survivor = make_dispatcher(), make_dispatcher()
+        sending, finish = asyncio.Event(), asyncio.Event()
+        calls = []
+
+        async def blockingSend(**kwargs):
+            calls.append(kwargs["device_tokens"])
+            sending.set()
+            await finish.wait()
+            return 2, 0, FailedTokens()
+
+        with patch("retry_engine.PushService.send_push_async", new=blockingSend):
+            [job] = await slow.claim(1)
+            task = asyncio.create_task(slow.process(job))
+            await sending.wait()
+            outbox_db.expire_all()
+            assert outbox_db.get(PushLog, log.id).status == "sending"
+
+            [reclaimed] = await survivor.claim(1, now=datetime.utcnow() + timedelta(seconds=61))
+            await survivor.process(reclaimed)
+            outbox_db.expire_all()
+            assert outbox_db.get(PushLog, log.id).error_message == INTERRUPTED_ERROR_MESSAGE
+            finish.set()
+            await task
+
+        assert len(calls) == 1
+        assert slow.stats()["lease_lost"] == 1
+        outbox_db.expire_all()
+        # 원래 워커가 살아 있었으므로 실제 발송 결과가 최종 기록
+        assert outbox_db.get(PushLog, log.id).status == "success"
+        assert outbox_db.execute(select(OutboxJob)).first() is None
+
+    @pytest.mark.asyncio
+    async def test_job_claimed_too_often_is_failed(self, outbox_db):
+        log, _ = add_push_job(outbox_db, claim_count=3)
+        dispatcher = make_dispatcher(max_claims=3)
+        with patch("retry_engine.PushService.send_push_async", new=AsyncMock()) as send:
+            [job] = await dispatcher.claim(1)
+            await dispatcher.process(job)
+
+        send.assert_not_awaited()
+        outbox_db.expire_all()
+        failed = outbox_db.get(PushLog, log.id)
+        assert failed.status == "failed"
+        assert failed.error_message == POISON_ERROR_MESSAGE
+        assert outbox_db.get(OutboxJob, job.id) is None
+
+    @pytest.mark.asyncio
+    async def test_email_job_uses_encrypted_payload(self, outbox_db):
+        log = EmailLog(
+            sender_email="a@example.com", recipient_emails=["b@example.com"], subject="s", body="b",
+            smtp_host="smtp.example.com", smtp_port=587, status="queued"
+        )
+        outbox_db.add(log)
+        outbox_db.commit()
+        outbox_db.add(OutboxJob(
+            kind=KIND_EMAIL, log_id=log.id, payload=encode_payload({"subject": "s"}), available_at=datetime.utcnow()
+        ))
+        outbox_db.commit()
+
+        dispatcher = make_dispatcher()
+        send = AsyncMock(return_value=(True, None))
+        with patch("retry_engine.EmailService.send_email", new=send):
+            [job] = await dispatcher.claim(1)
+            await dispatcher.process(job)
+
+        send.assert_awaited_once_with(subject="s", raise_errors=True)
+        outbox_db.expire_all()
+        assert outbox_db.get(EmailLog, log.id).status == "success"
+
+
+class TestDispatcher:
+    @pytest.mark.asyncio
+    async def test_run_and_shutdown_releases_unfinished_jobs(self, outbox_db):
+        """디스패처가 작업을 처리하고, 종료 시 끝나지 않은 작업은 lease를 풀어 다른 인스턴스가 바로 가져갈 수 있게 함"""
+        add_push_job(outbox_db)
+        _, slow = add_push_job(outbox_db)
+        blocked = asyncio.Event()
+
+        async def runJob(kind, log_id, payload):
+            if log_id == slow.log_id:
+                await blocked.wait()
+
+        dispatcher = make_dispatcher()
+        with patch("scheduler.run_outbox_job", new=runJob):
+            await dispatcher.start()
+            for _ in range(100):
+                if dispatcher.stats()["completed"] == 1:
+                    break
+                await asyncio.sleep(0.01)
+            await dispatcher.shutdown(timeout=0.05)
+
+        outbox_db.expire_all()
+        [remaining] = outbox_db.execute(select(OutboxJob)).scalars().all()
+        assert remaining.id == slow.id
+        assert remaining.lease_token is None
+        assert remaining.leased_until is None
+        assert await make_dispatcher().claim(1) != []
+
+    @pytest.mark.asyncio
+    async def test_scheduler_moves_due_job_into_outbox(self, outbox_db):
+        """outbox 사용 시 스케줄러는 선점과 같은 트랜잭션으로 payload를 outbox 작업으로 옮기고 직접 발송하지 않음"""
+        log = PushLog(
+            firebase_project_id="proj", title="t", body="b", token_count=1,
+            status="retrying", send_at=datetime.utcnow()
+        )
+        outbox_db.add(log)
+        outbox_db.commit()
+        outbox_db.add(JobPayload(log_id=log.id, kind=KIND_PUSH, payload=encode_payload({"tokens": ["t1"]})))
+        outbox_db.commit()
+
+        scheduler = SendScheduler(poll_interval=1, lookahead=60, release_rate=100)
+        with patch.object(OutboxDispatcher, "running", new_callable=PropertyMock, return_value=True):
+            assert await scheduler.fire(KIND_PUSH, log.id) is None
+
+        outbox_db.expire_all()
+        assert outbox_db.get(PushLog, log.id).status == "queued"
+        assert outbox_db.get(JobPayload, log.id) is None
+        [job] = outbox_db.execute(select(OutboxJob)).scalars().all()
+        assert job.log_id == log.id and job.payload is not None
@@ -124,7 +124,7 @@ class TestPushAPI:
         assert "JSON" in response.json()["detail"]
 
     @patch("main.PushService.send_push")
-    @patch("main.get_db")
+    @patch("main.get_async_db")
     def test_send_push_success(self, mockGetDb, mockSendPush):
         """정상 발송 → 200, PushSendResponse 반환"""
         from datetime import datetime
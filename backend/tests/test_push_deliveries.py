@@ -0,0 +1,149 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy.dialects import mysql
+
+from database import PushDelivery, PushLog
+from log_queries import InvalidCursorError
+from log_writer import LogWriter, upsert_statement
+from push_deliveries import (
+    add_pending_deliveries, list_deliveries, result_rows, save_delivery_rows, token_history
+)
+from push_service import FailedTokens
+from retry_engine import RetryBudget, RetryPolicy, attempt_push
+from tests.conftest import make_log_id
+
+
+@pytest.fixture
+def delivery_db(temp_db):
+    """임시 SQLite DB (비동기 세션 팩토리, 검증용 동기 세션), 로그 기록의 AsyncSessionLocal도 대체"""
+    db = temp_db("log_writer", expire_on_commit=False)
+    return db.async_session_local, db.session
+
+
+def statuses(session, log_id):
+    session.expire_all()
+    rows = session.query(PushDelivery).filter_by(push_log_id=log_id).order_by(PushDelivery.seq).all()
+    return [(row.token, row.status, row.message_id, row.error_code) for row in rows]
+
+
+class TestResults:
+    @pytest.mark.asyncio
+    async def test_attempt_records_per_token_results(self):
+        """성공 토큰은 message ID, 영구 실패는 failed, 일시적 실패는 retrying (다음 시도 결과로 덮어씀)"""
+        policy = RetryPolicy(True, 3, 0.01, 0.01, RetryBudget(ratio=1, min_retries=10, window=60))
+        first = AsyncMock(return_value=(1, 2, FailedTokens(
+            [("t2", "UNAVAILABLE"), ("t3", "UNREGISTERED")], message_ids={"t1": "m1"}
+        )))
+        with patch("retry_engine.retry_policy", policy), \
+             patch("retry_engine.PushService.send_push_async", new=first):
+            attempt = await attempt_push("proj", ["t1", "t2", "t3"], "제목", "내용")
+        assert attempt.results == {
+            "t1": ("success", "m1", None),
+            "t2": ("retrying", None, "UNAVAILABLE"),
+            "t3": ("failed", None, "UNREGISTERED"),
+        }
+
+        second = AsyncMock(return_value=(1, 0, FailedTokens(message_ids={"t2": "m2"})))
+        with patch("retry_engine.retry_policy", policy), \
+             patch("retry_engine.PushService.send_push_async", new=second):
+            final = await attempt_push("proj", attempt.retry_tokens, "제목", "내용", prior=attempt)
+        assert final.results["t2"] == ("success", "m2", None)
+        assert final.results["t1"] == ("success", "m1", None)
+        assert "failed_tokens" not in final.log_values()
+
+    def test_failed_tokens_merge_keeps_message_ids(self):
+        merged = FailedTokens([("a", "UNAVAILABLE")], message_ids={"b": "m1"}) + FailedTokens([("c", "DEAD")])
+        assert merged == ["a", "c"]
+        assert merged.message_ids == {"b": "m1"}
+
+    def test_mysql_result_upsert_keeps_seq_and_created_at(self):
+        """결과만 갱신하는 행은 seq/created_at을 덮어쓰지 않음"""
+        rows = result_rows(make_log_id(1), {"t1": ("success", "m1", None), "t2": ("failed", None, "UNREGISTERED")})
+        sql = str(upsert_statement("mysql", PushDelivery.__table__, rows).compile(dialect=mysql.dialect()))
+        assert sql.count("INSERT INTO push_deliveries") == 1
+        assert "status = VALUES(status)" in sql
+        assert "seq = VALUES(seq)" not in sql
+        assert "created_at = VALUES(created_at)" not in sql
+
+
+class TestStorage:
+    @pytest.mark.asyncio
+    async def test_pending_rows_updated_with_results(self, delivery_db):
+        asyncSessionLocal, session = delivery_db
+        async with asyncSessionLocal() as db:
+            await add_pending_deliveries(db, make_log_id(1), ["t1", "t2", "t3"])
+            await db.commit()
+        assert [status for _, status, _, _ in statuses(session, make_log_id(1))] == ["pending"] * 3
+
+        async with asyncSessionLocal() as db:
+            await save_delivery_rows(db, result_rows(make_log_id(1), {"t2": ("failed", None, "UNREGISTERED")}))
+            await db.commit()
+        assert statuses(session, make_log_id(1)) == [
+            ("t1", "pending", None, None),
+            ("t2", "failed", None, "UNREGISTERED"),
+            ("t3", "pending", None, None),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_write_behind_stores_log_and_deliveries_together(self, delivery_db):
+        """write-behind 로그는 토큰별 결과 행과 같은 트랜잭션으로 기록"""
+        _, session = delivery_db
+        log = PushLog(id=make_log_id(2), firebase_project_id="proj", title="t", body="b", token_count=2, status="success")
+        rows = result_rows(make_log_id(2), {"t1": ("success", "m1", None), "t2": ("success", "m2", None)}, ["t1", "t2"])
+
+        writer = LogWriter(enabled=True, batch_size=10, flush_interval=10, max_pending=100, put_timeout=1)
+        await writer.start()
+        await writer.upsert(log, children=[(PushDelivery, rows)])
+        await writer.update(PushLog, make_log_id(2), {"status": "partial"}, children=[
+            (PushDelivery, result_rows(make_log_id(2), {"t2": ("failed", None, "INTERNAL")}))
+        ])
+        assert session.get(PushLog, make_log_id(2)) is None
+        await writer.shutdown()
+
+        assert session.get(PushLog, make_log_id(2)).status == "partial"
+        assert statuses(session, make_log_id(2)) == [("t1", "success", "m1", None), ("t2", "failed", None, "INTERNAL")]
+
+
+class TestQueries:
+    @pytest.mark.asyncio
+    async def test_list_deliveries_pages_in_request_order(self, delivery_db):
+        asyncSessionLocal, _ = delivery_db
+        tokens = [f"t{i}" for i in range(5)]
+        async with asyncSessionLocal() as db:
+            await add_pending_deliveries(db, make_log_id(1), tokens)
+            await db.commit()
+
+            seen, cursor = [], None
+            while True:
+                page, cursor = await list_deliveries(db, make_log_id(1), None, cursor, 2)
+                seen.extend(row.token for row in page)
+                if cursor is None:
+                    break
+            assert seen == tokens
+
+            with pytest.raises(InvalidCursorError):
+                await list_deliveries(db, make_log_id(1), None, "not-a-seq", 2)
+
+    @pytest.mark.asyncio
+    async def test_token_history_newest_first(self, delivery_db):
+        """같은 토큰이 받은 발송을 로그를 가리지 않고 최신순으로 조회"""
+        asyncSessionLocal, _ = delivery_db
+        base = datetime(2025, 1, 1)
+        async with asyncSessionLocal() as db:
+            for i in range(3):
+                await save_delivery_rows(db, result_rows(
+                    make_log_id(i), {"shared": ("success", f"m{i}", None)}, ["shared", f"other-{i}"],
+                    now=base + timedelta(minutes=i)
+                ))
+            await db.commit()
+
+            first, cursor = await token_history(db, "shared", None, 2)
+            rest, last_cursor = await token_history(db, "shared", cursor, 2)
+        assert [row.push_log_id for row in first + rest] == [make_log_id(2), make_log_id(1), make_log_id(0)]
+        assert last_cursor is None
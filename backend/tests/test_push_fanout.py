@@ -0,0 +1,134 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from database import PushDelivery, PushLog
+from push_fanout import (
+    PushFanoutJob, PushFanoutRunner, create_fanout_logs, dedupe_tokens, parse_token_file
+)
+
+
+@pytest.fixture
+def fanout_db(temp_db):
+    """임시 SQLite DB (비동기 세션 팩토리, 검증용 동기 세션)"""
+    db = temp_db("push_fanout")
+    return db.async_session_local, db.session
+
+
+class TestTokenParsing:
+    def test_ndjson(self):
+        """NDJSON: 문자열 또는 {"token": ...} 객체"""
+        content = b'"token_a"\n{"token": "token_b"}\n\n"token_c"\n'
+        assert parse_token_file("tokens.ndjson", content) == ["token_a", "token_b", "token_c"]
+
+    def test_csv_with_header(self):
+        """CSV: 첫 컬럼 사용, token 헤더는 건너뜀"""
+        content = "token,user_id\ntoken_a,1\ntoken_b,2\n".encode("utf-8")
+        assert parse_token_file("tokens.csv", content) == ["token_a", "token_b"]
+
+    def test_invalid_ndjson_line(self):
+        """잘못된 줄은 줄 번호와 함께 오류"""
+        with pytest.raises(ValueError, match="2번째 줄"):
+            parse_token_file("tokens.jsonl", b'"token_a"\n{broken\n')
+
+    def test_unsupported_extension(self):
+        with pytest.raises(ValueError):
+            parse_token_file("tokens.txt", b"token_a")
+
+    def test_dedupe_tokens(self):
+        """순서 유지 + 중복/빈 토큰 제거"""
+        assert dedupe_tokens(["b", "a", "b", "", "c", "a"]) == ["b", "a", "c"]
+
+
+class TestPushFanoutRunner:
+    def test_build_chunks(self):
+        """500개 단위로 chunk 분할"""
+        tokens = [f"token_{i}" for i in range(1201)]
+        job = PushFanoutJob.build("test-project", tokens, "제목", "내용")
+        assert [len(chunkTokens) for _, chunkTokens in job.chunks] == [500, 500, 201]
+        assert job.total_tokens == 1201
+
+    @pytest.mark.asyncio
+    async def test_run_aggregates_chunks(self, fanout_db):
+        """chunk 결과는 자식 로그에, 합계는 부모 로그에 반영"""
+        asyncSessionLocal, session = fanout_db
+        tokens = [f"token_{i}" for i in range(1100)]
+        job = PushFanoutJob.build("test-project", tokens, "제목", "내용")
+        async with asyncSessionLocal() as db:
+            await create_fanout_logs(db, job)
+
+        async def fakeSendPushAsync(firebase_project_id, device_tokens, title, body, data=None):
+            await asyncio.sleep(0)
+            if device_tokens[0] == "token_1000":
+                raise RuntimeError("FCM 오류")
+            return len(device_tokens) - 1, 1, [device_tokens[-1]]
+
+        runner = PushFanoutRunner(concurrency=2)
+        queue = runner.subscribe(job.log_id)
+        with patch("push_fanout.PushService.send_push_async", side_effect=fakeSendPushAsync):
+            await runner.run(job)
+
+        parent = session.get(PushLog, job.log_id)
+        assert parent.status == "partial"
+        assert parent.success_count == 998
+        assert parent.failure_count == 102
+        assert parent.token_count == 1100
+
+        children = session.query(PushLog).filter_by(parent_log_id=job.log_id).order_by(PushLog.chunk_index).all()
+        assert [child.status for child in children] == ["partial", "partial", "failed"]
+        assert children[2].error_message == "FCM 오류"
+        assert [child.token_count for child in children] == [500, 500, 100]
+        deliveries = session.query(PushDelivery).filter_by(push_log_id=children[0].id).order_by(PushDelivery.seq).all()
+        assert len(deliveries) == 500
+        assert deliveries[0].token == "token_0"
+        assert [d.token for d in deliveries if d.status == "failed"] == ["token_499"]
+        assert session.query(PushDelivery).filter_by(push_log_id=job.log_id).count() == 0
+
+        events = []
+        while not queue.empty():
+            events.append(queue.get_nowait())
+        assert [event for event, _ in events] == ["started", "chunk", "chunk", "chunk", "done"]
+        assert events[-1][1]["completed_chunks"] == 3
+        assert events[-1][1]["status"] == "partial"
+
+    @pytest.mark.asyncio
+    async def test_worker_error_fails_parent_and_stops_siblings(self, fanout_db):
+        """워커 예외 시 남은 chunk/부모를 실패 처리하고 done 이벤트 전달, 다른 워커는 취소"""
+        asyncSessionLocal, session = fanout_db
+        job = PushFanoutJob.build("test-project", [f"token_{i}" for i in range(1500)], "제목", "내용")
+        async with asyncSessionLocal() as db:
+            await create_fanout_logs(db, job)
+        cancelled = []
+
+        async def fakeAttemptPush(firebase_project_id, tokens, title, body, data=None, prior=None):
+            if tokens[0] == "token_0":
+                await asyncio.sleep(0.01)
+                raise RuntimeError("boom")
+            try:
+                await asyncio.Event().wait()  # 취소되지 않으면 끝나지 않음
+            except asyncio.CancelledError:
+                cancelled.append(tokens[0])
+                raise
+
+        runner = PushFanoutRunner(concurrency=2)
+        queue = runner.subscribe(job.log_id)
+        with patch("push_fanout.attempt_push", side_effect=fakeAttemptPush):
+            await asyncio.wait_for(runner.run(job), timeout=5)
+
+        events = []
+        while not queue.empty():
+            events.append(queue.get_nowait())
+        assert events[-1][0] == "done"
+        assert events[-1][1]["status"] == "failed"
+        parent = session.get(PushLog, job.log_id)
+        assert parent.status == "failed"
+        assert parent.failure_count == 1500
+        children = session.query(PushLog).filter_by(parent_log_id=job.log_id).all()
+        assert {child.status for child in children} == {"failed"}
+        assert cancelled == ["token_500"]
+        assert runner.stats()["in_progress"] == []
@@ -11,8 +11,9 @@ from push_service import PushService
 
 class TestPushService:
     def setup_method(self):
-        """각 테스트 전에 앱 캐시 초기화"""
+        """각 테스트 전에 앱 캐시 및 Secrets Manager 클라이언트 초기화"""
         push_service._firebase_app_cache.clear()
+        push_service._reset_secrets_client()
 
     def _make_mock_app(self, project_id="test-project"):
         """Firebase 앱 mock 반환"""
@@ -261,3 +262,186 @@ class TestPushService:
         assert calledApps[0] is mockAppA
         assert calledApps[1] is mockAppB
         assert calledApps[0] is not calledApps[1]
+
+
+class TestPushServiceAsync:
+    def setup_method(self):
+        push_service._firebase_app_cache.clear()
+        push_service._project_semaphores.clear()
+
+    @pytest.mark.asyncio
+    async def test_send_push_async_runs_off_event_loop(self):
+        """send_push는 이벤트 루프 스레드가 아닌 스레드 풀에서 실행"""
+        import threading
+        loopThread = threading.get_ident()
+        calledThreads = []
+
+        def fakeSendPush(**kwargs):
+            calledThreads.append(threading.get_ident())
+            return 1, 0, []
+
+        with patch.object(PushService, "send_push", side_effect=fakeSendPush):
+            result = await PushService.send_push_async(
+                firebase_project_id="test-project",
+                device_tokens=["token_a"],
+                title="제목",
+                body="내용"
+            )
+
+        assert result == (1, 0, [])
+        assert calledThreads and calledThreads[0] != loopThread
+
+    @pytest.mark.asyncio
+    async def test_event_loop_not_blocked(self):
+        """느린 FCM 호출 중에도 다른 코루틴이 실행됨"""
+        import asyncio
+        import time
+
+        def slowSendPush(**kwargs):
+            time.sleep(0.2)
+            return 1, 0, []
+
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        with patch.object(PushService, "send_push", side_effect=slowSendPush):
+            await asyncio.gather(
+                PushService.send_push_async(
+                    firebase_project_id="test-project",
+                    device_tokens=["token_a"],
+                    title="제목",
+                    body="내용"
+                ),
+                ticker()
+            )
+
+        assert len(ticks) == 5
+        assert ticks[-1] - ticks[0] < 0.2
+
+    @pytest.mark.asyncio
+    async def test_project_concurrency_cap(self):
+        """프로젝트별 동시 실행 수 제한"""
+        import asyncio
+        import time
+        import threading
+        lock = threading.Lock()
+        state = {"current": 0, "peak": 0}
+
+        def trackingSendPush(**kwargs):
+            with lock:
+                state["current"] += 1
+                state["peak"] = max(state["peak"], state["current"])
+            time.sleep(0.05)
+            with lock:
+                state["current"] -= 1
+            return 1, 0, []
+
+        with patch.object(PushService, "send_push", side_effect=trackingSendPush), \
+             patch.object(push_service.settings, "push_project_concurrency", 2):
+            await asyncio.gather(*[
+                PushService.send_push_async(
+                    firebase_project_id="capped-project",
+                    device_tokens=["token"],
+                    title="제목",
+                    body="내용"
+                )
+                for _ in range(6)
+            ])
+
+        assert state["peak"] == 2
+        assert PushService.executor_stats()["in_flight"] == {}
+
+
+class StubSecretsManager:
+    """Secrets Manager 로컬 stub (등록된 Secret만 반환)"""
+
+    def __init__(self, secrets):
+        self.secrets = secrets
+        self.calls = []
+
+    def get_secret_value(self, SecretId):
+        import json
+        from botocore.exceptions import ClientError
+        self.calls.append(SecretId)
+        if SecretId not in self.secrets:
+            raise ClientError(
+                {'Error': {'Code': 'ResourceNotFoundException', 'Message': 'not found'}},
+                'GetSecretValue'
+            )
+        return {'SecretString': json.dumps(self.secrets[SecretId])}
+
+
+class TestSecretsClientAndPrewarm:
+    def setup_method(self):
+        push_service._firebase_app_cache.clear()
+        push_service._reset_secrets_client()
+
+    def teardown_method(self):
+        push_service._reset_secrets_client()
+
+    def _make_stub(self, *projectIds):
+        return StubSecretsManager({
+            f"prod/ignite-pilot/{projectId}-android-key": {"type": "service_account", "project_id": projectId}
+            for projectId in projectIds
+        })
+
+    def test_secrets_client_created_once(self):
+        """여러 프로젝트 로드 시에도 boto3 클라이언트는 한 번만 생성"""
+        stub = self._make_stub("project-a", "project-b")
+        with patch("push_service.boto3.client", return_value=stub) as mockBotoClient:
+            push_service._load_service_account_from_aws("project-a")
+            push_service._load_service_account_from_aws("project-b")
+            push_service._load_service_account_from_aws("project-a")
+
+        mockBotoClient.assert_called_once_with('secretsmanager', region_name='ap-northeast-2')
+        assert len(stub.calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_prewarm_initializes_apps(self):
+        """사전 초기화 후 발송 시 Secrets Manager 재조회 없음, 실패 프로젝트는 오류 반환"""
+        stub = self._make_stub("project-a", "project-b")
+        with patch("push_service.FIREBASE_AVAILABLE", True), \
+             patch("push_service.boto3.client", return_value=stub), \
+             patch("push_service.credentials.Certificate"), \
+             patch("push_service.firebase_admin.initialize_app", side_effect=lambda cred, name: MagicMock(name=name)):
+            outcome = await PushService.prewarm(["project-a", "project-b", "missing-project"])
+
+            assert outcome["project-a"] is None
+            assert outcome["project-b"] is None
+            assert "찾을 수 없습니다" in outcome["missing-project"]
+            assert "project-a" in push_service._firebase_app_cache
+            assert "project-b" in push_service._firebase_app_cache
+
+            callCount = len(stub.calls)
+            PushService._get_firebase_app("project-a")
+            assert len(stub.calls) == callCount
+
+    def test_slow_prewarm_does_not_block_startup(self):
+        """사전 초기화가 끝나지 않아도 서버는 시작되어 헬스 체크에 응답"""
+        import asyncio
+        from fastapi.testclient import TestClient
+        from main import app
+        from settings import settings
+
+        started = []
+
+        async def slowPrewarm(projects):
+            started.append(projects)
+            await asyncio.Event().wait()
+
+        with patch.object(settings, "firebase_prewarm_projects", "project-a"), \
+             patch("main.PushService.prewarm", side_effect=slowPrewarm):
+            with TestClient(app) as client:
+                assert client.get("/api/health").status_code == 200
+        assert started == [["project-a"]]
+
+    @pytest.mark.asyncio
+    async def test_prewarm_empty(self):
+        """대상 프로젝트가 없으면 아무 것도 하지 않음"""
+        with patch("push_service.boto3.client") as mockBotoClient:
+            assert await PushService.prewarm([]) == {}
+        mockBotoClient.assert_not_called()
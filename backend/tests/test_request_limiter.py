@@ -0,0 +1,161 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from request_limiter import (
+    STORAGE_DATABASE, STORAGE_MEMORY, RequestLimiter, api_key_hash, client_ip, parse_api_key_limits,
+    parse_rate, sliding_window_count
+)
+
+
+def make_request(peer="10.0.0.1", forwarded=None, api_key=None):
+    headers = []
+    if forwarded:
+        headers.append((b"x-forwarded-for", forwarded.encode()))
+    if api_key:
+        headers.append((b"x-api-key", api_key.encode()))
+    return Request({"type": "http", "method": "POST", "path": "/api/v1/email/send", "headers": headers, "client": (peer, 1234)})
+
+
+# DB 카운터의 만료 시각(expires_at)이 실제 시각 기준이므로 현재 시각의 분 경계에서 시작
+BASE = time.time() // 60 * 60
+
+
+class FakeClock:
+    def __init__(self, now=BASE):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_limiter(storage=STORAGE_MEMORY, **overrides):
+    options = dict(enabled=True, storage=storage, trusted_proxies=1, api_key_limits={}, clock=FakeClock())
+    options.update(overrides)
+    return RequestLimiter(**options)
+
+
+@pytest.fixture
+def limiter_db(temp_db):
+    """임시 SQLite DB로 rate limit 카운터 테이블을 대체 (여러 인스턴스가 공유하는 DB 역할)"""
+    temp_db("request_limiter")
+
+
+class TestParsing:
+    def test_parse_rate(self):
+        assert parse_rate("10/minute") == (10, 60)
+        assert parse_rate("100/seconds") == (100, 1)
+        with pytest.raises(ValueError):
+            parse_rate("10 per minute")
+
+    def test_parse_api_key_limits(self):
+        assert parse_api_key_limits("ABC=600/minute, def=5/second,") == {"abc": (600, 60), "def": (5, 1)}
+        assert parse_api_key_limits("") == {}
+
+    def test_sliding_window_count(self):
+        """직전 window는 현재 window에서 지난 비율만큼 덜 반영"""
+        assert sliding_window_count(10, 2, 0.25) == 9.5
+        assert sliding_window_count(10, 2, 1.0) == 2
+
+
+class TestClientIp:
+    def test_forwarded_for_behind_trusted_proxy(self):
+        """클라이언트가 위조한 왼쪽 항목은 무시하고 신뢰하는 프록시가 추가한 주소를 사용"""
+        request = make_request(peer="10.0.0.1", forwarded="1.1.1.1, 203.0.113.7")
+        assert client_ip(request, trusted_proxies=1) == "203.0.113.7"
+        assert client_ip(request, trusted_proxies=2) == "1.1.1.1"
+        assert client_ip(request, trusted_proxies=0) == "10.0.0.1"
+        assert client_ip(make_request(peer="10.0.0.1"), trusted_proxies=1) == "10.0.0.1"
+
+
+class TestRequestLimiter:
+    @pytest.mark.asyncio
+    async def test_limit_per_client_and_retry_after(self):
+        limiter = make_limiter()
+        for _ in range(3):
+            await limiter.check("send", make_request(forwarded="203.0.113.7"), (3, 60))
+        with pytest.raises(HTTPException) as excinfo:
+            await limiter.check("send", make_request(forwarded="203.0.113.7"), (3, 60))
+        assert excinfo.value.status_code == 429
+        assert int(excinfo.value.headers["Retry-After"]) >= 1
+
+        # 같은 ALB(peer)를 거쳐도 클라이언트가 다르면 별도 카운터
+        await limiter.check("send", make_request(forwarded="198.51.100.1"), (3, 60))
+        assert limiter.stats()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sliding_window_carries_previous_window(self):
+        """window가 바뀌어도 직전 window 요청이 남은 비율만큼 반영되어 경계에서 2배 burst가 나지 않음"""
+        clock = FakeClock()
+        limiter = make_limiter(clock=clock)
+        for _ in range(4):
+            await limiter.check("send", make_request(), (4, 60))
+
+        clock.now = BASE + 60 + 15  # 다음 window 25% 경과: 4 × 0.75 = 3
+        await limiter.check("send", make_request(), (4, 60))
+        with pytest.raises(HTTPException) as excinfo:
+            await limiter.check("send", make_request(), (4, 60))
+        # 직전 window 비중이 4 × (1 - r) + 1 + 1 ≤ 4 → r ≥ 0.5 가 될 때까지 (15초 후)
+        assert excinfo.value.headers["Retry-After"] == "15"
+
+        clock.now = BASE + 60 + 30
+        await limiter.check("send", make_request(), (4, 60))
+
+    @pytest.mark.asyncio
+    async def test_registered_api_key_gets_own_quota(self):
+        limiter = make_limiter(api_key_limits={api_key_hash("partner-key"): (5, 60)})
+        for _ in range(5):
+            await limiter.check("send", make_request(api_key="partner-key"), (1, 60))
+        with pytest.raises(HTTPException):
+            await limiter.check("send", make_request(api_key="partner-key"), (1, 60))
+
+        # 등록되지 않은 키는 IP 기준 기본 한도
+        await limiter.check("send", make_request(api_key="random"), (1, 60))
+        with pytest.raises(HTTPException):
+            await limiter.check("send", make_request(api_key="other"), (1, 60))
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        limiter = make_limiter(enabled=False)
+        for _ in range(5):
+            await limiter.check("send", make_request(), (1, 60))
+
+
+class TestDatabaseStorage:
+    @pytest.mark.asyncio
+    async def test_counters_shared_across_instances(self, limiter_db):
+        """두 인스턴스(ECS task)가 같은 DB 카운터를 공유하여 합계 기준으로 제한"""
+        clock = FakeClock()
+        first = make_limiter(STORAGE_DATABASE, clock=clock)
+        second = make_limiter(STORAGE_DATABASE, clock=clock)
+
+        await asyncio.gather(*(
+            limiter.check("send", make_request(), (4, 60)) for limiter in (first, second, first, second)
+        ))
+        with pytest.raises(HTTPException):
+            await second.check("send", make_request(), (4, 60))
+        with pytest.raises(HTTPException):
+            await first.check("send", make_request(), (4, 60))
+        assert first.stats()["storage_errors"] == 0
+
+    @pytest.mark.asyncio
+    async def test_storage_error_falls_back_to_memory(self):
+        """DB 오류 시 요청을 막지 않고 인스턴스 메모리 카운터로 제한"""
+        limiter = make_limiter(STORAGE_DATABASE)
+
+        def broken():
+            raise RuntimeError("db down")
+
+        with patch("request_limiter.AsyncSessionLocal", broken):
+            await limiter.check("send", make_request(), (1, 60))
+            with pytest.raises(HTTPException):
+                await limiter.check("send", make_request(), (1, 60))
+        assert limiter.stats()["storage_errors"] == 2
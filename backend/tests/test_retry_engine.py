@@ -0,0 +1,157 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from unittest.mock import patch, AsyncMock
+
+import aiosmtplib
+import pytest
+
+from push_service import FailedTokens
+from retry_engine import (
+    STATUS_RETRYING, PushAttempt, RetryBudget, RetryPolicy, attempt_email, attempt_push,
+    backoff_delay, classify_smtp_error, is_transient_fcm_error
+)
+
+
+def make_policy(**overrides):
+    options = dict(enabled=True, max_attempts=3, base_delay=1, max_delay=10)
+    options.update(overrides)
+    budget = options.pop("budget", RetryBudget(ratio=0.5, min_retries=10, window=60))
+    return RetryPolicy(budget=budget, **options)
+
+
+class TestClassification:
+    def test_smtp_reply_codes(self):
+        """4xx 응답은 일시적, 5xx 응답은 영구 오류"""
+        assert classify_smtp_error(aiosmtplib.SMTPResponseException(451, "try later")) == (True, "451")
+        assert classify_smtp_error(aiosmtplib.SMTPResponseException(550, "no such user")) == (False, "550")
+        assert classify_smtp_error(aiosmtplib.SMTPAuthenticationError(535, "bad credentials")) == (False, "535")
+
+    def test_smtp_connection_errors_are_transient(self):
+        """연결 끊김/타임아웃은 일시적 오류, 그 외 예외는 영구 오류"""
+        assert classify_smtp_error(aiosmtplib.SMTPServerDisconnected("gone"))[0] is True
+        assert classify_smtp_error(aiosmtplib.SMTPTimeoutError("timeout"))[0] is True
+        assert classify_smtp_error(ValueError("bad"))[0] is False
+
+    def test_recipients_refused(self):
+        """모든 수신자가 4xx로 거부된 경우만 일시적 오류"""
+        refused = aiosmtplib.SMTPRecipientsRefused([
+            aiosmtplib.SMTPRecipientRefused(450, "busy", "a@example.com"),
+            aiosmtplib.SMTPRecipientRefused(550, "unknown", "b@example.com"),
+        ])
+        assert classify_smtp_error(refused) == (False, "450")
+
+    def test_fcm_codes(self):
+        assert is_transient_fcm_error("UNAVAILABLE")
+        assert is_transient_fcm_error("INTERNAL")
+        assert not is_transient_fcm_error("UNREGISTERED")
+        assert not is_transient_fcm_error(None)
+
+
+class TestRetryPolicy:
+    def test_backoff_is_capped_with_jitter(self):
+        """full jitter: 0 ~ min(cap, base × 2^(attempt-1))"""
+        assert backoff_delay(1, base=2, cap=100, rand=lambda: 1.0) == 2
+        assert backoff_delay(3, base=2, cap=100, rand=lambda: 0.5) == 4
+        assert backoff_delay(10, base=2, cap=100, rand=lambda: 1.0) == 100
+        assert backoff_delay(3, base=2, cap=100, rand=lambda: 0.0) == 0
+
+    def test_no_retry_for_permanent_or_last_attempt(self):
+        policy = make_policy()
+        assert policy.next_delay("smtp.example.com", 1, transient=False) is None
+        assert policy.next_delay("smtp.example.com", 3, transient=True) is None
+        assert policy.next_delay("smtp.example.com", 2, transient=True) is not None
+        assert make_policy(enabled=False).next_delay("smtp.example.com", 1, transient=True) is None
+
+    def test_budget_per_destination(self):
+        """재시도 수는 max(min_retries, 요청 수 × ratio)까지만 허용 (목적지별)"""
+        policy = make_policy(budget=RetryBudget(ratio=0.5, min_retries=1, window=60))
+        for _ in range(4):
+            policy.record_first_attempt("a")
+        delays = [policy.next_delay("a", 1, transient=True) for _ in range(3)]
+        assert [delay is not None for delay in delays] == [True, True, False]
+        # 다른 목적지는 별도 예산
+        assert policy.next_delay("b", 1, transient=True) is not None
+        assert policy.stats()["budget"]["exhausted"] == 1
+
+
+class TestAttemptEmail:
+    @pytest.mark.asyncio
+    async def test_transient_failure_schedules_retry(self):
+        """4xx 응답 → 재시도 대기 (시도 이력에 코드와 대기 시간 기록)"""
+        send = AsyncMock(side_effect=aiosmtplib.SMTPResponseException(421, "busy"))
+        with patch("retry_engine.retry_policy", make_policy()), \
+             patch("retry_engine.EmailService.send_email", new=send):
+            attempt = await attempt_email({"smtp_host": "smtp.example.com"})
+
+        assert attempt.status == STATUS_RETRYING
+        assert attempt.retry_delay is not None
+        assert attempt.attempts[0]["code"] == "421"
+        assert attempt.attempts[0]["transient"] is True
+        send.assert_awaited_once_with(smtp_host="smtp.example.com", raise_errors=True)
+
+    @pytest.mark.asyncio
+    async def test_permanent_failure_and_success_history(self):
+        """5xx 응답 → 실패, 이전 시도 이력에 이어서 기록"""
+        history = [{"attempt": 1, "success": False}]
+        send = AsyncMock(side_effect=aiosmtplib.SMTPResponseException(550, "rejected"))
+        with patch("retry_engine.retry_policy", make_policy()), \
+             patch("retry_engine.EmailService.send_email", new=send):
+            attempt = await attempt_email({"smtp_host": "smtp.example.com"}, history)
+
+        assert attempt.status == "failed"
+        assert [record["attempt"] for record in attempt.attempts] == [1, 2]
+
+        with patch("retry_engine.retry_policy", make_policy()), \
+             patch("retry_engine.EmailService.send_email", new=AsyncMock(return_value=(True, None))):
+            attempt = await attempt_email({"smtp_host": "smtp.example.com"})
+        assert attempt.status == "success"
+        assert attempt.attempts[0]["success"] is True
+
+
+class TestAttemptPush:
+    @pytest.mark.asyncio
+    async def test_only_transient_tokens_are_retried(self):
+        """UNAVAILABLE 토큰만 재시도, UNREGISTERED는 영구 실패로 집계"""
+        failed = FailedTokens([("t2", "UNAVAILABLE"), ("t3", "UNREGISTERED")])
+        send = AsyncMock(return_value=(1, 2, failed))
+        with patch("retry_engine.retry_policy", make_policy()), \
+             patch("retry_engine.PushService.send_push_async", new=send):
+            attempt = await attempt_push("proj", ["t1", "t2", "t3"], "제목", "내용")
+
+        assert attempt.status == STATUS_RETRYING
+        assert attempt.retry_tokens == ["t2"]
+        assert attempt.failed_tokens == ["t3"]
+        assert attempt.attempts[0]["codes"] == {"UNAVAILABLE": 1, "UNREGISTERED": 1}
+        assert "status" not in attempt.log_values()
+
+        # 재시도 성공 → 누적 집계
+        with patch("retry_engine.retry_policy", make_policy()), \
+             patch("retry_engine.PushService.send_push_async", new=AsyncMock(return_value=(1, 0, FailedTokens()))):
+            final = await attempt_push("proj", attempt.retry_tokens, "제목", "내용", prior=attempt)
+
+        assert final.status == "partial"
+        assert final.success_count == 2
+        assert final.failed_tokens == ["t3"]
+        assert len(final.attempts) == 2
+        assert final.log_values()["status"] == "partial"
+
+    @pytest.mark.asyncio
+    async def test_exception_is_permanent(self):
+        """Firebase 앱 초기화 실패 등 예외 → 전체 실패, 재시도하지 않음"""
+        send = AsyncMock(side_effect=ValueError("Secret 없음"))
+        with patch("retry_engine.retry_policy", make_policy()), \
+             patch("retry_engine.PushService.send_push_async", new=send):
+            attempt = await attempt_push("proj", ["t1", "t2"], "제목", "내용")
+
+        assert attempt.status == "failed"
+        assert attempt.failure_count == 2
+        assert attempt.error_message == "Secret 없음"
+
+    def test_failed_tokens_keep_error_codes(self):
+        """FailedTokens는 list처럼 동작하고 합쳐도 에러 코드를 유지"""
+        merged = FailedTokens([("a", "INTERNAL")]) + FailedTokens([("b", "DEAD_TOKEN")])
+        assert merged == ["a", "b"]
+        assert merged.error_codes == {"a": "INTERNAL", "b": "DEAD_TOKEN"}
+        assert PushAttempt(success_count=0, failed_tokens=["a"]).status == "failed"
@@ -0,0 +1,290 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import ANY, patch, AsyncMock
+
+import pytest
+
+from database import EmailLog, JobPayload, PushDelivery, PushLog
+from push_deliveries import pending_rows
+from scheduler import (
+    KIND_EMAIL, KIND_PUSH, SendScheduler, decode_payload, encode_payload, parse_send_at
+)
+
+
+@pytest.fixture
+def sched_db(temp_db):
+    """임시 SQLite DB로 스케줄러/로그 기록의 AsyncSessionLocal을 대체"""
+    return temp_db("scheduler", "log_writer", expire_on_commit=False).session
+
+
+def add_push_log(session, send_at, status="scheduled", tokens=("token-1",), **overrides):
+    values = dict(
+        firebase_project_id="proj",
+        title="t",
+        body="b",
+        token_count=len(tokens),
+        status=status,
+        send_at=send_at
+    )
+    values.update(overrides)
+    log = PushLog(**values)
+    session.add(log)
+    session.commit()
+    session.add_all(PushDelivery(**row) for row in pending_rows(log.id, tokens))
+    session.commit()
+    return log
+
+
+def delivery_statuses(session, log_id):
+    session.expire_all()
+    return {d.token: d.status for d in session.query(PushDelivery).filter_by(push_log_id=log_id)}
+
+
+def make_scheduler(**overrides):
+    options = dict(poll_interval=0.05, lookahead=60, release_rate=1000)
+    options.update(overrides)
+    return SendScheduler(**options)
+
+
+class TestParseSendAt:
+    def test_empty_and_past_mean_immediate(self):
+        """send_at 없음/과거 시각 → None (즉시 발송)"""
+        now = datetime(2026, 1, 1, 0, 0, 0)
+        assert parse_send_at(None, now=now) is None
+        assert parse_send_at("", now=now) is None
+        assert parse_send_at("2025-12-31T23:00:00Z", now=now) is None
+
+    def test_timezone_converted_to_utc(self):
+        """시간대가 있으면 UTC naive로 변환, 없으면 UTC로 간주"""
+        now = datetime(2026, 1, 1, 0, 0, 0)
+        assert parse_send_at("2026-01-01T09:30:00+09:00", now=now) == datetime(2026, 1, 1, 0, 30, 0)
+        assert parse_send_at("2026-01-01T01:00:00", now=now) == datetime(2026, 1, 1, 1, 0, 0)
+
+    def test_invalid_and_too_far(self):
+        """형식 오류, 최대 예약 기간 초과 → ValueError"""
+        now = datetime(2026, 1, 1, 0, 0, 0)
+        with pytest.raises(ValueError):
+            parse_send_at("tomorrow 9am", now=now)
+        with pytest.raises(ValueError):
+            parse_send_at("2027-01-01T00:00:00Z", now=now)
+
+    def test_future_rejected_when_scheduler_disabled(self):
+        """예약 발송이 꺼져 있으면 미래 시각은 거부 (지난 시각은 즉시 발송)"""
+        from settings import settings
+
+        now = datetime(2026, 1, 1, 0, 0, 0)
+        with patch.object(settings, "scheduler_enabled", False):
+            assert parse_send_at("2025-12-31T23:00:00Z", now=now) is None
+            with pytest.raises(ValueError, match="SCHEDULER_ENABLED"):
+                parse_send_at("2026-01-01T01:00:00Z", now=now)
+
+
+class TestJobPayload:
+    def test_round_trip_with_attachment(self):
+        """첨부 bytes는 base64 content로 저장되고 복호화 시 그대로 복원"""
+        payload = encode_payload({
+            "subject": "s",
+            "smtp_password": "secret",
+            "attachments": [{"filename": "a.txt", "data": b"hello"}]
+        })
+        assert b"secret" not in payload
+        decoded = decode_payload(payload)
+        assert decoded["smtp_password"] == "secret"
+        assert decoded["attachments"] == [{"filename": "a.txt", "content": "aGVsbG8="}]
+
+    def test_missing_key_refused_outside_local(self):
+        """local 외 환경은 JOB_PAYLOAD_KEY가 없으면 임시 키를 만들지 않고 서버 시작도 거부"""
+        from fastapi.testclient import TestClient
+        import main
+        import scheduler
+        from settings import settings
+
+        scheduler._fernet.cache_clear()
+        try:
+            with patch.object(settings, "env_name", "alpha"), \
+                 patch.object(settings, "job_payload_key", ""), \
+                 patch.object(settings, "scheduler_enabled", True):
+                with pytest.raises(RuntimeError, match="JOB_PAYLOAD_KEY"):
+                    encode_payload({"subject": "s"})
+                with pytest.raises(RuntimeError, match="JOB_PAYLOAD_KEY"):
+                    with TestClient(main.app):
+                        pass
+                assert not scheduler.send_scheduler.running
+        finally:
+            scheduler._fernet.cache_clear()
+
+
+class TestSendScheduler:
+    @pytest.mark.asyncio
+    async def test_load_is_incremental(self, sched_db):
+        """lookahead 구간만 로드하고, 다음 로드는 이전 구간 이후만 조회"""
+        now = datetime.utcnow()
+        near = add_push_log(sched_db, now + timedelta(seconds=10))
+        far = add_push_log(sched_db, now + timedelta(seconds=120))
+        add_push_log(sched_db, now + timedelta(seconds=5), status="success")
+
+        scheduler = make_scheduler()
+        assert await scheduler.load(now) == 1
+        assert [entry[2] for entry in scheduler._heap] == [near.id]
+
+        # orphan_grace(60초) 이내이므로 이미 로드한 near는 다시 조회하지 않음
+        assert await scheduler.load(now + timedelta(seconds=65)) == 1
+        assert sorted(entry[2] for entry in scheduler._heap) == sorted([near.id, far.id])
+
+    @pytest.mark.asyncio
+    async def test_claim_fires_once_across_instances(self, sched_db):
+        """두 인스턴스가 같은 작업을 로드해도 조건부 UPDATE로 한 번만 발송"""
+        log = add_push_log(sched_db, datetime.utcnow() + timedelta(seconds=1))
+        first, second = make_scheduler(), make_scheduler()
+
+        with patch("scheduler._send_scheduled_push", new_callable=AsyncMock) as mockSend:
+            task = await first.fire(KIND_PUSH, log.id)
+            assert await second.fire(KIND_PUSH, log.id) is None
+            await task
+
+        mockSend.assert_awaited_once_with(log.id)
+        assert second.stats()["claim_lost"] == 1
+        sched_db.expire_all()
+        assert sched_db.get(PushLog, log.id).status == "pending"
+
+    @pytest.mark.asyncio
+    async def test_restart_does_not_refire_claimed_jobs(self, sched_db):
+        """이미 선점된(scheduled가 아닌) 로그는 재시작 후 로드되지 않음"""
+        past = datetime.utcnow() - timedelta(minutes=5)
+        add_push_log(sched_db, past, status="pending")
+        pending = add_push_log(sched_db, past)
+
+        scheduler = make_scheduler()
+        assert await scheduler.load() == 1
+        assert scheduler._heap[0][2] == pending.id
+
+    @pytest.mark.asyncio
+    async def test_crashed_direct_send_is_recovered(self, sched_db):
+        """직접 발송 중 인스턴스가 죽어 pending으로 남은 예약 이메일은 claim_timeout 후 payload로 다시 발송"""
+        log = EmailLog(
+            sender_email="a@example.com",
+            recipient_emails=["b@example.com"],
+            subject="s",
+            body="b",
+            smtp_host="smtp.example.com",
+            smtp_port=587,
+            status="scheduled",
+            send_at=datetime.utcnow() - timedelta(seconds=1)
+        )
+        sched_db.add(log)
+        sched_db.commit()
+        sched_db.add(JobPayload(log_id=log.id, kind=KIND_EMAIL, payload=encode_payload({"subject": "s"})))
+        sched_db.commit()
+
+        crashed = make_scheduler(claim_timeout=30)
+        assert await crashed.claim(KIND_EMAIL, log.id)
+        sched_db.expire_all()
+        claimedAt = sched_db.get(EmailLog, log.id).send_at
+        assert sched_db.get(JobPayload, log.id) is not None
+
+        restarted = make_scheduler(claim_timeout=30)
+        assert await restarted.load(claimedAt + timedelta(seconds=10)) == 0
+        assert await restarted.load(claimedAt + timedelta(seconds=31)) == 1
+
+        with patch("retry_engine.EmailService.send_email", new=AsyncMock(return_value=(True, None))) as mockSend, \
+             patch("scheduler.datetime") as mockDatetime:
+            mockDatetime.utcnow.return_value = claimedAt + timedelta(seconds=31)
+            task = await restarted.fire(KIND_EMAIL, log.id)
+            await task
+            await crashed.fire(KIND_EMAIL, log.id)
+
+        mockSend.assert_awaited_once_with(subject="s", raise_errors=True)
+        sched_db.expire_all()
+        assert sched_db.get(EmailLog, log.id).status == "success"
+        assert sched_db.get(JobPayload, log.id) is None
+
+    @pytest.mark.asyncio
+    async def test_run_releases_due_jobs_at_release_rate(self, sched_db):
+        """만기 작업은 release_rate 간격으로 방출"""
+        due = datetime.utcnow() - timedelta(seconds=1)
+        logs = [add_push_log(sched_db, due) for _ in range(3)]
+        scheduler = make_scheduler(release_rate=20)
+        fired = []
+
+        async def recordSend(log_id):
+            fired.append((log_id, asyncio.get_running_loop().time()))
+
+        with patch("scheduler._send_scheduled_push", new=recordSend):
+            await scheduler.start()
+            for _ in range(100):
+                if len(fired) == 3:
+                    break
+                await asyncio.sleep(0.02)
+            await scheduler.shutdown(timeout=1)
+
+        assert sorted(log_id for log_id, _ in fired) == sorted(log.id for log in logs)
+        gaps = [b[1] - a[1] for a, b in zip(fired, fired[1:])]
+        assert all(gap >= 0.04 for gap in gaps)
+        assert scheduler.stats()["fired"] == 3
+
+    @pytest.mark.asyncio
+    async def test_scheduled_email_sends_stored_payload(self, sched_db):
+        """예약 이메일: payload를 복호화해 발송하고 payload는 삭제"""
+        log = EmailLog(
+            sender_email="a@example.com",
+            recipient_emails=["b@example.com"],
+            subject="s",
+            body="b",
+            smtp_host="smtp.example.com",
+            smtp_port=587,
+            status="scheduled",
+            send_at=datetime.utcnow() + timedelta(seconds=1)
+        )
+        sched_db.add(log)
+        sched_db.commit()
+        sched_db.add(JobPayload(log_id=log.id, kind=KIND_EMAIL, payload=encode_payload({"subject": "s"})))
+        sched_db.commit()
+
+        scheduler = make_scheduler()
+        with patch("retry_engine.EmailService.send_email", new=AsyncMock(return_value=(True, None))) as mockSend, \
+             patch("scheduler._apply_send_result", new_callable=AsyncMock) as mockApply:
+            task = await scheduler.fire(KIND_EMAIL, log.id)
+            await task
+
+        mockSend.assert_awaited_once_with(subject="s", raise_errors=True)
+        mockApply.assert_awaited_once_with(log.id, True, None, attempts=ANY)
+        sched_db.expire_all()
+        assert sched_db.get(JobPayload, log.id) is None
+
+    @pytest.mark.asyncio
+    async def test_retry_is_rescheduled_with_remaining_tokens(self, sched_db):
+        """일시적 오류 토큰만 retrying 상태로 재예약되고 다음 시도에서 그 토큰만 발송"""
+        from push_service import FailedTokens
+        from retry_engine import RetryBudget, RetryPolicy
+
+        log = add_push_log(sched_db, datetime.utcnow(), tokens=["t1", "t2"])
+        scheduler = make_scheduler()
+        policy = RetryPolicy(True, 3, 0.01, 0.01, RetryBudget(ratio=1, min_retries=10, window=60))
+        first = AsyncMock(return_value=(1, 1, FailedTokens([("t2", "UNAVAILABLE")])))
+        with patch("retry_engine.retry_policy", policy), \
+             patch("retry_engine.PushService.send_push_async", new=first), \
+             patch("scheduler.send_scheduler", scheduler):
+            await (await scheduler.fire(KIND_PUSH, log.id))
+
+        sched_db.expire_all()
+        retrying = sched_db.get(PushLog, log.id)
+        assert retrying.status == "retrying"
+        assert retrying.success_count == 1
+        assert delivery_statuses(sched_db, log.id) == {"t1": "success", "t2": "retrying"}
+
+        second = AsyncMock(return_value=(1, 0, FailedTokens()))
+        with patch("retry_engine.retry_policy", policy), \
+             patch("retry_engine.PushService.send_push_async", new=second):
+            await (await scheduler.fire(KIND_PUSH, log.id))
+
+        assert second.await_args.kwargs["device_tokens"] == ["t2"]
+        sched_db.expire_all()
+        done = sched_db.get(PushLog, log.id)
+        assert done.status == "success"
+        assert done.success_count == 2
+        assert len(done.attempts) == 2
+        assert delivery_statuses(sched_db, log.id) == {"t1": "success", "t2": "success"}
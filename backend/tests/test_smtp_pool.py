@@ -0,0 +1,159 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from unittest.mock import patch, AsyncMock, MagicMock
+import aiosmtplib
+import pytest
+
+from smtp_pool import SMTPPoolKey, SMTPConnectionPool, SMTPPoolManager
+
+
+def make_fake_smtp():
+    """aiosmtplib.SMTP mock 생성"""
+    fakeSmtp = MagicMock()
+    fakeSmtp.is_connected = True
+    fakeSmtp.connect = AsyncMock()
+    fakeSmtp.login = AsyncMock()
+    fakeSmtp.noop = AsyncMock()
+    fakeSmtp.rset = AsyncMock()
+    fakeSmtp.quit = AsyncMock()
+    fakeSmtp.send_message = AsyncMock(return_value=({}, "OK"))
+    return fakeSmtp
+
+
+def make_pool(max_size=2, idle_timeout=30.0):
+    key = SMTPPoolKey.build("smtp.example.com", 587, "user", "pw", False, True)
+    return SMTPConnectionPool(
+        key, {"hostname": "smtp.example.com", "port": 587}, "user", "pw",
+        max_size=max_size, idle_timeout=idle_timeout
+    )
+
+
+class TestSMTPPoolKey:
+    def test_password_not_stored_in_key(self):
+        """키에는 비밀번호 원문 대신 해시만 저장"""
+        key = SMTPPoolKey.build("smtp.example.com", 587, "user", "secret", False, True)
+        assert "secret" not in repr(key)
+        assert key.password_digest is not None
+
+    def test_different_password_different_key(self):
+        """비밀번호가 다르면 다른 풀 사용"""
+        keyA = SMTPPoolKey.build("smtp.example.com", 587, "user", "a", False, True)
+        keyB = SMTPPoolKey.build("smtp.example.com", 587, "user", "b", False, True)
+        assert keyA != keyB
+
+
+class TestSMTPConnectionPool:
+    @pytest.mark.asyncio
+    async def test_reuses_authenticated_session(self):
+        """두 번째 발송은 connect/login 없이 기존 세션 재사용"""
+        fakeSmtp = make_fake_smtp()
+        pool = make_pool()
+        with patch("smtp_pool.aiosmtplib.SMTP", return_value=fakeSmtp) as mockSmtpClass:
+            await pool.send_message(MagicMock())
+            await pool.send_message(MagicMock())
+
+        assert mockSmtpClass.call_count == 1
+        fakeSmtp.connect.assert_awaited_once()
+        fakeSmtp.login.assert_awaited_once_with("user", "pw")
+        fakeSmtp.noop.assert_awaited_once()
+        assert fakeSmtp.send_message.await_count == 2
+        assert pool.stats()["idle"] == 1
+
+    @pytest.mark.asyncio
+    async def test_reconnects_when_noop_fails(self):
+        """NOOP 실패한 세션은 버리고 새로 연결"""
+        staleSmtp = make_fake_smtp()
+        staleSmtp.noop.side_effect = aiosmtplib.SMTPServerDisconnected("gone")
+        freshSmtp = make_fake_smtp()
+        pool = make_pool()
+        with patch("smtp_pool.aiosmtplib.SMTP", side_effect=[staleSmtp, freshSmtp]):
+            await pool.send_message(MagicMock())
+            await pool.send_message(MagicMock())
+
+        freshSmtp.send_message.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_reconnects_on_server_disconnected(self):
+        """발송 중 SMTPServerDisconnected → 재연결 후 재시도"""
+        droppedSmtp = make_fake_smtp()
+        droppedSmtp.send_message.side_effect = aiosmtplib.SMTPServerDisconnected("closed")
+        freshSmtp = make_fake_smtp()
+        pool = make_pool()
+        with patch("smtp_pool.aiosmtplib.SMTP", side_effect=[droppedSmtp, freshSmtp]):
+            await pool.send_message(MagicMock())
+
+        freshSmtp.login.assert_awaited_once()
+        freshSmtp.send_message.assert_awaited_once()
+        assert pool.stats()["in_use"] == 0
+
+    @pytest.mark.asyncio
+    async def test_idle_timeout_closes_session(self):
+        """idle_timeout이 지난 세션은 재사용하지 않음"""
+        oldSmtp = make_fake_smtp()
+        newSmtp = make_fake_smtp()
+        pool = make_pool(idle_timeout=0)
+        with patch("smtp_pool.aiosmtplib.SMTP", side_effect=[oldSmtp, newSmtp]), \
+             patch("smtp_pool.time.monotonic", side_effect=[0, 0, 100, 100, 100]):
+            await pool.send_message(MagicMock())
+            await pool.send_message(MagicMock())
+
+        oldSmtp.quit.assert_awaited_once()
+        newSmtp.send_message.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_transaction_error_keeps_session(self):
+        """수신자 거부 등 응답 오류는 RSET 후 세션 유지"""
+        fakeSmtp = make_fake_smtp()
+        fakeSmtp.send_message.side_effect = aiosmtplib.SMTPResponseException(550, "rejected")
+        pool = make_pool()
+        with patch("smtp_pool.aiosmtplib.SMTP", return_value=fakeSmtp):
+            with pytest.raises(aiosmtplib.SMTPResponseException):
+                await pool.send_message(MagicMock())
+
+        fakeSmtp.rset.assert_awaited_once()
+        assert pool.stats()["idle"] == 1
+
+
+class TestSMTPPoolManager:
+    @pytest.mark.asyncio
+    async def test_disabled_pool_quits_every_message(self):
+        """풀 비활성화 시 메시지마다 quit"""
+        fakeSmtp = make_fake_smtp()
+        manager = SMTPPoolManager(enabled=False, max_size=2, idle_timeout=30)
+        key = SMTPPoolKey.build("smtp.example.com", 587, None, None, False, True)
+        with patch("smtp_pool.aiosmtplib.SMTP", return_value=fakeSmtp):
+            await manager.send_message(key, {}, None, None, MagicMock())
+
+        fakeSmtp.quit.assert_awaited_once()
+        assert manager.stats() == []
+
+    @pytest.mark.asyncio
+    async def test_close_all(self):
+        """close_all은 유휴 세션을 모두 quit"""
+        fakeSmtp = make_fake_smtp()
+        manager = SMTPPoolManager(enabled=True, max_size=2, idle_timeout=30)
+        key = SMTPPoolKey.build("smtp.example.com", 587, "user", "pw", False, True)
+        with patch("smtp_pool.aiosmtplib.SMTP", return_value=fakeSmtp):
+            await manager.send_message(key, {}, "user", "pw", MagicMock())
+            await manager.close_all()
+
+        fakeSmtp.quit.assert_awaited_once()
+        assert manager.stats() == []
+
+    @pytest.mark.asyncio
+    async def test_reap_idle_closes_sessions_and_drops_unused_pools(self):
+        """idle_timeout이 지난 세션은 닫고, 세션이 없는 풀은 레지스트리에서 제거"""
+        fakeSmtp = make_fake_smtp()
+        manager = SMTPPoolManager(enabled=True, max_size=2, idle_timeout=30)
+        key = SMTPPoolKey.build("smtp.example.com", 587, "user", "pw", False, True)
+        with patch("smtp_pool.aiosmtplib.SMTP", return_value=fakeSmtp):
+            await manager.send_message(key, {}, "user", "pw", MagicMock())
+        await manager.reap_idle()
+        assert manager.stats()[0]["idle"] == 1
+
+        with patch("smtp_pool.time.monotonic", return_value=10 ** 9):
+            await manager.reap_idle()
+        fakeSmtp.quit.assert_awaited_once()
+        assert manager.stats() == []
@@ -0,0 +1,187 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from firebase_admin import exceptions as firebaseExceptions
+from firebase_admin import messaging as firebaseMessaging
+
+import push_service
+from database import PushTokenHealth
+from main import app
+from push_service import PushService
+from token_registry import TokenRegistry, fcm_error_code, token_hash
+
+
+@pytest.fixture
+def registry_db(temp_db):
+    """임시 SQLite DB로 레지스트리/API의 세션을 대체"""
+    return temp_db("token_registry", sync_modules=("token_registry",), override_db=True).session
+
+
+class TestErrorClassification:
+    def test_fcm_error_code(self):
+        """firebase_admin 예외 → FCM 에러 코드"""
+        assert fcm_error_code(firebaseMessaging.UnregisteredError("gone")) == "UNREGISTERED"
+        assert fcm_error_code(firebaseMessaging.SenderIdMismatchError("mismatch")) == "SENDER_ID_MISMATCH"
+        assert fcm_error_code(firebaseExceptions.InvalidArgumentError("bad")) == "INVALID_ARGUMENT"
+        assert fcm_error_code(firebaseExceptions.UnavailableError("retry")) == "UNAVAILABLE"
+        assert fcm_error_code(Exception("unknown")) is None
+
+
+class TestTokenRegistry:
+    def test_record_and_filter(self, registry_db):
+        """영구 실패 토큰만 기록되고 이후 발송에서 제외"""
+        registry = TokenRegistry(enabled=True)
+        registry.record_failures("project-a", [
+            ("dead_token", "UNREGISTERED"),
+            ("flaky_token", "UNAVAILABLE"),
+            ("bad_payload_token", "INVALID_ARGUMENT"),  # 배치 전체 실패 → payload 문제일 수 있으므로 제외
+        ], batch_had_success=False)
+
+        alive, skipped = registry.filter_tokens("project-a", ["dead_token", "flaky_token", "bad_payload_token"])
+        assert skipped == ["dead_token"]
+        assert alive == ["flaky_token", "bad_payload_token"]
+        # 다른 프로젝트에는 영향 없음
+        assert registry.filter_tokens("project-b", ["dead_token"]) == (["dead_token"], [])
+
+        rows = registry_db.query(PushTokenHealth).all()
+        assert [(row.token, row.error_code) for row in rows] == [("dead_token", "UNREGISTERED")]
+        assert rows[0].token_hash == token_hash("dead_token")
+
+    def test_repeated_failure_increments_count(self, registry_db):
+        """같은 토큰이 다시 실패하면 failure_count 증가"""
+        registry = TokenRegistry(enabled=True)
+        registry.record_failures("project-a", [("dead_token", "INVALID_ARGUMENT")], batch_had_success=True)
+        registry.record_failures("project-a", [("dead_token", "UNREGISTERED")], batch_had_success=False)
+
+        row = registry_db.query(PushTokenHealth).one()
+        assert row.failure_count == 2
+        assert row.error_code == "UNREGISTERED"
+
+    def test_tokens_recorded_by_other_instance_are_updated(self, registry_db):
+        """다른 인스턴스가 이미 기록한 토큰이 섞여 있어도 배치 전체가 기록됨 (중복 키로 롤백되지 않음)"""
+        registry_db.add(PushTokenHealth(
+            firebase_project_id="project-a", token_hash=token_hash("t1"), token="t1", error_code="UNREGISTERED"
+        ))
+        registry_db.commit()
+
+        registry = TokenRegistry(enabled=True)
+        registry.record_failures("project-a", [("t1", "SENDER_ID_MISMATCH"), ("t2", "UNREGISTERED")], False)
+
+        registry_db.expire_all()
+        rows = {row.token: row for row in registry_db.query(PushTokenHealth).all()}
+        assert (rows["t1"].failure_count, rows["t1"].error_code) == (2, "SENDER_ID_MISMATCH")
+        assert (rows["t2"].failure_count, rows["t2"].error_code) == (1, "UNREGISTERED")
+
+    def test_load_incremental(self, registry_db):
+        """다른 인스턴스가 기록한 토큰을 증분 로드"""
+        registry_db.add(PushTokenHealth(
+            firebase_project_id="project-a", token_hash=token_hash("t1"), token="t1", error_code="UNREGISTERED"
+        ))
+        registry_db.commit()
+
+        registry = TokenRegistry(enabled=True)
+        assert registry.load() == 1
+        assert registry.filter_tokens("project-a", ["t1", "t2"]) == (["t2"], ["t1"])
+        assert registry.load() == 0
+
+    def test_disabled_registry_passes_all(self):
+        registry = TokenRegistry(enabled=False)
+        registry._remember("project-a", [token_hash("t1")])
+        assert registry.filter_tokens("project-a", ["t1"]) == (["t1"], [])
+
+
+class TestPushServicePrefilter:
+    def setup_method(self):
+        push_service._firebase_app_cache.clear()
+
+    def test_dead_tokens_skipped_and_recorded(self, registry_db):
+        """dead 토큰은 FCM에 보내지 않고 실패로 집계, 새 UNREGISTERED 응답은 기록"""
+        registry = TokenRegistry(enabled=True)
+        registry._remember("test-project", [token_hash("known_dead")])
+        push_service._firebase_app_cache["test-project"] = MagicMock()
+
+        okResponse = MagicMock(success=True, exception=None)
+        goneResponse = MagicMock(success=False, exception=firebaseMessaging.UnregisteredError("gone"))
+        mockBatchResponse = MagicMock(success_count=1, failure_count=1, responses=[okResponse, goneResponse])
+
+        with patch("push_service.token_registry", registry), \
+             patch("push_service.FIREBASE_AVAILABLE", True), \
+             patch("push_service.messaging") as mockMessaging:
+            mockMessaging.send_each.return_value = mockBatchResponse
+            successCount, failureCount, failedTokens = PushService.send_push(
+                firebase_project_id="test-project",
+                device_tokens=["token_ok", "known_dead", "token_gone"],
+                title="제목",
+                body="내용"
+            )
+
+        sentMessages = mockMessaging.send_each.call_args.args[0]
+        assert len(sentMessages) == 2
+        assert successCount == 1
+        assert failureCount == 2
+        assert sorted(failedTokens) == ["known_dead", "token_gone"]
+        assert registry.filter_tokens("test-project", ["token_gone"])[1] == ["token_gone"]
+
+    def test_all_dead_skips_fcm(self):
+        """모든 토큰이 dead면 Firebase 앱 초기화/FCM 호출 없음"""
+        registry = TokenRegistry(enabled=True)
+        registry._remember("test-project", [token_hash("a"), token_hash("b")])
+        with patch("push_service.token_registry", registry), \
+             patch.object(PushService, "_get_firebase_app") as mockGetApp:
+            result = PushService.send_push("test-project", ["a", "b"], "제목", "내용")
+
+        assert result == (0, 2, ["a", "b"])
+        mockGetApp.assert_not_called()
+
+
+class TestDeadTokenAPI:
+    def _seed(self, session, count):
+        for i in range(count):
+            session.add(PushTokenHealth(
+                firebase_project_id="project-a",
+                token_hash=token_hash(f"token_{i}"),
+                token=f"token_{i}",
+                error_code="UNREGISTERED",
+                created_at=datetime(2025, 1, 1, 0, i),
+                last_failed_at=datetime(2025, 1, 2)
+            ))
+        session.add(PushTokenHealth(
+            firebase_project_id="project-b", token_hash=token_hash("other"), token="other", error_code="UNREGISTERED"
+        ))
+        session.commit()
+
+    def test_list_dead_tokens_with_cursor(self, registry_db):
+        """프로젝트별 dead 토큰 목록 + 커서 페이지네이션"""
+        self._seed(registry_db, 3)
+        client = TestClient(app)
+        first = client.get("/api/v1/push/tokens/dead?firebase_project_id=project-a&limit=2")
+        assert first.status_code == 200
+        assert [item["token"] for item in first.json()] == ["token_2", "token_1"]
+        second = client.get(
+            f"/api/v1/push/tokens/dead?firebase_project_id=project-a&limit=2&cursor={first.headers['X-Next-Cursor']}"
+        )
+        assert [item["token"] for item in second.json()] == ["token_0"]
+
+    def test_export_ndjson_and_csv(self, registry_db):
+        """NDJSON / CSV export (fan-out 토큰 파일 형식과 호환)"""
+        self._seed(registry_db, 2)
+        client = TestClient(app)
+
+        ndjson = client.get("/api/v1/push/tokens/dead/export?firebase_project_id=project-a")
+        assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in ndjson.text.splitlines()]
+        assert [line["token"] for line in lines] == ["token_0", "token_1"]
+
+        csvResponse = client.get("/api/v1/push/tokens/dead/export?firebase_project_id=project-a&format=csv")
+        rows = csvResponse.text.splitlines()
+        assert rows[0].startswith("token,error_code")
+        assert rows[1].startswith("token_0,UNREGISTERED,1,")
+
+        assert client.get("/api/v1/push/tokens/dead/export?firebase_project_id=project-a&format=xml").status_code == 422
@@ -0,0 +1,252 @@
+"""
+FCM dead 토큰 레지스트리
+
+send/send_each 응답의 에러 코드로 영구 실패 토큰(UNREGISTERED 등)을 push_token_health 테이블에 기록하고,
+프로젝트별 토큰 해시 집합을 메모리에 유지하여 다음 발송부터 FCM 호출 전에 걸러낸다.
+다른 인스턴스가 기록한 토큰은 last_failed_at 기준 증분 로드(refresh)로 반영된다.
+"""
+import csv
+import hashlib
+import io
+import json
+import logging
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database import AsyncSessionLocal, PushTokenHealth, SessionLocal
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    from firebase_admin import exceptions as firebase_exceptions
+    from firebase_admin import messaging as firebase_messaging
+except ImportError:
+    firebase_exceptions = None
+    firebase_messaging = None
+
+# 토큰 자체가 더 이상 유효하지 않음을 의미하는 에러 코드
+ERROR_UNREGISTERED = "UNREGISTERED"
+ERROR_SENDER_ID_MISMATCH = "SENDER_ID_MISMATCH"
+ERROR_INVALID_ARGUMENT = "INVALID_ARGUMENT"
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+# 한 문장으로 기록하는 최대 토큰 수
+SAVE_CHUNK_SIZE = 500
+
+
+def token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _memory_key(hash_hex: str) -> bytes:
+    # 메모리 사용량을 줄이기 위해 해시 앞 16바이트만 보관 (충돌 확률 무시 가능)
+    return bytes.fromhex(hash_hex[:32])
+
+
+def fcm_error_code(exc: Optional[BaseException]) -> Optional[str]:
+    """firebase_admin 예외 → FCM 에러 코드 (알 수 없으면 None)"""
+    if exc is None or firebase_exceptions is None:
+        return None
+    if isinstance(exc, firebase_messaging.UnregisteredError):
+        return ERROR_UNREGISTERED
+    if isinstance(exc, firebase_messaging.SenderIdMismatchError):
+        return ERROR_SENDER_ID_MISMATCH
+    if isinstance(exc, firebase_exceptions.FirebaseError):
+        return exc.code
+    return None
+
+
+def is_dead_error(error_code: Optional[str], batch_had_success: bool) -> bool:
+    """
+    영구 실패 여부.
+    INVALID_ARGUMENT는 payload 오류일 수도 있으므로 같은 배치에 성공 건이 있을 때만 토큰 문제로 판단한다.
+    """
+    if error_code in (ERROR_UNREGISTERED, ERROR_SENDER_ID_MISMATCH):
+        return True
+    return error_code == ERROR_INVALID_ARGUMENT and batch_had_success
+
+
+def _upsert_statement(dialect: str, rows: List[Dict[str, Any]]):
+    table = PushTokenHealth.__table__
+    if dialect == "sqlite":
+        stmt = sqlite_insert(table).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=[table.c.firebase_project_id, table.c.token_hash],
+            set_={
+                "error_code": stmt.excluded.error_code,
+                "failure_count": table.c.failure_count + 1,
+                "last_failed_at": stmt.excluded.last_failed_at,
+            }
+        )
+    stmt = mysql_insert(table).values(rows)
+    return stmt.on_duplicate_key_update(
+        error_code=stmt.inserted.error_code,
+        failure_count=table.c.failure_count + 1,
+        last_failed_at=stmt.inserted.last_failed_at,
+    )
+
+
+class TokenRegistry:
+    """프로젝트별 dead 토큰 집합 (발송 스레드 풀에서 호출되므로 lock으로 보호)"""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._dead: Dict[str, Set[bytes]] = {}
+        self._lock = threading.Lock()
+        self._loaded_until: Optional[datetime] = None
+        self._skipped = 0
+        self._recorded = 0
+
+    def filter_tokens(self, firebase_project_id: str, tokens: Sequence[str]) -> Tuple[List[str], List[str]]:
+        """(발송할 토큰, 건너뛸 dead 토큰)"""
+        if not self.enabled:
+            return list(tokens), []
+        with self._lock:
+            dead = self._dead.get(firebase_project_id)
+            if not dead:
+                return list(tokens), []
+            alive, skipped = [], []
+            for token in tokens:
+                (skipped if _memory_key(token_hash(token)) in dead else alive).append(token)
+            self._skipped += len(skipped)
+        return alive, skipped
+
+    def _remember(self, firebase_project_id: str, hashes: List[str]):
+        with self._lock:
+            dead = self._dead.setdefault(firebase_project_id, set())
+            dead.update(_memory_key(h) for h in hashes)
+
+    def record_failures(
+        self,
+        firebase_project_id: str,
+        failures: List[Tuple[str, Optional[str]]],
+        batch_had_success: bool
+    ):
+        """
+        발송 실패 (token, error_code) 목록 중 영구 실패만 기록.
+        DB 기록 실패는 발송 결과에 영향을 주지 않도록 로그만 남긴다.
+        """
+        dead = {
+            token: code for token, code in failures
+            if is_dead_error(code, batch_had_success)
+        }
+        if not dead:
+            return
+        hashes = {token_hash(token): (token, code) for token, code in dead.items()}
+        self._remember(firebase_project_id, list(hashes))
+        self._recorded += len(hashes)
+        logger.info(f"dead 토큰 {len(hashes)}건 기록: project_id={firebase_project_id}")
+        try:
+            self._save(firebase_project_id, hashes)
+        except Exception as e:
+            logger.warning(f"dead 토큰 DB 기록 실패 ({firebase_project_id}): {str(e)}")
+
+    @staticmethod
+    def _save(firebase_project_id: str, hashes: Dict[str, Tuple[str, str]]):
+        """
+        (프로젝트, 토큰 해시) 단위 upsert: 없으면 INSERT, 있으면 failure_count 증가 + 에러 코드/최근 실패 시각 갱신.
+        SELECT 후 INSERT하면 다른 인스턴스가 같은 토큰을 먼저 기록했을 때 중복 키 오류로 배치 전체가 롤백되므로
+        한 문장으로 처리한다. (해시 순서로 기록해 동시 upsert 간 잠금 순서를 맞춤)
+        """
+        now = datetime.utcnow()
+        rows = [
+            dict(
+                id=str(uuid.uuid4()), firebase_project_id=firebase_project_id, token_hash=hash_hex, token=token,
+                error_code=code, failure_count=1, created_at=now, last_failed_at=now
+            )
+            for hash_hex, (token, code) in sorted(hashes.items())
+        ]
+        db = SessionLocal()
+        try:
+            dialect = db.get_bind().dialect.name
+            for start in range(0, len(rows), SAVE_CHUNK_SIZE):
+                db.execute(_upsert_statement(dialect, rows[start:start + SAVE_CHUNK_SIZE]))
+            db.commit()
+        finally:
+            db.close()
+
+    def load(self) -> int:
+        """DB의 dead 토큰을 메모리로 로드 (이전 로드 이후 갱신분만)"""
+        if not self.enabled:
+            return 0
+        started_at = datetime.utcnow()
+        stmt = select(PushTokenHealth.firebase_project_id, PushTokenHealth.token_hash)
+        if self._loaded_until is not None:
+            stmt = stmt.where(PushTokenHealth.last_failed_at >= self._loaded_until)
+        db = SessionLocal()
+        try:
+            rows = db.execute(stmt).all()
+        finally:
+            db.close()
+        by_project: Dict[str, List[str]] = {}
+        for project_id, hash_hex in rows:
+            by_project.setdefault(project_id, []).append(hash_hex)
+        for project_id, hashes in by_project.items():
+            self._remember(project_id, hashes)
+        self._loaded_until = started_at
+        return len(rows)
+
+    def clear(self):
+        with self._lock:
+            self._dead.clear()
+            self._loaded_until = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            projects = {project_id: len(hashes) for project_id, hashes in self._dead.items()}
+        return {
+            "enabled": self.enabled,
+            "dead_tokens": projects,
+            "skipped": self._skipped,
+            "recorded": self._recorded,
+        }
+
+
+async def export_dead_tokens(firebase_project_id: str, export_format: str) -> AsyncIterator[str]:
+    """프로젝트의 dead 토큰을 NDJSON 또는 CSV로 스트리밍 (전체를 메모리에 올리지 않음)"""
+    stmt = (
+        select(
+            PushTokenHealth.token,
+            PushTokenHealth.error_code,
+            PushTokenHealth.failure_count,
+            PushTokenHealth.created_at,
+            PushTokenHealth.last_failed_at
+        )
+        .where(PushTokenHealth.firebase_project_id == firebase_project_id)
+        .order_by(PushTokenHealth.created_at, PushTokenHealth.id)
+        .execution_options(yield_per=1000)
+    )
+    if export_format == "csv":
+        yield "token,error_code,failure_count,first_failed_at,last_failed_at\n"
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt)
+        async for rows in result.partitions():
+            buffer = io.StringIO()
+            if export_format == "csv":
+                writer = csv.writer(buffer, lineterminator="\n")
+                for row in rows:
+                    writer.writerow([
+                        row.token, row.error_code, row.failure_count,
+                        row.created_at.isoformat(), row.last_failed_at.isoformat()
+                    ])
+            else:
+                for row in rows:
+                    buffer.write(json.dumps({
+                        "token": row.token,
+                        "error_code": row.error_code,
+                        "failure_count": row.failure_count,
+                        "first_failed_at": row.created_at.isoformat(),
+                        "last_failed_at": row.last_failed_at.isoformat(),
+                    }) + "\n")
+            yield buffer.getvalue()
+
+
+token_registry = TokenRegistry(enabled=settings.push_token_prefilter_enabled)
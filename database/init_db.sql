@@ -21,9 +21,204 @@ CREATE TABLE IF NOT EXISTS email_logs (
     attachment_count INTEGER DEFAULT 0,
     total_attachment_size BIGINT DEFAULT 0,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-    sent_at DATETIME
+    sent_at DATETIME,
+    batch_id CHAR(36),
+    send_at DATETIME,
+    attempts JSON
 );
 
 CREATE INDEX IF NOT EXISTS idx_email_logs_created_at ON email_logs(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_email_logs_status ON email_logs(status);
 
+-- 검색 필터용 복합 인덱스: (필터 컬럼, created_at, id)
+-- 등호 조건 + 기간(created_from/created_to) + 커서 조건을 하나의 인덱스 범위 스캔으로 처리
+-- idx_email_logs_status는 idx_email_logs_status_created_at의 prefix이므로 적용 후 삭제 가능:
+--   DROP INDEX idx_email_logs_status ON email_logs;
+CREATE INDEX IF NOT EXISTS idx_email_logs_status_created_at ON email_logs(status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_email_logs_sender_created_at ON email_logs(sender_email, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_email_logs_smtp_host_created_at ON email_logs(smtp_host, created_at DESC, id DESC);
+
+-- 대량 발송 배치 추적 (기존 테이블: ALTER TABLE email_logs ADD COLUMN batch_id CHAR(36) NULL;)
+CREATE INDEX IF NOT EXISTS idx_email_logs_batch_id_created_at ON email_logs(batch_id, created_at DESC, id DESC);
+
+-- 커서 페이지네이션용 복합 인덱스 (ORDER BY created_at DESC, id DESC)
+CREATE INDEX IF NOT EXISTS idx_email_logs_created_at_id ON email_logs(created_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS push_logs (
+    id CHAR(36) PRIMARY KEY,
+    firebase_project_id VARCHAR(255) NOT NULL,
+    title VARCHAR(500) NOT NULL,
+    body TEXT NOT NULL,
+    data JSON,
+    token_count INTEGER DEFAULT 0,
+    success_count INTEGER DEFAULT 0,
+    failure_count INTEGER DEFAULT 0,
+    status VARCHAR(50) DEFAULT 'pending',
+    error_message TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    sent_at DATETIME,
+    parent_log_id CHAR(36),
+    chunk_index INTEGER,
+    send_at DATETIME,
+    attempts JSON
+);
+
+CREATE INDEX IF NOT EXISTS idx_push_logs_created_at_id ON push_logs(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_push_logs_status_created_at ON push_logs(status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_push_logs_project_created_at ON push_logs(firebase_project_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_push_logs_project_status_created_at ON push_logs(firebase_project_id, status, created_at DESC, id DESC);
+
+-- fan-out chunk 로그 조회 (기존 테이블: ALTER TABLE push_logs ADD COLUMN parent_log_id CHAR(36) NULL, ADD COLUMN chunk_index INTEGER NULL;)
+CREATE INDEX IF NOT EXISTS idx_push_logs_parent_created_at ON push_logs(parent_log_id, created_at DESC, id DESC);
+
+-- 로그 테이블 월 단위 RANGE 파티션 (MySQL 8.0, 선택)
+-- 보관 기간이 지난 월은 log_retention이 아카이브 후 DROP PARTITION으로 삭제하고, 앞으로 쓸 월 파티션은 pmax를 나눠 미리 만든다.
+-- 파티션 이름은 p{YYYYMM} (상한: 다음 달 1일), 마지막은 pmax. 파티션 키는 모든 unique 키에 포함되어야 하므로 기본 키를 (id, created_at)으로 바꾼다.
+-- 파티션이 없으면 log_retention은 만료된 로그를 batch 단위 DELETE로 정리한다.
+-- ALTER TABLE email_logs MODIFY created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+--   DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at);
+-- ALTER TABLE email_logs PARTITION BY RANGE COLUMNS (created_at) (
+--   PARTITION p202601 VALUES LESS THAN ('2026-02-01'),
+--   PARTITION p202602 VALUES LESS THAN ('2026-03-01'),
+--   PARTITION pmax VALUES LESS THAN (MAXVALUE)
+-- );
+-- ALTER TABLE push_logs MODIFY created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+--   DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at);
+-- ALTER TABLE push_logs PARTITION BY RANGE COLUMNS (created_at) (
+--   PARTITION p202601 VALUES LESS THAN ('2026-02-01'),
+--   PARTITION p202602 VALUES LESS THAN ('2026-03-01'),
+--   PARTITION pmax VALUES LESS THAN (MAXVALUE)
+-- );
+-- (첫 파티션은 가장 오래된 로그가 있는 달로 시작, 그 이전 로그도 첫 파티션에 들어감)
+
+-- 푸시 토큰별 발송 결과 (push_logs에는 토큰 수/성공/실패 집계만 저장)
+CREATE TABLE IF NOT EXISTS push_deliveries (
+    push_log_id CHAR(36) NOT NULL,
+    token_hash CHAR(64) NOT NULL,
+    seq INTEGER NOT NULL DEFAULT 0,
+    token TEXT NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'pending',
+    message_id VARCHAR(255),
+    error_code VARCHAR(64),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (push_log_id, token_hash)
+);
+
+CREATE INDEX IF NOT EXISTS idx_push_deliveries_log_seq ON push_deliveries(push_log_id, seq);
+CREATE INDEX IF NOT EXISTS idx_push_deliveries_log_status_seq ON push_deliveries(push_log_id, status, seq);
+CREATE INDEX IF NOT EXISTS idx_push_deliveries_token_created_at ON push_deliveries(token_hash, created_at DESC, push_log_id);
+
+-- 기존 테이블 (MySQL 8.0): 토큰 JSON을 push_deliveries로 옮긴 뒤 컬럼 삭제
+-- ALTER TABLE push_logs ADD COLUMN token_count INTEGER DEFAULT 0;
+-- UPDATE push_logs SET token_count = JSON_LENGTH(device_tokens);
+-- INSERT IGNORE INTO push_deliveries (push_log_id, token_hash, seq, token, status, created_at, updated_at)
+--   SELECT p.id, SHA2(t.token, 256), t.seq - 1, t.token,
+--          CASE WHEN p.status IN ('scheduled', 'pending', 'queued', 'retrying') THEN 'pending'
+--               WHEN JSON_CONTAINS(COALESCE(p.failed_tokens, JSON_ARRAY()), JSON_QUOTE(t.token)) THEN 'failed'
+--               ELSE 'success' END,
+--          p.created_at, COALESCE(p.sent_at, p.created_at)
+--   FROM push_logs p, JSON_TABLE(p.device_tokens, '$[*]' COLUMNS (seq FOR ORDINALITY, token TEXT PATH '$')) t;
+-- ALTER TABLE push_logs DROP COLUMN device_tokens, DROP COLUMN failed_tokens;
+
+-- FCM 영구 실패 토큰 레지스트리 (발송 전 사전 필터링 / dead 토큰 export)
+CREATE TABLE IF NOT EXISTS push_token_health (
+    id CHAR(36) PRIMARY KEY,
+    firebase_project_id VARCHAR(255) NOT NULL,
+    token_hash CHAR(64) NOT NULL,
+    token TEXT NOT NULL,
+    error_code VARCHAR(64) NOT NULL,
+    failure_count INTEGER DEFAULT 1,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    last_failed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE UNIQUE INDEX uq_push_token_health_project_hash ON push_token_health(firebase_project_id, token_hash);
+CREATE INDEX IF NOT EXISTS idx_push_token_health_project_created_at ON push_token_health(firebase_project_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_push_token_health_last_failed_at ON push_token_health(last_failed_at);
+
+-- 예약 발송 (기존 테이블: ALTER TABLE email_logs ADD COLUMN send_at DATETIME NULL; ALTER TABLE push_logs ADD COLUMN send_at DATETIME NULL;)
+-- 스케줄러는 status='scheduled' AND send_at 범위로 증분 로드
+CREATE INDEX IF NOT EXISTS idx_email_logs_status_send_at ON email_logs(status, send_at);
+CREATE INDEX IF NOT EXISTS idx_push_logs_status_send_at ON push_logs(status, send_at);
+
+-- 발송 재시도 이력 (기존 테이블: ALTER TABLE email_logs ADD COLUMN attempts JSON NULL; ALTER TABLE push_logs ADD COLUMN attempts JSON NULL;)
+-- 재시도 대기 중인 로그는 status='retrying', send_at=다음 시도 시각으로 스케줄러가 로드
+
+-- 예약/재시도 발송 정보 (이메일: SMTP 인증 정보/첨부파일, 푸시: 재시도 토큰, Fernet 암호화 JSON, 발송 후 삭제)
+CREATE TABLE IF NOT EXISTS job_payloads (
+    log_id CHAR(36) PRIMARY KEY,
+    kind VARCHAR(16) NOT NULL,
+    payload LONGBLOB NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 발송 작업 outbox (OUTBOX_ENABLED: 로그와 같은 트랜잭션으로 등록, 워커가 SELECT ... FOR UPDATE SKIP LOCKED로 lease를 잡고 처리 후 삭제)
+CREATE TABLE IF NOT EXISTS outbox_jobs (
+    id CHAR(36) PRIMARY KEY,
+    kind VARCHAR(16) NOT NULL,
+    log_id CHAR(36) NOT NULL,
+    payload LONGBLOB,
+    available_at DATETIME NOT NULL,
+    lease_token CHAR(36),
+    leased_until DATETIME,
+    claim_count INTEGER NOT NULL DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_outbox_jobs_available_at ON outbox_jobs(available_at);
+CREATE INDEX IF NOT EXISTS idx_outbox_jobs_lease_token ON outbox_jobs(lease_token);
+
+-- 발송 API Idempotency-Key (같은 키로 재시도하면 재발송 없이 최초 응답 반환)
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    id CHAR(36) PRIMARY KEY,
+    scope VARCHAR(32) NOT NULL,
+    idempotency_key VARCHAR(255) NOT NULL,
+    request_hash CHAR(64) NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'in_progress',
+    log_id CHAR(36),
+    status_code INTEGER,
+    response_body JSON,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    expires_at DATETIME NOT NULL
+);
+
+CREATE UNIQUE INDEX uq_idempotency_keys_scope_key ON idempotency_keys(scope, idempotency_key);
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at ON idempotency_keys(expires_at);
+
+-- 발송 API rate limit 카운터 (RATE_LIMIT_STORAGE=database: 모든 ECS task가 공유하는 sliding window 카운터)
+CREATE TABLE IF NOT EXISTS rate_limit_counters (
+    limit_key VARCHAR(255) NOT NULL,
+    window_start BIGINT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    expires_at DATETIME NOT NULL,
+    PRIMARY KEY (limit_key, window_start)
+);
+
+CREATE INDEX IF NOT EXISTS idx_rate_limit_counters_expires_at ON rate_limit_counters(expires_at);
+
+-- 로그 ID BINARY(16) 저장 (LOG_ID_STORAGE=binary, MySQL 8.0, 선택)
+-- CHAR(36) utf8mb4 키는 PK와 PK를 포함하는 모든 보조 인덱스 항목마다 36바이트 이상을 차지하므로 16바이트로 줄인다.
+-- 새 로그 ID는 시간순 UUIDv7이라 clustered index 끝에 추가된다 (기존 UUIDv4 행은 값 그대로 변환, API의 ID 문자열은 바뀌지 않음).
+-- 로그 ID를 참조하는 컬럼도 함께 변환한다. 변환 중에는 로그 쓰기를 멈추고, 완료 후 LOG_ID_STORAGE=binary로 배포한다.
+-- VARBINARY(36)로 바꿔 문자열 바이트를 유지한 채 UUID_TO_BIN으로 16바이트로 변환 (swap 없음: 파이썬 uuid.UUID.bytes와 같은 순서)
+-- ALTER TABLE email_logs MODIFY id VARBINARY(36) NOT NULL, MODIFY batch_id VARBINARY(36) NULL;
+-- UPDATE email_logs SET id = UUID_TO_BIN(id), batch_id = UUID_TO_BIN(batch_id);
+-- ALTER TABLE email_logs MODIFY id BINARY(16) NOT NULL, MODIFY batch_id BINARY(16) NULL;
+-- ALTER TABLE push_logs MODIFY id VARBINARY(36) NOT NULL, MODIFY parent_log_id VARBINARY(36) NULL;
+-- UPDATE push_logs SET id = UUID_TO_BIN(id), parent_log_id = UUID_TO_BIN(parent_log_id);
+-- ALTER TABLE push_logs MODIFY id BINARY(16) NOT NULL, MODIFY parent_log_id BINARY(16) NULL;
+-- ALTER TABLE push_deliveries MODIFY push_log_id VARBINARY(36) NOT NULL;
+-- UPDATE push_deliveries SET push_log_id = UUID_TO_BIN(push_log_id);
+-- ALTER TABLE push_deliveries MODIFY push_log_id BINARY(16) NOT NULL;
+-- ALTER TABLE job_payloads MODIFY log_id VARBINARY(36) NOT NULL;
+-- UPDATE job_payloads SET log_id = UUID_TO_BIN(log_id);
+-- ALTER TABLE job_payloads MODIFY log_id BINARY(16) NOT NULL;
+-- ALTER TABLE outbox_jobs MODIFY log_id VARBINARY(36) NOT NULL;
+-- UPDATE outbox_jobs SET log_id = UUID_TO_BIN(log_id);
+-- ALTER TABLE outbox_jobs MODIFY log_id BINARY(16) NOT NULL;
+-- ALTER TABLE idempotency_keys MODIFY log_id VARBINARY(36) NULL;
+-- UPDATE idempotency_keys SET log_id = UUID_TO_BIN(log_id);
+-- ALTER TABLE idempotency_keys MODIFY log_id BINARY(16) NULL;
+-- 되돌리기: 같은 순서로 VARBINARY(36) → BIN_TO_UUID(컬럼) → CHAR(36)
+-- 변환 전후 크기/INSERT 처리량 비교: backend/benchmarks/bench_log_ids.py
@@ -24,8 +24,11 @@ function PushLogs() {
 
   const handleLogClick = async (logId) => {
     try {
-      const response = await axios.get(`/api/v1/push/logs/${logId}`)
-      setSelectedLog(response.data)
+      const [response, failed] = await Promise.all([
+        axios.get(`/api/v1/push/logs/${logId}`),
+        axios.get(`/api/v1/push/logs/${logId}/deliveries`, { params: { status: 'failed' } })
+      ])
+      setSelectedLog({ ...response.data, failed_tokens: failed.data.map((delivery) => delivery.token) })
     } catch (error) {
       console.error('푸시 로그 상세 조회 실패:', error)
     }
@@ -166,7 +169,7 @@ function PushLogs() {
                     </pre>
                   </div>
                 )}
-                <div><strong>디바이스 토큰 수:</strong> {Array.isArray(selectedLog.device_tokens) ? selectedLog.device_tokens.length : 0}개</div>
+                <div><strong>디바이스 토큰 수:</strong> {selectedLog.token_count ?? 0}개</div>
                 <div><strong>성공:</strong> <span className="text-green-600 font-medium">{selectedLog.success_count}</span></div>
                 <div><strong>실패:</strong> <span className="text-red-600 font-medium">{selectedLog.failure_count}</span></div>
                 {selectedLog.failed_tokens && selectedLog.failed_tokens.length > 0 && (